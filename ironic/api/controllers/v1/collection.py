@@ -33,8 +33,12 @@ class Collection(base.APIBase):
         """Return whether collection has more items."""
         return len(self.collection) and len(self.collection) == limit
 
-    def get_next(self, limit, url=None, **kwargs):
-        """Return a link to the next subset of the collection."""
+    def get_next(self, limit, url=None, marker=None, **kwargs):
+        """Return a link to the next subset of the collection.
+
+        :param marker: the pagination marker of the next subset. Defaults
+            to the UUID of the last item of the collection.
+        """
         if not self.has_next(limit):
             return wtypes.Unset
 
@@ -42,7 +46,7 @@ class Collection(base.APIBase):
         q_args = ''.join(['%s=%s&' % (key, kwargs[key]) for key in kwargs])
         next_args = '?%(args)slimit=%(limit)d&marker=%(marker)s' % {
             'args': q_args, 'limit': limit,
-            'marker': self.collection[-1].uuid}
+            'marker': marker or self.collection[-1].uuid}
 
         return link.Link.make_link('next', pecan.request.public_url,
                                    resource_url, next_args).href
@@ -537,7 +537,7 @@ class NodeStatesController(rest.RestController):
             raise exception.NodeInMaintenance(op=_('provisioning'),
                                               node=rpc_node.uuid)
 
-        m = ir_states.machine.copy()
+        m = ir_states.machine.copy(shallow=True)
         m.initialize(rpc_node.provision_state)
         if not m.is_actionable_event(ir_states.VERBS.get(target, target)):
             # Normally, we let the task manager recognize and deal with
@@ -921,7 +921,12 @@ class NodeCollection(collection.Collection):
         collection = NodeCollection()
         collection.nodes = [Node.convert_with_links(n, fields=fields)
                             for n in nodes]
-        collection.next = collection.get_next(limit, url=url, **kwargs)
+        marker = None
+        if nodes:
+            marker = api_utils.get_page_cursor(nodes[-1],
+                                               kwargs.get('sort_key'))
+        collection.next = collection.get_next(limit, url=url, marker=marker,
+                                              **kwargs)
         return collection
 
     @classmethod
@@ -1103,6 +1108,9 @@ class NodesController(rest.RestController):
 
         marker_obj = None
         if marker:
+            marker_obj = api_utils.get_marker_from_cursor(objects.Node,
+                                                          marker, sort_key)
+        if marker and marker_obj is None:
             marker_obj = objects.Node.get_by_uuid(pecan.request.context,
                                                   marker)
 
@@ -1128,9 +1136,18 @@ class NodesController(rest.RestController):
             if resource_class is not None:
                 filters['resource_class'] = resource_class
 
+            db_fields = None
+            if fields is not None:
+                # NOTE: only load the requested fields, plus the ones needed
+                # for the links and the next page marker.
+                db_fields = set(fields) | {'id', 'uuid', sort_key or 'id'}
+                if 'chassis_uuid' in db_fields:
+                    db_fields.add('chassis_id')
+                db_fields = [f for f in objects.Node.fields
+                             if f in db_fields]
             nodes = objects.Node.list(pecan.request.context, limit, marker_obj,
                                       sort_key=sort_key, sort_dir=sort_dir,
-                                      filters=filters)
+                                      filters=filters, fields=db_fields)
 
         parameters = {'sort_key': sort_key, 'sort_dir': sort_dir}
         if associated:
@@ -1226,7 +1243,7 @@ class NodesController(rest.RestController):
 
     @METRICS.timer('NodesController.get_all')
     @expose.expose(NodeCollection, types.uuid, types.uuid, types.boolean,
-                   types.boolean, wtypes.text, types.uuid, int, wtypes.text,
+                   types.boolean, wtypes.text, types.marker, int, wtypes.text,
                    wtypes.text, wtypes.text, types.listtype, wtypes.text)
     def get_all(self, chassis_uuid=None, instance_uuid=None, associated=None,
                 maintenance=None, provision_state=None, marker=None,
@@ -1280,7 +1297,7 @@ class NodesController(rest.RestController):
 
     @METRICS.timer('NodesController.detail')
     @expose.expose(NodeCollection, types.uuid, types.uuid, types.boolean,
-                   types.boolean, wtypes.text, types.uuid, int, wtypes.text,
+                   types.boolean, wtypes.text, types.marker, int, wtypes.text,
                    wtypes.text, wtypes.text, wtypes.text)
     def detail(self, chassis_uuid=None, instance_uuid=None, associated=None,
                maintenance=None, provision_state=None, marker=None,
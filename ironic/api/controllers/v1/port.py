@@ -255,7 +255,12 @@ class PortCollection(collection.Collection):
         collection = PortCollection()
         collection.ports = [Port.convert_with_links(p, fields=fields)
                             for p in rpc_ports]
-        collection.next = collection.get_next(limit, url=url, **kwargs)
+        marker = None
+        if rpc_ports:
+            marker = api_utils.get_page_cursor(rpc_ports[-1],
+                                               kwargs.get('sort_key'))
+        collection.next = collection.get_next(limit, url=url, marker=marker,
+                                              **kwargs)
         return collection
 
     @classmethod
@@ -290,6 +295,9 @@ class PortsController(rest.RestController):
 
         marker_obj = None
         if marker:
+            marker_obj = api_utils.get_marker_from_cursor(objects.Port,
+                                                          marker, sort_key)
+        if marker and marker_obj is None:
             marker_obj = objects.Port.get_by_uuid(pecan.request.context,
                                                   marker)
 
@@ -354,7 +362,7 @@ class PortsController(rest.RestController):
 
     @METRICS.timer('PortsController.get_all')
     @expose.expose(PortCollection, types.uuid_or_name, types.uuid,
-                   types.macaddress, types.uuid, int, wtypes.text,
+                   types.macaddress, types.marker, int, wtypes.text,
                    wtypes.text, types.listtype, types.uuid_or_name)
     def get_all(self, node=None, node_uuid=None, address=None, marker=None,
                 limit=None, sort_key='id', sort_dir='asc', fields=None,
@@ -415,7 +423,7 @@ class PortsController(rest.RestController):
 
     @METRICS.timer('PortsController.detail')
     @expose.expose(PortCollection, types.uuid_or_name, types.uuid,
-                   types.macaddress, types.uuid, int, wtypes.text,
+                   types.macaddress, types.marker, int, wtypes.text,
                    wtypes.text, types.uuid_or_name)
     def detail(self, node=None, node_uuid=None, address=None, marker=None,
                limit=None, sort_key='id', sort_dir='asc', portgroup=None):
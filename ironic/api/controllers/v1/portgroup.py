@@ -200,7 +200,12 @@ class PortgroupCollection(collection.Collection):
         collection = PortgroupCollection()
         collection.portgroups = [Portgroup.convert_with_links(p, fields=fields)
                                  for p in rpc_portgroups]
-        collection.next = collection.get_next(limit, url=url, **kwargs)
+        marker = None
+        if rpc_portgroups:
+            marker = api_utils.get_page_cursor(rpc_portgroups[-1],
+                                               kwargs.get('sort_key'))
+        collection.next = collection.get_next(limit, url=url, marker=marker,
+                                              **kwargs)
         return collection
 
     @classmethod
@@ -264,6 +269,9 @@ class PortgroupsController(pecan.rest.RestController):
 
         marker_obj = None
         if marker:
+            marker_obj = api_utils.get_marker_from_cursor(objects.Portgroup,
+                                                          marker, sort_key)
+        if marker and marker_obj is None:
             marker_obj = objects.Portgroup.get_by_uuid(pecan.request.context,
                                                        marker)
 
@@ -314,7 +322,7 @@ class PortgroupsController(pecan.rest.RestController):
 
     @METRICS.timer('PortgroupsController.get_all')
     @expose.expose(PortgroupCollection, types.uuid_or_name, types.macaddress,
-                   types.uuid, int, wtypes.text, wtypes.text, types.listtype)
+                   types.marker, int, wtypes.text, wtypes.text, types.listtype)
     def get_all(self, node=None, address=None, marker=None,
                 limit=None, sort_key='id', sort_dir='asc', fields=None):
         """Retrieve a list of portgroups.
@@ -349,7 +357,7 @@ class PortgroupsController(pecan.rest.RestController):
 
     @METRICS.timer('PortgroupsController.detail')
     @expose.expose(PortgroupCollection, types.uuid_or_name, types.macaddress,
-                   types.uuid, int, wtypes.text, wtypes.text)
+                   types.marker, int, wtypes.text, wtypes.text)
     def detail(self, node=None, address=None, marker=None,
                limit=None, sort_key='id', sort_dir='asc'):
         """Retrieve a list of portgroups with detail.
@@ -105,6 +105,25 @@ class UuidType(wtypes.UserType):
         return UuidType.validate(value)
 
 
+class MarkerType(wtypes.UserType):
+    """A pagination marker: a UUID, optionally followed by a page cursor."""
+
+    basetype = wtypes.text
+    name = 'marker'
+
+    @staticmethod
+    def validate(value):
+        if not uuidutils.is_uuid_like(value.partition('.')[0]):
+            raise exception.InvalidUUID(uuid=value)
+        return value
+
+    @staticmethod
+    def frombasetype(value):
+        if value is None:
+            return None
+        return MarkerType.validate(value)
+
+
 class BooleanType(wtypes.UserType):
     """A simple boolean type."""
 
@@ -180,6 +199,7 @@ macaddress = MacAddressType()
 uuid_or_name = UuidOrNameType()
 name = NameType()
 uuid = UuidType()
+marker = MarkerType()
 boolean = BooleanType()
 listtype = ListType()
 # Can't call it 'json' because that's the name of the stdlib module
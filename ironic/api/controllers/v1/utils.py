@@ -13,10 +13,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import base64
 import inspect
 
 import jsonpatch
 from oslo_config import cfg
+from oslo_serialization import jsonutils
 from oslo_utils import uuidutils
 import pecan
 from pecan import rest
@@ -73,6 +75,91 @@ def validate_sort_dir(sort_dir):
     return sort_dir
 
 
+# Sort keys that page cursors are used for, per resource. Each of them
+# has either a unique index or an index on (sort key, id), so following a
+# cursor does not sort the whole table.
+PAGINATION_CURSOR_SORT_KEYS = {
+    'Node': ('id', 'uuid', 'name', 'instance_uuid', 'created_at',
+             'provision_state'),
+    'Port': ('id', 'uuid', 'address', 'created_at'),
+    'Portgroup': ('id', 'uuid', 'name', 'address', 'created_at'),
+}
+
+
+def _use_page_cursor(obj_cls, sort_key):
+    return (allow_pagination_cursor() and
+            (sort_key or 'id') in
+            PAGINATION_CURSOR_SORT_KEYS.get(obj_cls.obj_name(), ()))
+
+
+class _PageMarker(object):
+    """Pagination marker holding only the values the DB query compares."""
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def get_page_cursor(obj, sort_key):
+    """Return the pagination marker of the page following a resource.
+
+    The marker is the UUID of the resource followed by a cursor holding its
+    ID and sort key value, so that the next page can be fetched without
+    looking the resource up first.
+
+    :param obj: the last resource of the page, an Ironic object.
+    :param sort_key: the sort key of the listing.
+    :returns: the marker, as a string, or None if the requested API version
+        does not support page cursors or the listing is not sorted on one of
+        PAGINATION_CURSOR_SORT_KEYS.
+    """
+    if not _use_page_cursor(obj, sort_key):
+        return None
+
+    sort_key = sort_key or 'id'
+    data = jsonutils.dumps([sort_key, getattr(obj, sort_key), obj.id])
+    cursor = base64.urlsafe_b64encode(data.encode('utf-8'))
+    return '%s.%s' % (obj.uuid, cursor.decode('ascii').rstrip('='))
+
+
+def get_marker_from_cursor(obj_cls, marker, sort_key):
+    """Return the pagination marker object encoded in a page cursor.
+
+    :param obj_cls: the Ironic object class of the listed resources.
+    :param marker: the marker passed to the API, see get_page_cursor.
+    :param sort_key: the sort key of the listing.
+    :returns: an object with the ID and sort key value of the marker
+        resource, or None if the marker is a plain UUID.
+    :raises: InvalidUUID if the requested API version does not support
+        page cursors.
+    :raises: InvalidParameterValue if the cursor is invalid or was made
+        for another sort key.
+    """
+    uuid, sep, cursor = marker.partition('.')
+    if not sep:
+        return None
+
+    if not allow_pagination_cursor():
+        raise exception.InvalidUUID(uuid=marker)
+
+    sort_key = sort_key or 'id'
+    try:
+        if not _use_page_cursor(obj_cls, sort_key):
+            raise ValueError(sort_key)
+        cursor += '=' * (-len(cursor) % 4)
+        data = base64.urlsafe_b64decode(cursor.encode('ascii'))
+        key, value, obj_id = jsonutils.loads(data.decode('utf-8'))
+        if key != sort_key:
+            raise ValueError(key)
+        if value is not None:
+            value = obj_cls.fields[key].coerce(obj_cls, key, value)
+        obj_id = int(obj_id)
+    except (TypeError, ValueError, KeyError):
+        raise exception.InvalidParameterValue(
+            _("Invalid marker %(marker)s for sort key %(key)s") %
+            {'marker': marker, 'key': sort_key})
+    return _PageMarker(**{'id': obj_id, 'uuid': uuid, sort_key: value})
+
+
 def apply_jsonpatch(doc, patch):
     for p in patch:
         if p['op'] == 'add' and p['path'].count('/') == 1:
@@ -442,6 +529,16 @@ def allow_remove_chassis_uuid():
             versions.MINOR_25_UNSET_CHASSIS_UUID)
 
 
+def allow_pagination_cursor():
+    """Check if page cursors can be used as pagination markers.
+
+    Version 1.26 of the API added page cursors to the markers of node,
+    port and portgroup listings.
+    """
+    return (pecan.request.version.minor >=
+            versions.MINOR_26_PAGINATION_CURSOR)
+
+
 def get_controller_reserved_names(cls):
     """Get reserved names for a given controller.
 
@@ -56,6 +56,8 @@ BASE_VERSION = 1
 # v1.24: Add subcontrollers: node.portgroup, portgroup.ports.
 #        Add port.portgroup_uuid field.
 # v1.25: Add possibility to unset chassis_uuid from node.
+# v1.26: Add page cursors to the pagination markers of nodes, ports and
+#        portgroups.
 
 MINOR_0_JUNO = 0
 MINOR_1_INITIAL_VERSION = 1
@@ -83,11 +85,12 @@ MINOR_22_LOOKUP_HEARTBEAT = 22
 MINOR_23_PORTGROUPS = 23
 MINOR_24_PORTGROUPS_SUBCONTROLLERS = 24
 MINOR_25_UNSET_CHASSIS_UUID = 25
+MINOR_26_PAGINATION_CURSOR = 26
 
 # When adding another version, update MINOR_MAX_VERSION and also update
 # doc/source/dev/webapi-version-history.rst with a detailed explanation of
 # what the version has changed.
-MINOR_MAX_VERSION = MINOR_25_UNSET_CHASSIS_UUID
+MINOR_MAX_VERSION = MINOR_26_PAGINATION_CURSOR
 
 # String representations of the minor and maximum versions
 MIN_VERSION_STRING = '{}.{}'.format(BASE_VERSION, MINOR_1_INITIAL_VERSION)
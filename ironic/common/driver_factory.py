@@ -30,6 +30,11 @@ LOG = log.getLogger(__name__)
 EM_SEMAPHORE = 'extension_manager'
 
 
+# Composed drivers, keyed by the driver singleton and the network interface
+# they are built from. They are shared by all tasks and must not be modified.
+_composed_drivers = {}
+
+
 def build_driver_for_task(task, driver_name=None):
     """Builds a composable driver for a given task.
 
@@ -38,34 +43,46 @@ def build_driver_for_task(task, driver_name=None):
     monolithic driver singleton, but later will come from separate
     driver factories and configurable via the database.
 
+    The composed driver only depends on the driver and the network interface,
+    so it is built once for each combination and shared by all tasks using
+    it. It must be treated as read-only.
+
     :param task: The task containing the node to build a driver for.
     :param driver_name: The name of the monolithic driver to use as a base,
                         if different than task.node.driver.
     :returns: A driver object for the task.
     :raises: DriverNotFound if node.driver could not be
              found in the "ironic.drivers" namespace.
+    :raises: DriverNotFoundInEntrypoint if node.network_interface could not
+             be found in the "ironic.hardware.interfaces.network" namespace.
     """
     node = task.node
-    driver = driver_base.BareDriver()
-    _attach_interfaces_to_driver(driver, node, driver_name=driver_name)
-    return driver
+    driver_singleton = get_driver(driver_name or node.driver)
+    net_driver = _get_network_interface(node.network_interface)
+    key = (driver_singleton, net_driver)
+    try:
+        return _composed_drivers[key]
+    except KeyError:
+        driver = driver_base.BareDriver()
+        _attach_interfaces_to_driver(driver, driver_singleton, net_driver)
+        return _composed_drivers.setdefault(key, driver)
 
 
-def _attach_interfaces_to_driver(driver, node, driver_name=None):
-    driver_singleton = get_driver(driver_name or node.driver)
+def _attach_interfaces_to_driver(driver, driver_singleton, net_driver):
     for iface in driver_singleton.all_interfaces:
         impl = getattr(driver_singleton, iface, None)
         setattr(driver, iface, impl)
+    driver.network = net_driver
 
-    network_iface = node.network_interface
+
+def _get_network_interface(network_iface):
     network_factory = NetworkInterfaceFactory()
     try:
-        net_driver = network_factory.get_driver(network_iface)
+        return network_factory.get_driver(network_iface)
     except KeyError:
         raise exception.DriverNotFoundInEntrypoint(
             driver_name=network_iface,
             entrypoint=network_factory._entrypoint_name)
-    driver.network = net_driver
 
 
 def get_driver(driver_name):
@@ -39,13 +39,16 @@ class HashRing(object):
       just one other host assigned to it.
     """
 
-    def __init__(self, hosts, replicas=None):
+    def __init__(self, hosts, replicas=None, previous=None):
         """Create a new hash ring across the specified hosts.
 
         :param hosts: an iterable of hosts which will be mapped.
         :param replicas: number of hosts to map to each hash partition,
                          or len(hosts), which ever is lesser.
                          Default: CONF.hash_distribution_replicas
+        :param previous: a previous `HashRing`. The partitions of hosts
+                         which are in both rings are reused instead of
+                         being hashed again. Default: None.
 
         """
         if replicas is None:
@@ -58,17 +61,47 @@ class HashRing(object):
             raise exception.Invalid(
                 _("Invalid hosts supplied when building HashRing."))
 
-        self._host_hashes = {}
-        for host in hosts:
+        self._configured_replicas = replicas
+        self._partition_exponent = CONF.hash_partition_exponent
+        if (previous is not None and
+                previous._partition_exponent == self._partition_exponent):
+            self._host_hashes = {
+                hashed_key: host
+                for hashed_key, host in previous._host_hashes.items()
+                if host in self.hosts}
+            new_hosts = [host for host in hosts if host not in previous.hosts]
+        else:
+            self._host_hashes = {}
+            new_hosts = hosts
+
+        for host in new_hosts:
             key = str(host).encode('utf8')
             key_hash = hashlib.md5(key)
-            for p in range(2 ** CONF.hash_partition_exponent):
+            for p in range(2 ** self._partition_exponent):
                 key_hash.update(key)
                 hashed_key = self._hash2int(key_hash)
                 self._host_hashes[hashed_key] = host
         # Gather the (possibly colliding) resulting hashes into a bisectable
         # list.
         self._partitions = sorted(self._host_hashes.keys())
+        # Precompute the hosts serving each partition when no hosts are
+        # ignored, which is by far the most common lookup. An empty ring
+        # maps everything onto partition 0 and no hosts.
+        self._partition_hosts = [
+            tuple(self._probe_hosts(partition, frozenset()))
+            for partition in range(len(self._partitions))] or [()]
+
+    def is_current(self, hosts):
+        """Check whether this ring is up to date.
+
+        :param hosts: an iterable of hosts which should be mapped.
+        :returns: True if this ring maps exactly these hosts and was built
+                  with the current configuration, False otherwise.
+        """
+        return (self.hosts == set(hosts) and
+                self._configured_replicas ==
+                CONF.hash_distribution_replicas and
+                self._partition_exponent == CONF.hash_partition_exponent)
 
     def _hash2int(self, key_hash):
         """Convert the given hash's digest to a numerical value for the ring.
@@ -102,13 +135,44 @@ class HashRing(object):
                   this `HashRing` was created with. It may be less than this
                   if ignore_hosts is not None.
         """
-        hosts = []
-        if ignore_hosts is None:
-            ignore_hosts = set()
-        else:
-            ignore_hosts = set(ignore_hosts)
-            ignore_hosts.intersection_update(self.hosts)
         partition = self._get_partition(data)
+        if not ignore_hosts:
+            return list(self._partition_hosts[partition])
+        ignore_hosts = self.hosts.intersection(ignore_hosts)
+        return self._probe_hosts(partition, ignore_hosts)
+
+    def get_hosts_many(self, data, ignore_hosts=None):
+        """Get the lists of hosts which each of the supplied data maps onto.
+
+        This is equivalent to calling :meth:`get_hosts` for each item, but
+        avoids the per-call overhead when mapping many items at once.
+
+        :param data: An iterable of string identifiers to be mapped across
+                     the ring.
+        :param ignore_hosts: A list of hosts to skip when performing the hash.
+                             Default: None.
+        :returns: a dictionary mapping each item of data to a list of hosts,
+                  as returned by :meth:`get_hosts`.
+        """
+        result = {}
+        if ignore_hosts:
+            ignore_hosts = self.hosts.intersection(ignore_hosts)
+        for item in data:
+            partition = self._get_partition(item)
+            if ignore_hosts:
+                result[item] = self._probe_hosts(partition, ignore_hosts)
+            else:
+                result[item] = list(self._partition_hosts[partition])
+        return result
+
+    def _probe_hosts(self, partition, ignore_hosts):
+        """Find the hosts serving a partition, skipping ignored ones.
+
+        :param partition: The index of the partition in the partition map.
+        :param ignore_hosts: A set of hosts of this ring to skip.
+        :returns: a list of hosts.
+        """
+        hosts = []
         for replica in range(0, self.replicas):
             if len(hosts) + len(ignore_hosts) == len(self.hosts):
                 # prevent infinite loop - cannot allocate more fallbacks.
@@ -135,6 +199,7 @@ class HashRing(object):
 
 class HashRingManager(object):
     _hash_rings = None
+    _generation = 0
     _lock = threading.Lock()
 
     def __init__(self):
@@ -152,16 +217,33 @@ class HashRingManager(object):
         with self._lock:
             if self.__class__._hash_rings is None or self.updated_at < limit:
                 rings = self._load_hash_rings()
+                if rings != self.__class__._hash_rings:
+                    self.__class__._generation += 1
                 self.__class__._hash_rings = rings
                 self.updated_at = time.time()
             return self.__class__._hash_rings
 
+    @property
+    def generation(self):
+        """A number which changes every time the hash rings change.
+
+        Anything derived from the hash rings can be cached for as long as
+        the generation stays the same.
+        """
+        return self.__class__._generation
+
     def _load_hash_rings(self):
         rings = {}
         d2c = self.dbapi.get_active_driver_dict()
+        old_rings = self.__class__._hash_rings or {}
 
         for driver_name, hosts in d2c.items():
-            rings[driver_name] = HashRing(hosts)
+            ring = old_rings.get(driver_name)
+            if ring is not None and ring.is_current(hosts):
+                # Nothing changed for this driver, keep the existing ring.
+                rings[driver_name] = ring
+            else:
+                rings[driver_name] = HashRing(hosts, previous=ring)
         return rings
 
     @classmethod
@@ -382,3 +382,7 @@ machine.add_transition(ADOPTFAIL, ADOPTING, 'adopt')
 
 # A node that failed adoption can be moved back to manageable
 machine.add_transition(ADOPTFAIL, MANAGEABLE, 'manage')
+
+# The transition table is shared by the copies of the state machine used by
+# every task (see TaskManager), it must not be changed anymore.
+machine.freeze()
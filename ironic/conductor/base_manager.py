@@ -12,6 +12,7 @@
 
 """Base conductor manager functionality."""
 
+import collections
 import inspect
 import threading
 
@@ -38,6 +39,10 @@ from ironic import objects
 
 LOG = log.getLogger(__name__)
 
+# The minimum number of nodes whose mapping to the conductor is cached, see
+# BaseConductorManager._cache_ownership.
+_OWNERSHIP_CACHE_MIN = 1000
+
 
 class BaseConductorManager(object):
 
@@ -49,6 +54,13 @@ class BaseConductorManager(object):
         self.topic = topic
         self.sensors_notifier = rpc.get_sensors_notifier()
         self._started = False
+        self._shutdown = None
+        # Maps (driver, node UUID) to whether the node is mapped to this
+        # conductor, for the hash rings generation in _ownership_generation,
+        # in least recently used order.
+        self._ownership_cache = collections.OrderedDict()
+        self._ownership_cache_max = _OWNERSHIP_CACHE_MIN
+        self._ownership_generation = None
 
     def init_host(self, admin_context=None):
         """Initialize the conductor host.
@@ -65,6 +77,8 @@ class BaseConductorManager(object):
 
         self.dbapi = dbapi.get_instance()
 
+        self._shutdown = False
+
         self._keepalive_evt = threading.Event()
         """Event for the keepalive thread."""
 
@@ -192,6 +206,7 @@ class BaseConductorManager(object):
         # conductor (e.g. when rpc server is unreachable).
         if not hasattr(self, 'conductor'):
             return
+        self._shutdown = True
         self._keepalive_evt.set()
         if deregister:
             try:
@@ -257,6 +272,12 @@ class BaseConductorManager(object):
         """
         columns = ['uuid', 'driver'] + list(fields or ())
         node_list = self.dbapi.get_nodeinfo_list(columns=columns, **kwargs)
+        # NOTE: size the cache after the largest node listing, with room for
+        # the nodes of other listings, so that a listing does not evict its
+        # own nodes. Entries of deleted nodes are evicted in time.
+        self._ownership_cache_max = max(self._ownership_cache_max,
+                                        2 * len(node_list))
+        self._cache_nodes_mapping([result[:2] for result in node_list])
         for result in node_list:
             if self._mapped_to_this_conductor(*result[:2]):
                 yield result
@@ -299,7 +320,72 @@ class BaseConductorManager(object):
         except exception.DriverNotFound:
             return False
 
-        return self.host in ring.get_hosts(node_uuid)
+        key = (driver, node_uuid)
+        try:
+            mapped = self._get_ownership_cache()[key]
+        except KeyError:
+            mapped = self.host in ring.get_hosts(node_uuid)
+        self._cache_ownership(key, mapped)
+        return mapped
+
+    def _cache_nodes_mapping(self, nodes):
+        """Find out at once whether many nodes are mapped to this conductor.
+
+        The results are put in the cache used by _mapped_to_this_conductor,
+        each hash ring maps all the uncached nodes of its driver in a
+        single call.
+
+        :param nodes: a list of (node_uuid, driver) tuples.
+        """
+        by_driver = {}
+        for node_uuid, driver in nodes:
+            by_driver.setdefault(driver, []).append(node_uuid)
+
+        for driver, node_uuids in by_driver.items():
+            try:
+                ring = self.ring_manager[driver]
+            except exception.DriverNotFound:
+                continue
+
+            ownership_cache = self._get_ownership_cache()
+            node_uuids = [node_uuid for node_uuid in node_uuids
+                          if (driver, node_uuid) not in ownership_cache]
+            if not node_uuids:
+                continue
+            for node_uuid, hosts in ring.get_hosts_many(node_uuids).items():
+                self._cache_ownership((driver, node_uuid), self.host in hosts)
+
+    def _cache_ownership(self, key, mapped):
+        """Cache whether a node is mapped to this conductor.
+
+        The least recently used entries are evicted once the cache holds
+        more than self._ownership_cache_max of them.
+
+        :param key: a (driver, node UUID) tuple.
+        :param mapped: whether the node is mapped to this conductor.
+        """
+        ownership_cache = self._get_ownership_cache()
+        # Move the entry to the most recently used end
+        ownership_cache.pop(key, None)
+        ownership_cache[key] = mapped
+        while len(ownership_cache) > self._ownership_cache_max:
+            ownership_cache.popitem(last=False)
+
+    def _get_ownership_cache(self):
+        """Return the cache of the nodes mapped to this conductor.
+
+        The mapping only depends on the hash rings, so it is cached until
+        they are rebuilt. This avoids hashing every node again in every
+        periodic task.
+
+        :returns: an OrderedDict mapping (driver, node UUID) to whether the
+                  node is mapped to this conductor.
+        """
+        generation = self.ring_manager.generation
+        if generation != self._ownership_generation:
+            self._ownership_cache = collections.OrderedDict()
+            self._ownership_generation = generation
+        return self._ownership_cache
 
     def _fail_if_in_state(self, context, filters, provision_state,
                           sort_key, callback_method=None,
@@ -44,14 +44,17 @@ a change, etc.
 import collections
 import datetime
 import tempfile
+import time
 
 import eventlet
 from futurist import periodics
+from futurist import waiters
 from ironic_lib import metrics_utils
 from oslo_log import log
 import oslo_messaging as messaging
 from oslo_utils import excutils
 from oslo_utils import uuidutils
+from six.moves import queue
 
 from ironic.common import dhcp_factory
 from ironic.common import driver_factory
@@ -77,6 +80,16 @@ METRICS = metrics_utils.get_metrics_logger(__name__)
 
 SYNC_EXCLUDED_STATES = (states.DEPLOYWAIT, states.CLEANWAIT, states.ENROLL)
 
+# NOTE(deva): we should not acquire a lock on a node in DEPLOYWAIT/CLEANWAIT,
+#             as this could cause an error within a deploy ramdisk POSTing
+#             back at the same time.
+# NOTE(dtantsur): it's also pointless (and dangerous) to sync power state
+#                 when a power action is in progress.
+SYNC_FILTERS = {'maintenance': False,
+                'reserved': False,
+                'provision_state_not_in': SYNC_EXCLUDED_STATES,
+                'target_power_state': None}
+
 
 class ConductorManager(base_manager.BaseConductorManager):
     """Ironic Conductor manager main class."""
@@ -1106,8 +1119,13 @@ class ConductorManager(base_manager.BaseConductorManager):
 
         1) Node is mapped to this conductor.
         2) Node is not in maintenance mode.
-        3) Node is not in DEPLOYWAIT/CLEANWAIT provision state.
+        3) Node is not in DEPLOYWAIT/CLEANWAIT/ENROLL provision state.
         4) Node doesn't have a reservation
+        5) Node doesn't have a power action in progress
+
+        Conditions 2-5 are checked by the database, both when listing nodes
+        and when loading a node to sync, so nodes which will be skipped are
+        never locked.
 
         NOTE: Grabbing a lock here can cause other methods to fail to
         grab it. We want to avoid trying to grab a lock while a node
@@ -1115,38 +1133,99 @@ class ConductorManager(base_manager.BaseConductorManager):
         cause a deploy/cleaning callback to fail. There's not much we
         can do here to avoid failing a brand new deploy to a node that
         we've locked here, though.
+
+        Nodes are processed by up to [conductor]sync_power_state_workers
+        workers in parallel. Nodes sharing the same BMC address are spread
+        over the queue, so that workers do not talk to the same BMC at the
+        same time. Nodes whose power interface supports bulk power state
+        requests are queued in batches of up to
+        [conductor]sync_power_state_bulk_size nodes using the same driver.
+        """
+        node_iter = self.iter_nodes(fields=['id', 'driver_info'],
+                                    filters=SYNC_FILTERS)
+
+        bulk_size = CONF.conductor.sync_power_state_bulk_size
+        supports_bulk = {}
+        batches = {}
+        nodes = queue.Queue()
+        for node_info in utils.interleave_by_bmc_address(node_iter, 3):
+            driver_name = node_info[1]
+            if bulk_size > 1 and driver_name not in supports_bulk:
+                supports_bulk[driver_name] = _supports_bulk_power_states(
+                    driver_name)
+            if bulk_size > 1 and supports_bulk[driver_name]:
+                batch = batches.setdefault(driver_name, [])
+                batch.append(node_info)
+                if len(batch) >= bulk_size:
+                    nodes.put(batches.pop(driver_name))
+            else:
+                nodes.put(node_info)
+        for batch in batches.values():
+            nodes.put(batch)
+
+        number_of_workers = min(CONF.conductor.sync_power_state_workers,
+                                CONF.conductor.periodic_max_workers,
+                                nodes.qsize())
+        futures = []
+        # The current thread is used as one of the workers
+        for worker_number in range(max(0, number_of_workers - 1)):
+            try:
+                futures.append(
+                    self._spawn_worker(self._sync_power_state_nodes_task,
+                                       context, nodes))
+            except exception.NoFreeConductorWorker:
+                LOG.warning(_LW("There are no more conductor workers for "
+                                "power sync task. %(workers)d workers have "
+                                "been already spawned."),
+                            {'workers': worker_number})
+                break
+
+        try:
+            self._sync_power_state_nodes_task(context, nodes)
+        finally:
+            waiters.wait_for_all(futures)
+
+    def _sync_power_state_nodes_task(self, context, nodes):
+        """Sync power states for nodes from the shared queue.
+
+        :param context: request context.
+        :param nodes: a queue of tuples (node_uuid, driver, node_id,
+                      driver_info), or of lists of such tuples for nodes
+                      whose power states are requested together; the
+                      worker exits when it is empty.
         """
-        # FIXME(comstud): Since our initial state checks are outside
-        # of the lock (to try to avoid the lock), some checks are
-        # repeated after grabbing the lock so we can unlock quickly.
-        # The node mapping is not re-checked because it doesn't much
-        # matter if things happened to re-balance.
-        #
-        # This is inefficient and racey. We end up with calling DB API's
-        # get_node() twice (once here, and once in acquire(). Ideally we
-        # add a way to pass constraints to task_manager.acquire()
-        # (through to its DB API call) so that we can eliminate our call
-        # and first set of checks below.
-
-        filters = {'maintenance': False}
-        node_iter = self.iter_nodes(fields=['id'], filters=filters)
-        for (node_uuid, driver, node_id) in node_iter:
+        while not self._shutdown:
+            try:
+                node_info = nodes.get_nowait()
+            except queue.Empty:
+                break
+
+            if isinstance(node_info, list):
+                try:
+                    self._sync_power_state_nodes_bulk(context, node_info)
+                except Exception:
+                    # NOTE: do not let one batch stop this worker, the
+                    # other batches in the queue still need syncing.
+                    LOG.exception(_LE("During sync_power_state, syncing the "
+                                      "power states of nodes %(nodes)s "
+                                      "failed."),
+                                  {'nodes': ', '.join(
+                                      info[0] for info in node_info)})
+                finally:
+                    # Yield on every iteration
+                    eventlet.sleep(0)
+                continue
+
+            node_uuid, driver, node_id, driver_info = node_info
             try:
                 # NOTE(dtantsur): start with a shared lock, upgrade if needed
+                # The filters are checked again when loading the node, as
+                # it could have changed since the nodes were listed.
                 with task_manager.acquire(context, node_uuid,
                                           purpose='power state sync',
-                                          shared=True) as task:
-                    # NOTE(deva): we should not acquire a lock on a node in
-                    #             DEPLOYWAIT/CLEANWAIT, as this could cause
-                    #             an error within a deploy ramdisk POSTing back
-                    #             at the same time.
-                    # NOTE(dtantsur): it's also pointless (and dangerous) to
-                    # sync power state when a power action is in progress
-                    if (task.node.provision_state in SYNC_EXCLUDED_STATES or
-                            task.node.maintenance or
-                            task.node.target_power_state or
-                            task.node.reservation):
-                        continue
+                                          shared=True,
+                                          filters=SYNC_FILTERS,
+                                          load_ports=False) as task:
                     count = do_sync_power_state(
                         task, self.power_state_sync_count[node_uuid])
                     if count:
@@ -1156,7 +1235,9 @@ class ConductorManager(base_manager.BaseConductorManager):
                         del self.power_state_sync_count[node_uuid]
             except exception.NodeNotFound:
                 LOG.info(_LI("During sync_power_state, node %(node)s was not "
-                             "found and presumed deleted by another process."),
+                             "found and presumed deleted by another process, "
+                             "or its state changed so that it no longer "
+                             "needs syncing."),
                          {'node': node_uuid})
             except exception.NodeLocked:
                 LOG.info(_LI("During sync_power_state, node %(node)s was "
@@ -1166,6 +1247,61 @@ class ConductorManager(base_manager.BaseConductorManager):
                 # Yield on every iteration
                 eventlet.sleep(0)
 
+    def _sync_power_state_nodes_bulk(self, context, batch):
+        """Sync power states for nodes using one bulk power state request.
+
+        :param context: request context.
+        :param batch: a list of tuples (node_uuid, driver, node_id,
+                      driver_info) of nodes using the same driver.
+        """
+        tasks = []
+        try:
+            for node_uuid, driver, node_id, driver_info in batch:
+                try:
+                    # The filters are checked again when loading the node,
+                    # as it could have changed since the nodes were listed.
+                    tasks.append(task_manager.acquire(
+                        context, node_uuid, purpose='power state sync',
+                        shared=True, filters=SYNC_FILTERS, load_ports=False))
+                except exception.NodeNotFound:
+                    LOG.info(_LI("During sync_power_state, node %(node)s "
+                                 "was not found and presumed deleted by "
+                                 "another process, or its state changed so "
+                                 "that it no longer needs syncing."),
+                             {'node': node_uuid})
+            if not tasks:
+                return
+
+            power_states = tasks[0].driver.power.get_power_states_bulk(tasks)
+            for task in tasks:
+                if self._shutdown:
+                    break
+                node_uuid = task.node.uuid
+                try:
+                    count = do_sync_power_state(
+                        task, self.power_state_sync_count[node_uuid],
+                        prefetched=power_states.get(node_uuid))
+                    if count:
+                        self.power_state_sync_count[node_uuid] = count
+                    else:
+                        # don't bloat the dict with non-failing nodes
+                        del self.power_state_sync_count[node_uuid]
+                except exception.NodeNotFound:
+                    LOG.info(_LI("During sync_power_state, node %(node)s was "
+                                 "not found and presumed deleted by another "
+                                 "process."), {'node': node_uuid})
+                except exception.NodeLocked:
+                    LOG.info(_LI("During sync_power_state, node %(node)s was "
+                                 "already locked by another process. "
+                                 "Skip."), {'node': node_uuid})
+                except Exception:
+                    LOG.exception(_LE("During sync_power_state, syncing the "
+                                      "power state of node %(node)s "
+                                      "failed."), {'node': node_uuid})
+        finally:
+            for task in tasks:
+                task.release_resources()
+
     @METRICS.timer('ConductorManager._check_deploy_timeouts')
     @periodics.periodic(spacing=CONF.conductor.check_provision_state_interval)
     def _check_deploy_timeouts(self, context):
@@ -1361,33 +1497,61 @@ class ConductorManager(base_manager.BaseConductorManager):
         node_iter = self.iter_nodes(fields=['id', 'conductor_affinity'],
                                     filters=filters)
 
+        # NOTE: nodes mapped here, but not updated by this conductor last,
+        # are locked together, with one database request per batch. Nodes
+        # which cannot be taken over do not count against the limit, more
+        # candidates are locked until enough nodes are actually taken over.
         workers_count = 0
-        for node_uuid, driver, node_id, conductor_affinity in node_iter:
-            if conductor_affinity == self.conductor.id:
-                continue
+        node_uuids = []
+        try:
+            for node_uuid, driver, node_id, conductor_affinity in node_iter:
+                if conductor_affinity == self.conductor.id:
+                    continue
+                node_uuids.append(node_uuid)
+                if (len(node_uuids) <
+                        CONF.conductor.periodic_max_workers - workers_count):
+                    continue
+                workers_count += self._take_over_nodes(context, node_uuids)
+                node_uuids = []
+                if workers_count >= CONF.conductor.periodic_max_workers:
+                    return
 
-            # Node is mapped here, but not updated by this conductor last
-            try:
-                with task_manager.acquire(context, node_uuid,
-                                          purpose='node take over') as task:
-                    # NOTE(deva): now that we have the lock, check again to
-                    # avoid racing with deletes and other state changes
-                    node = task.node
-                    if (node.maintenance or
-                            node.conductor_affinity == self.conductor.id or
-                            node.provision_state != states.ACTIVE):
-                        continue
+            if node_uuids:
+                self._take_over_nodes(context, node_uuids)
+        except exception.NoFreeConductorWorker:
+            pass
 
-                    task.spawn_after(self._spawn_worker,
-                                     self._do_takeover, task)
+    def _take_over_nodes(self, context, node_uuids):
+        """Lock the given nodes and start taking them over.
 
-            except exception.NoFreeConductorWorker:
-                break
-            except (exception.NodeLocked, exception.NodeNotFound):
-                continue
-            workers_count += 1
-            if workers_count == CONF.conductor.periodic_max_workers:
-                break
+        Nodes which are locked or deleted meanwhile are skipped, as well as
+        nodes that no longer need to be taken over once locked.
+
+        :param context: an admin context.
+        :param node_uuids: a list of node UUIDs.
+        :returns: the number of nodes being taken over.
+        :raises: NoFreeConductorWorker if the worker pool is full.
+        """
+        count = 0
+        with task_manager.acquire_many(context, node_uuids,
+                                       purpose='node take over') as (
+                tasks, failed):
+            for node_uuid in node_uuids:
+                task = tasks.get(node_uuid)
+                if task is None:
+                    continue
+                # NOTE(deva): now that we have the lock, check again to
+                # avoid racing with deletes and other state changes
+                node = task.node
+                if (node.maintenance or
+                        node.conductor_affinity == self.conductor.id or
+                        node.provision_state != states.ACTIVE):
+                    continue
+
+                task.spawn_after(self._spawn_worker,
+                                 self._do_takeover, task)
+                count += 1
+        return count
 
     @METRICS.timer('ConductorManager.validate_driver_interfaces')
     @messaging.expected_exceptions(exception.NodeLocked)
@@ -1853,16 +2017,79 @@ class ConductorManager(base_manager.BaseConductorManager):
     @METRICS.timer('ConductorManager._send_sensor_data')
     @periodics.periodic(spacing=CONF.conductor.send_sensor_data_interval)
     def _send_sensor_data(self, context):
-        """Periodically sends sensor data to Ceilometer."""
+        """Periodically sends sensor data to Ceilometer.
+
+        Sensor data is collected by up to [conductor]send_sensor_data_workers
+        workers in parallel. The collected data is filtered and sent by
+        batches of [conductor]send_sensor_data_batch_size nodes while the
+        collection is still running.
+        """
         # do nothing if send_sensor_data option is False
         if not CONF.conductor.send_sensor_data:
             return
 
+        started = time.time()
         filters = {'associated': True}
-        node_iter = self.iter_nodes(fields=['instance_uuid'],
-                                    filters=filters)
+        nodes = queue.Queue()
+        for node_info in self.iter_nodes(fields=['instance_uuid'],
+                                         filters=filters):
+            nodes.put(node_info)
+        number_of_nodes = nodes.qsize()
+
+        collected = queue.Queue()
+        number_of_workers = min(CONF.conductor.send_sensor_data_workers,
+                                CONF.conductor.periodic_max_workers,
+                                number_of_nodes)
+        futures = []
+        # The current thread is used as one of the workers
+        for worker_number in range(max(0, number_of_workers - 1)):
+            try:
+                futures.append(
+                    self._spawn_worker(self._sensor_data_nodes_task,
+                                       context, nodes, collected))
+            except exception.NoFreeConductorWorker:
+                LOG.warning(_LW("There are no more conductor workers for "
+                                "sensor data task. %(workers)d workers have "
+                                "been already spawned."),
+                            {'workers': worker_number})
+                break
+
+        try:
+            self._sensor_data_nodes_task(context, nodes, collected)
+        finally:
+            waiters.wait_for_all(futures)
+            # Send what is left, however small the last batch is
+            self._send_sensor_data_batches(context, collected, flush=True)
+
+        elapsed = time.time() - started
+        lag = max(0, elapsed - CONF.conductor.send_sensor_data_interval)
+        METRICS.send_gauge('ConductorManager._send_sensor_data.nodes',
+                           number_of_nodes)
+        METRICS.send_gauge(
+            'ConductorManager._send_sensor_data.nodes_per_second',
+            float(number_of_nodes) / max(elapsed, 0.001))
+        METRICS.send_gauge('ConductorManager._send_sensor_data.lag', lag)
+        if lag:
+            LOG.warning(_LW("Sending sensor data of %(nodes)d nodes took "
+                            "%(elapsed).1f seconds, longer than "
+                            "[conductor]send_sensor_data_interval."),
+                        {'nodes': number_of_nodes, 'elapsed': elapsed})
+
+    def _sensor_data_nodes_task(self, context, nodes, collected):
+        """Collect sensor data for nodes from the shared queue.
+
+        :param context: request context.
+        :param nodes: a queue of tuples (node_uuid, driver, instance_uuid);
+                      the worker exits when it is empty.
+        :param collected: a queue the sensor data messages are put in, before
+                          being filtered and sent.
+        """
+        while not self._shutdown:
+            try:
+                node_uuid, driver, instance_uuid = nodes.get_nowait()
+            except queue.Empty:
+                break
 
-        for (node_uuid, driver, instance_uuid) in node_iter:
             # populate the message which will be sent to ceilometer
             message = {'message_id': uuidutils.generate_uuid(),
                        'instance_uuid': instance_uuid,
@@ -1875,7 +2102,8 @@ class ConductorManager(base_manager.BaseConductorManager):
                 with task_manager.acquire(context,
                                           node_uuid,
                                           shared=True,
-                                          purpose=lock_purpose) as task:
+                                          purpose=lock_purpose,
+                                          load_ports=False) as task:
                     if not getattr(task.driver, 'management', None):
                         continue
                     task.driver.management.validate(task)
@@ -1906,14 +2134,45 @@ class ConductorManager(base_manager.BaseConductorManager):
                     "Failed to get sensor data for node %(node)s. "
                     "Error: %(error)s"), {'node': node_uuid, 'error': str(e)})
             else:
+                message['payload'] = sensors_data
+                collected.put(message)
+                self._send_sensor_data_batches(context, collected)
+            finally:
+                # Yield on every iteration
+                eventlet.sleep(0)
+
+    def _send_sensor_data_batches(self, context, collected, flush=False):
+        """Filter and send the collected sensor data messages.
+
+        Messages are sent [conductor]send_sensor_data_batch_size at a time.
+        A batch of a single message is sent as is, bigger batches are sent as
+        a list in one "hardware.ipmi.metrics.batch" notification.
+
+        :param context: request context.
+        :param collected: a queue of sensor data messages.
+        :param flush: whether to also send the last, incomplete batch.
+        """
+        batch_size = CONF.conductor.send_sensor_data_batch_size
+        while collected.qsize() >= batch_size or (flush and
+                                                  not collected.empty()):
+            batch = []
+            while len(batch) < batch_size:
+                try:
+                    message = collected.get_nowait()
+                except queue.Empty:
+                    break
                 message['payload'] = (
-                    self._filter_out_unsupported_types(sensors_data))
+                    self._filter_out_unsupported_types(message['payload']))
                 if message['payload']:
+                    batch.append(message)
+
+            if batch_size == 1:
+                for message in batch:
                     self.sensors_notifier.info(
                         context, "hardware.ipmi.metrics", message)
-            finally:
-                # Yield on every iteration
-                eventlet.sleep(0)
+            elif batch:
+                self.sensors_notifier.info(
+                    context, "hardware.ipmi.metrics.batch", batch)
 
     def _filter_out_unsupported_types(self, sensors_data):
         """Filters out sensor data types that aren't specified in the config.
@@ -1994,7 +2253,8 @@ class ConductorManager(base_manager.BaseConductorManager):
         """
         LOG.debug('RPC get_boot_device called for node %s', node_id)
         with task_manager.acquire(context, node_id,
-                                  purpose='getting boot device') as task:
+                                  purpose='getting boot device',
+                                  load_ports=False) as task:
             if not getattr(task.driver, 'management', None):
                 raise exception.UnsupportedDriverExtension(
                     driver=task.node.driver, extension='management')
@@ -2025,7 +2285,8 @@ class ConductorManager(base_manager.BaseConductorManager):
         LOG.debug('RPC get_supported_boot_devices called for node %s', node_id)
         lock_purpose = 'getting supported boot devices'
         with task_manager.acquire(context, node_id, shared=True,
-                                  purpose=lock_purpose) as task:
+                                  purpose=lock_purpose,
+                                  load_ports=False) as task:
             if not getattr(task.driver, 'management', None):
                 raise exception.UnsupportedDriverExtension(
                     driver=task.node.driver, extension='management')
@@ -2451,8 +2712,22 @@ def handle_sync_power_state_max_retries_exceeded(task, actual_power_state,
     LOG.error(msg)
 
 
+def _supports_bulk_power_states(driver_name):
+    """Whether the power interface of a driver supports bulk requests.
+
+    :param driver_name: the name of the driver.
+    :returns: True if the power interface of the driver implements
+              get_power_states_bulk efficiently, False otherwise.
+    """
+    try:
+        driver = driver_factory.get_driver(driver_name)
+    except exception.DriverNotFound:
+        return False
+    return getattr(driver.power, 'supports_bulk_power_states', False)
+
+
 @METRICS.timer('do_sync_power_state')
-def do_sync_power_state(task, count):
+def do_sync_power_state(task, count, prefetched=None):
     """Sync the power state for this node, incrementing the counter on failure.
 
     When the limit of power_state_sync_max_retries is reached, the node is put
@@ -2460,6 +2735,10 @@ def do_sync_power_state(task, count):
 
     :param task: a TaskManager instance
     :param count: number of times this node has previously failed a sync
+    :param prefetched: the result of get_power_states_bulk for this node:
+                       either its power state or the exception raised when
+                       getting it. If None, the power state is requested
+                       from the power interface.
     :raises: NodeLocked if unable to upgrade task lock to an exclusive one
     :returns: Count of failed attempts.
               On success, the counter is set to 0.
@@ -2482,7 +2761,10 @@ def do_sync_power_state(task, count):
     try:
         # The driver may raise an exception, or may return ERROR.
         # Handle both the same way.
-        power_state = task.driver.power.get_power_state(task)
+        if isinstance(prefetched, Exception):
+            raise prefetched
+        power_state = (task.driver.power.get_power_state(task)
+                       if prefetched is None else prefetched)
         if power_state == states.ERROR:
             raise exception.PowerStateFailure(
                 _("Power driver returned ERROR state "
@@ -94,12 +94,17 @@ raised in the background thread.):
 
 """
 
+import contextlib
+import random
+import threading
+import time
+
 import futurist
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import excutils
+from oslo_utils import strutils
 from oslo_utils import timeutils
-import retrying
 import six
 
 from ironic.common import driver_factory
@@ -112,6 +117,58 @@ LOG = logging.getLogger(__name__)
 
 CONF = cfg.CONF
 
+# Initial delay (in seconds) between attempts to lock a node which is
+# locked by another conductor.
+_LOCK_RETRY_MIN_DELAY = 0.1
+
+
+class _LockReleaseNotifier(object):
+    """Wakes up tasks waiting for a lock held by this conductor.
+
+    Tasks start watching a node before trying to reserve it, so that a
+    release happening between a failed attempt and the wait is not missed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Maps node ids and UUIDs, as requested, to the set of events of
+        # the tasks watching them
+        self._waiters = {}
+
+    @contextlib.contextmanager
+    def watch(self, node_id):
+        """Watch for the release of the lock on a node.
+
+        :param node_id: ID or UUID of the node.
+        :returns: A context manager yielding a function, which waits until
+                  the lock is released after entering the context, or for
+                  at most the timeout given as argument.
+        """
+        key = int(node_id) if strutils.is_int_like(node_id) else node_id
+        event = threading.Event()
+        with self._lock:
+            self._waiters.setdefault(key, set()).add(event)
+        try:
+            yield event.wait
+        finally:
+            with self._lock:
+                events = self._waiters.get(key)
+                if events is not None:
+                    events.discard(event)
+                    if not events:
+                        del self._waiters[key]
+
+    def notify(self, node_uuid, node_id):
+        """Wake up everybody watching the lock on a node."""
+        with self._lock:
+            events = (self._waiters.pop(node_uuid, set()) |
+                      self._waiters.pop(node_id, set()))
+        for event in events:
+            event.set()
+
+
+_lock_release_notifier = _LockReleaseNotifier()
+
 
 def require_exclusive_lock(f):
     """Decorator to require an exclusive lock.
@@ -140,7 +197,7 @@ def require_exclusive_lock(f):
 
 
 def acquire(context, node_id, shared=False, driver_name=None,
-            purpose='unspecified action'):
+            purpose='unspecified action', filters=None, load_ports=True):
     """Shortcut for acquiring a lock on a Node.
 
     :param context: Request context.
@@ -149,13 +206,105 @@ def acquire(context, node_id, shared=False, driver_name=None,
                    lock. Default: False.
     :param driver_name: Name of Driver. Default: None.
     :param purpose: human-readable purpose to put to debug logs.
+    :param filters: Filters the node has to match, checked in the same
+                    query which loads the node. See
+                    :meth:`ironic.objects.node.Node.list` for the format.
+                    Default: None.
+    :param load_ports: Whether to load the node's ports and portgroups
+                       immediately. If False, they are loaded on first
+                       access. Default: True.
     :returns: An instance of :class:`TaskManager`.
 
     """
     # NOTE(lintan): This is a workaround to set the context of periodic tasks.
     context.ensure_thread_contain_context()
     return TaskManager(context, node_id, shared=shared,
-                       driver_name=driver_name, purpose=purpose)
+                       driver_name=driver_name, purpose=purpose,
+                       filters=filters, load_ports=load_ports)
+
+
+@contextlib.contextmanager
+def acquire_many(context, node_ids, driver_name=None,
+                 purpose='unspecified action', load_ports=True):
+    """Acquire exclusive locks on several nodes at once.
+
+    The nodes are reserved and released with one database request each,
+    rather than one per node. Nodes which cannot be locked are reported
+    instead of raising an exception.
+
+    Usage::
+
+      with task_manager.acquire_many(context, node_ids) as (tasks, failed):
+          for node_id, task in tasks.items():
+              <do some work>
+
+    :param context: Request context.
+    :param node_ids: A list of IDs or UUIDs of nodes to lock.
+    :param driver_name: Name of Driver. Default: None.
+    :param purpose: human-readable purpose to put to debug logs.
+    :param load_ports: Whether to load the nodes' ports and portgroups
+                       immediately. Default: True.
+    :returns: A context manager yielding a tuple (tasks, failed). tasks
+              is a dict mapping the ID or UUID of each locked node to a
+              :class:`TaskManager`. failed is a dict mapping the ID or UUID
+              of each other node to the exception which prevented locking
+              it, e.g. NodeLocked or NodeNotFound.
+
+    """
+    # NOTE(lintan): This is a workaround to set the context of periodic tasks.
+    context.ensure_thread_contain_context()
+    nodes, failed = objects.Node.reserve_many(context, CONF.host, node_ids)
+    tasks = {}
+    for node_id, node in nodes.items():
+        try:
+            tasks[node_id] = TaskManager(context, node.id,
+                                         driver_name=driver_name,
+                                         purpose=purpose,
+                                         load_ports=load_ports,
+                                         reserved_node=node)
+        except Exception as e:
+            # NOTE: TaskManager released the node itself
+            failed[node_id] = e
+
+    try:
+        yield tasks, failed
+    except Exception:
+        with excutils.save_and_reraise_exception():
+            _release_many(context, list(tasks.values()))
+    else:
+        to_release = [task for task in tasks.values()
+                      if task._spawn_method is None]
+        to_spawn = [task for task in tasks.values()
+                    if task._spawn_method is not None]
+        _release_many(context, to_release)
+
+        # Tasks which spawn a worker are released when it finishes
+        error = None
+        for task in to_spawn:
+            try:
+                task.__exit__(None, None, None)
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+
+
+def _release_many(context, tasks):
+    """Release the exclusive locks of several tasks at once."""
+    node_ids = [task.node.id for task in tasks if task.node]
+    if node_ids:
+        failed = objects.Node.release_many(context, CONF.host, node_ids)
+        for task in tasks:
+            if task.node and task.node.id not in failed:
+                _lock_release_notifier.notify(task.node.uuid, task.node.id)
+        for node_id, error in failed.items():
+            # NOTE: the node may have been deleted within the task's context.
+            if not isinstance(error, exception.NodeNotFound):
+                LOG.warning(_LW("Failed to release lock on node %(node)s: "
+                                "%(error)s"),
+                            {'node': node_id, 'error': error})
+    for task in tasks:
+        task._clear_resources()
 
 
 class TaskManager(object):
@@ -167,7 +316,8 @@ class TaskManager(object):
     """
 
     def __init__(self, context, node_id, shared=False, driver_name=None,
-                 purpose='unspecified action'):
+                 purpose='unspecified action', filters=None,
+                 load_ports=True, reserved_node=None):
         """Create a new TaskManager.
 
         Acquire a lock on a node. The lock can be either shared or
@@ -182,8 +332,16 @@ class TaskManager(object):
         :param driver_name: The name of the driver to load, if different
                             from the Node's current driver.
         :param purpose: human-readable purpose to put to debug logs.
+        :param filters: Filters the node has to match. They are evaluated
+                        when the node is loaded, before a lock is taken.
+        :param load_ports: Whether to load the node's ports and portgroups
+                           immediately, or on first access.
+        :param reserved_node: A Node object which is already reserved by
+                              this conductor, see :func:`acquire_many`. The
+                              node is neither loaded nor reserved again.
         :raises: DriverNotFound
-        :raises: NodeNotFound
+        :raises: NodeNotFound if the node is not found or does not match
+                 the filters.
         :raises: NodeLocked
 
         """
@@ -193,28 +351,38 @@ class TaskManager(object):
 
         self.context = context
         self._node = None
+        self._ports = None
+        self._portgroups = None
         self.node_id = node_id
         self.shared = shared
 
-        self.fsm = states.machine.copy()
+        # NOTE: a shallow copy shares the (frozen) states and transitions
+        # of states.machine and only holds the current and target states.
+        self.fsm = states.machine.copy(shallow=True)
         self._purpose = purpose
         self._debug_timer = timeutils.StopWatch()
 
         try:
-            node = objects.Node.get(context, node_id)
-            LOG.debug("Attempting to get %(type)s lock on node %(node)s (for "
-                      "%(purpose)s)",
-                      {'type': 'shared' if shared else 'exclusive',
-                       'node': node.uuid, 'purpose': purpose})
-            if not self.shared:
-                self._lock()
-            else:
+            if reserved_node is not None:
                 self._debug_timer.restart()
-                self.node = node
-
-            self.ports = objects.Port.list_by_node_id(context, self.node.id)
-            self.portgroups = objects.Portgroup.list_by_node_id(context,
-                                                                self.node.id)
+                self.node = reserved_node
+            else:
+                node = objects.Node.get(context, node_id, filters=filters)
+                LOG.debug("Attempting to get %(type)s lock on node %(node)s "
+                          "(for %(purpose)s)",
+                          {'type': 'shared' if shared else 'exclusive',
+                           'node': node.uuid, 'purpose': purpose})
+                if not self.shared:
+                    self._lock()
+                else:
+                    self._debug_timer.restart()
+                    self.node = node
+
+            if load_ports:
+                self.ports = objects.Port.list_by_node_id(context,
+                                                          self.node.id)
+                self.portgroups = objects.Portgroup.list_by_node_id(
+                    context, self.node.id)
             self.driver = driver_factory.build_driver_for_task(
                 self, driver_name=driver_name)
 
@@ -233,26 +401,68 @@ class TaskManager(object):
             self.fsm.initialize(start_state=self.node.provision_state,
                                 target_state=self.node.target_provision_state)
 
+    @property
+    def ports(self):
+        # NOTE: ports are not loaded in __init__ when load_ports is False,
+        # load them on first access instead.
+        if self._ports is None and self.node is not None:
+            self._ports = objects.Port.list_by_node_id(self.context,
+                                                       self.node.id)
+        return self._ports
+
+    @ports.setter
+    def ports(self, ports):
+        self._ports = ports
+
+    @property
+    def portgroups(self):
+        if self._portgroups is None and self.node is not None:
+            self._portgroups = objects.Portgroup.list_by_node_id(
+                self.context, self.node.id)
+        return self._portgroups
+
+    @portgroups.setter
+    def portgroups(self, portgroups):
+        self._portgroups = portgroups
+
     def _lock(self):
         self._debug_timer.restart()
 
         # NodeLocked exceptions can be annoying. Let's try to alleviate
-        # some of that pain by retrying our lock attempts. The retrying
-        # module expects a wait_fixed value in milliseconds.
-        @retrying.retry(
-            retry_on_exception=lambda e: isinstance(e, exception.NodeLocked),
-            stop_max_attempt_number=CONF.conductor.node_locked_retry_attempts,
-            wait_fixed=CONF.conductor.node_locked_retry_interval * 1000)
-        def reserve_node():
-            self.node = objects.Node.reserve(self.context, CONF.host,
-                                             self.node_id)
-            LOG.debug("Node %(node)s successfully reserved for %(purpose)s "
-                      "(took %(time).2f seconds)",
-                      {'node': self.node.uuid, 'purpose': self._purpose,
-                       'time': self._debug_timer.elapsed()})
-            self._debug_timer.restart()
-
-        reserve_node()
+        # some of that pain by retrying our lock attempts, for at least
+        # node_locked_retry_attempts attempts and as long as fixed
+        # node_locked_retry_interval waits would take. If the lock is held
+        # by this conductor, we are woken up as soon as it is released.
+        # Otherwise we back off exponentially, with jitter, so that
+        # contending conductors do not retry in lockstep.
+        attempts = CONF.conductor.node_locked_retry_attempts
+        interval = CONF.conductor.node_locked_retry_interval
+        timer = timeutils.StopWatch(
+            duration=max(attempts - 1, 0) * interval).start()
+        delay = min(_LOCK_RETRY_MIN_DELAY, interval)
+        attempt = 1
+        while True:
+            with _lock_release_notifier.watch(self.node_id) as wait_release:
+                try:
+                    self.node = objects.Node.reserve(self.context, CONF.host,
+                                                     self.node_id)
+                    break
+                except exception.NodeLocked as e:
+                    if attempt >= attempts and not timer.leftover():
+                        raise
+                    attempt += 1
+                    if e.kwargs.get('host') == CONF.host:
+                        wait_release(min(interval, timer.leftover()))
+                    else:
+                        time.sleep(min(random.uniform(delay / 2, delay),
+                                       timer.leftover()))
+                        delay = min(delay * 2, interval)
+
+        LOG.debug("Node %(node)s successfully reserved for %(purpose)s "
+                  "(took %(time).2f seconds)",
+                  {'node': self.node.uuid, 'purpose': self._purpose,
+                   'time': self._debug_timer.elapsed()})
+        self._debug_timer.restart()
 
     def upgrade_lock(self, purpose=None):
         """Upgrade a shared lock to an exclusive lock.
@@ -319,10 +529,15 @@ class TaskManager(object):
             try:
                 if self.node:
                     objects.Node.release(self.context, CONF.host, self.node.id)
+                    _lock_release_notifier.notify(self.node.uuid, self.node.id)
             except exception.NodeNotFound:
                 # squelch the exception if the node was deleted
                 # within the task's context.
                 pass
+        self._clear_resources()
+
+    def _clear_resources(self):
+        """Reset attributes once the lock, if any, has been released."""
         if self.node:
             LOG.debug("Successfully released %(type)s lock for %(purpose)s "
                       "on node %(node)s (lock was held %(time).2f sec)",
@@ -12,9 +12,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+
 from oslo_config import cfg
 from oslo_log import log
 from oslo_utils import excutils
+import six
 
 from ironic.common import exception
 from ironic.common.i18n import _, _LE, _LI, _LW
@@ -459,3 +462,50 @@ def _validate_user_clean_steps(task, user_steps):
 
     if errors:
         raise exception.InvalidParameterValue('; '.join(errors))
+
+
+def get_bmc_address(driver_info):
+    """Get the address of the management controller of a node.
+
+    Drivers store the address of the BMC (or of the hypervisor or PDU that
+    controls the node) in driver_info fields like ``ipmi_address``,
+    ``ssh_address``, ``snmp_address`` or ``drac_host``. Several nodes may
+    share the same address, e.g. VMs on a single hypervisor.
+
+    :param driver_info: the node's driver_info dictionary.
+    :returns: the address as a string, or None if it cannot be determined.
+    """
+    for field in sorted(driver_info or ()):
+        if field.endswith(('_address', '_host')) and driver_info[field]:
+            return six.text_type(driver_info[field])
+    return None
+
+
+def interleave_by_bmc_address(node_infos, driver_info_index):
+    """Reorder nodes so that nodes sharing a BMC address are spread apart.
+
+    Nodes are grouped by their BMC address (see :func:`get_bmc_address`) and
+    then taken from the groups in a round-robin fashion, so that workers
+    consuming the result in parallel do not hammer the same BMC
+    concurrently.
+
+    :param node_infos: an iterable of tuples describing nodes, as returned
+        by ``iter_nodes``.
+    :param driver_info_index: index of the driver_info dictionary in each
+        tuple.
+    :returns: a list with the same tuples, reordered.
+    """
+    groups = collections.OrderedDict()
+    for node_info in node_infos:
+        address = get_bmc_address(node_info[driver_info_index])
+        # NOTE: nodes with an unknown address are treated as independent.
+        key = address if address is not None else node_info[0]
+        groups.setdefault(key, collections.deque()).append(node_info)
+
+    result = []
+    queues = list(groups.values())
+    while queues:
+        for q in queues:
+            result.append(q.popleft())
+        queues = [q for q in queues if q]
+    return result
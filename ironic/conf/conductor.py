@@ -66,6 +66,24 @@ opts = [
                help=_('Maximum number of worker threads that can be started '
                       'simultaneously by a periodic task. Should be less '
                       'than RPC thread pool size.')),
+    cfg.IntOpt('sync_power_state_workers',
+               default=8, min=1,
+               help=_('The maximum number of worker threads that can be '
+                      'started simultaneously to sync nodes power states '
+                      'from the periodic task. The effective number is also '
+                      'limited by [conductor]periodic_max_workers.')),
+    cfg.IntOpt('sync_power_state_bulk_size',
+               default=16, min=1,
+               help=_('The maximum number of nodes whose power states are '
+                      'requested together from the periodic task, for '
+                      'drivers able to get the power states of several '
+                      'nodes at once. Set to 1 to get the power state of '
+                      'one node at a time.')),
+    cfg.IntOpt('sync_power_state_bulk_concurrency',
+               default=8, min=1,
+               help=_('The maximum number of power state requests run in '
+                      'parallel for one batch of nodes, by drivers which '
+                      'query the nodes of a batch separately.')),
     cfg.IntOpt('node_locked_retry_attempts',
                default=3,
                help=_('Number of attempts to grab a node lock.')),
@@ -80,6 +98,21 @@ opts = [
                default=600,
                help=_('Seconds between conductor sending sensor data message'
                       ' to ceilometer via the notification bus.')),
+    cfg.IntOpt('send_sensor_data_workers',
+               default=4, min=1,
+               help=_('The maximum number of worker threads that can be '
+                      'started simultaneously to collect sensor data from '
+                      'the periodic task. The effective number is also '
+                      'limited by [conductor]periodic_max_workers.')),
+    cfg.IntOpt('send_sensor_data_batch_size',
+               default=1, min=1,
+               help=_('The number of nodes whose sensor data is sent in a '
+                      'single notification. With the default value of 1, a '
+                      '"hardware.ipmi.metrics" notification is sent for '
+                      'every node. With bigger values, a '
+                      '"hardware.ipmi.metrics.batch" notification is sent '
+                      'instead, with a list of the messages of several '
+                      'nodes as payload.')),
     cfg.ListOpt('send_sensor_data_types',
                 default=['ALL'],
                 help=_('List of comma separated meter types which need to be'
@@ -34,6 +34,33 @@ opts = [
                       'sent to a server. There is a risk with some hardware '
                       'that setting this too low may cause the BMC to crash. '
                       'Recommended setting is 5 seconds.')),
+    cfg.BoolOpt('use_session_pool',
+                default=False,
+                help=_('Whether the ipmitool driver should keep a long-lived '
+                       '"ipmitool shell" session per BMC and send read-only '
+                       'commands, such as "power status", through it instead '
+                       'of starting a new ipmitool process and IPMI session '
+                       'for every command.')),
+    cfg.IntOpt('session_idle_timeout',
+               default=60,
+               min=1,
+               help=_('Time, in seconds, after which an unused pooled '
+                      'ipmitool session is closed. Idle sessions are looked '
+                      'for at this interval too. Only used when '
+                      '[ipmi]use_session_pool is enabled.')),
+    cfg.BoolOpt('use_sdr_cache',
+                default=False,
+                help=_('Whether the ipmitool driver should keep a local copy '
+                       'of the Sensor Data Record (SDR) repository of each '
+                       'BMC when collecting sensor data, and only read the '
+                       'sensor readings from the BMC. The copies are stored '
+                       'in [DEFAULT]tempdir.')),
+    cfg.IntOpt('sdr_cache_ttl',
+               default=86400,
+               min=1,
+               help=_('Time, in seconds, after which the local copy of the '
+                      'SDR repository of a BMC is created again. Only used '
+                      'when [ipmi]use_sdr_cache is enabled.')),
 ]
 
 
@@ -31,6 +31,34 @@ opts = [
                help=_("Number of seconds to wait between attempts to get "
                       "VM name used by the host that corresponds to a "
                       "node's MAC address.")),
+    cfg.BoolOpt('use_connection_pool',
+                default=False,
+                help=_('Whether the SSH power driver should keep its SSH '
+                       'connections to the hosts open and reuse them, '
+                       'instead of connecting again for every request.')),
+    cfg.IntOpt('connection_idle_timeout',
+               default=300,
+               min=1,
+               help=_('Time, in seconds, after which an unused pooled SSH '
+                      'connection is closed. Only used when '
+                      '[ssh]use_connection_pool is enabled.')),
+    cfg.IntOpt('vm_name_cache_ttl',
+               default=60,
+               min=0,
+               help=_("Time, in seconds, for which the name of the VM "
+                      "corresponding to a node's MAC addresses is cached, "
+                      "instead of being looked up on the host for every "
+                      "request. Set to 0 to disable caching.")),
+    cfg.IntOpt('vm_list_cache_ttl',
+               default=0,
+               min=0,
+               help=_('Time, in seconds, for which the lists of running and '
+                      'of all VMs of a host are cached and shared by all the '
+                      'nodes hosted on it, instead of being fetched from the '
+                      'host for every node. The lists are refreshed after '
+                      'every power action, but a power state changed '
+                      'outside of ironic is only seen once they expire. '
+                      '0 (the default) disables caching.')),
 ]
 
 
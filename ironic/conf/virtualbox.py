@@ -20,6 +20,15 @@ opts = [
     cfg.PortOpt('port',
                 default=18083,
                 help=_('Port on which VirtualBox web service is listening.')),
+    cfg.IntOpt('power_state_cache_ttl',
+               default=0,
+               min=0,
+               help=_('Time, in seconds, for which the power state of a VM '
+                      'is cached, instead of being queried from the '
+                      'VirtualBox web service for every request. The cached '
+                      'state is dropped after every power action, but a '
+                      'power state changed outside of ironic is only seen '
+                      'once it expires. 0 (the default) disables caching.')),
 ]
 
 
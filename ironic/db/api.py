@@ -61,6 +61,12 @@ class Connection(object):
                         :chassis_uuid: uuid of chassis
                         :driver: driver's name
                         :provision_state: provision state of node
+                        :provision_state_in:
+                            provision state of node is in the list
+                        :provision_state_not_in:
+                            provision state of node is not in the list
+                        :target_power_state: target power state of node,
+                            None for nodes without a power action in progress
                         :provisioned_before:
                             nodes with provision_updated_at field before this
                             interval in seconds
@@ -75,7 +81,8 @@ class Connection(object):
 
     @abc.abstractmethod
     def get_node_list(self, filters=None, limit=None, marker=None,
-                      sort_key=None, sort_dir=None):
+                      sort_key=None, sort_dir=None, fields=None,
+                      with_tags=False):
         """Return a list of nodes.
 
         :param filters: Filters to apply. Defaults to None.
@@ -86,6 +93,12 @@ class Connection(object):
                         :chassis_uuid: uuid of chassis
                         :driver: driver's name
                         :provision_state: provision state of node
+                        :provision_state_in:
+                            provision state of node is in the list
+                        :provision_state_not_in:
+                            provision state of node is not in the list
+                        :target_power_state: target power state of node,
+                            None for nodes without a power action in progress
                         :provisioned_before:
                             nodes with provision_updated_at field before this
                             interval in seconds
@@ -95,6 +108,12 @@ class Connection(object):
         :param sort_key: Attribute by which results should be sorted.
         :param sort_dir: direction in which results should be sorted.
                          (asc, desc)
+        :param fields: List of node columns to load. The other columns are
+                       not fetched from the database and must not be
+                       accessed. Defaults to all columns.
+        :param with_tags: Whether to load the tags of the nodes. Defaults
+                          to False, in which case the tags must not be
+                          accessed.
         """
 
     @abc.abstractmethod
@@ -106,7 +125,7 @@ class Connection(object):
 
         :param tag: A string uniquely identifying the reservation holder.
         :param node_id: A node id or uuid.
-        :returns: A Node object.
+        :returns: A Node object, without its tags loaded.
         :raises: NodeNotFound if the node is not found.
         :raises: NodeLocked if the node is already reserved.
         """
@@ -123,6 +142,39 @@ class Connection(object):
                  reservation at all.
         """
 
+    @abc.abstractmethod
+    def reserve_nodes(self, tag, node_ids):
+        """Reserve several nodes at once.
+
+        The nodes which are not reserved by anyone are reserved by this
+        host, the others are left untouched.
+
+        :param tag: A string uniquely identifying the reservation holder.
+        :param node_ids: A list of node ids or uuids.
+        :returns: A tuple (reserved, failed). reserved is a dict mapping the
+                  id or uuid of each reserved node, as it was supplied, to
+                  the node. failed is a dict mapping the id or uuid of each
+                  other node to a NodeNotFound or NodeLocked exception.
+        :raises: InvalidIdentity if one of node_ids is neither an id nor
+                 a uuid.
+        """
+
+    @abc.abstractmethod
+    def release_nodes(self, tag, node_ids):
+        """Release the reservations on several nodes at once.
+
+        The nodes which are reserved by this host are released, the others
+        are left untouched.
+
+        :param tag: A string uniquely identifying the reservation holder.
+        :param node_ids: A list of node ids or uuids.
+        :returns: A dict mapping the id or uuid of each node which could
+                  not be released, as it was supplied, to a NodeNotFound,
+                  NodeLocked or NodeNotLocked exception.
+        :raises: InvalidIdentity if one of node_ids is neither an id nor
+                 a uuid.
+        """
+
     @abc.abstractmethod
     def create_node(self, values):
         """Create a new node.
@@ -148,34 +200,54 @@ class Connection(object):
         """
 
     @abc.abstractmethod
-    def get_node_by_id(self, node_id):
+    def get_node_by_id(self, node_id, filters=None, with_tags=False):
         """Return a node.
 
         :param node_id: The id of a node.
+        :param filters: Filters the node must match, see get_node_list().
+                        Defaults to None.
+        :param with_tags: Whether to load the tags of the node. Defaults
+                          to False, in which case the tags must not be
+                          accessed.
         :returns: A node.
+        :raises: NodeNotFound if the node is not found or does not match
+                 the filters.
         """
 
     @abc.abstractmethod
-    def get_node_by_uuid(self, node_uuid):
+    def get_node_by_uuid(self, node_uuid, filters=None, with_tags=False):
         """Return a node.
 
         :param node_uuid: The uuid of a node.
+        :param filters: Filters the node must match, see get_node_list().
+                        Defaults to None.
+        :param with_tags: Whether to load the tags of the node. Defaults
+                          to False, in which case the tags must not be
+                          accessed.
         :returns: A node.
+        :raises: NodeNotFound if the node is not found or does not match
+                 the filters.
         """
 
     @abc.abstractmethod
-    def get_node_by_name(self, node_name):
+    def get_node_by_name(self, node_name, with_tags=False):
         """Return a node.
 
         :param node_name: The logical name of a node.
+        :param with_tags: Whether to load the tags of the node. Defaults
+                          to False, in which case the tags must not be
+                          accessed.
         :returns: A node.
         """
 
     @abc.abstractmethod
-    def get_node_by_instance(self, instance):
+    def get_node_by_instance(self, instance, with_tags=False):
         """Return a node.
 
         :param instance: The instance uuid to search for.
+        :param with_tags: Whether to load the tags of the node. Defaults
+                          to False, in which case the tags must not be
+                          accessed.
         :returns: A node.
         :raises: InstanceNotFound if the instance is not found.
         :raises: InvalidUUID if the instance uuid is invalid.
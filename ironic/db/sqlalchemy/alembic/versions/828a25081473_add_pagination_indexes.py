@@ -0,0 +1,36 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add indexes for the sort keys of API listings
+
+Revision ID: 828a25081473
+Revises: b4130a7fc904
+Create Date: 2016-10-17 10:41:27.180642
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '828a25081473'
+down_revision = 'b4130a7fc904'
+
+from alembic import op
+
+
+def upgrade():
+    op.create_index('nodes_created_at_idx', 'nodes', ['created_at', 'id'],
+                    unique=False)
+    op.create_index('nodes_provision_state_idx', 'nodes',
+                    ['provision_state', 'id'], unique=False)
+    op.create_index('ports_created_at_idx', 'ports', ['created_at', 'id'],
+                    unique=False)
+    op.create_index('portgroups_created_at_idx', 'portgroups',
+                    ['created_at', 'id'], unique=False)
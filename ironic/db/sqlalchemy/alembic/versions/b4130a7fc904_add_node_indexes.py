@@ -0,0 +1,39 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add indexes to nodes for the conductor's periodic tasks
+
+Revision ID: b4130a7fc904
+Revises: 60cf717201bc
+Create Date: 2016-10-14 09:12:41.503318
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'b4130a7fc904'
+down_revision = '60cf717201bc'
+
+from alembic import op
+
+
+def upgrade():
+    op.create_index('provision_maintenance_update_idx', 'nodes',
+                    ['provision_state', 'maintenance', 'provision_updated_at'],
+                    unique=False)
+    op.create_index('provision_inspection_started_idx', 'nodes',
+                    ['provision_state', 'inspection_started_at'],
+                    unique=False)
+    op.create_index('reservation_idx', 'nodes', ['reservation'],
+                    unique=False)
+    op.create_index('driver_idx', 'nodes', ['driver'], unique=False)
+    op.create_index('console_enabled_idx', 'nodes', ['console_enabled'],
+                    unique=False)
@@ -22,6 +22,7 @@ import threading
 
 from oslo_db import exception as db_exc
 from oslo_db.sqlalchemy import enginefacade
+from oslo_db.sqlalchemy import types as db_types
 from oslo_db.sqlalchemy import utils as db_utils
 from oslo_log import log
 from oslo_utils import strutils
@@ -29,6 +30,8 @@ from oslo_utils import timeutils
 from oslo_utils import uuidutils
 from sqlalchemy.orm.exc import NoResultFound, MultipleResultsFound
 from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm import make_transient_to_detached
 from sqlalchemy import sql
 
 from ironic.common import exception
@@ -59,8 +62,23 @@ def _session_for_write():
     return enginefacade.writer.using(_CONTEXT)
 
 
-def _get_node_query_with_tags():
-    return model_query(models.Node).options(joinedload('tags'))
+# NOTE: node filters matching the value of the column of the same name.
+_NODE_EQUALITY_FILTERS = ('maintenance', 'driver', 'resource_class',
+                          'provision_state', 'target_power_state',
+                          'console_enabled')
+
+
+def _get_node_query(with_tags=False):
+    query = model_query(models.Node)
+    if with_tags:
+        query = query.options(joinedload('tags'))
+    return query
+
+
+def _update_returning_supported(session):
+    # NOTE: of the database backends supported by ironic, only PostgreSQL
+    # implements UPDATE ... RETURNING.
+    return session.get_bind().dialect.name == 'postgresql'
 
 
 def model_query(model, *args, **kwargs):
@@ -92,6 +110,38 @@ def add_identity_filter(query, value):
         raise exception.InvalidIdentity(identity=value)
 
 
+def _split_identities(values):
+    """Split node identities into integer ids and UUIDs.
+
+    :param values: An iterable of node ids or UUIDs.
+    :returns: A dict mapping each id or UUID, as an integer id or as a
+              UUID string, to the value it was supplied as.
+    :raises: InvalidIdentity if a value is neither an id nor a UUID.
+    """
+    identities = {}
+    for value in values:
+        if strutils.is_int_like(value):
+            identities[int(value)] = value
+        elif uuidutils.is_uuid_like(value):
+            identities[value] = value
+        else:
+            raise exception.InvalidIdentity(identity=value)
+    return identities
+
+
+def add_node_identities_filter(query, identities):
+    """Adds a filter on several identities to a query.
+
+    :param query: Initial query to add filter to.
+    :param identities: A dict as returned by _split_identities().
+    :return: Modified query.
+    """
+    ids = [i for i in identities if isinstance(i, int)]
+    uuids = [i for i in identities if not isinstance(i, int)]
+    return query.filter(sql.or_(models.Node.id.in_(ids),
+                                models.Node.uuid.in_(uuids)))
+
+
 def add_port_filter(query, value):
     """Adds a port-specific filter to a query.
 
@@ -160,6 +210,20 @@ def add_node_filter_by_chassis(query, value):
         return query.filter(models.Chassis.uuid == value)
 
 
+def _get_node_column(name):
+    """Return the column of the nodes table to select for a node field.
+
+    The JSON fields of the Node model are left encoded when loaded, see
+    models.JsonDict. When they are selected on their own, they are decoded
+    by the query instead.
+    """
+    attr_name = models.Node.get_attr_name(name)
+    column = getattr(models.Node, attr_name)
+    if attr_name != name:
+        column = sql.type_coerce(column, db_types.JsonEncodedDict).label(name)
+    return column
+
+
 def _paginate_query(model, limit=None, marker=None, sort_key=None,
                     sort_dir=None, query=None):
     if not query:
@@ -205,14 +269,19 @@ class Connection(api.Connection):
         if 'reserved_by_any_of' in filters:
             query = query.filter(models.Node.reservation.in_(
                 filters['reserved_by_any_of']))
-        if 'maintenance' in filters:
-            query = query.filter_by(maintenance=filters['maintenance'])
-        if 'driver' in filters:
-            query = query.filter_by(driver=filters['driver'])
-        if 'resource_class' in filters:
-            query = query.filter_by(resource_class=filters['resource_class'])
-        if 'provision_state' in filters:
-            query = query.filter_by(provision_state=filters['provision_state'])
+        for column in _NODE_EQUALITY_FILTERS:
+            if column in filters:
+                query = query.filter_by(**{column: filters[column]})
+        if 'provision_state_in' in filters:
+            query = query.filter(models.Node.provision_state.in_(
+                filters['provision_state_in']))
+        if 'provision_state_not_in' in filters:
+            # NOTE: NOT IN is never true for NULL (NOSTATE), match it
+            # explicitly.
+            query = query.filter(sql.or_(
+                models.Node.provision_state == sql.null(),
+                ~models.Node.provision_state.in_(
+                    filters['provision_state_not_in'])))
         if 'provisioned_before' in filters:
             limit = (timeutils.utcnow() -
                      datetime.timedelta(seconds=filters['provisioned_before']))
@@ -222,8 +291,6 @@ class Connection(api.Connection):
                      (datetime.timedelta(
                          seconds=filters['inspection_started_before'])))
             query = query.filter(models.Node.inspection_started_at < limit)
-        if 'console_enabled' in filters:
-            query = query.filter_by(console_enabled=filters['console_enabled'])
 
         return query
 
@@ -234,7 +301,7 @@ class Connection(api.Connection):
         if columns is None:
             columns = [models.Node.id]
         else:
-            columns = [getattr(models.Node, c) for c in columns]
+            columns = [_get_node_column(c) for c in columns]
 
         query = model_query(*columns, base_model=models.Node)
         query = self._add_nodes_filters(query, filters)
@@ -242,19 +309,31 @@ class Connection(api.Connection):
                                sort_key, sort_dir, query)
 
     def get_node_list(self, filters=None, limit=None, marker=None,
-                      sort_key=None, sort_dir=None):
-        query = _get_node_query_with_tags()
+                      sort_key=None, sort_dir=None, fields=None,
+                      with_tags=False):
+        query = _get_node_query(with_tags)
+        if fields is not None:
+            columns = [models.Node.get_attr_name(f) for f in fields]
+            query = query.options(load_only(*columns))
         query = self._add_nodes_filters(query, filters)
         return _paginate_query(models.Node, limit, marker,
                                sort_key, sort_dir, query)
 
     def reserve_node(self, tag, node_id):
-        with _session_for_write():
-            query = _get_node_query_with_tags()
+        with _session_for_write() as session:
+            returning = _update_returning_supported(session)
+            if returning:
+                node = self._reserve_node_returning(session, tag, node_id)
+                if node is not None:
+                    return node
+
+            query = model_query(models.Node)
             query = add_identity_filter(query, node_id)
-            # be optimistic and assume we usually create a reservation
-            count = query.filter_by(reservation=None).update(
-                {'reservation': tag}, synchronize_session=False)
+            count = 0
+            if not returning:
+                # be optimistic and assume we usually create a reservation
+                count = query.filter_by(reservation=None).update(
+                    {'reservation': tag}, synchronize_session=False)
             try:
                 node = query.one()
                 if count != 1:
@@ -266,6 +345,30 @@ class Connection(api.Connection):
             except NoResultFound:
                 raise exception.NodeNotFound(node_id)
 
+    def _reserve_node_returning(self, session, tag, node_id):
+        """Reserve a node with a single UPDATE ... RETURNING statement.
+
+        :returns: The reserved node, detached from the session, or None if
+                  the node does not exist or is already reserved.
+        """
+        table = models.Node.__table__
+        if strutils.is_int_like(node_id):
+            identity = table.c.id == int(node_id)
+        else:
+            identity = table.c.uuid == node_id
+        stmt = (table.update().
+                where(identity).
+                where(table.c.reservation == sql.null()).
+                values(reservation=tag).
+                returning(*table.c))
+        row = session.execute(stmt).first()
+        if row is None:
+            return None
+        node = models.Node(**{models.Node.get_attr_name(column.name):
+                              row[column] for column in table.c})
+        make_transient_to_detached(node)
+        return node
+
     def release_node(self, tag, node_id):
         with _session_for_write():
             query = model_query(models.Node)
@@ -284,6 +387,73 @@ class Connection(api.Connection):
             except NoResultFound:
                 raise exception.NodeNotFound(node_id)
 
+    def reserve_nodes(self, tag, node_ids):
+        identities = _split_identities(node_ids)
+        with _session_for_write():
+            free, failed = self._check_reservations(identities, None)
+            reserved = {}
+            if free:
+                query = model_query(models.Node).filter(
+                    models.Node.id.in_(free))
+                query.update({'reservation': tag}, synchronize_session=False)
+                for node in query:
+                    reserved[free[node.id]] = node
+            return reserved, failed
+
+    def release_nodes(self, tag, node_ids):
+        identities = _split_identities(node_ids)
+        with _session_for_write():
+            held, failed = self._check_reservations(identities, tag)
+            if held:
+                query = model_query(models.Node).filter(
+                    models.Node.id.in_(held))
+                query.update({'reservation': None}, synchronize_session=False)
+            return failed
+
+    def _check_reservations(self, identities, expected):
+        """Check the reservations of several nodes and lock their rows.
+
+        Must be called within a write session. The rows are locked until
+        the end of the session, so that the reservations do not change in
+        the meantime.
+
+        :param identities: A dict as returned by _split_identities().
+        :param expected: The reservation the nodes are expected to have.
+        :returns: A tuple (matching, failed). matching is a dict mapping the
+                  id of each node with the expected reservation to the value
+                  it was requested as. failed is a dict mapping each other
+                  requested value to the exception explaining the mismatch.
+                  A node requested both by id and by uuid is only checked
+                  as its id, its uuid fails with InvalidParameterValue.
+        """
+        matching = {}
+        failed = {}
+        if not identities:
+            return matching, failed
+
+        identities = dict(identities)
+        query = model_query(models.Node.id, models.Node.uuid,
+                            models.Node.reservation)
+        query = add_node_identities_filter(query, identities)
+        for node_id, node_uuid, reservation in query.with_for_update():
+            requested = [identities.pop(key) for key in (node_id, node_uuid)
+                         if key in identities]
+            if len(requested) > 1:
+                failed[requested[1]] = exception.InvalidParameterValue(
+                    _('Node %s was requested both by id and by uuid.') %
+                    node_uuid)
+            requested = requested[0]
+            if reservation == expected:
+                matching[node_id] = requested
+            elif reservation is None:
+                failed[requested] = exception.NodeNotLocked(node=node_uuid)
+            else:
+                failed[requested] = exception.NodeLocked(node=node_uuid,
+                                                         host=reservation)
+        for requested in identities.values():
+            failed[requested] = exception.NodeNotFound(node=requested)
+        return matching, failed
+
     def create_node(self, values):
         # ensure defaults are present for new nodes
         if 'uuid' not in values:
@@ -316,35 +486,37 @@ class Connection(api.Connection):
             node['tags'] = []
             return node
 
-    def get_node_by_id(self, node_id):
-        query = _get_node_query_with_tags()
+    def get_node_by_id(self, node_id, filters=None, with_tags=False):
+        query = _get_node_query(with_tags)
         query = query.filter_by(id=node_id)
+        query = self._add_nodes_filters(query, filters)
         try:
             return query.one()
         except NoResultFound:
             raise exception.NodeNotFound(node=node_id)
 
-    def get_node_by_uuid(self, node_uuid):
-        query = _get_node_query_with_tags()
+    def get_node_by_uuid(self, node_uuid, filters=None, with_tags=False):
+        query = _get_node_query(with_tags)
         query = query.filter_by(uuid=node_uuid)
+        query = self._add_nodes_filters(query, filters)
         try:
             return query.one()
         except NoResultFound:
             raise exception.NodeNotFound(node=node_uuid)
 
-    def get_node_by_name(self, node_name):
-        query = _get_node_query_with_tags()
+    def get_node_by_name(self, node_name, with_tags=False):
+        query = _get_node_query(with_tags)
         query = query.filter_by(name=node_name)
         try:
             return query.one()
         except NoResultFound:
             raise exception.NodeNotFound(node=node_name)
 
-    def get_node_by_instance(self, instance):
+    def get_node_by_instance(self, instance, with_tags=False):
         if not uuidutils.is_uuid_like(instance):
             raise exception.InvalidUUID(uuid=instance)
 
-        query = _get_node_query_with_tags()
+        query = _get_node_query(with_tags)
         query = query.filter_by(instance_uuid=instance)
 
         try:
@@ -659,14 +831,15 @@ class Connection(api.Connection):
             msg = _("Cannot overwrite UUID for an existing Chassis.")
             raise exception.InvalidParameterValue(err=msg)
 
-        with _session_for_write():
-            query = model_query(models.Chassis)
-            query = add_identity_filter(query, chassis_id)
-
-            count = query.update(values)
-            if count != 1:
-                raise exception.ChassisNotFound(chassis=chassis_id)
-            ref = query.one()
+        try:
+            with _session_for_write() as session:
+                query = model_query(models.Chassis)
+                query = add_identity_filter(query, chassis_id)
+                ref = query.one()
+                ref.update(values)
+                session.flush()
+        except NoResultFound:
+            raise exception.ChassisNotFound(chassis=chassis_id)
         return ref
 
     def destroy_chassis(self, chassis_id):
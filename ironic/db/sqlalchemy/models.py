@@ -21,6 +21,8 @@ SQLAlchemy models for baremetal data.
 from oslo_db import options as db_options
 from oslo_db.sqlalchemy import models
 from oslo_db.sqlalchemy import types as db_types
+from oslo_serialization import jsonutils
+import six
 import six.moves.urllib.parse as urlparse
 from sqlalchemy import Boolean, Column, DateTime, Index
 from sqlalchemy import ForeignKey, Integer
@@ -45,6 +47,53 @@ def table_args():
     return None
 
 
+class LazyJsonEncodedDict(db_types.JsonEncodedDict):
+    """JsonEncodedDict column type that leaves loaded values encoded.
+
+    Values are decoded on first access by a :class:`JsonDict` attribute.
+    """
+
+    def process_result_value(self, value, dialect):
+        return value
+
+
+class JsonDict(object):
+    """Model attribute decoding a LazyJsonEncodedDict column on first read.
+
+    The column is mapped to another attribute, holding the JSON string as
+    loaded from the database or the value last set. The decoded value is
+    cached until a new value is loaded or set, and values are only encoded
+    again when a new one is set.
+    """
+
+    def __init__(self, attr):
+        self.attr = attr
+        self._cache = '_decoded%s' % attr
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        value = getattr(obj, self.attr)
+        if not isinstance(value, six.string_types):
+            return value
+        cached = obj.__dict__.get(self._cache)
+        if cached is None or cached[0] is not value:
+            cached = (value, jsonutils.loads(value))
+            obj.__dict__[self._cache] = cached
+        return cached[1]
+
+    def __set__(self, obj, value):
+        setattr(obj, self.attr, value)
+
+    def is_decoded(self, obj):
+        """Return whether reading the attribute requires no decoding."""
+        value = getattr(obj, self.attr)
+        if not isinstance(value, six.string_types):
+            return True
+        cached = obj.__dict__.get(self._cache)
+        return cached is not None and cached[0] is value
+
+
 class IronicBase(models.TimestampMixin,
                  models.ModelBase):
 
@@ -56,6 +105,17 @@ class IronicBase(models.TimestampMixin,
             d[c.name] = self[c.name]
         return d
 
+    @classmethod
+    def get_attr_name(cls, name):
+        """Return the name of the attribute a column is mapped to."""
+        attr = getattr(cls, name, None)
+        return attr.attr if isinstance(attr, JsonDict) else name
+
+    def is_json_decoded(self, name):
+        """Return whether reading a column requires no JSON decoding."""
+        attr = getattr(type(self), name, None)
+        return not isinstance(attr, JsonDict) or attr.is_decoded(self)
+
 
 Base = declarative_base(cls=IronicBase)
 
@@ -70,7 +130,8 @@ class Chassis(Base):
     )
     id = Column(Integer, primary_key=True)
     uuid = Column(String(36))
-    extra = Column(db_types.JsonEncodedDict)
+    _extra = Column('extra', LazyJsonEncodedDict)
+    extra = JsonDict('_extra')
     description = Column(String(255), nullable=True)
 
 
@@ -97,6 +158,19 @@ class Node(Base):
         schema.UniqueConstraint('instance_uuid',
                                 name='uniq_nodes0instance_uuid'),
         schema.UniqueConstraint('name', name='uniq_nodes0name'),
+        # NOTE: indexes matching the filters and sort keys of the
+        # conductor's periodic tasks.
+        Index('provision_maintenance_update_idx', 'provision_state',
+              'maintenance', 'provision_updated_at'),
+        Index('provision_inspection_started_idx', 'provision_state',
+              'inspection_started_at'),
+        Index('reservation_idx', 'reservation'),
+        Index('driver_idx', 'driver'),
+        Index('console_enabled_idx', 'console_enabled'),
+        # NOTE: indexes matching the (sort key, id) order of the API
+        # listings, for the sort keys without a unique index.
+        Index('nodes_created_at_idx', 'created_at', 'id'),
+        Index('nodes_provision_state_idx', 'provision_state', 'id'),
         table_args())
     id = Column(Integer, primary_key=True)
     uuid = Column(String(36))
@@ -112,16 +186,24 @@ class Node(Base):
     target_provision_state = Column(String(15), nullable=True)
     provision_updated_at = Column(DateTime, nullable=True)
     last_error = Column(Text, nullable=True)
-    instance_info = Column(db_types.JsonEncodedDict)
-    properties = Column(db_types.JsonEncodedDict)
+    _instance_info = Column('instance_info', LazyJsonEncodedDict)
+    instance_info = JsonDict('_instance_info')
+    _properties = Column('properties', LazyJsonEncodedDict)
+    properties = JsonDict('_properties')
     driver = Column(String(255))
-    driver_info = Column(db_types.JsonEncodedDict)
-    driver_internal_info = Column(db_types.JsonEncodedDict)
-    clean_step = Column(db_types.JsonEncodedDict)
+    _driver_info = Column('driver_info', LazyJsonEncodedDict)
+    driver_info = JsonDict('_driver_info')
+    _driver_internal_info = Column('driver_internal_info',
+                                   LazyJsonEncodedDict)
+    driver_internal_info = JsonDict('_driver_internal_info')
+    _clean_step = Column('clean_step', LazyJsonEncodedDict)
+    clean_step = JsonDict('_clean_step')
     resource_class = Column(String(80), nullable=True)
 
-    raid_config = Column(db_types.JsonEncodedDict)
-    target_raid_config = Column(db_types.JsonEncodedDict)
+    _raid_config = Column('raid_config', LazyJsonEncodedDict)
+    raid_config = JsonDict('_raid_config')
+    _target_raid_config = Column('target_raid_config', LazyJsonEncodedDict)
+    target_raid_config = JsonDict('_target_raid_config')
 
     # NOTE(deva): this is the host name of the conductor which has
     #             acquired a TaskManager lock on the node.
@@ -142,7 +224,8 @@ class Node(Base):
     console_enabled = Column(Boolean, default=False)
     inspection_finished_at = Column(DateTime, nullable=True)
     inspection_started_at = Column(DateTime, nullable=True)
-    extra = Column(db_types.JsonEncodedDict)
+    _extra = Column('extra', LazyJsonEncodedDict)
+    extra = JsonDict('_extra')
 
     network_interface = Column(String(255), nullable=True)
 
@@ -154,16 +237,21 @@ class Port(Base):
     __table_args__ = (
         schema.UniqueConstraint('address', name='uniq_ports0address'),
         schema.UniqueConstraint('uuid', name='uniq_ports0uuid'),
+        Index('ports_created_at_idx', 'created_at', 'id'),
         table_args())
     id = Column(Integer, primary_key=True)
     uuid = Column(String(36))
     address = Column(String(18))
     node_id = Column(Integer, ForeignKey('nodes.id'), nullable=True)
-    extra = Column(db_types.JsonEncodedDict)
-    local_link_connection = Column(db_types.JsonEncodedDict)
+    _extra = Column('extra', LazyJsonEncodedDict)
+    extra = JsonDict('_extra')
+    _local_link_connection = Column('local_link_connection',
+                                    LazyJsonEncodedDict)
+    local_link_connection = JsonDict('_local_link_connection')
     portgroup_id = Column(Integer, ForeignKey('portgroups.id'), nullable=True)
     pxe_enabled = Column(Boolean, default=True)
-    internal_info = Column(db_types.JsonEncodedDict)
+    _internal_info = Column('internal_info', LazyJsonEncodedDict)
+    internal_info = JsonDict('_internal_info')
 
 
 class Portgroup(Base):
@@ -174,14 +262,17 @@ class Portgroup(Base):
         schema.UniqueConstraint('uuid', name='uniq_portgroups0uuid'),
         schema.UniqueConstraint('address', name='uniq_portgroups0address'),
         schema.UniqueConstraint('name', name='uniq_portgroups0name'),
+        Index('portgroups_created_at_idx', 'created_at', 'id'),
         table_args())
     id = Column(Integer, primary_key=True)
     uuid = Column(String(36))
     name = Column(String(255), nullable=True)
     node_id = Column(Integer, ForeignKey('nodes.id'), nullable=True)
     address = Column(String(18))
-    extra = Column(db_types.JsonEncodedDict)
-    internal_info = Column(db_types.JsonEncodedDict)
+    _extra = Column('extra', LazyJsonEncodedDict)
+    extra = JsonDict('_extra')
+    _internal_info = Column('internal_info', LazyJsonEncodedDict)
+    internal_info = JsonDict('_internal_info')
     standalone_ports_supported = Column(Boolean, default=True)
 
 
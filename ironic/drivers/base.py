@@ -468,6 +468,14 @@ class PowerInterface(BaseInterface):
     """Interface for power-related actions."""
     interface_type = 'power'
 
+    supports_bulk_power_states = False
+    """Indicates if get_power_states_bulk is faster than a loop.
+
+    If True, the power state synchronization periodic task gets the power
+    states of the nodes using this interface in batches, by calling
+    get_power_states_bulk.
+    """
+
     @abc.abstractmethod
     def get_power_state(self, task):
         """Return the power state of the task's node.
@@ -477,6 +485,28 @@ class PowerInterface(BaseInterface):
         :returns: a power state. One of :mod:`ironic.common.states`.
         """
 
+    def get_power_states_bulk(self, tasks):
+        """Return the power states of several nodes.
+
+        This is an optional method. Drivers able to query several nodes at
+        once, or in parallel, should override it and set
+        supports_bulk_power_states to True. The default implementation
+        calls get_power_state for each node in turn.
+
+        :param tasks: a list of TaskManager instances containing the nodes
+                      to act on. All the nodes use this power interface.
+        :returns: a dictionary mapping node UUIDs to either a power state,
+                  one of :mod:`ironic.common.states`, or the exception
+                  raised when getting it.
+        """
+        power_states = {}
+        for task in tasks:
+            try:
+                power_states[task.node.uuid] = self.get_power_state(task)
+            except Exception as e:
+                power_states[task.node.uuid] = e
+        return power_states
+
     @abc.abstractmethod
     def set_power_state(self, task, power_state):
         """Set the power state of the task's node.
@@ -804,7 +804,8 @@ class DracRAID(base.RAIDInterface):
                 lock_purpose = 'checking async raid configuration jobs'
                 with task_manager.acquire(context, node_uuid,
                                           purpose=lock_purpose,
-                                          shared=True) as task:
+                                          shared=True,
+                                          load_ports=False) as task:
                     if not isinstance(task.driver.raid, DracRAID):
                         continue
 
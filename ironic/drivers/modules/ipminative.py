@@ -328,6 +328,8 @@ def _send_raw(driver_info, raw_bytes):
 class NativeIPMIPower(base.PowerInterface):
     """The power driver using native python-ipmi library."""
 
+    supports_bulk_power_states = True
+
     def get_properties(self):
         return COMMON_PROPERTIES
 
@@ -355,6 +357,21 @@ class NativeIPMIPower(base.PowerInterface):
         driver_info = _parse_driver_info(task.node)
         return _power_status(driver_info)
 
+    @METRICS.timer('NativeIPMIPower.get_power_states_bulk')
+    def get_power_states_bulk(self, tasks):
+        """Get the current power states of several nodes.
+
+        The IPMI sessions to the nodes are run in parallel.
+
+        :param tasks: a list of TaskManager instances containing the nodes
+                      to act on.
+        :returns: a dictionary mapping node UUIDs to either a power state
+                  POWER_ON, POWER_OFF or ERROR defined in
+                  :class:`ironic.common.states`, or the exception raised
+                  when getting it.
+        """
+        return driver_utils.get_power_states_concurrently(self, tasks)
+
     @METRICS.timer('NativeIPMIPower.set_power_state')
     @task_manager.require_exclusive_lock
     def set_power_state(self, task, pstate):
@@ -29,18 +29,22 @@ WHICH PROVIDES DIFFERENT COMMAND-LINE OPTIONS AND *IS NOT SUPPORTED* BY THIS
 DRIVER.
 """
 
+import collections
 import contextlib
 import os
 import re
+import select
 import subprocess
 import tempfile
+import threading
 import time
 
+from futurist import periodics
 from ironic_lib import metrics_utils
 from ironic_lib import utils as ironic_utils
 from oslo_concurrency import processutils
 from oslo_log import log as logging
-from oslo_service import loopingcall
+from oslo_serialization import jsonutils
 from oslo_utils import excutils
 from oslo_utils import strutils
 import six
@@ -109,12 +113,25 @@ BRIDGING_OPTIONS = [('local_address', '-m'),
                     ('transit_channel', '-B'), ('transit_address', '-T'),
                     ('target_channel', '-b'), ('target_address', '-t')]
 
-LAST_CMD_TIME = {}
 TIMING_SUPPORT = None
 SINGLE_BRIDGE_SUPPORT = None
 DUAL_BRIDGE_SUPPORT = None
 TMP_DIR_CHECKED = None
 
+# NOTE: results of _parse_driver_info, as (parsed input, driver info) tuples
+# keyed by node UUID, in LRU order. Bounded so that deleted nodes do not
+# stay in it forever.
+_PARSED_DRIVER_INFO = collections.OrderedDict()
+_PARSED_DRIVER_INFO_MAX = 10000
+
+# NOTE: SDR cache files used by each node, as (path, creation time) tuples
+# keyed by node UUID, see _get_sdr_cache_file.
+_SDR_CACHE_FILES = {}
+
+# NOTE: private directory holding the SDR cache files, created on first use
+# by _get_sdr_cache_dir.
+_SDR_CACHE_DIR = None
+
 ipmitool_command_options = {
     'timing': ['ipmitool', '-N', '0', '-R', '0', '-h'],
     'single_bridge': ['ipmitool', '-m', '0', '-b', '0', '-t', '0', '-h'],
@@ -128,6 +145,15 @@ ipmitool_command_options = {
 # form regardless of locale.
 IPMITOOL_RETRYABLE_FAILURES = ['insufficient resources for session']
 
+# NOTE: Only read-only commands with well known output are sent through
+# a pooled ipmitool shell session, see _IPMISessionPool. Everything else keeps
+# using a dedicated ipmitool process, so that its exit code is reliable.
+POOLED_COMMANDS = frozenset(['power status'])
+
+# Strings printed by ipmitool when a command sent through a shell session
+# failed; the exit code of the shell process does not tell us that.
+IPMITOOL_SHELL_FAILURES = ('Error', 'Unable to establish')
+
 # NOTE(lucasagomes): A mapping for the boot devices and their hexadecimal
 # value. For more information about these values see the "Set System Boot
 # Options Command" section of the link below (page 418)
@@ -246,6 +272,32 @@ def _make_password_file(password):
 def _parse_driver_info(node):
     """Gets the parameters required for ipmitool to access the node.
 
+    The result is cached per node and reused until the node's driver_info,
+    driver or capabilities change.
+
+    :param node: the Node of interest.
+    :returns: dictionary of parameters.
+    :raises: InvalidParameterValue when an invalid value is specified
+    :raises: MissingParameterValue when a required ipmi parameter is missing.
+
+    """
+    source = jsonutils.dumps([node.driver_info, node.driver,
+                              node.properties.get('capabilities')],
+                             sort_keys=True)
+    # NOTE: the entry is popped and re-added to keep the cache in LRU order,
+    # a node whose driver_info fails validation is not cached at all.
+    cached = _PARSED_DRIVER_INFO.pop(node.uuid, None)
+    if cached is None or cached[0] != source:
+        cached = (source, _parse_driver_info_uncached(node))
+    _PARSED_DRIVER_INFO[node.uuid] = cached
+    while len(_PARSED_DRIVER_INFO) > _PARSED_DRIVER_INFO_MAX:
+        _PARSED_DRIVER_INFO.popitem(last=False)
+    return dict(cached[1])
+
+
+def _parse_driver_info_uncached(node):
+    """Parses and validates the ipmitool parameters of a node.
+
     :param node: the Node of interest.
     :returns: dictionary of parameters.
     :raises: InvalidParameterValue when an invalid value is specified
@@ -357,15 +409,267 @@ def _parse_driver_info(node):
         'target_address': target_address,
         'protocol_version': protocol_version,
         'force_boot_device': force_boot_device,
+        'hardware_model': driver_utils.get_hardware_model(node),
     }
 
 
-def _exec_ipmitool(driver_info, command, check_exit_code=None):
+class _BMC(object):
+    """Command scheduling state of a single BMC."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last_done = 0
+        self.users = 0
+
+
+class _BMCCommandScheduler(object):
+    """Spaces out the commands sent to each BMC.
+
+    Commands to the same BMC are queued on a per-BMC lock and each one is
+    woken up when its slot opens, that is CONF.ipmi.min_command_interval
+    seconds after the previous command to that BMC finished. Commands to
+    other BMCs never wait behind a throttled one.
+
+    BMCs are kept in least recently used order and dropped once they are
+    idle, so that the state does not grow with the number of BMCs ever
+    talked to.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bmcs = collections.OrderedDict()
+
+    def _evict_idle(self):
+        deadline = time.time() - CONF.ipmi.min_command_interval
+        for address, bmc in list(self._bmcs.items()):
+            if bmc.last_done >= deadline:
+                break
+            if not bmc.users:
+                del self._bmcs[address]
+
+    @contextlib.contextmanager
+    def slot(self, address):
+        """Wait for the next command slot of a BMC and hold it.
+
+        :param address: the address of the BMC.
+        """
+        with self._lock:
+            # Move the BMC to the most recently used end
+            bmc = self._bmcs.pop(address, None) or _BMC()
+            self._bmcs[address] = bmc
+            bmc.users += 1
+            self._evict_idle()
+        try:
+            with bmc.lock:
+                delay = CONF.ipmi.min_command_interval - (
+                    time.time() - bmc.last_done)
+                if delay > 0:
+                    time.sleep(delay)
+                try:
+                    yield
+                finally:
+                    bmc.last_done = time.time()
+        finally:
+            with self._lock:
+                bmc.users -= 1
+
+
+_BMC_SCHEDULER = _BMCCommandScheduler()
+
+
+class _IPMIShellSession(object):
+    """A long-lived ``ipmitool shell`` process talking to a single BMC.
+
+    The RMCP+ session is negotiated once and reused by every command sent
+    through the shell, instead of once per ipmitool process.
+    """
+
+    PROMPT = 'ipmitool> '
+
+    def __init__(self, args, password):
+        """Start the shell.
+
+        :param args: ipmitool arguments identifying the BMC, without the
+                     password file and the command.
+        :param password: the password for the BMC.
+        :raises: PasswordFileFailedToCreate from creating or writing to the
+                 temporary file.
+        :raises: processutils.ProcessExecutionError if the shell could not
+                 be started.
+        """
+        self.lock = threading.Lock()
+        self.last_used = time.time()
+        self._cmd = ' '.join(args + ['shell'])
+        # NOTE: ipmitool reads the password file while parsing its
+        # arguments, so the file can be removed once the prompt is shown.
+        with _make_password_file(password or '\0') as pw_file:
+            try:
+                self._proc = subprocess.Popen(
+                    args + ['-f', pw_file, 'shell'],
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT, close_fds=True)
+            except OSError as e:
+                raise processutils.ProcessExecutionError(
+                    cmd=self._cmd, description=six.text_type(e))
+            try:
+                self._read_until_prompt()
+            except processutils.ProcessExecutionError:
+                with excutils.save_and_reraise_exception():
+                    self.close()
+
+    def _read_until_prompt(self):
+        """Read the shell output up to the next prompt.
+
+        :returns: the output, without the prompt.
+        :raises: processutils.ProcessExecutionError if the shell exited or
+                 did not answer within CONF.ipmi.retry_timeout seconds.
+        """
+        fd = self._proc.stdout.fileno()
+        end_time = time.time() + CONF.ipmi.retry_timeout
+        out = b''
+        prompt = self.PROMPT.encode()
+        while not out.endswith(prompt):
+            timeout = end_time - time.time()
+            if timeout <= 0 or not select.select([fd], [], [], timeout)[0]:
+                raise processutils.ProcessExecutionError(
+                    stdout=out, cmd=self._cmd,
+                    description=_('Timed out waiting for ipmitool shell'))
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                raise processutils.ProcessExecutionError(
+                    stdout=out, cmd=self._cmd,
+                    exit_code=self._proc.poll(),
+                    description=_('ipmitool shell exited unexpectedly'))
+            out += chunk
+        return out[:-len(prompt)].decode('utf-8', 'replace')
+
+    def execute(self, command):
+        """Run a command in the shell.
+
+        :param command: the ipmitool command to be executed.
+        :returns: (stdout, stderr) of the command, stderr is always empty
+                  as it is merged into stdout.
+        :raises: processutils.ProcessExecutionError if the command failed
+                 or the shell is not usable anymore.
+        """
+        self.last_used = time.time()
+        try:
+            self._proc.stdin.write(('%s\n' % command).encode())
+            self._proc.stdin.flush()
+        except (IOError, OSError) as e:
+            raise processutils.ProcessExecutionError(
+                cmd=self._cmd, description=six.text_type(e))
+        out = self._read_until_prompt()
+        self.last_used = time.time()
+        # NOTE: depending on how ipmitool was built, the command may be
+        # echoed back by readline before its output.
+        if out.startswith(command + '\n'):
+            out = out[len(command) + 1:]
+        if any(failure in out for failure in IPMITOOL_SHELL_FAILURES):
+            raise processutils.ProcessExecutionError(
+                stdout=out, cmd='%s: %s' % (self._cmd, command))
+        return out, ''
+
+    def close(self):
+        """Terminate the shell process."""
+        if self._proc.poll() is None:
+            try:
+                self._proc.stdin.close()
+                self._proc.terminate()
+            except (IOError, OSError):
+                pass
+        self._proc.wait()
+
+
+class _IPMISessionPool(object):
+    """Pool of ipmitool shell sessions keyed by BMC access parameters.
+
+    Sessions are started on first use. The ones that have not been used for
+    CONF.ipmi.session_idle_timeout seconds are closed by evict_idle(), which
+    runs as a periodic task of the IPMIPower interface.
+    """
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def evict_idle(self):
+        """Close the sessions that have been idle for too long."""
+        deadline = time.time() - CONF.ipmi.session_idle_timeout
+        with self._lock:
+            idle = [key for key, session in self._sessions.items()
+                    if (session.last_used < deadline and
+                        not session.lock.locked())]
+            idle = [self._sessions.pop(key) for key in idle]
+        for session in idle:
+            session.close()
+
+    def _get_session(self, key, args, password):
+        with self._lock:
+            session = self._sessions.get(key)
+        if session is not None:
+            return session
+        # NOTE: start the shell without holding the pool lock, so that
+        # sessions to other BMCs are not blocked by a slow one.
+        new_session = _IPMIShellSession(args, password)
+        with self._lock:
+            session = self._sessions.setdefault(key, new_session)
+        if session is not new_session:
+            new_session.close()
+        return session
+
+    def discard(self, key):
+        """Close and forget the session for the given key, if any."""
+        with self._lock:
+            session = self._sessions.pop(key, None)
+        if session is not None:
+            session.close()
+
+    def execute(self, args, password, command):
+        """Run a command through the pooled session for a BMC.
+
+        A session that failed is closed, the next call starts a new one.
+
+        :param args: ipmitool arguments identifying the BMC, without the
+                     password file and the command.
+        :param password: the password for the BMC.
+        :param command: the ipmitool command to be executed.
+        :returns: (stdout, stderr) of the command.
+        :raises: PasswordFileFailedToCreate from creating or writing to the
+                 temporary file.
+        :raises: processutils.ProcessExecutionError from executing the
+                 command.
+        """
+        key = tuple(args) + (password,)
+        session = self._get_session(key, args, password)
+        with session.lock:
+            try:
+                return session.execute(command)
+            except processutils.ProcessExecutionError:
+                with excutils.save_and_reraise_exception():
+                    self.discard(key)
+
+    def close_all(self):
+        """Close all the pooled sessions."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+_SESSION_POOL = _IPMISessionPool()
+
+
+def _exec_ipmitool(driver_info, command, check_exit_code=None,
+                   sdr_cache_file=None):
     """Execute the ipmitool command.
 
     :param driver_info: the ipmitool parameters for accessing a node.
     :param command: the ipmitool command to be executed.
     :param check_exit_code: Single bool, int, or list of allowed exit codes.
+    :param sdr_cache_file: path of a local copy of the node's SDR repository
+                           to use instead of reading it from the BMC.
     :returns: (stdout, stderr) from executing the command.
     :raises: PasswordFileFailedToCreate from creating or writing to the
              temporary file.
@@ -407,76 +711,81 @@ def _exec_ipmitool(driver_info, command, check_exit_code=None):
         args.append('-N')
         args.append(str(CONF.ipmi.min_command_interval))
 
+    if sdr_cache_file:
+        args.append('-S')
+        args.append(sdr_cache_file)
+
     end_time = (time.time() + CONF.ipmi.retry_timeout)
+    use_pool = (CONF.ipmi.use_session_pool and check_exit_code is None and
+                command in POOLED_COMMANDS)
 
     while True:
-        num_tries = num_tries - 1
         # NOTE(deva): ensure that no communications are sent to a BMC more
         #             often than once every min_command_interval seconds.
-        time_till_next_poll = CONF.ipmi.min_command_interval - (
-            time.time() - LAST_CMD_TIME.get(driver_info['address'], 0))
-        if time_till_next_poll > 0:
-            time.sleep(time_till_next_poll)
-        # Resetting the list that will be utilized so the password arguments
-        # from any previous execution are preserved.
-        cmd_args = args[:]
-        extra_args = {}
-        if check_exit_code is not None:
-            extra_args['check_exit_code'] = check_exit_code
-        # 'ipmitool' command will prompt password if there is no '-f'
-        # option, we set it to '\0' to write a password file to support
-        # empty password
-        with _make_password_file(driver_info['password'] or '\0') as pw_file:
-            cmd_args.append('-f')
-            cmd_args.append(pw_file)
-            cmd_args.extend(command.split(" "))
-            try:
-                out, err = utils.execute(*cmd_args, **extra_args)
-                return out, err
-            except processutils.ProcessExecutionError as e:
-                with excutils.save_and_reraise_exception() as ctxt:
-                    err_list = [x for x in IPMITOOL_RETRYABLE_FAILURES
-                                if x in six.text_type(e)]
-                    if ((time.time() > end_time) or
-                        (num_tries == 0) or
-                        not err_list):
-                        LOG.error(_LE('IPMI Error while attempting "%(cmd)s" '
-                                      'for node %(node)s. Error: %(error)s'), {
-                                  'node': driver_info['uuid'],
-                                  'cmd': e.cmd, 'error': e
-                                  })
-                    else:
-                        ctxt.reraise = False
-                        LOG.warning(_LW('IPMI Error encountered, retrying '
-                                        '"%(cmd)s" for node %(node)s. '
-                                        'Error: %(error)s'), {
-                                    'node': driver_info['uuid'],
-                                    'cmd': e.cmd, 'error': e
-                                    })
-            finally:
-                LAST_CMD_TIME[driver_info['address']] = time.time()
-
-
-def _sleep_time(iter):
-    """Return the time-to-sleep for the n'th iteration of a retry loop.
-
-    This implementation increases exponentially.
-
-    :param iter: iteration number
-    :returns: number of seconds to sleep
-
-    """
-    if iter <= 1:
-        return 1
-    return iter ** 2
+        with _BMC_SCHEDULER.slot(driver_info['address']):
+            if use_pool:
+                use_pool = False
+                try:
+                    return _SESSION_POOL.execute(
+                        args, driver_info['password'], command)
+                except (exception.PasswordFileFailedToCreate,
+                        processutils.ProcessExecutionError) as e:
+                    # NOTE: fall back to a dedicated ipmitool process,
+                    # which reports errors and handles retries properly.
+                    LOG.debug('Pooled IPMI session failed for node '
+                              '%(node)s, running "%(cmd)s" in a new '
+                              'process. Error: %(error)s',
+                              {'node': driver_info['uuid'], 'cmd': command,
+                               'error': e})
+                    continue
+            num_tries = num_tries - 1
+            # Resetting the list that will be utilized so the password
+            # arguments from any previous execution are preserved.
+            cmd_args = args[:]
+            extra_args = {}
+            if check_exit_code is not None:
+                extra_args['check_exit_code'] = check_exit_code
+            # 'ipmitool' command will prompt password if there is no '-f'
+            # option, we set it to '\0' to write a password file to support
+            # empty password
+            with _make_password_file(
+                    driver_info['password'] or '\0') as pw_file:
+                cmd_args.append('-f')
+                cmd_args.append(pw_file)
+                cmd_args.extend(command.split(" "))
+                try:
+                    out, err = utils.execute(*cmd_args, **extra_args)
+                    return out, err
+                except processutils.ProcessExecutionError as e:
+                    with excutils.save_and_reraise_exception() as ctxt:
+                        err_list = [x for x in IPMITOOL_RETRYABLE_FAILURES
+                                    if x in six.text_type(e)]
+                        if ((time.time() > end_time) or
+                            (num_tries == 0) or
+                            not err_list):
+                            LOG.error(_LE('IPMI Error while attempting '
+                                          '"%(cmd)s" for node %(node)s. '
+                                          'Error: %(error)s'), {
+                                      'node': driver_info['uuid'],
+                                      'cmd': e.cmd, 'error': e
+                                      })
+                        else:
+                            ctxt.reraise = False
+                            LOG.warning(_LW('IPMI Error encountered, '
+                                            'retrying "%(cmd)s" for node '
+                                            '%(node)s. Error: %(error)s'), {
+                                        'node': driver_info['uuid'],
+                                        'cmd': e.cmd, 'error': e
+                                        })
 
 
 def _set_and_wait(target_state, driver_info):
-    """Helper function for DynamicLoopingCall.
+    """Change the power state and wait for it to be reached.
 
     This method changes the power state and polls the BMC until the desired
-    power state is reached, or CONF.ipmi.retry_timeout would be exceeded by the
-    next iteration.
+    power state is reached, or CONF.ipmi.retry_timeout expires. The polling
+    schedule adapts to how long the transition usually takes on the node's
+    hardware model, see driver_utils.wait_for_power_state().
 
     This method assumes the caller knows the current power state and does not
     check it prior to changing the power state. Most BMCs should be fine, but
@@ -493,45 +802,36 @@ def _set_and_wait(target_state, driver_info):
     elif target_state == states.POWER_OFF:
         state_name = "off"
 
-    def _wait(mutable):
+    def _log_failure():
+        # Log failures but keep trying
+        LOG.warning(_LW("IPMI power %(state)s failed for node %(node)s."),
+                    {'state': state_name, 'node': driver_info['uuid']})
+
+    def _get_power_state():
         try:
-            # Only issue power change command once
-            if mutable['iter'] < 0:
-                _exec_ipmitool(driver_info, "power %s" % state_name)
-            else:
-                mutable['power'] = _power_status(driver_info)
+            return _power_status(driver_info)
         except (exception.PasswordFileFailedToCreate,
                 processutils.ProcessExecutionError,
                 exception.IPMIFailure):
-            # Log failures but keep trying
-            LOG.warning(_LW("IPMI power %(state)s failed for node %(node)s."),
-                        {'state': state_name, 'node': driver_info['uuid']})
-        finally:
-            mutable['iter'] += 1
-
-        if mutable['power'] == target_state:
-            raise loopingcall.LoopingCallDone()
-
-        sleep_time = _sleep_time(mutable['iter'])
-        if (sleep_time + mutable['total_time']) > CONF.ipmi.retry_timeout:
-            # Stop if the next loop would exceed maximum retry_timeout
-            LOG.error(_LE('IPMI power %(state)s timed out after '
-                          '%(tries)s retries on node %(node_id)s.'),
-                      {'state': state_name, 'tries': mutable['iter'],
-                       'node_id': driver_info['uuid']})
-            mutable['power'] = states.ERROR
-            raise loopingcall.LoopingCallDone()
-        else:
-            mutable['total_time'] += sleep_time
-            return sleep_time
+            _log_failure()
 
-    # Use mutable objects so the looped method can change them.
-    # Start 'iter' from -1 so that the first two checks are one second apart.
-    status = {'power': None, 'iter': -1, 'total_time': 0}
+    # Only issue power change command once
+    try:
+        _exec_ipmitool(driver_info, "power %s" % state_name)
+    except (exception.PasswordFileFailedToCreate,
+            processutils.ProcessExecutionError,
+            exception.IPMIFailure):
+        _log_failure()
 
-    timer = loopingcall.DynamicLoopingCall(_wait, status)
-    timer.start().wait()
-    return status['power']
+    state = driver_utils.wait_for_power_state(
+        _get_power_state, target_state, CONF.ipmi.retry_timeout,
+        model=('ipmitool', driver_info['hardware_model']))
+    if state == states.ERROR:
+        LOG.error(_LE('IPMI power %(state)s timed out after '
+                      '%(timeout)s seconds on node %(node_id)s.'),
+                  {'state': state_name, 'timeout': CONF.ipmi.retry_timeout,
+                   'node_id': driver_info['uuid']})
+    return state
 
 
 def _power_on(driver_info):
@@ -582,18 +882,29 @@ def _power_status(driver_info):
         return states.ERROR
 
 
-def _process_sensor(sensor_data):
-    sensor_data_fields = sensor_data.split('\n')
+def _iter_sensors(sensors_data):
+    """Split the output of 'ipmitool sdr -v' into one dict per sensor.
+
+    The output is read line by line. Sensors are separated by blank lines,
+    and each line holding exactly one 'key : value' pair becomes an item of
+    the sensor's dict.
+
+    :param sensors_data: the sensor data returned by ipmitool command.
+    :returns: a generator of dicts, one per sensor.
+    """
     sensor_data_dict = {}
-    for field in sensor_data_fields:
-        if not field:
+    for line in sensors_data.splitlines():
+        if not line.strip():
+            if sensor_data_dict:
+                yield sensor_data_dict
+                sensor_data_dict = {}
             continue
-        kv_value = field.split(':')
-        if len(kv_value) != 2:
-            continue
-        sensor_data_dict[kv_value[0].strip()] = kv_value[1].strip()
+        kv_value = line.split(':')
+        if len(kv_value) == 2:
+            sensor_data_dict[kv_value[0].strip()] = kv_value[1].strip()
 
-    return sensor_data_dict
+    if sensor_data_dict:
+        yield sensor_data_dict
 
 
 def _get_sensor_type(node, sensor_data_dict):
@@ -631,12 +942,7 @@ def _parse_ipmi_sensors_data(node, sensors_data):
     if not sensors_data:
         return sensors_data_dict
 
-    sensors_data_array = sensors_data.split('\n\n')
-    for sensor_data in sensors_data_array:
-        sensor_data_dict = _process_sensor(sensor_data)
-        if not sensor_data_dict:
-            continue
-
+    for sensor_data_dict in _iter_sensors(sensors_data):
         sensor_type = _get_sensor_type(node, sensor_data_dict)
 
         # ignore the sensors which has no current 'Sensor Reading' data
@@ -655,6 +961,135 @@ def _parse_ipmi_sensors_data(node, sensors_data):
     return sensors_data_dict
 
 
+def _get_bmc_firmware(driver_info):
+    """Return the firmware revision of a BMC, as reported by 'mc info'.
+
+    :param driver_info: the ipmitool parameters for accessing a node.
+    :returns: the firmware revision, 'unknown' if it is not reported.
+    :raises: PasswordFileFailedToCreate from creating or writing to the
+             temporary file.
+    :raises: processutils.ProcessExecutionError from executing the command.
+    """
+    out, err = _exec_ipmitool(driver_info, 'mc info')
+    match = re.search(r'^Firmware Revision\s*:\s*(\S+)', out, re.MULTILINE)
+    return match.group(1) if match else 'unknown'
+
+
+def _get_sdr_cache_dir():
+    """Return the private directory holding the SDR cache files.
+
+    The directory is created in [DEFAULT]tempdir, readable by the conductor
+    only, so that other users can not replace or read the cache files.
+
+    :raises: OSError if the directory can not be created.
+    :returns: the path of the directory.
+    """
+    global _SDR_CACHE_DIR
+    if _SDR_CACHE_DIR is None or not os.path.isdir(_SDR_CACHE_DIR):
+        _SDR_CACHE_DIR = tempfile.mkdtemp(prefix='ironic-ipmi-sdr-',
+                                          dir=CONF.tempdir)
+    return _SDR_CACHE_DIR
+
+
+def _get_sdr_cache_name(driver_info, firmware):
+    """Return the name of the SDR cache file of a node.
+
+    :param driver_info: the ipmitool parameters for accessing the node.
+    :param firmware: the firmware revision of the BMC.
+    :returns: a file name, unique for the BMC address, port, bridging
+              parameters and firmware revision.
+    """
+    parts = [driver_info['address'], driver_info['dest_port']]
+    parts.extend(driver_info[option] for option, _arg in BRIDGING_OPTIONS)
+    parts.append(firmware)
+    name = 'ipmi-sdr-%s' % '-'.join('' if part is None else str(part)
+                                    for part in parts)
+    return re.sub(r'[^\w.-]', '_', name)
+
+
+def _get_sdr_cache_file(task, driver_info):
+    """Return a local copy of the node's SDR repository.
+
+    The copy is shared by all nodes with the same BMC address, port,
+    bridging parameters and firmware revision, and is created with
+    'sdr dump' if it does not exist yet or is older than
+    [ipmi]sdr_cache_ttl seconds. The firmware revision is only checked
+    again once the copy used by the node has expired.
+
+    :param task: a TaskManager instance.
+    :param driver_info: the ipmitool parameters for accessing the node.
+    :returns: the path of the SDR cache file, or None if it could not be
+              created.
+    """
+    node_uuid = task.node.uuid
+    now = time.time()
+    cached = _SDR_CACHE_FILES.get(node_uuid)
+    if (cached is not None and now < cached[1] + CONF.ipmi.sdr_cache_ttl and
+            os.path.exists(cached[0])):
+        return cached[0]
+
+    tmp_path = None
+    try:
+        firmware = _get_bmc_firmware(driver_info)
+        cache_dir = _get_sdr_cache_dir()
+        name = _get_sdr_cache_name(driver_info, firmware)
+        path = os.path.join(cache_dir, name)
+        try:
+            created = os.path.getmtime(path)
+        except OSError:
+            created = 0
+        if now >= created + CONF.ipmi.sdr_cache_ttl:
+            # NOTE: dump to a temporary file first and rename it, so that
+            # nodes sharing the BMC never read a partially written cache.
+            fd, tmp_path = tempfile.mkstemp(prefix=name + '.', dir=cache_dir)
+            os.close(fd)
+            dump_sdr(task, tmp_path)
+            os.rename(tmp_path, path)
+            created = now
+    except (exception.IPMIFailure, exception.PasswordFileFailedToCreate,
+            processutils.ProcessExecutionError, OSError) as e:
+        LOG.warning(_LW('Unable to create the SDR cache for node %(node)s, '
+                        'reading the SDR from the BMC. Error: %(error)s'),
+                    {'node': node_uuid, 'error': e})
+        if tmp_path:
+            ironic_utils.unlink_without_raise(tmp_path)
+        return
+
+    _SDR_CACHE_FILES[node_uuid] = (path, created)
+    return path
+
+
+def _get_sensors_data_with_sdr_cache(task, driver_info):
+    """Read the sensors of a node, using a cached copy of its SDR.
+
+    :param task: a TaskManager instance.
+    :param driver_info: the ipmitool parameters for accessing the node.
+    :returns: the output of 'ipmitool sdr -v', or None if the SDR cache
+              could not be used.
+    """
+    sdr_cache_file = _get_sdr_cache_file(task, driver_info)
+    if not sdr_cache_file:
+        return
+
+    try:
+        out, err = _exec_ipmitool(driver_info, "sdr -v",
+                                  sdr_cache_file=sdr_cache_file)
+    except (exception.PasswordFileFailedToCreate,
+            processutils.ProcessExecutionError) as e:
+        # NOTE: the cache file may be corrupt, drop it so that it is
+        # created again next time.
+        LOG.warning(_LW('Reading sensors with the SDR cache %(file)s failed '
+                        'for node %(node)s, reading the SDR from the BMC. '
+                        'Error: %(error)s'),
+                    {'file': sdr_cache_file, 'node': task.node.uuid,
+                     'error': e})
+        _SDR_CACHE_FILES.pop(task.node.uuid, None)
+        ironic_utils.unlink_without_raise(sdr_cache_file)
+        return
+
+    return out
+
+
 @METRICS.timer('send_raw')
 @task_manager.require_exclusive_lock
 def send_raw(task, raw_bytes):
@@ -753,6 +1188,8 @@ def _constructor_checks(driver):
 
 class IPMIPower(base.PowerInterface):
 
+    supports_bulk_power_states = True
+
     def __init__(self):
         _constructor_checks(driver=self.__class__.__name__)
 
@@ -791,6 +1228,26 @@ class IPMIPower(base.PowerInterface):
         driver_info = _parse_driver_info(task.node)
         return _power_status(driver_info)
 
+    @periodics.periodic(spacing=CONF.ipmi.session_idle_timeout,
+                        enabled=CONF.ipmi.use_session_pool)
+    def _close_idle_sessions(self, manager, context):
+        """Periodic task closing the pooled ipmitool sessions left idle."""
+        _SESSION_POOL.evict_idle()
+
+    @METRICS.timer('IPMIPower.get_power_states_bulk')
+    def get_power_states_bulk(self, tasks):
+        """Get the current power states of several nodes.
+
+        An ipmitool process is run for every node in parallel.
+
+        :param tasks: a list of TaskManager instances containing the nodes
+                      to act on.
+        :returns: a dictionary mapping node UUIDs to either one of
+                  ironic.common.states POWER_OFF, POWER_ON or ERROR, or the
+                  exception raised when getting it.
+        """
+        return driver_utils.get_power_states_concurrently(self, tasks)
+
     @METRICS.timer('IPMIPower.set_power_state')
     @task_manager.require_exclusive_lock
     def set_power_state(self, task, pstate):
@@ -1025,15 +1482,20 @@ class IPMIManagement(base.ManagementInterface):
 
         """
         driver_info = _parse_driver_info(task.node)
-        # with '-v' option, we can get the entire sensor data including the
-        # extended sensor informations
-        cmd = "sdr -v"
-        try:
-            out, err = _exec_ipmitool(driver_info, cmd)
-        except (exception.PasswordFileFailedToCreate,
-                processutils.ProcessExecutionError) as e:
-            raise exception.FailedToGetSensorData(node=task.node.uuid,
-                                                  error=e)
+        out = None
+        if CONF.ipmi.use_sdr_cache:
+            out = _get_sensors_data_with_sdr_cache(task, driver_info)
+
+        if out is None:
+            # with '-v' option, we can get the entire sensor data including
+            # the extended sensor informations
+            cmd = "sdr -v"
+            try:
+                out, err = _exec_ipmitool(driver_info, cmd)
+            except (exception.PasswordFileFailedToCreate,
+                    processutils.ProcessExecutionError) as e:
+                raise exception.FailedToGetSensorData(node=task.node.uuid,
+                                                      error=e)
 
         return _parse_ipmi_sensors_data(task.node, out)
 
@@ -24,10 +24,11 @@ models.
 """
 
 import abc
+import collections
+import threading
 import time
 
 from oslo_log import log as logging
-from oslo_service import loopingcall
 from oslo_utils import importutils
 import six
 
@@ -38,6 +39,7 @@ from ironic.common import utils
 from ironic.conductor import task_manager
 from ironic.conf import CONF
 from ironic.drivers import base
+from ironic.drivers import utils as driver_utils
 
 pysnmp = importutils.try_import('pysnmp')
 if pysnmp:
@@ -79,12 +81,28 @@ OPTIONAL_PROPERTIES = {
 COMMON_PROPERTIES = REQUIRED_PROPERTIES.copy()
 COMMON_PROPERTIES.update(OPTIONAL_PROPERTIES)
 
+# NOTE: SNMP clients keyed by PDU address, port, SNMP version and
+# credentials, so that all the outlets of a PDU share one SNMP engine and
+# transport. See _get_client. Kept in LRU order and bounded, so that clients
+# of removed PDUs or of changed credentials do not stay in it forever.
+_CLIENTS = collections.OrderedDict()
+_CLIENTS_MAX = 1000
+
+# Maximum number of objects read in a single SNMP GET request when getting
+# the power states of several outlets of a PDU. Kept small so that the
+# responses fit the message size limits of simple SNMP agents.
+_MAX_OIDS_PER_GET = 16
+
 
 class SNMPClient(object):
     """SNMP client object.
 
     Performs low level SNMP get and set operations. Encapsulates all
     interaction with PySNMP to simplify dynamic importing and unit testing.
+
+    The SNMP engine, authorization data and transport target are created
+    once and reused by all the requests of the client. Requests are
+    serialized, as the SNMP engine is not safe for concurrent use.
     """
 
     def __init__(self, address, port, version, community=None, security=None):
@@ -96,6 +114,9 @@ class SNMPClient(object):
         else:
             self.community = community
         self.cmd_gen = cmdgen.CommandGenerator()
+        self._auth = None
+        self._transport = None
+        self._lock = threading.Lock()
 
     def _get_auth(self):
         """Return the authorization data for an SNMP request.
@@ -104,13 +125,17 @@ class SNMPClient(object):
             :class:`pysnmp.entity.rfc3413.oneliner.cmdgen.CommunityData`
             object.
         """
-        if self.version == SNMP_V3:
-            # Handling auth/encryption credentials is not (yet) supported.
-            # This version supports a security name analogous to community.
-            return cmdgen.UsmUserData(self.security)
-        else:
-            mp_model = 1 if self.version == SNMP_V2C else 0
-            return cmdgen.CommunityData(self.community, mpModel=mp_model)
+        if self._auth is None:
+            if self.version == SNMP_V3:
+                # Handling auth/encryption credentials is not (yet)
+                # supported. This version supports a security name
+                # analogous to community.
+                self._auth = cmdgen.UsmUserData(self.security)
+            else:
+                mp_model = 1 if self.version == SNMP_V2C else 0
+                self._auth = cmdgen.CommunityData(self.community,
+                                                  mpModel=mp_model)
+        return self._auth
 
     def _get_transport(self):
         """Return the transport target for an SNMP request.
@@ -122,7 +147,10 @@ class SNMPClient(object):
         # The transport target accepts timeout and retries parameters, which
         # default to 1 (second) and 5 respectively. These are deemed sensible
         # enough to allow for an unreliable network or slow device.
-        return cmdgen.UdpTransportTarget((self.address, self.port))
+        if self._transport is None:
+            self._transport = cmdgen.UdpTransportTarget(
+                (self.address, self.port))
+        return self._transport
 
     def get(self, oid):
         """Use PySNMP to perform an SNMP GET operation on a single object.
@@ -131,17 +159,32 @@ class SNMPClient(object):
         :raises: SNMPFailure if an SNMP request fails.
         :returns: The value of the requested object.
         """
+        return self.get_multiple([oid])[0]
+
+    def get_multiple(self, oids):
+        """Use PySNMP to perform an SNMP GET operation on several objects.
+
+        All the objects are requested in a single SNMP message.
+
+        :param oids: A list of the OIDs of the objects to get.
+        :raises: SNMPFailure if an SNMP request fails.
+        :returns: A list of the values of the requested objects, in the
+            order of `oids`.
+        """
         try:
-            results = self.cmd_gen.getCmd(self._get_auth(),
-                                          self._get_transport(),
-                                          oid)
+            with self._lock:
+                results = self.cmd_gen.getCmd(self._get_auth(),
+                                              self._get_transport(),
+                                              *oids)
         except snmp_error.PySnmpError as e:
             raise exception.SNMPFailure(operation="GET", error=e)
 
         error_indication, error_status, error_index, var_binds = results
 
         if error_indication:
-            # SNMP engine-level error.
+            # SNMP engine-level error. Resolve the transport address again
+            # on the next request, in case it has changed.
+            self._transport = None
             raise exception.SNMPFailure(operation="GET",
                                         error=error_indication)
 
@@ -150,9 +193,7 @@ class SNMPClient(object):
             raise exception.SNMPFailure(operation="GET",
                                         error=error_status.prettyPrint())
 
-        # We only expect a single value back
-        name, val = var_binds[0]
-        return val
+        return [val for name, val in var_binds]
 
     def get_next(self, oid):
         """Use PySNMP to perform an SNMP GET NEXT operation on a table object.
@@ -162,9 +203,10 @@ class SNMPClient(object):
         :returns: A list of values of the requested table object.
         """
         try:
-            results = self.cmd_gen.nextCmd(self._get_auth(),
-                                           self._get_transport(),
-                                           oid)
+            with self._lock:
+                results = self.cmd_gen.nextCmd(self._get_auth(),
+                                               self._get_transport(),
+                                               oid)
         except snmp_error.PySnmpError as e:
             raise exception.SNMPFailure(operation="GET_NEXT", error=e)
 
@@ -172,6 +214,7 @@ class SNMPClient(object):
 
         if error_indication:
             # SNMP engine-level error.
+            self._transport = None
             raise exception.SNMPFailure(operation="GET_NEXT",
                                         error=error_indication)
 
@@ -190,9 +233,10 @@ class SNMPClient(object):
         :raises: SNMPFailure if an SNMP request fails.
         """
         try:
-            results = self.cmd_gen.setCmd(self._get_auth(),
-                                          self._get_transport(),
-                                          (oid, value))
+            with self._lock:
+                results = self.cmd_gen.setCmd(self._get_auth(),
+                                              self._get_transport(),
+                                              (oid, value))
         except snmp_error.PySnmpError as e:
             raise exception.SNMPFailure(operation="SET", error=e)
 
@@ -200,6 +244,7 @@ class SNMPClient(object):
 
         if error_indication:
             # SNMP engine-level error.
+            self._transport = None
             raise exception.SNMPFailure(operation="SET",
                                         error=error_indication)
 
@@ -210,16 +255,24 @@ class SNMPClient(object):
 
 
 def _get_client(snmp_info):
-    """Create and return an SNMP client object.
+    """Return the SNMP client object of a PDU.
+
+    Clients are cached, all the nodes using the same PDU with the same SNMP
+    version and credentials share one client. The least recently used
+    clients are dropped once there are more than _CLIENTS_MAX of them.
 
     :param snmp_info: SNMP driver info.
     :returns: A :class:`SNMPClient` object.
     """
-    return SNMPClient(snmp_info["address"],
-                      snmp_info["port"],
-                      snmp_info["version"],
-                      snmp_info.get("community"),
-                      snmp_info.get("security"))
+    key = (snmp_info["address"], snmp_info["port"], snmp_info["version"],
+           snmp_info.get("community"), snmp_info.get("security"))
+    client = _CLIENTS.pop(key, None)
+    if client is None:
+        client = SNMPClient(*key)
+    _CLIENTS[key] = client
+    while len(_CLIENTS) > _CLIENTS_MAX:
+        _CLIENTS.popitem(last=False)
+    return client
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -267,29 +320,33 @@ class SNMPDriverBase(object):
         :raises: SNMPFailure if an SNMP request fails.
         :returns: power state. One of :class:`ironic.common.states`.
         """
+        state = driver_utils.wait_for_power_state(
+            self._snmp_power_state, goal_state, CONF.snmp.power_timeout,
+            model=('snmp', type(self).__name__),
+            min_interval=self.retry_interval,
+            max_interval=self.retry_interval)
+        LOG.debug("power state '%s'", state)
+        return state
+
+    def _snmp_power_state_oid(self):
+        """Return the OID of the object holding the outlet's power state.
+
+        The value of the object is translated by _snmp_parse_power_state.
+        This allows reading the power states of several outlets of a PDU
+        in one request.
+
+        :returns: The OID as a tuple of integers, or None if the power state
+            cannot be read from a single object.
+        """
+        return None
+
+    @abc.abstractmethod
+    def _snmp_parse_power_state(self, state):
+        """Translate the value of the power state object to a power state.
 
-        def _poll_for_state(mutable):
-            """Called at an interval until the node's power is consistent.
-
-            :param mutable: dict object containing "state" and "next_time"
-            :raises: SNMPFailure if an SNMP request fails.
-            """
-            mutable["state"] = self._snmp_power_state()
-            if mutable["state"] == goal_state:
-                raise loopingcall.LoopingCallDone()
-
-            mutable["next_time"] += self.retry_interval
-            if mutable["next_time"] >= CONF.snmp.power_timeout:
-                mutable["state"] = states.ERROR
-                raise loopingcall.LoopingCallDone()
-
-        # Pass state to the looped function call in a mutable form.
-        state = {"state": None, "next_time": 0}
-        timer = loopingcall.FixedIntervalLoopingCall(_poll_for_state,
-                                                     state)
-        timer.start(interval=self.retry_interval).wait()
-        LOG.debug("power state '%s'", state["state"])
-        return state["state"]
+        :param state: The value of the power state object of the outlet.
+        :returns: power state. One of :class:`ironic.common.states`.
+        """
 
     def power_state(self):
         """Returns a node's current power state.
@@ -368,9 +425,14 @@ class SNMPDriverSimple(SNMPDriverBase):
         outlet = int(self.snmp_info['outlet'])
         return self.oid_enterprise + self.oid_device + (outlet,)
 
+    def _snmp_power_state_oid(self):
+        return self.oid
+
     def _snmp_power_state(self):
         state = self.client.get(self.oid)
+        return self._snmp_parse_power_state(state)
 
+    def _snmp_parse_power_state(self, state):
         # Translate the state to an Ironic power state.
         if state == self.value_power_on:
             power_state = states.POWER_ON
@@ -533,10 +595,15 @@ class SNMPDriverEatonPower(SNMPDriverBase):
         outlet = int(self.snmp_info['outlet'])
         return self.oid_base + oid + (outlet,)
 
+    def _snmp_power_state_oid(self):
+        return self._snmp_oid(self.oid_status)
+
     def _snmp_power_state(self):
         oid = self._snmp_oid(self.oid_status)
         state = self.client.get(oid)
+        return self._snmp_parse_power_state(state)
 
+    def _snmp_parse_power_state(self, state):
         # Translate the state to an Ironic power state.
         if state in (self.status_on, self.status_pending_off):
             power_state = states.POWER_ON
@@ -652,6 +719,47 @@ def _get_driver(node):
     return cls(snmp_info)
 
 
+def _get_power_states(client, drivers):
+    """Get the power states of several outlets of a PDU.
+
+    The power state objects of the outlets are read with as few SNMP GET
+    requests as possible. Outlets whose power state cannot be read this
+    way, or whose request failed, are then read one at a time.
+
+    :param client: The :class:`SNMPClient` object of the PDU.
+    :param drivers: A list of (node UUID, SNMP driver object) tuples for the
+        outlets of the PDU.
+    :returns: A dictionary mapping node UUIDs to either a power state, one
+        of :class:`ironic.common.states`, or the exception raised when
+        getting it.
+    """
+    power_states = {}
+    bulk = [(uuid, driver) for uuid, driver in drivers
+            if driver._snmp_power_state_oid() is not None]
+    for i in range(0, len(bulk), _MAX_OIDS_PER_GET):
+        chunk = bulk[i:i + _MAX_OIDS_PER_GET]
+        oids = [driver._snmp_power_state_oid() for uuid, driver in chunk]
+        try:
+            values = client.get_multiple(oids)
+        except exception.SNMPFailure as e:
+            LOG.debug("Reading the power states of %(count)d outlets of SNMP "
+                      "PDU %(addr)s at once failed, reading them one at a "
+                      "time. Error: %(error)s",
+                      {'count': len(chunk), 'addr': client.address,
+                       'error': e})
+            continue
+        for (uuid, driver), value in zip(chunk, values):
+            power_states[uuid] = driver._snmp_parse_power_state(value)
+
+    for uuid, driver in drivers:
+        if uuid not in power_states:
+            try:
+                power_states[uuid] = driver.power_state()
+            except Exception as e:
+                power_states[uuid] = e
+    return power_states
+
+
 class SNMPPower(base.PowerInterface):
     """SNMP Power Interface.
 
@@ -659,6 +767,8 @@ class SNMPPower(base.PowerInterface):
     state of a physical device using an SNMP-enabled smart power controller.
     """
 
+    supports_bulk_power_states = True
+
     def get_properties(self):
         """Return the properties of the interface.
 
@@ -689,6 +799,33 @@ class SNMPPower(base.PowerInterface):
         power_state = driver.power_state()
         return power_state
 
+    def get_power_states_bulk(self, tasks):
+        """Get the current power states of several nodes.
+
+        The power states of the outlets of each PDU are read together, in
+        as few SNMP requests as possible.
+
+        :param tasks: A list of TaskManager instances containing the nodes
+            to act on.
+        :returns: A dictionary mapping node UUIDs to either a power state,
+            one of :class:`ironic.common.states`, or the exception raised
+            when getting it.
+        """
+        power_states = {}
+        pdus = collections.OrderedDict()
+        for task in tasks:
+            try:
+                driver = _get_driver(task.node)
+            except Exception as e:
+                power_states[task.node.uuid] = e
+                continue
+            pdus.setdefault(driver.client, []).append(
+                (task.node.uuid, driver))
+
+        for client, drivers in pdus.items():
+            power_states.update(_get_power_states(client, drivers))
+        return power_states
+
     @task_manager.require_exclusive_lock
     def set_power_state(self, task, pstate):
         """Turn the power on or off.
@@ -28,7 +28,11 @@ Currently supported environments are:
     XenServer   (xenserver)
 """
 
+import collections
+import contextlib
 import os
+import threading
+import time
 
 from oslo_concurrency import processutils
 from oslo_log import log as logging
@@ -94,6 +98,130 @@ _BOOT_DEVICES_MAP = {
 }
 
 
+# driver_info keys identifying an SSH connection and the virt CLI it uses
+_CONNECTION_KEYS = ('host', 'port', 'username', 'password', 'key_filename',
+                    'key_contents', 'virt_type', 'use_headless')
+# driver_info keys identifying only an SSH connection
+_SSH_CLIENT_KEYS = ('host', 'port', 'username', 'password', 'key_filename',
+                    'key_contents')
+
+# NOTE: names the hosts use for the nodes' VMs, as (name, time found)
+# tuples keyed by node UUID, host and MAC addresses, in LRU order. See
+# _get_hosts_name_for_node. Bounded so that deleted nodes and replaced
+# ports do not stay in it forever.
+_VM_NAMES = collections.OrderedDict()
+_VM_NAMES_MAX = 10000
+
+# NOTE: outputs of the commands listing the VMs of the hosts, as
+# (lines, time run) tuples keyed by host, port, username and command. They
+# are shared by all the nodes hosted on the same host. See _list_vms.
+_VM_LISTS = {}
+
+
+class _SSHClientPool(object):
+    """Pool of SSH clients keyed by connection parameters.
+
+    Clients are connected on first use, checked to still be connected
+    before being reused, and closed once they have not been used for
+    CONF.ssh.connection_idle_timeout seconds. A client checked out with
+    get() is not closed for being idle until it is given back with
+    release().
+    """
+
+    def __init__(self):
+        # [client, last used time, number of users] lists keyed by
+        # connection parameters
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def _evict_idle(self):
+        deadline = time.time() - CONF.ssh.connection_idle_timeout
+        with self._lock:
+            idle = [key for key, (client, last_used, users)
+                    in self._clients.items()
+                    if not users and last_used < deadline]
+            idle = [self._clients.pop(key)[0] for key in idle]
+        for client in idle:
+            client.close()
+
+    @staticmethod
+    def _is_active(client):
+        transport = client.get_transport()
+        return transport is not None and transport.is_active()
+
+    @staticmethod
+    def _key(driver_info):
+        return tuple(driver_info.get(k) for k in _SSH_CLIENT_KEYS)
+
+    def get(self, driver_info):
+        """Check out a connected SSH client for the connection parameters.
+
+        The client is shared with the other users of the same connection
+        parameters, and must be given back with release().
+
+        :param driver_info: information for accessing the node.
+        :returns: paramiko.SSHClient, an active ssh connection.
+        :raises: SSHConnectFailed if ssh failed to connect.
+        """
+        self._evict_idle()
+        key = self._key(driver_info)
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None:
+                entry[1] = time.time()
+                entry[2] += 1
+        if entry is not None:
+            if self._is_active(entry[0]):
+                return entry[0]
+            LOG.debug('Pooled SSH connection to %s is no longer active, '
+                      'reconnecting.', driver_info['host'])
+            self.discard(entry[0])
+
+        # NOTE: connect without holding the pool lock, so that connections
+        # to other hosts are not blocked by a slow one.
+        client = utils.ssh_connect(driver_info)
+        with self._lock:
+            entry = self._clients.setdefault(key, [client, time.time(), 0])
+            entry[2] += 1
+        if entry[0] is not client:
+            client.close()
+        return entry[0]
+
+    def release(self, driver_info, client):
+        """Give back an SSH client checked out with get().
+
+        :param driver_info: the information the client was checked out for.
+        :param client: the client.
+        """
+        with self._lock:
+            entry = self._clients.get(self._key(driver_info))
+            if entry is not None and entry[0] is client:
+                entry[1] = time.time()
+                entry[2] -= 1
+
+    def discard(self, client):
+        """Close and forget a pooled SSH client, if it is pooled."""
+        with self._lock:
+            keys = [key for key, (pooled, last_used, users)
+                    in self._clients.items() if pooled is client]
+            for key in keys:
+                del self._clients[key]
+        if keys:
+            client.close()
+
+    def close_all(self):
+        """Close all the pooled SSH clients."""
+        with self._lock:
+            clients = [client for client, last_used, users
+                       in self._clients.values()]
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+
+_CONNECTION_POOL = _SSHClientPool()
+
+
 def _get_boot_device_map(virt_type):
     if virt_type in ('virsh', 'vmware'):
         return _BOOT_DEVICES_MAP
@@ -345,6 +473,8 @@ def _ssh_execute(ssh_obj, cmd_to_exec):
     except Exception as e:
         LOG.error(_LE("Cannot execute SSH cmd %(cmd)s. Reason: %(err)s."),
                   {'cmd': cmd_to_exec, 'err': e})
+        # The connection may be broken, do not reuse it
+        _CONNECTION_POOL.discard(ssh_obj)
         raise exception.SSHCommandFailed(cmd=cmd_to_exec)
 
     return output_list
@@ -423,11 +553,76 @@ def _parse_driver_info(node):
     return res
 
 
-def _get_power_status(ssh_obj, driver_info):
+def _list_vms(ssh_obj, driver_info, cmd_to_exec):
+    """Runs a command listing VMs, caching its output for the host.
+
+    The output is cached for CONF.ssh.vm_list_cache_ttl seconds and shared
+    by all the nodes hosted on the same host.
+
+    :param ssh_obj: paramiko.SSHClient, an active ssh connection.
+    :param driver_info: information for accessing the node.
+    :param cmd_to_exec: the command listing the VMs.
+    :returns: list of the lines of output of the command.
+    :raises: SSHCommandFailed on an error from ssh.
+
+    """
+    key = (driver_info['host'], driver_info['port'],
+           driver_info['username'], cmd_to_exec)
+    ttl = CONF.ssh.vm_list_cache_ttl
+    cached = _VM_LISTS.get(key)
+    if cached is not None:
+        if time.time() < cached[1] + ttl:
+            return cached[0]
+        _VM_LISTS.pop(key, None)
+
+    run_at = time.time()
+    lines = _ssh_execute(ssh_obj, cmd_to_exec)
+    if ttl > 0:
+        _VM_LISTS[key] = (lines, run_at)
+    return lines
+
+
+def _invalidate_vm_lists(driver_info):
+    """Drops the cached VM listings of the host of a node.
+
+    :param driver_info: information for accessing the node.
+
+    """
+    host = (driver_info['host'], driver_info['port'],
+            driver_info['username'])
+    for key in list(_VM_LISTS):
+        if key[:3] == host:
+            _VM_LISTS.pop(key, None)
+
+
+def _get_running_vms(ssh_obj, driver_info, node_name=None):
+    """Returns the list of VMs running on the host.
+
+    :param ssh_obj: paramiko.SSHClient, an active ssh connection.
+    :param driver_info: information for accessing the node.
+    :param node_name: the name the host uses for the node. Some virt
+        CLIs only list the given node, it is not used by the others.
+    :returns: list of the lines of output of the list_running command.
+    :raises: SSHCommandFailed on an error from ssh.
+
+    The listing is cached for the host, see _list_vms.
+    """
+    # Get a list of vms running on the host. If the command supports
+    # it, explicitly specify the desired node."
+    cmd_to_exec = "%s %s" % (driver_info['cmd_set']['base_cmd'],
+                             driver_info['cmd_set']['list_running'])
+    if node_name is not None:
+        cmd_to_exec = cmd_to_exec.replace('{_NodeName_}', node_name)
+    return _list_vms(ssh_obj, driver_info, cmd_to_exec)
+
+
+def _get_power_status(ssh_obj, driver_info, running_list=None):
     """Returns a node's current power state.
 
     :param ssh_obj: paramiko.SSHClient, an active ssh connection.
     :param driver_info: information for accessing the node.
+    :param running_list: the output of the list_running command, if it
+        was already run for all the VMs of the host.
     :returns: one of ironic.common.states POWER_OFF, POWER_ON.
     :raises: NodeNotFound if could not find a VM corresponding to any
         of the provided MACs.
@@ -435,12 +630,8 @@ def _get_power_status(ssh_obj, driver_info):
     """
     power_state = None
     node_name = _get_hosts_name_for_node(ssh_obj, driver_info)
-    # Get a list of vms running on the host. If the command supports
-    # it, explicitly specify the desired node."
-    cmd_to_exec = "%s %s" % (driver_info['cmd_set']['base_cmd'],
-                             driver_info['cmd_set']['list_running'])
-    cmd_to_exec = cmd_to_exec.replace('{_NodeName_}', node_name)
-    running_list = _ssh_execute(ssh_obj, cmd_to_exec)
+    if running_list is None:
+        running_list = _get_running_vms(ssh_obj, driver_info, node_name)
 
     # Command should return a list of running vms. If the current node is
     # not listed then we can assume it is not powered on.
@@ -460,14 +651,62 @@ def _get_power_status(ssh_obj, driver_info):
     return power_state
 
 
+def _get_host_power_states(ssh_obj, host_nodes, power_states):
+    """Get the power states of several nodes hosted on the same host.
+
+    Unless the virt CLI needs the node name to list the running VMs, the
+    nodes share one listing of the running VMs.
+
+    :param ssh_obj: paramiko.SSHClient, an active ssh connection.
+    :param host_nodes: a list of the driver information of the nodes.
+    :param power_states: a dictionary in which each node's UUID is mapped
+        to either its power state or the exception raised when getting it.
+    """
+    running_list = None
+    per_node_listing = ('{_NodeName_}' in
+                        host_nodes[0]['cmd_set']['list_running'])
+    for driver_info in host_nodes:
+        try:
+            if running_list is None and not per_node_listing:
+                running_list = _get_running_vms(ssh_obj, driver_info)
+            power_states[driver_info['uuid']] = _get_power_status(
+                ssh_obj, driver_info, running_list=running_list)
+        except Exception as e:
+            power_states[driver_info['uuid']] = e
+
+
+@contextlib.contextmanager
+def _connect(driver_info):
+    """Yields an SSH client, from the connection pool if it is enabled.
+
+    A pooled client is given back to the pool when the context exits.
+
+    :param driver_info: information for accessing the node.
+    :returns: a context manager yielding paramiko.SSHClient, an active ssh
+        connection.
+    :raises: SSHConnectFailed if ssh failed to connect.
+
+    """
+    if not CONF.ssh.use_connection_pool:
+        yield utils.ssh_connect(driver_info)
+        return
+
+    ssh_obj = _CONNECTION_POOL.get(driver_info)
+    try:
+        yield ssh_obj
+    finally:
+        _CONNECTION_POOL.release(driver_info, ssh_obj)
+
+
 def _get_connection(node):
     """Returns an SSH client connected to a node.
 
     :param node: the Node.
-    :returns: paramiko.SSHClient, an active ssh connection.
+    :returns: a context manager yielding paramiko.SSHClient, an active ssh
+        connection.
 
     """
-    return utils.ssh_connect(_parse_driver_info(node))
+    return _connect(_parse_driver_info(node))
 
 
 def _get_hosts_name_for_node(ssh_obj, driver_info):
@@ -479,7 +718,16 @@ def _get_hosts_name_for_node(ssh_obj, driver_info):
     :raises: NodeNotFound if could not find a VM corresponding to any of
         the provided MACs
 
+    The name is cached for CONF.ssh.vm_name_cache_ttl seconds.
     """
+    key = (driver_info['uuid'], driver_info['host'], driver_info['port'],
+           tuple(sorted(driver_info['macs'])))
+    # NOTE: the entry is popped and re-added to keep the cache in LRU order.
+    cached = _VM_NAMES.pop(key, None)
+    if cached is not None:
+        if time.time() < cached[1] + CONF.ssh.vm_name_cache_ttl:
+            _VM_NAMES[key] = cached
+            return cached[0]
 
     @retrying.retry(
         retry_on_result=lambda v: v is None,
@@ -490,7 +738,7 @@ def _get_hosts_name_for_node(ssh_obj, driver_info):
         matched_name = None
         cmd_to_exec = "%s %s" % (driver_info['cmd_set']['base_cmd'],
                                  driver_info['cmd_set']['list_all'])
-        full_node_list = _ssh_execute(ssh_obj, cmd_to_exec)
+        full_node_list = _list_vms(ssh_obj, driver_info, cmd_to_exec)
         LOG.debug("Retrieved Node List: %s", repr(full_node_list))
         # for each node check Mac Addresses
         for node in full_node_list:
@@ -517,16 +765,26 @@ def _get_hosts_name_for_node(ssh_obj, driver_info):
             if matched_name:
                 break
 
+        if matched_name is None:
+            # NOTE: the VM may have been created since the host's VMs
+            # were listed, list them again on the next attempt.
+            _invalidate_vm_lists(driver_info)
         return matched_name
 
     try:
-        return _with_retries()
+        name = _with_retries()
     except retrying.RetryError:
         raise exception.NodeNotFound(
             _("SSH driver was not able to find a VM with any of the "
               "specified MACs: %(macs)s for node %(node)s.") %
             {'macs': driver_info['macs'], 'node': driver_info['uuid']})
 
+    if CONF.ssh.vm_name_cache_ttl > 0:
+        _VM_NAMES[key] = (name, time.time())
+        while len(_VM_NAMES) > _VM_NAMES_MAX:
+            _VM_NAMES.popitem(last=False)
+    return name
+
 
 def _power_on(ssh_obj, driver_info):
     """Power ON this node.
@@ -546,6 +804,7 @@ def _power_on(ssh_obj, driver_info):
     cmd_to_power_on = cmd_to_power_on.replace('{_NodeName_}', node_name)
 
     _ssh_execute(ssh_obj, cmd_to_power_on)
+    _invalidate_vm_lists(driver_info)
 
     current_pstate = _get_power_status(ssh_obj, driver_info)
     if current_pstate == states.POWER_ON:
@@ -572,6 +831,7 @@ def _power_off(ssh_obj, driver_info):
     cmd_to_power_off = cmd_to_power_off.replace('{_NodeName_}', node_name)
 
     _ssh_execute(ssh_obj, cmd_to_power_off)
+    _invalidate_vm_lists(driver_info)
 
     current_pstate = _get_power_status(ssh_obj, driver_info)
     if current_pstate == states.POWER_OFF:
@@ -590,6 +850,8 @@ class SSHPower(base.PowerInterface):
     NOTE: This driver does not currently support multi-node operations.
     """
 
+    supports_bulk_power_states = True
+
     def get_properties(self):
         return COMMON_PROPERTIES
 
@@ -610,7 +872,8 @@ class SSHPower(base.PowerInterface):
                 _("Node %s does not have any port associated with it."
                   ) % task.node.uuid)
         try:
-            _get_connection(task.node)
+            with _get_connection(task.node):
+                pass
         except exception.SSHConnectFailed as e:
             raise exception.InvalidParameterValue(_("SSH connection cannot"
                                                     " be established: %s") % e)
@@ -632,8 +895,44 @@ class SSHPower(base.PowerInterface):
         """
         driver_info = _parse_driver_info(task.node)
         driver_info['macs'] = driver_utils.get_node_mac_addresses(task)
-        ssh_obj = _get_connection(task.node)
-        return _get_power_status(ssh_obj, driver_info)
+        with _get_connection(task.node) as ssh_obj:
+            return _get_power_status(ssh_obj, driver_info)
+
+    def get_power_states_bulk(self, tasks):
+        """Get the current power states of several nodes.
+
+        Nodes hosted on the same host share one SSH connection. Unless the
+        virt CLI needs the node name to list the running VMs, they also
+        share one listing of the running VMs, which is cached for
+        CONF.ssh.vm_list_cache_ttl seconds.
+
+        :param tasks: a list of TaskManager instances containing the nodes
+                      to act on.
+        :returns: a dictionary mapping node UUIDs to either a power state,
+                  one of :class:`ironic.common.states`, or the exception
+                  raised when getting it.
+        """
+        power_states = {}
+        hosts = collections.OrderedDict()
+        for task in tasks:
+            try:
+                driver_info = _parse_driver_info(task.node)
+                driver_info['macs'] = driver_utils.get_node_mac_addresses(
+                    task)
+            except Exception as e:
+                power_states[task.node.uuid] = e
+                continue
+            key = tuple(driver_info.get(k) for k in _CONNECTION_KEYS)
+            hosts.setdefault(key, []).append(driver_info)
+
+        for host_nodes in hosts.values():
+            try:
+                with _connect(host_nodes[0]) as ssh_obj:
+                    _get_host_power_states(ssh_obj, host_nodes, power_states)
+            except Exception as e:
+                for driver_info in host_nodes:
+                    power_states[driver_info['uuid']] = e
+        return power_states
 
     @task_manager.require_exclusive_lock
     def set_power_state(self, task, pstate):
@@ -655,16 +954,18 @@ class SSHPower(base.PowerInterface):
         """
         driver_info = _parse_driver_info(task.node)
         driver_info['macs'] = driver_utils.get_node_mac_addresses(task)
-        ssh_obj = _get_connection(task.node)
-
-        if pstate == states.POWER_ON:
-            state = _power_on(ssh_obj, driver_info)
-        elif pstate == states.POWER_OFF:
-            state = _power_off(ssh_obj, driver_info)
-        else:
-            raise exception.InvalidParameterValue(
-                _("set_power_state called with invalid power state %s."
-                  ) % pstate)
+        with _get_connection(task.node) as ssh_obj:
+            # NOTE: act on the current power state, not on a cached one.
+            _invalidate_vm_lists(driver_info)
+
+            if pstate == states.POWER_ON:
+                state = _power_on(ssh_obj, driver_info)
+            elif pstate == states.POWER_OFF:
+                state = _power_off(ssh_obj, driver_info)
+            else:
+                raise exception.InvalidParameterValue(
+                    _("set_power_state called with invalid power state %s."
+                      ) % pstate)
 
         if state != pstate:
             raise exception.PowerStateFailure(pstate=pstate)
@@ -687,10 +988,11 @@ class SSHPower(base.PowerInterface):
         """
         driver_info = _parse_driver_info(task.node)
         driver_info['macs'] = driver_utils.get_node_mac_addresses(task)
-        ssh_obj = _get_connection(task.node)
+        with _get_connection(task.node) as ssh_obj:
+            _invalidate_vm_lists(driver_info)
 
-        # _power_on will turn the power off if it's already on.
-        state = _power_on(ssh_obj, driver_info)
+            # _power_on will turn the power off if it's already on.
+            state = _power_on(ssh_obj, driver_info)
 
         if state != states.POWER_ON:
             raise exception.PowerStateFailure(pstate=states.POWER_ON)
@@ -753,31 +1055,31 @@ class SSHManagement(base.ManagementInterface):
             raise exception.InvalidParameterValue(_(
                 "Invalid boot device %s specified.") % device)
         driver_info['macs'] = driver_utils.get_node_mac_addresses(task)
-        ssh_obj = _get_connection(node)
-
-        node_name = _get_hosts_name_for_node(ssh_obj, driver_info)
-        virt_type = driver_info['virt_type']
-        use_headless = driver_info['use_headless']
-
-        if virt_type == 'vbox':
-            if use_headless:
-                current_pstate = _get_power_status(ssh_obj, driver_info)
-                if current_pstate == states.POWER_ON:
-                    LOG.debug("Forcing VBox VM %s to power off "
-                              "in order to set the boot device.",
-                              node_name)
-                    _power_off(ssh_obj, driver_info)
-
-        boot_device_map = _get_boot_device_map(driver_info['virt_type'])
-        try:
-            _set_boot_device(ssh_obj, driver_info, boot_device_map[device])
-        except NotImplementedError:
-            with excutils.save_and_reraise_exception():
-                LOG.error(_LE("Failed to set boot device for node %(node)s, "
-                              "virt_type %(vtype)s does not support this "
-                              "operation"),
-                          {'node': node.uuid,
-                           'vtype': driver_info['virt_type']})
+        with _get_connection(node) as ssh_obj:
+            node_name = _get_hosts_name_for_node(ssh_obj, driver_info)
+            virt_type = driver_info['virt_type']
+            use_headless = driver_info['use_headless']
+
+            if virt_type == 'vbox':
+                if use_headless:
+                    current_pstate = _get_power_status(ssh_obj, driver_info)
+                    if current_pstate == states.POWER_ON:
+                        LOG.debug("Forcing VBox VM %s to power off "
+                                  "in order to set the boot device.",
+                                  node_name)
+                        _power_off(ssh_obj, driver_info)
+
+            boot_device_map = _get_boot_device_map(driver_info['virt_type'])
+            try:
+                _set_boot_device(ssh_obj, driver_info,
+                                 boot_device_map[device])
+            except NotImplementedError:
+                with excutils.save_and_reraise_exception():
+                    LOG.error(_LE("Failed to set boot device for node "
+                                  "%(node)s, virt_type %(vtype)s does not "
+                                  "support this operation"),
+                              {'node': node.uuid,
+                               'vtype': driver_info['virt_type']})
 
     def get_boot_device(self, task):
         """Get the current boot device for the task's node.
@@ -804,10 +1106,11 @@ class SSHManagement(base.ManagementInterface):
         node = task.node
         driver_info = _parse_driver_info(node)
         driver_info['macs'] = driver_utils.get_node_mac_addresses(task)
-        ssh_obj = _get_connection(node)
         response = {'boot_device': None, 'persistent': None}
         try:
-            response['boot_device'] = _get_boot_device(ssh_obj, driver_info)
+            with _get_connection(node) as ssh_obj:
+                response['boot_device'] = _get_boot_device(ssh_obj,
+                                                           driver_info)
         except NotImplementedError:
             LOG.warning(_LW("Failed to get boot device for node %(node)s, "
                             "virt_type %(vtype)s does not support this "
@@ -867,8 +1170,8 @@ class ShellinaboxConsole(base.ConsoleInterface):
 
         driver_info = _parse_driver_info(task.node)
         driver_info['macs'] = driver_utils.get_node_mac_addresses(task)
-        ssh_obj = _get_connection(task.node)
-        node_name = _get_hosts_name_for_node(ssh_obj, driver_info)
+        with _get_connection(task.node) as ssh_obj:
+            node_name = _get_hosts_name_for_node(ssh_obj, driver_info)
 
         ssh_cmd = ("/:%(uid)s:%(gid)s:HOME:virsh console %(node)s"
                    % {'uid': os.getuid(),
@@ -14,6 +14,9 @@
 VirtualBox Driver Modules
 """
 
+import collections
+import time
+
 from oslo_log import log as logging
 from oslo_utils import importutils
 
@@ -47,6 +50,13 @@ VIRTUALBOX_TO_IRONIC_POWER_MAPPING = {
 
 LOG = logging.getLogger(__name__)
 
+# NOTE: power statuses of the VMs, as (status, time read) tuples keyed by
+# host, port, user name and VM name. See _get_power_status.
+_POWER_STATUSES = {}
+
+# driver_info keys identifying a VirtualBox web service session
+_HOST_KEYS = ('host', 'port', 'username', 'password')
+
 REQUIRED_PROPERTIES = {
     'virtualbox_vmname': _("Name of the VM in VirtualBox. Required."),
     'virtualbox_host': _("IP address or hostname of the VirtualBox host. "
@@ -140,9 +150,32 @@ def _run_virtualbox_method(node, ironic_method, vm_object_method,
     :raises: pyremotevbox.exception.VmInWrongPowerState, if operation cannot
         be performed when vm is in the current power state.
     """
+    return _run_vm_method(node, None, ironic_method, vm_object_method,
+                          *call_args, **call_kwargs)
+
+
+def _run_vm_method(node, host, ironic_method, vm_object_method,
+                   *call_args, **call_kwargs):
+    """Runs a method of pyremotevbox.vbox.VirtualMachine on a given host.
+
+    Same as _run_virtualbox_method, using an existing VirtualBoxHost
+    object instead of opening a new session to the web service.
+
+    :param node: an Ironic Node object.
+    :param host: a pyremotevbox.vbox.VirtualBoxHost object for the node's
+        host, or None to create one.
+    :param ironic_method: the Ironic method which called it, for logging.
+    :param vm_object_method: The method on the VirtualMachine object
+        to be called.
+    :param call_args: The args to be passed to 'vm_object_method'.
+    :param call_kwargs: The kwargs to be passed to the 'vm_object_method'.
+    :returns: The value returned by 'vm_object_method'
+    :raises: see _run_virtualbox_method.
+    """
     driver_info = _parse_driver_info(node)
     try:
-        host = virtualbox.VirtualBoxHost(**driver_info)
+        if host is None:
+            host = virtualbox.VirtualBoxHost(**driver_info)
         vm_object = host.find_vm(driver_info['vmname'])
     except virtualbox_exc.PyRemoteVBoxException as exc:
         LOG.error(_LE("Failed while creating a VirtualMachine object for "
@@ -170,7 +203,74 @@ def _run_virtualbox_method(node, ironic_method, vm_object_method,
                                                   error=exc)
 
 
+def _get_power_status(node, host=None):
+    """Returns the VirtualBox power status of a node's VM.
+
+    The status is cached for CONF.virtualbox.power_state_cache_ttl seconds,
+    if it is not 0.
+
+    :param node: an Ironic Node object.
+    :param host: a pyremotevbox.vbox.VirtualBoxHost object for the node's
+        host, or None to create one if needed.
+    :returns: the power status reported by VirtualBox, e.g. 'Running'.
+    :raises: see _run_virtualbox_method.
+    """
+    key = _power_status_key(node)
+    ttl = CONF.virtualbox.power_state_cache_ttl
+    cached = _POWER_STATUSES.get(key)
+    if cached is not None:
+        if time.time() < cached[1] + ttl:
+            return cached[0]
+        _POWER_STATUSES.pop(key, None)
+
+    read_at = time.time()
+    if host is None:
+        power_status = _run_virtualbox_method(node, 'get_power_state',
+                                              'get_power_status')
+    else:
+        power_status = _run_vm_method(node, host, 'get_power_state',
+                                      'get_power_status')
+    if ttl > 0:
+        _POWER_STATUSES[key] = (power_status, read_at)
+    return power_status
+
+
+def _power_status_key(node):
+    """Returns the key of a node's VM in the power status cache.
+
+    VMs with the same name on the same host are only the same VM for the
+    same VirtualBox user, so the user name is part of the key.
+
+    :param node: an Ironic Node object.
+    """
+    driver_info = _parse_driver_info(node)
+    return (driver_info['host'], driver_info['port'],
+            driver_info.get('username'), driver_info['vmname'])
+
+
+def _invalidate_power_status(node):
+    """Drops the cached power status of a node's VM.
+
+    :param node: an Ironic Node object.
+    """
+    _POWER_STATUSES.pop(_power_status_key(node), None)
+
+
+def _to_ironic_power_state(node, power_status):
+    """Maps a VirtualBox power status to an Ironic power state."""
+    try:
+        return VIRTUALBOX_TO_IRONIC_POWER_MAPPING[power_status]
+    except KeyError:
+        msg = _LE("VirtualBox returned unknown state '%(state)s' for "
+                  "node %(node)s")
+        LOG.error(msg, {'state': power_status, 'node': node.uuid})
+        return states.ERROR
+
+
 class VirtualBoxPower(base.PowerInterface):
+
+    supports_bulk_power_states = True
+
     def get_properties(self):
         return COMMON_PROPERTIES
 
@@ -209,15 +309,49 @@ class VirtualBoxPower(base.PowerInterface):
         :raises: VirtualBoxOperationFailed, if error encountered from
             VirtualBox operation.
         """
-        power_status = _run_virtualbox_method(task.node, 'get_power_state',
-                                              'get_power_status')
-        try:
-            return VIRTUALBOX_TO_IRONIC_POWER_MAPPING[power_status]
-        except KeyError:
-            msg = _LE("VirtualBox returned unknown state '%(state)s' for "
-                      "node %(node)s")
-            LOG.error(msg, {'state': power_status, 'node': task.node.uuid})
-            return states.ERROR
+        power_status = _get_power_status(task.node)
+        return _to_ironic_power_state(task.node, power_status)
+
+    def get_power_states_bulk(self, tasks):
+        """Get the current power states of several nodes.
+
+        Nodes hosted on the same host share one session to its VirtualBox
+        web service, opened only if some of their power states are not
+        cached.
+
+        :param tasks: a list of TaskManager instances containing the nodes
+                      to act on.
+        :returns: a dictionary mapping node UUIDs to either a power state,
+                  one of :mod:`ironic.common.states`, or the exception
+                  raised when getting it.
+        """
+        power_states = {}
+        hosts = collections.OrderedDict()
+        for task in tasks:
+            try:
+                driver_info = _parse_driver_info(task.node)
+            except Exception as e:
+                power_states[task.node.uuid] = e
+                continue
+            key = tuple(driver_info.get(k) for k in _HOST_KEYS)
+            hosts.setdefault(key, []).append((task.node, driver_info))
+
+        for host_nodes in hosts.values():
+            host = None
+            for node, driver_info in host_nodes:
+                try:
+                    if host is None:
+                        try:
+                            host = virtualbox.VirtualBoxHost(**driver_info)
+                        except virtualbox_exc.PyRemoteVBoxException as exc:
+                            raise exception.VirtualBoxOperationFailed(
+                                operation='get_power_status', error=exc)
+                    power_status = _get_power_status(node, host=host)
+                    power_states[node.uuid] = _to_ironic_power_state(
+                        node, power_status)
+                except Exception as e:
+                    power_states[node.uuid] = e
+        return power_states
 
     @task_manager.require_exclusive_lock
     def set_power_state(self, task, target_state):
@@ -239,11 +373,17 @@ class VirtualBoxPower(base.PowerInterface):
         # shuts down the machine without calling power off method here. For
         # instance, soft power off the machine from OS.
         if target_state == states.POWER_OFF:
-            _run_virtualbox_method(task.node, 'set_power_state', 'stop')
+            try:
+                _run_virtualbox_method(task.node, 'set_power_state', 'stop')
+            finally:
+                _invalidate_power_status(task.node)
             self._apply_boot_device(task)
         elif target_state == states.POWER_ON:
             self._apply_boot_device(task)
-            _run_virtualbox_method(task.node, 'set_power_state', 'start')
+            try:
+                _run_virtualbox_method(task.node, 'set_power_state', 'start')
+            finally:
+                _invalidate_power_status(task.node)
         elif target_state == states.REBOOT:
             self.reboot(task)
         else:
@@ -263,9 +403,12 @@ class VirtualBoxPower(base.PowerInterface):
         :raises: VirtualBoxOperationFailed, if error encountered from
             VirtualBox operation.
         """
-        _run_virtualbox_method(task.node, 'reboot', 'stop')
-        self._apply_boot_device(task)
-        _run_virtualbox_method(task.node, 'reboot', 'start')
+        try:
+            _run_virtualbox_method(task.node, 'reboot', 'stop')
+            self._apply_boot_device(task)
+            _run_virtualbox_method(task.node, 'reboot', 'start')
+        finally:
+            _invalidate_power_status(task.node)
 
 
 class VirtualBoxManagement(base.ManagementInterface):
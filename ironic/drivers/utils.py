@@ -13,16 +13,22 @@
 # under the License.
 
 import base64
+import collections
 import os
 import tempfile
+import time
 
+import eventlet
+from ironic_lib import metrics_utils
 from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_service import loopingcall
 from oslo_utils import timeutils
 import six
 
 from ironic.common import exception
 from ironic.common.i18n import _, _LE, _LW
+from ironic.common import states
 from ironic.common import swift
 from ironic.conductor import utils
 from ironic.drivers import base
@@ -33,6 +39,16 @@ LOG = logging.getLogger(__name__)
 
 CONF = cfg.CONF
 
+METRICS = metrics_utils.get_metrics_logger(__name__)
+
+# NOTE: moving average of the observed power transition latencies, in
+# seconds, keyed by (hardware model, target power state). Kept in LRU order
+# and bounded, since the models are free-form strings set by operators.
+_POWER_TRANSITION_TIMES = collections.OrderedDict()
+_POWER_TRANSITION_TIMES_MAX = 256
+# Weight of the latest observation in the moving average
+_POWER_TRANSITION_WEIGHT = 0.3
+
 
 class MixinVendorInterface(base.VendorInterface):
     """Wrapper around multiple VendorInterfaces."""
@@ -132,6 +148,143 @@ def get_node_mac_addresses(task):
     return [p.address for p in task.ports]
 
 
+def get_power_states_concurrently(power, tasks):
+    """Get the power states of several nodes in parallel.
+
+    Helper for implementing PowerInterface.get_power_states_bulk in drivers
+    which talk to each node separately. get_power_state is called for every
+    node in its own green thread, running at most
+    CONF.conductor.sync_power_state_bulk_concurrency of them at a time.
+
+    :param power: the PowerInterface instance used by the nodes.
+    :param tasks: a list of TaskManager instances containing the nodes to
+                  act on.
+    :returns: a dictionary mapping node UUIDs to either a power state or the
+              exception raised when getting it.
+    """
+    def _get_power_state(task):
+        try:
+            return task.node.uuid, power.get_power_state(task)
+        except Exception as e:
+            return task.node.uuid, e
+
+    if not tasks:
+        return {}
+    pool = eventlet.GreenPool(
+        min(len(tasks), CONF.conductor.sync_power_state_bulk_concurrency))
+    return dict(pool.imap(_get_power_state, tasks))
+
+
+def get_hardware_model(node):
+    """Return the hardware model of a node, for learning its behaviour.
+
+    The model is taken from the 'hardware_model' capability in the node's
+    properties, falling back to the node's driver.
+
+    :param node: Node object.
+    :returns: a string identifying the kind of hardware the node is.
+    """
+    return get_node_capability(node, 'hardware_model') or node.driver
+
+
+def _record_power_transition(key, latency):
+    """Fold an observed power transition latency into the moving average."""
+    previous = _POWER_TRANSITION_TIMES.pop(key, None)
+    if previous is not None:
+        latency = previous + _POWER_TRANSITION_WEIGHT * (latency - previous)
+    _POWER_TRANSITION_TIMES[key] = latency
+    while len(_POWER_TRANSITION_TIMES) > _POWER_TRANSITION_TIMES_MAX:
+        _POWER_TRANSITION_TIMES.popitem(last=False)
+
+
+def _power_poll_intervals(expected, min_interval, max_interval=None):
+    """Generate the delays between power state polls.
+
+    The first poll happens shortly before the transition is expected to
+    complete, followed by polls every min_interval seconds until well past
+    the expected time. After that the delay doubles with every poll, up to
+    max_interval seconds.
+
+    :param expected: expected transition time in seconds, 0 if unknown.
+    :param min_interval: shortest delay between polls, in seconds.
+    :param max_interval: longest delay between polls, in seconds. Not
+                         limited if None.
+    """
+    elapsed = max(min_interval, 0.8 * expected)
+    yield elapsed
+    while elapsed < 1.5 * expected:
+        elapsed += min_interval
+        yield min_interval
+    delay = min_interval
+    while True:
+        yield delay
+        delay *= 2
+        if max_interval is not None:
+            delay = min(delay, max_interval)
+
+
+def wait_for_power_state(get_power_state, target_state, timeout, model=None,
+                         min_interval=1, max_interval=None):
+    """Wait for a node to reach a power state.
+
+    Intended to be called right after a power state change was requested.
+    How long the same transition took on the same hardware model before is
+    used to poll densely around the time it is expected to complete and
+    sparsely otherwise. The observed transition times are reported as
+    metrics.
+
+    :param get_power_state: a callable returning the current power state of
+                            the node. Exceptions it raises are propagated.
+    :param target_state: the power state to wait for, one of
+                         :class:`ironic.common.states`.
+    :param timeout: maximum time to wait, in seconds.
+    :param model: a hashable identifying the hardware model of the node.
+    :param min_interval: shortest delay between polls, in seconds.
+    :param max_interval: longest delay between polls, in seconds. Not
+                         limited if None.
+    :returns: target_state, or states.ERROR if it was not reached in time.
+    """
+    key = (model, target_state)
+    intervals = _power_poll_intervals(_POWER_TRANSITION_TIMES.get(key, 0),
+                                      min_interval, max_interval)
+
+    def _poll(mutable):
+        # NOTE: nothing to poll when called the first time, the transition
+        # has only just been requested.
+        if mutable['elapsed']:
+            mutable['polls'] += 1
+            if get_power_state() == target_state:
+                raise loopingcall.LoopingCallDone()
+
+        remaining = timeout - mutable['elapsed']
+        if remaining <= 0:
+            raise loopingcall.LoopingCallDone(states.ERROR)
+        delay = min(next(intervals), remaining)
+        mutable['elapsed'] += delay
+        return delay
+
+    # Use a mutable object so the looped method can change it.
+    status = {'elapsed': 0, 'polls': 0}
+    started = time.time()
+    timer = loopingcall.DynamicLoopingCall(_poll, status)
+    if timer.start().wait() == states.ERROR:
+        LOG.debug('Power state %(state)s not reached in %(timeout)s seconds '
+                  'after %(polls)s polls.',
+                  {'state': target_state, 'timeout': timeout,
+                   'polls': status['polls']})
+        return states.ERROR
+
+    latency = time.time() - started
+    _record_power_transition(key, latency)
+    METRICS.send_timer('wait_for_power_state.%s' %
+                       target_state.replace(' ', '_'), latency * 1000)
+    LOG.debug('Power state %(state)s reached after %(latency).1f seconds and '
+              '%(polls)s polls, hardware model %(model)s.',
+              {'state': target_state, 'latency': latency,
+               'polls': status['polls'], 'model': model})
+    return target_state
+
+
 def get_node_capability(node, capability):
     """Returns 'capability' value from node's 'capabilities' property.
 
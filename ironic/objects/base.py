@@ -57,10 +57,61 @@ class IronicObject(object_base.VersionedObject):
         'updated_at': object_fields.DateTimeField(nullable=True),
     }
 
+    def __init__(self, context=None, **kwargs):
+        # NOTE: DB entities holding the JSON fields which were not decoded
+        # yet, by field name. They are decoded by obj_load_attr().
+        self._lazy_fields = {}
+        super(IronicObject, self).__init__(context, **kwargs)
+
     def as_dict(self):
         return dict((k, getattr(self, k))
                     for k in self.fields
-                    if hasattr(self, k))
+                    if self.obj_attr_is_set(k))
+
+    def obj_attr_is_set(self, attrname):
+        return (attrname in self._lazy_fields or
+                super(IronicObject, self).obj_attr_is_set(attrname))
+
+    def obj_load_attr(self, attrname):
+        db_object = self._lazy_fields.pop(attrname, None)
+        if db_object is None:
+            return super(IronicObject, self).obj_load_attr(attrname)
+        setattr(self, attrname, db_object[attrname])
+        self.obj_reset_changes([attrname])
+
+    def obj_what_changed(self):
+        """Returns a set of fields that have been modified.
+
+        Unlike the parent implementation, fields which were not decoded yet
+        are skipped when looking for modified nested objects: they did not
+        change, and reading them would decode them.
+        """
+        changes = set(field for field in self._changed_fields
+                      if field in self.fields)
+        for field in self.fields:
+            if field in changes or self._is_lazy_field(field):
+                continue
+            if (self.obj_attr_is_set(field) and
+                    isinstance(getattr(self, field),
+                               object_base.VersionedObject) and
+                    getattr(self, field).obj_what_changed()):
+                changes.add(field)
+        return changes
+
+    def _set_lazy_field(self, field, db_object):
+        """Set a field to be decoded from a DB entity on first access."""
+        # NOTE: oslo.versionedobjects stores the value of a field in the
+        # "_obj_<field>" attribute, and calls obj_load_attr() when the
+        # attribute is missing.
+        attrname = '_obj_%s' % field
+        if hasattr(self, attrname):
+            delattr(self, attrname)
+        self._lazy_fields[field] = db_object
+
+    def _is_lazy_field(self, field):
+        """Return whether a field was not decoded yet."""
+        return (field in self._lazy_fields and
+                not hasattr(self, '_obj_%s' % field))
 
     def obj_refresh(self, loaded_object):
         """Applies updates for objects that inherit from base.IronicObject.
@@ -70,21 +121,31 @@ class IronicObject(object_base.VersionedObject):
         object.
         """
         for field in self.fields:
-            if (self.obj_attr_is_set(field) and
+            if (self._is_lazy_field(field) and
+                    loaded_object._is_lazy_field(field)):
+                # NOTE: neither value was read, keep the field lazy.
+                self._set_lazy_field(field,
+                                     loaded_object._lazy_fields[field])
+            elif (self.obj_attr_is_set(field) and
                     self[field] != loaded_object[field]):
                 self[field] = loaded_object[field]
 
     @staticmethod
-    def _from_db_object(obj, db_object):
+    def _from_db_object(obj, db_object, fields=None):
         """Converts a database entity to a formal object.
 
         :param obj: An object of the class.
         :param db_object: A DB model of the object
+        :param fields: The fields to set on the object, defaults to all of
+                       them. The other fields are left unset.
         :return: The object of the class with the database entity added
         """
-
-        for field in obj.fields:
-            obj[field] = db_object[field]
+        is_json_decoded = getattr(db_object, 'is_json_decoded', None)
+        for field in obj.fields if fields is None else fields:
+            if is_json_decoded is not None and not is_json_decoded(field):
+                obj._set_lazy_field(field, db_object)
+            else:
+                obj[field] = db_object[field]
 
         obj.obj_reset_changes()
         return obj
@@ -154,16 +154,20 @@ class Node(base.IronicObject, object_base.VersionedObjectDictCompat):
     # Implications of calling new remote procedures should be thought through.
     # @object_base.remotable_classmethod
     @classmethod
-    def get(cls, context, node_id):
+    def get(cls, context, node_id, filters=None):
         """Find a node based on its id or uuid and return a Node object.
 
         :param node_id: the id *or* uuid of a node.
+        :param filters: filters the node must match, in the format accepted
+                        by :meth:`list`.
+        :raises: NodeNotFound if the node is not found or does not match
+                 the filters.
         :returns: a :class:`Node` object.
         """
         if strutils.is_int_like(node_id):
-            return cls.get_by_id(context, node_id)
+            return cls.get_by_id(context, node_id, filters=filters)
         elif uuidutils.is_uuid_like(node_id):
-            return cls.get_by_uuid(context, node_id)
+            return cls.get_by_uuid(context, node_id, filters=filters)
         else:
             raise exception.InvalidIdentity(identity=node_id)
 
@@ -172,13 +176,17 @@ class Node(base.IronicObject, object_base.VersionedObjectDictCompat):
     # Implications of calling new remote procedures should be thought through.
     # @object_base.remotable_classmethod
     @classmethod
-    def get_by_id(cls, context, node_id):
+    def get_by_id(cls, context, node_id, filters=None):
         """Find a node based on its integer id and return a Node object.
 
         :param node_id: the id of a node.
+        :param filters: filters the node must match, in the format accepted
+                        by :meth:`list`.
+        :raises: NodeNotFound if the node is not found or does not match
+                 the filters.
         :returns: a :class:`Node` object.
         """
-        db_node = cls.dbapi.get_node_by_id(node_id)
+        db_node = cls.dbapi.get_node_by_id(node_id, filters=filters)
         node = Node._from_db_object(cls(context), db_node)
         return node
 
@@ -187,13 +195,17 @@ class Node(base.IronicObject, object_base.VersionedObjectDictCompat):
     # Implications of calling new remote procedures should be thought through.
     # @object_base.remotable_classmethod
     @classmethod
-    def get_by_uuid(cls, context, uuid):
+    def get_by_uuid(cls, context, uuid, filters=None):
         """Find a node based on uuid and return a Node object.
 
         :param uuid: the uuid of a node.
+        :param filters: filters the node must match, in the format accepted
+                        by :meth:`list`.
+        :raises: NodeNotFound if the node is not found or does not match
+                 the filters.
         :returns: a :class:`Node` object.
         """
-        db_node = cls.dbapi.get_node_by_uuid(uuid)
+        db_node = cls.dbapi.get_node_by_uuid(uuid, filters=filters)
         node = Node._from_db_object(cls(context), db_node)
         return node
 
@@ -233,7 +245,7 @@ class Node(base.IronicObject, object_base.VersionedObjectDictCompat):
     # @object_base.remotable_classmethod
     @classmethod
     def list(cls, context, limit=None, marker=None, sort_key=None,
-             sort_dir=None, filters=None):
+             sort_dir=None, filters=None, fields=None):
         """Return a list of Node objects.
 
         :param context: Security context.
@@ -242,13 +254,17 @@ class Node(base.IronicObject, object_base.VersionedObjectDictCompat):
         :param sort_key: column to sort results by.
         :param sort_dir: direction to sort. "asc" or "desc".
         :param filters: Filters to apply.
+        :param fields: Node fields to load, defaults to all of them. The
+                       other fields are left unset, so the returned nodes
+                       must not be saved.
         :returns: a list of :class:`Node` object.
 
         """
         db_nodes = cls.dbapi.get_node_list(filters=filters, limit=limit,
                                            marker=marker, sort_key=sort_key,
-                                           sort_dir=sort_dir)
-        return [Node._from_db_object(cls(context), obj) for obj in db_nodes]
+                                           sort_dir=sort_dir, fields=fields)
+        return [Node._from_db_object(cls(context), obj, fields)
+                for obj in db_nodes]
 
     # NOTE(xek): We don't want to enable RPC on this call just yet. Remotable
     # methods can be used in the future to replace current explicit RPC calls.
@@ -288,6 +304,47 @@ class Node(base.IronicObject, object_base.VersionedObjectDictCompat):
         """
         cls.dbapi.release_node(tag, node_id)
 
+    # NOTE(xek): We don't want to enable RPC on this call just yet. Remotable
+    # methods can be used in the future to replace current explicit RPC calls.
+    # Implications of calling new remote procedures should be thought through.
+    # @object_base.remotable_classmethod
+    @classmethod
+    def reserve_many(cls, context, tag, node_ids):
+        """Get and reserve several nodes at once.
+
+        :param context: Security context.
+        :param tag: A string uniquely identifying the reservation holder.
+        :param node_ids: A list of node ids or uuids.
+        :returns: A tuple (reserved, failed). reserved is a dict mapping
+                  the id or uuid of each reserved node, as it was supplied,
+                  to a :class:`Node` object. failed is a dict mapping the id
+                  or uuid of each other node to a NodeNotFound or NodeLocked
+                  exception.
+
+        """
+        db_nodes, failed = cls.dbapi.reserve_nodes(tag, node_ids)
+        reserved = {node_id: Node._from_db_object(cls(context), db_node)
+                    for node_id, db_node in db_nodes.items()}
+        return reserved, failed
+
+    # NOTE(xek): We don't want to enable RPC on this call just yet. Remotable
+    # methods can be used in the future to replace current explicit RPC calls.
+    # Implications of calling new remote procedures should be thought through.
+    # @object_base.remotable_classmethod
+    @classmethod
+    def release_many(cls, context, tag, node_ids):
+        """Release the reservations on several nodes at once.
+
+        :param context: Security context.
+        :param tag: A string uniquely identifying the reservation holder.
+        :param node_ids: A list of node ids or uuids.
+        :returns: a dict mapping the id or uuid of each node which could not
+                  be released to a NodeNotFound, NodeLocked or NodeNotLocked
+                  exception.
+
+        """
+        return cls.dbapi.release_nodes(tag, node_ids)
+
     # NOTE(xek): We don't want to enable RPC on this call just yet. Remotable
     # methods can be used in the future to replace current explicit RPC calls.
     # Implications of calling new remote procedures should be thought through.
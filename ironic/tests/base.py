@@ -37,6 +37,7 @@ import testtools
 
 from ironic.common import config as ironic_config
 from ironic.common import context as ironic_context
+from ironic.common import driver_factory
 from ironic.common import hash_ring
 from ironic.conf import CONF
 from ironic.objects import base as objects_base
@@ -107,6 +108,10 @@ class TestCase(testtools.TestCase):
 
         self.addCleanup(self._clear_attrs)
         self.addCleanup(hash_ring.HashRingManager().reset)
+        # NOTE: composed drivers are shared by all tasks, do not let a test
+        # see the drivers built by, or modified in, a previous one.
+        driver_factory._composed_drivers.clear()
+        self.addCleanup(driver_factory._composed_drivers.clear)
         self.useFixture(fixtures.EnvironmentVariable('http_proxy'))
         self.policy = self.useFixture(policy_fixture.PolicyFixture())
 
@@ -0,0 +1,94 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark of the throughput of task_manager.acquire.
+
+Shared locks are taken on a node many times, with the shallow copies of the
+provisioning state machine that tasks use, and with deep copies like tasks
+used to make. Both throughputs are attached to the test results, they are
+not compared since wall-clock timings vary too much between test runs.
+"""
+
+import time
+
+import mock
+from testtools import content
+
+from ironic.common import driver_factory
+from ironic.common import states
+from ironic.conductor import task_manager
+from ironic.tests.unit.db import base as db_base
+from ironic.tests.unit.objects import utils as obj_utils
+
+ACQUIRE_COUNT = 500
+
+COPY_COUNT = 5000
+
+
+class AcquireThroughputTestCase(db_base.DbTestCase):
+
+    def setUp(self):
+        super(AcquireThroughputTestCase, self).setUp()
+        # NOTE: the driver is not what is measured, do not load it.
+        build_driver = mock.patch.object(driver_factory,
+                                         'build_driver_for_task')
+        build_driver.start()
+        self.addCleanup(build_driver.stop)
+        self.node = obj_utils.create_test_node(
+            self.context, provision_state=states.ACTIVE)
+        self.deep_copy = states.machine.copy
+
+    def _deep_copies(self):
+        return mock.patch.object(
+            states.machine, 'copy',
+            side_effect=lambda shallow=False: self.deep_copy())
+
+    def _acquire_per_second(self, name):
+        start = time.time()
+        for i in range(ACQUIRE_COUNT):
+            with task_manager.acquire(self.context, self.node.uuid,
+                                      shared=True, load_ports=False,
+                                      purpose='benchmark') as task:
+                self.assertEqual(states.ACTIVE, task.fsm.current_state)
+        rate = ACQUIRE_COUNT / (time.time() - start)
+        self.addDetail('%s-acquire-per-second' % name,
+                       content.text_content('%.1f' % rate))
+        return rate
+
+    def _copies_per_second(self, name):
+        start = time.time()
+        for i in range(COPY_COUNT):
+            states.machine.copy(shallow=True)
+        rate = COPY_COUNT / (time.time() - start)
+        self.addDetail('%s-copy-per-second' % name,
+                       content.text_content('%.1f' % rate))
+        return rate
+
+    def test_acquire(self):
+        with self._deep_copies():
+            deep = self._acquire_per_second('deep')
+        # NOTE: the shallow copies go through a mock too, so that both
+        # measurements pay for it.
+        with mock.patch.object(states.machine, 'copy',
+                               wraps=states.machine.copy) as copy_mock:
+            shallow = self._acquire_per_second('shallow')
+        self.addDetail('speedup',
+                       content.text_content('%.2f' % (shallow / deep)))
+        self.assertEqual([mock.call(shallow=True)] * ACQUIRE_COUNT,
+                         copy_mock.call_args_list)
+
+    def test_state_machine_copy(self):
+        with self._deep_copies():
+            deep = self._copies_per_second('deep')
+        shallow = self._copies_per_second('shallow')
+        self.addDetail('speedup',
+                       content.text_content('%.2f' % (shallow / deep)))
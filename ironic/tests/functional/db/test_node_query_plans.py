@@ -0,0 +1,100 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark of the node queries run by the conductor's periodic tasks.
+
+The nodes table is populated with a few thousand nodes, and the queries are
+checked to use the nodes indexes rather than scanning the table.
+"""
+
+import time
+
+from oslo_db.sqlalchemy import enginefacade
+from oslo_utils import uuidutils
+from testtools import content
+
+from ironic.common import states
+from ironic.db.sqlalchemy import api as sa_api
+from ironic.db.sqlalchemy import models
+from ironic.tests.unit.db import base as db_base
+from ironic.tests.unit.db import utils as db_utils
+
+NODE_COUNT = 2000
+
+PROVISION_STATES = [states.ACTIVE, states.AVAILABLE, states.DEPLOYWAIT,
+                    states.CLEANWAIT, states.INSPECTING, states.MANAGEABLE]
+
+
+class NodeQueryPlansTestCase(db_base.DbTestCase):
+
+    def setUp(self):
+        super(NodeQueryPlansTestCase, self).setUp()
+        self.engine = enginefacade.get_legacy_facade().get_engine()
+        for i in range(NODE_COUNT):
+            db_utils.create_test_node(
+                uuid=uuidutils.generate_uuid(),
+                name='node-%d' % i,
+                driver='fake%d' % (i % 5),
+                provision_state=PROVISION_STATES[i % len(PROVISION_STATES)],
+                maintenance=(i % 10 == 0),
+                console_enabled=(i % 50 == 0),
+                reservation='conductor%d' % i if i % 100 == 0 else None)
+
+    def _node_query(self, filters, sort_key=None):
+        query = sa_api.model_query(models.Node.id, base_model=models.Node)
+        query = self.dbapi._add_nodes_filters(query, filters)
+        if sort_key is not None:
+            query = query.order_by(getattr(models.Node, sort_key))
+        return query
+
+    def _assert_uses_index(self, index, filters, sort_key=None):
+        query = self._node_query(filters, sort_key)
+        compiled = query.statement.compile(dialect=self.engine.dialect)
+        params = [compiled.params[name] for name in compiled.positiontup]
+        plan = ' '.join(
+            str(row[-1]) for row in self.engine.execute(
+                'EXPLAIN QUERY PLAN %s' % compiled, params))
+
+        start = time.time()
+        query.all()
+        elapsed = time.time() - start
+        self.addDetail('%s-plan' % index, content.text_content(plan))
+        self.addDetail('%s-seconds' % index,
+                       content.text_content('%.6f' % elapsed))
+        self.assertIn('USING', plan)
+        self.assertIn(index, plan)
+
+    def test_check_deploy_timeouts(self):
+        self._assert_uses_index(
+            'provision_maintenance_update_idx',
+            {'reserved': False, 'provision_state': states.DEPLOYWAIT,
+             'maintenance': False, 'provisioned_before': 60},
+            sort_key='provision_updated_at')
+
+    def test_check_inspect_timeouts(self):
+        self._assert_uses_index(
+            'provision_inspection_started_idx',
+            {'reserved': False, 'provision_state': states.INSPECTING,
+             'inspection_started_before': 60},
+            sort_key='inspection_started_at')
+
+    def test_reserved_by_any_of(self):
+        self._assert_uses_index(
+            'reservation_idx',
+            {'reserved_by_any_of': ['conductor0', 'conductor100']})
+
+    def test_console_enabled(self):
+        self._assert_uses_index('console_enabled_idx',
+                                {'console_enabled': True})
+
+    def test_driver(self):
+        self._assert_uses_index('driver_idx', {'driver': 'fake1'})
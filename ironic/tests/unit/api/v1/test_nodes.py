@@ -182,6 +182,26 @@ class TestListNodes(test_api_base.BaseApiTest):
             # We always append "links"
             self.assertItemsEqual(['uuid', 'instance_info', 'links'], node)
 
+    def test_get_collection_custom_fields_projection(self):
+        for i in range(3):
+            obj_utils.create_test_node(self.context,
+                                       uuid=uuidutils.generate_uuid(),
+                                       chassis_id=self.chassis.id)
+        node_list = objects.Node.list
+        with mock.patch.object(objects.Node, 'list', autospec=True,
+                               side_effect=node_list) as mock_list:
+            data = self.get_json(
+                '/nodes?fields=uuid,power_state,chassis_uuid',
+                headers={api_base.Version.string: str(api_v1.MAX_VER)})
+
+        self.assertEqual({'id', 'uuid', 'power_state', 'chassis_id'},
+                         set(mock_list.call_args[1]['fields']))
+        self.assertEqual(3, len(data['nodes']))
+        for node in data['nodes']:
+            self.assertItemsEqual(['uuid', 'power_state', 'chassis_uuid',
+                                   'links'], node)
+            self.assertEqual(self.chassis.uuid, node['chassis_uuid'])
+
     def test_get_custom_fields_invalid_fields(self):
         node = obj_utils.create_test_node(self.context,
                                           chassis_id=self.chassis.id)
@@ -434,6 +454,67 @@ class TestListNodes(test_api_base.BaseApiTest):
         next_marker = data['nodes'][-1]['uuid']
         self.assertIn(next_marker, data['next'])
 
+    @mock.patch.object(objects.Node, 'get_by_uuid', autospec=True)
+    def test_collection_links_cursor(self, mock_get_by_uuid):
+        nodes = []
+        for id in range(5):
+            node = obj_utils.create_test_node(self.context,
+                                              uuid=uuidutils.generate_uuid())
+            nodes.append(node.uuid)
+        headers = {api_base.Version.string: str(api_v1.MAX_VER)}
+        data = self.get_json('/nodes?limit=3&sort_key=uuid', headers=headers)
+        marker = data['next'].split('marker=')[1]
+        self.assertTrue(marker.startswith(data['nodes'][-1]['uuid'] + '.'))
+
+        data = self.get_json('/nodes?limit=3&sort_key=uuid&marker=%s'
+                             % marker, headers=headers)
+        self.assertEqual(sorted(nodes)[3:],
+                         [n['uuid'] for n in data['nodes']])
+        self.assertFalse(mock_get_by_uuid.called)
+
+    def test_collection_links_cursor_old_version(self):
+        for id in range(3):
+            obj_utils.create_test_node(self.context,
+                                       uuid=uuidutils.generate_uuid())
+        headers = {api_base.Version.string: "1.25"}
+        data = self.get_json('/nodes?limit=2&sort_key=uuid', headers=headers)
+        self.assertTrue(data['next'].endswith(
+            'marker=%s' % data['nodes'][-1]['uuid']))
+
+    def test_collection_cursor_old_version(self):
+        for id in range(3):
+            obj_utils.create_test_node(self.context,
+                                       uuid=uuidutils.generate_uuid())
+        data = self.get_json(
+            '/nodes?limit=2&sort_key=uuid',
+            headers={api_base.Version.string: str(api_v1.MAX_VER)})
+        marker = data['next'].split('marker=')[1]
+        response = self.get_json(
+            '/nodes?limit=2&sort_key=uuid&marker=%s' % marker,
+            headers={api_base.Version.string: "1.25"}, expect_errors=True)
+        self.assertEqual(http_client.BAD_REQUEST, response.status_int)
+
+    def test_collection_links_cursor_not_indexed(self):
+        for id in range(3):
+            obj_utils.create_test_node(self.context,
+                                       uuid=uuidutils.generate_uuid())
+        headers = {api_base.Version.string: str(api_v1.MAX_VER)}
+        data = self.get_json('/nodes?limit=2&sort_key=updated_at',
+                             headers=headers)
+        self.assertTrue(data['next'].endswith(
+            'marker=%s' % data['nodes'][-1]['uuid']))
+
+    def test_collection_cursor_other_sort_key(self):
+        for id in range(3):
+            obj_utils.create_test_node(self.context,
+                                       uuid=uuidutils.generate_uuid())
+        headers = {api_base.Version.string: str(api_v1.MAX_VER)}
+        data = self.get_json('/nodes?limit=2&sort_key=uuid', headers=headers)
+        marker = data['next'].split('marker=')[1]
+        response = self.get_json('/nodes?limit=2&marker=%s' % marker,
+                                 headers=headers, expect_errors=True)
+        self.assertEqual(http_client.BAD_REQUEST, response.status_int)
+
     def test_sort_key(self):
         nodes = []
         for id in range(3):
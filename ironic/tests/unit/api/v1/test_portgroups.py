@@ -31,6 +31,7 @@ from ironic.api.controllers.v1 import portgroup as api_portgroup
 from ironic.api.controllers.v1 import utils as api_utils
 from ironic.common import exception
 from ironic.conductor import rpcapi
+from ironic import objects
 from ironic.tests import base
 from ironic.tests.unit.api import base as test_api_base
 from ironic.tests.unit.api import utils as apiutils
@@ -219,6 +220,28 @@ class TestListPortgroups(test_api_base.BaseApiTest):
         next_marker = data['portgroups'][-1]['uuid']
         self.assertIn(next_marker, data['next'])
 
+    @mock.patch.object(objects.Portgroup, 'get_by_uuid', autospec=True)
+    def test_collection_links_cursor(self, mock_get_by_uuid):
+        portgroups = []
+        for id_ in range(5):
+            portgroup = obj_utils.create_test_portgroup(
+                self.context,
+                node_id=self.node.id,
+                uuid=uuidutils.generate_uuid(),
+                name='portgroup%s' % id_,
+                address='52:54:00:cf:2d:3%s' % id_)
+            portgroups.append(portgroup.uuid)
+        data = self.get_json('/portgroups/?limit=3', headers=self.headers)
+        marker = data['next'].split('marker=')[1]
+        self.assertTrue(
+            marker.startswith(data['portgroups'][-1]['uuid'] + '.'))
+
+        data = self.get_json('/portgroups/?limit=3&marker=%s' % marker,
+                             headers=self.headers)
+        self.assertEqual(portgroups[3:],
+                         [p['uuid'] for p in data['portgroups']])
+        self.assertFalse(mock_get_by_uuid.called)
+
     def test_ports_subresource(self):
         pg = obj_utils.create_test_portgroup(self.context,
                                              uuid=uuidutils.generate_uuid(),
@@ -34,6 +34,7 @@ from ironic.api.controllers.v1 import utils as api_utils
 from ironic.api.controllers.v1 import versions
 from ironic.common import exception
 from ironic.conductor import rpcapi
+from ironic import objects
 from ironic.tests import base
 from ironic.tests.unit.api import base as test_api_base
 from ironic.tests.unit.api import utils as apiutils
@@ -269,6 +270,27 @@ class TestListPorts(test_api_base.BaseApiTest):
         next_marker = data['ports'][-1]['uuid']
         self.assertIn(next_marker, data['next'])
 
+    @mock.patch.object(objects.Port, 'get_by_uuid', autospec=True)
+    def test_collection_links_cursor(self, mock_get_by_uuid):
+        ports = []
+        for id_ in range(5):
+            port = obj_utils.create_test_port(
+                self.context,
+                node_id=self.node.id,
+                uuid=uuidutils.generate_uuid(),
+                address='52:54:00:cf:2d:3%s' % id_)
+            ports.append(port.uuid)
+        headers = {api_base.Version.string: str(api_v1.MAX_VER)}
+        data = self.get_json('/ports/?limit=3&sort_key=address',
+                             headers=headers)
+        marker = data['next'].split('marker=')[1]
+        self.assertTrue(marker.startswith(data['ports'][-1]['uuid'] + '.'))
+
+        data = self.get_json('/ports/?limit=3&sort_key=address&marker=%s'
+                             % marker, headers=headers)
+        self.assertEqual(ports[3:], [p['uuid'] for p in data['ports']])
+        self.assertFalse(mock_get_by_uuid.called)
+
     def test_port_by_address(self):
         address_template = "aa:bb:cc:dd:ee:f%d"
         for id_ in range(3):
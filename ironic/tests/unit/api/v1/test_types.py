@@ -52,6 +52,21 @@ class TestUuidType(base.TestCase):
                           types.UuidType.validate, 'invalid-uuid')
 
 
+class TestMarkerType(base.TestCase):
+
+    def test_valid_uuid(self):
+        test_uuid = '1a1a1a1a-2b2b-3c3c-4d4d-5e5e5e5e5e5e'
+        self.assertEqual(test_uuid, types.MarkerType.validate(test_uuid))
+
+    def test_valid_cursor(self):
+        marker = '1a1a1a1a-2b2b-3c3c-4d4d-5e5e5e5e5e5e.WyJpZCIsIDEsIDFd'
+        self.assertEqual(marker, types.MarkerType.validate(marker))
+
+    def test_invalid_marker(self):
+        self.assertRaises(exception.InvalidUUID,
+                          types.MarkerType.validate, 'invalid-uuid.abc')
+
+
 class TestNameType(base.TestCase):
 
     @mock.patch("pecan.request")
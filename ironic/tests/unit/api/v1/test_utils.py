@@ -14,6 +14,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import base64
+import datetime
+
 import mock
 from oslo_config import cfg
 from oslo_utils import uuidutils
@@ -57,6 +60,86 @@ class TestApiUtils(base.TestCase):
                           utils.validate_sort_dir,
                           'fake-sort')
 
+    @mock.patch.object(pecan, 'request', spec_set=['version'])
+    def test_page_cursor(self, mock_request):
+        mock_request.version.minor = 26
+        created_at = datetime.datetime(2000, 1, 2, 3, 4, 5, 6)
+        node = objects.Node(id=42, uuid=uuidutils.generate_uuid(),
+                            created_at=created_at)
+        marker = utils.get_page_cursor(node, 'created_at')
+        self.assertTrue(marker.startswith(node.uuid + '.'))
+        self.assertNotIn('=', marker)
+
+        marker_obj = utils.get_marker_from_cursor(objects.Node, marker,
+                                                  'created_at')
+        self.assertEqual(42, marker_obj.id)
+        self.assertEqual(node.uuid, marker_obj.uuid)
+        self.assertEqual(created_at,
+                         marker_obj.created_at.replace(tzinfo=None))
+
+    @mock.patch.object(pecan, 'request', spec_set=['version'])
+    def test_page_cursor_default_sort_key(self, mock_request):
+        mock_request.version.minor = 26
+        node = objects.Node(id=42, uuid=uuidutils.generate_uuid())
+        marker = utils.get_page_cursor(node, None)
+        marker_obj = utils.get_marker_from_cursor(objects.Node, marker, 'id')
+        self.assertEqual(42, marker_obj.id)
+
+    @mock.patch.object(pecan, 'request', spec_set=['version'])
+    def test_page_cursor_old_version(self, mock_request):
+        mock_request.version.minor = 25
+        node = objects.Node(id=42, uuid=uuidutils.generate_uuid())
+        self.assertIsNone(utils.get_page_cursor(node, 'id'))
+
+    @mock.patch.object(pecan, 'request', spec_set=['version'])
+    def test_page_cursor_not_indexed(self, mock_request):
+        mock_request.version.minor = 26
+        node = objects.Node(id=42, uuid=uuidutils.generate_uuid(),
+                            driver='fake')
+        self.assertIsNone(utils.get_page_cursor(node, 'driver'))
+
+    def test_get_marker_from_cursor_uuid(self):
+        self.assertIsNone(utils.get_marker_from_cursor(
+            objects.Node, uuidutils.generate_uuid(), 'id'))
+
+    @mock.patch.object(pecan, 'request', spec_set=['version'])
+    def test_get_marker_from_cursor_old_version(self, mock_request):
+        mock_request.version.minor = 26
+        node = objects.Node(id=42, uuid=uuidutils.generate_uuid())
+        marker = utils.get_page_cursor(node, 'id')
+        mock_request.version.minor = 25
+        self.assertRaises(exception.InvalidUUID,
+                          utils.get_marker_from_cursor,
+                          objects.Node, marker, 'id')
+
+    @mock.patch.object(pecan, 'request', spec_set=['version'])
+    def test_get_marker_from_cursor_other_sort_key(self, mock_request):
+        mock_request.version.minor = 26
+        node = objects.Node(id=42, uuid=uuidutils.generate_uuid(),
+                            name='node-42')
+        marker = utils.get_page_cursor(node, 'name')
+        self.assertRaises(exception.InvalidParameterValue,
+                          utils.get_marker_from_cursor,
+                          objects.Node, marker, 'id')
+
+    @mock.patch.object(pecan, 'request', spec_set=['version'])
+    def test_get_marker_from_cursor_not_indexed(self, mock_request):
+        mock_request.version.minor = 26
+        cursor = base64.urlsafe_b64encode(b'["driver", "fake", 42]')
+        marker = '%s.%s' % (uuidutils.generate_uuid(),
+                            cursor.decode('ascii'))
+        self.assertRaises(exception.InvalidParameterValue,
+                          utils.get_marker_from_cursor,
+                          objects.Node, marker, 'driver')
+
+    @mock.patch.object(pecan, 'request', spec_set=['version'])
+    def test_get_marker_from_cursor_invalid(self, mock_request):
+        mock_request.version.minor = 26
+        marker = '%s.%s' % (uuidutils.generate_uuid(), 'not-a-cursor')
+        self.assertRaises(exception.InvalidParameterValue,
+                          utils.get_marker_from_cursor,
+                          objects.Node, marker, 'id')
+
     def test_get_patch_values_no_path(self):
         patch = [{'path': '/name', 'op': 'update', 'value': 'node-0'}]
         path = '/invalid'
@@ -313,6 +396,13 @@ class TestApiUtils(base.TestCase):
         mock_request.version.minor = 24
         self.assertFalse(utils.allow_remove_chassis_uuid())
 
+    @mock.patch.object(pecan, 'request', spec_set=['version'])
+    def test_allow_pagination_cursor(self, mock_request):
+        mock_request.version.minor = 26
+        self.assertTrue(utils.allow_pagination_cursor())
+        mock_request.version.minor = 25
+        self.assertFalse(utils.allow_pagination_cursor())
+
 
 class TestNodeIdent(base.TestCase):
 
@@ -13,6 +13,7 @@
 #    under the License.
 
 import mock
+from oslo_utils import uuidutils
 from stevedore import dispatch
 
 from ironic.common import driver_factory
@@ -185,6 +186,24 @@ class NetworkInterfaceFactoryTestCase(db_base.DbTestCase):
             self.assertIn('noop', extension_mgr)
             self.assertEqual(extension_mgr['flat'].obj, task.driver.network)
 
+    def test_build_driver_for_task_cached(self):
+        node1 = obj_utils.create_test_node(self.context, driver='fake',
+                                           network_interface='flat')
+        node2 = obj_utils.create_test_node(self.context, driver='fake',
+                                           network_interface='flat',
+                                           uuid=uuidutils.generate_uuid())
+        node3 = obj_utils.create_test_node(self.context, driver='fake',
+                                           network_interface='noop',
+                                           uuid=uuidutils.generate_uuid())
+        with task_manager.acquire(self.context, node1.id) as task1:
+            driver1 = task1.driver
+        with task_manager.acquire(self.context, node2.id) as task2:
+            self.assertIs(driver1, task2.driver)
+        with task_manager.acquire(self.context, node3.id) as task3:
+            self.assertIsNot(driver1, task3.driver)
+            self.assertIs(driver1.power, task3.driver.power)
+            self.assertIsNot(driver1.network, task3.driver.network)
+
     def test_build_driver_for_task_unknown_network_interface(self):
         node = obj_utils.create_test_node(self.context, driver='fake',
                                           network_interface='meow')
@@ -198,6 +198,75 @@ class HashRingTestCase(base.TestCase):
         self.assertEqual(['foo'], ring.get_hosts('fake',
                                                  ignore_hosts=['baz']))
 
+    def test_get_hosts_empty_ring(self):
+        ring = hash_ring.HashRing([])
+        self.assertEqual([], ring.get_hosts('fake'))
+
+    def test_get_hosts_uses_partition_table(self):
+        hosts = ['foo', 'bar', 'baz']
+        ring = hash_ring.HashRing(hosts, replicas=2)
+        with mock.patch.object(ring, '_probe_hosts',
+                               autospec=True) as mock_probe:
+            fake_hosts = ring.get_hosts('fake')
+        self.assertFalse(mock_probe.called)
+        self.assertEqual(fake_hosts,
+                         ring._probe_hosts(ring._get_partition('fake'),
+                                           set()))
+
+    def test_get_hosts_many(self):
+        hosts = ['foo', 'bar', 'baz']
+        ring = hash_ring.HashRing(hosts, replicas=2)
+        data = ['fake', 'fake-again', 'another-fake']
+        result = ring.get_hosts_many(data)
+        self.assertEqual({item: ring.get_hosts(item) for item in data},
+                         result)
+
+    def test_get_hosts_many_ignore_hosts(self):
+        hosts = ['foo', 'bar', 'baz']
+        ring = hash_ring.HashRing(hosts, replicas=2)
+        data = ['fake', 'fake-again']
+        result = ring.get_hosts_many(data, ignore_hosts=['bar'])
+        self.assertEqual(
+            {item: ring.get_hosts(item, ignore_hosts=['bar'])
+             for item in data},
+            result)
+
+    def test_get_hosts_many_invalid_data(self):
+        hosts = ['foo', 'bar']
+        ring = hash_ring.HashRing(hosts)
+        self.assertRaises(exception.Invalid,
+                          ring.get_hosts_many,
+                          ['fake', None])
+
+    def test_create_ring_from_previous(self):
+        hosts = ['foo', 'bar', 'baz']
+        new_hosts = ['foo', 'bar', 'qux']
+        previous = hash_ring.HashRing(hosts)
+        with mock.patch.object(hashlib, 'md5',
+                               wraps=hashlib.md5) as mock_md5:
+            ring = hash_ring.HashRing(new_hosts, previous=previous)
+        # Only the new host is hashed
+        mock_md5.assert_called_once_with(b'qux')
+        expected = hash_ring.HashRing(new_hosts)
+        self.assertEqual(expected._host_hashes, ring._host_hashes)
+        self.assertEqual(expected._partitions, ring._partitions)
+        self.assertEqual(expected.get_hosts('fake'), ring.get_hosts('fake'))
+
+    def test_create_ring_from_previous_different_partitions(self):
+        hosts = ['foo', 'bar']
+        previous = hash_ring.HashRing(hosts)
+        CONF.set_override('hash_partition_exponent', 2)
+        ring = hash_ring.HashRing(hosts, previous=previous)
+        self.assertEqual(2 ** 2 * 2, len(ring._partitions))
+
+    def test_is_current(self):
+        hosts = ['foo', 'bar']
+        ring = hash_ring.HashRing(hosts)
+        self.assertTrue(ring.is_current(set(hosts)))
+        self.assertFalse(ring.is_current(['foo']))
+        CONF.set_override('hash_distribution_replicas', 2)
+        self.assertFalse(ring.is_current(hosts))
+
     def test_create_ring_invalid_data(self):
         hosts = None
         self.assertRaises(exception.Invalid,
@@ -261,3 +330,37 @@ class HashRingManagerTestCase(db_base.DbTestCase):
         self.register_conductors()
         self.ring_manager.updated_at = time.time() - 31
         self.ring_manager.__getitem__('driver1')
+
+    def test_hash_ring_manager_refresh_reuses_unchanged_rings(self):
+        CONF.set_override('hash_ring_reset_interval', 30)
+        self.register_conductors()
+        ring1 = self.ring_manager['driver1']
+        ring2 = self.ring_manager['driver2']
+        self.dbapi.register_conductor({
+            'hostname': 'host3',
+            'drivers': ['driver1'],
+        })
+        self.ring_manager.updated_at = time.time() - 31
+        with mock.patch.object(hash_ring, 'HashRing',
+                               wraps=hash_ring.HashRing) as mock_ring:
+            new_ring1 = self.ring_manager['driver1']
+        mock_ring.assert_called_once_with(mock.ANY, previous=ring1)
+        self.assertEqual(set(['host1', 'host2', 'host3']), new_ring1.hosts)
+        self.assertIs(ring2, self.ring_manager['driver2'])
+
+    def test_hash_ring_manager_generation(self):
+        CONF.set_override('hash_ring_reset_interval', 30)
+        self.register_conductors()
+        self.ring_manager['driver1']
+        generation = self.ring_manager.generation
+        self.ring_manager.updated_at = time.time() - 31
+        self.ring_manager['driver1']
+        self.assertEqual(generation, self.ring_manager.generation)
+
+        self.dbapi.register_conductor({
+            'hostname': 'host3',
+            'drivers': ['driver1'],
+        })
+        self.ring_manager.updated_at = time.time() - 31
+        self.ring_manager['driver1']
+        self.assertNotEqual(generation, self.ring_manager.generation)
@@ -16,6 +16,7 @@
 
 import six
 
+from ironic.common import exception
 from ironic.common import states
 from ironic.tests import base
 
@@ -38,3 +39,21 @@ class StatesTest(base.TestCase):
                     (len(value) <= 15),
                     "Value for state: {} is greater than 15 characters".format(
                         key))
+
+    def test_machine_frozen(self):
+        self.assertRaises(exception.InvalidState,
+                          states.machine.add_state, 'foo')
+        self.assertRaises(exception.InvalidState,
+                          states.machine.add_transition,
+                          states.AVAILABLE, states.MANAGEABLE, 'foo')
+
+    def test_machine_shallow_copies_are_independent(self):
+        m1 = states.machine.copy(shallow=True)
+        m2 = states.machine.copy(shallow=True)
+        m1.initialize(start_state=states.AVAILABLE)
+        m2.initialize(start_state=states.AVAILABLE)
+        m1.process_event('deploy')
+        self.assertEqual(states.DEPLOYING, m1.current_state)
+        self.assertEqual(states.ACTIVE, m1.target_state)
+        self.assertEqual(states.AVAILABLE, m2.current_state)
+        self.assertIsNone(m2.target_state)
@@ -73,7 +73,8 @@ class CommonMixIn(object):
                  'power_state': states.POWER_OFF,
                  'target_power_state': None,
                  'maintenance': False,
-                 'reservation': None}
+                 'reservation': None,
+                 'driver_info': {}}
         attrs.update(kwargs)
         node = mock.Mock(spec_set=objects.Node)
         for attr in attrs:
@@ -18,19 +18,23 @@
 
 """Test class for Ironic ManagerService."""
 
+import contextlib
 import datetime
 
 import eventlet
+from futurist import waiters
 import mock
 from oslo_config import cfg
 import oslo_messaging as messaging
 from oslo_utils import uuidutils
 from oslo_versionedobjects import base as ovo_base
 from oslo_versionedobjects import fields
+from six.moves import queue
 
 from ironic.common import boot_devices
 from ironic.common import driver_factory
 from ironic.common import exception
+from ironic.common import hash_ring
 from ironic.common import images
 from ironic.common import states
 from ironic.common import swift
@@ -2539,6 +2543,81 @@ class MiscTestCase(mgr_utils.ServiceSetUpMixin, mgr_utils.CommonMixIn,
         self.assertFalse(self.service._mapped_to_this_conductor(n['uuid'],
                                                                 'otherdriver'))
 
+    def test__mapped_to_this_conductor_cached(self):
+        self._start_service()
+        n = utils.get_test_node()
+        ring = self.service.ring_manager['fake']
+        with mock.patch.object(ring, 'get_hosts',
+                               autospec=True) as mock_get_hosts:
+            mock_get_hosts.return_value = [self.hostname]
+            self.assertTrue(self.service._mapped_to_this_conductor(n['uuid'],
+                                                                   'fake'))
+            self.assertTrue(self.service._mapped_to_this_conductor(n['uuid'],
+                                                                   'fake'))
+            mock_get_hosts.assert_called_once_with(n['uuid'])
+
+            # The cache is dropped when the hash rings change
+            with mock.patch.object(hash_ring.HashRingManager, '_generation',
+                                   -1):
+                self.assertTrue(self.service._mapped_to_this_conductor(
+                    n['uuid'], 'fake'))
+            self.assertEqual(2, mock_get_hosts.call_count)
+
+    def test_iter_nodes_maps_nodes_at_once(self):
+        self._start_service()
+        nodes = [obj_utils.create_test_node(self.context,
+                                            uuid=uuidutils.generate_uuid(),
+                                            driver='fake')
+                 for i in range(3)]
+        ring = self.service.ring_manager['fake']
+        with mock.patch.object(ring, 'get_hosts_many', autospec=True,
+                               side_effect=ring.get_hosts_many) as mock_many:
+            with mock.patch.object(ring, 'get_hosts',
+                                   autospec=True) as mock_get_hosts:
+                result = list(self.service.iter_nodes())
+                self.assertEqual(sorted(n.uuid for n in nodes),
+                                 sorted(r[0] for r in result))
+                mock_many.assert_called_once_with(mock.ANY)
+                self.assertEqual(sorted(n.uuid for n in nodes),
+                                 sorted(mock_many.call_args[0][0]))
+
+                # The mapping of the nodes is cached
+                self.assertEqual(3, len(list(self.service.iter_nodes())))
+                self.assertEqual(1, mock_many.call_count)
+                self.assertFalse(mock_get_hosts.called)
+
+    def test__mapped_to_this_conductor_cache_bounded(self):
+        self._start_service()
+        self.service._ownership_cache_max = 2
+        uuids = [uuidutils.generate_uuid() for i in range(3)]
+        for node_uuid in uuids[:2]:
+            self.service._mapped_to_this_conductor(node_uuid, 'fake')
+        # Using the first node makes the second one the least recently used
+        self.service._mapped_to_this_conductor(uuids[0], 'fake')
+        self.service._mapped_to_this_conductor(uuids[2], 'fake')
+
+        self.assertEqual([('fake', uuids[0]), ('fake', uuids[2])],
+                         list(self.service._ownership_cache))
+
+    def test_iter_nodes_sizes_ownership_cache(self):
+        self._start_service()
+        self.service._ownership_cache_max = 1
+        for i in range(3):
+            obj_utils.create_test_node(self.context,
+                                       uuid=uuidutils.generate_uuid(),
+                                       driver='fake')
+
+        self.assertEqual(3, len(list(self.service.iter_nodes())))
+        self.assertEqual(6, self.service._ownership_cache_max)
+        self.assertEqual(3, len(self.service._ownership_cache))
+
+    def test__cache_nodes_mapping_unknown_driver(self):
+        self._start_service()
+        node_uuid = uuidutils.generate_uuid()
+        self.service._cache_nodes_mapping([(node_uuid, 'otherdriver')])
+        self.assertFalse(self.service._mapped_to_this_conductor(
+            node_uuid, 'otherdriver'))
+
     @mock.patch.object(images, 'is_whole_disk_image')
     def test_validate_driver_interfaces(self, mock_iwdi):
         mock_iwdi.return_value = False
@@ -3610,6 +3689,28 @@ class ManagerDoSyncPowerStateTestCase(tests_db_base.DbTestCase):
         self.assertEqual(1,
                          self.service.power_state_sync_count[self.node.uuid])
 
+    def test_prefetched_state(self, node_power_action):
+        self.node.power_state = states.POWER_OFF
+
+        count = manager.do_sync_power_state(self.task, 0,
+                                            prefetched=states.POWER_ON)
+
+        self.assertEqual(0, count)
+        self.assertFalse(self.power.get_power_state.called)
+        self.assertEqual(states.POWER_ON, self.node.power_state)
+        self.task.upgrade_lock.assert_called_once_with()
+
+    def test_prefetched_exception(self, node_power_action):
+        self.node.power_state = states.POWER_OFF
+
+        count = manager.do_sync_power_state(
+            self.task, 0, prefetched=exception.IronicException('foo'))
+
+        self.assertEqual(1, count)
+        self.assertFalse(self.power.get_power_state.called)
+        self.assertFalse(node_power_action.called)
+        self.assertEqual(states.POWER_OFF, self.node.power_state)
+
     def test_get_power_state_error(self, node_power_action):
         self._do_sync_power_state('fake', states.ERROR)
         self.assertFalse(self.power.validate.called)
@@ -3826,9 +3927,15 @@ class ManagerSyncPowerStatesTestCase(mgr_utils.CommonMixIn,
         super(ManagerSyncPowerStatesTestCase, self).setUp()
         self.service = manager.ConductorManager('hostname', 'test-topic')
         self.service.dbapi = self.dbapi
+        self.service.ring_manager = mock.MagicMock()
         self.node = self._create_node()
-        self.filters = {'maintenance': False}
-        self.columns = ['uuid', 'driver', 'id']
+        self.filters = {'maintenance': False,
+                        'reserved': False,
+                        'provision_state_not_in': (states.DEPLOYWAIT,
+                                                   states.CLEANWAIT,
+                                                   states.ENROLL),
+                        'target_power_state': None}
+        self.columns = ['uuid', 'driver', 'id', 'driver_info']
 
     def test_node_not_mapped(self, get_nodeinfo_mock,
                              mapped_mock, acquire_mock, sync_mock):
@@ -3844,109 +3951,6 @@ class ManagerSyncPowerStatesTestCase(mgr_utils.CommonMixIn,
         self.assertFalse(acquire_mock.called)
         self.assertFalse(sync_mock.called)
 
-    def test_node_locked_on_acquire(self, get_nodeinfo_mock,
-                                    mapped_mock, acquire_mock, sync_mock):
-        get_nodeinfo_mock.return_value = self._get_nodeinfo_list_response()
-        mapped_mock.return_value = True
-        task = self._create_task(
-            node_attrs=dict(reservation='host1', uuid=self.node.uuid))
-        acquire_mock.side_effect = self._get_acquire_side_effect(task)
-
-        self.service._sync_power_states(self.context)
-
-        get_nodeinfo_mock.assert_called_once_with(
-            columns=self.columns, filters=self.filters)
-        mapped_mock.assert_called_once_with(self.node.uuid,
-                                            self.node.driver)
-        acquire_mock.assert_called_once_with(self.context, self.node.uuid,
-                                             purpose=mock.ANY,
-                                             shared=True)
-        self.assertFalse(sync_mock.called)
-
-    def test_node_in_deploywait_on_acquire(self, get_nodeinfo_mock,
-                                           mapped_mock, acquire_mock,
-                                           sync_mock):
-        get_nodeinfo_mock.return_value = self._get_nodeinfo_list_response()
-        mapped_mock.return_value = True
-        task = self._create_task(
-            node_attrs=dict(provision_state=states.DEPLOYWAIT,
-                            target_provision_state=states.ACTIVE,
-                            uuid=self.node.uuid))
-        acquire_mock.side_effect = self._get_acquire_side_effect(task)
-
-        self.service._sync_power_states(self.context)
-
-        get_nodeinfo_mock.assert_called_once_with(
-            columns=self.columns, filters=self.filters)
-        mapped_mock.assert_called_once_with(self.node.uuid,
-                                            self.node.driver)
-        acquire_mock.assert_called_once_with(self.context, self.node.uuid,
-                                             purpose=mock.ANY,
-                                             shared=True)
-        self.assertFalse(sync_mock.called)
-
-    def test_node_in_enroll_on_acquire(self, get_nodeinfo_mock, mapped_mock,
-                                       acquire_mock, sync_mock):
-        get_nodeinfo_mock.return_value = self._get_nodeinfo_list_response()
-        mapped_mock.return_value = True
-        task = self._create_task(
-            node_attrs=dict(provision_state=states.ENROLL,
-                            target_provision_state=states.NOSTATE,
-                            uuid=self.node.uuid))
-        acquire_mock.side_effect = self._get_acquire_side_effect(task)
-
-        self.service._sync_power_states(self.context)
-
-        get_nodeinfo_mock.assert_called_once_with(
-            columns=self.columns, filters=self.filters)
-        mapped_mock.assert_called_once_with(self.node.uuid,
-                                            self.node.driver)
-        acquire_mock.assert_called_once_with(self.context, self.node.uuid,
-                                             purpose=mock.ANY,
-                                             shared=True)
-        self.assertFalse(sync_mock.called)
-
-    def test_node_in_power_transition_on_acquire(self, get_nodeinfo_mock,
-                                                 mapped_mock, acquire_mock,
-                                                 sync_mock):
-        get_nodeinfo_mock.return_value = self._get_nodeinfo_list_response()
-        mapped_mock.return_value = True
-        task = self._create_task(
-            node_attrs=dict(target_power_state=states.POWER_ON,
-                            uuid=self.node.uuid))
-        acquire_mock.side_effect = self._get_acquire_side_effect(task)
-
-        self.service._sync_power_states(self.context)
-
-        get_nodeinfo_mock.assert_called_once_with(
-            columns=self.columns, filters=self.filters)
-        mapped_mock.assert_called_once_with(self.node.uuid,
-                                            self.node.driver)
-        acquire_mock.assert_called_once_with(self.context, self.node.uuid,
-                                             purpose=mock.ANY,
-                                             shared=True)
-        self.assertFalse(sync_mock.called)
-
-    def test_node_in_maintenance_on_acquire(self, get_nodeinfo_mock,
-                                            mapped_mock, acquire_mock,
-                                            sync_mock):
-        get_nodeinfo_mock.return_value = self._get_nodeinfo_list_response()
-        mapped_mock.return_value = True
-        task = self._create_task(
-            node_attrs=dict(maintenance=True, uuid=self.node.uuid))
-        acquire_mock.side_effect = self._get_acquire_side_effect(task)
-
-        self.service._sync_power_states(self.context)
-
-        get_nodeinfo_mock.assert_called_once_with(
-            columns=self.columns, filters=self.filters)
-        mapped_mock.assert_called_once_with(self.node.uuid,
-                                            self.node.driver)
-        acquire_mock.assert_called_once_with(self.context, self.node.uuid,
-                                             purpose=mock.ANY,
-                                             shared=True)
-        self.assertFalse(sync_mock.called)
-
     def test_node_disappears_on_acquire(self, get_nodeinfo_mock,
                                         mapped_mock, acquire_mock, sync_mock):
         get_nodeinfo_mock.return_value = self._get_nodeinfo_list_response()
@@ -3962,7 +3966,9 @@ class ManagerSyncPowerStatesTestCase(mgr_utils.CommonMixIn,
                                             self.node.driver)
         acquire_mock.assert_called_once_with(self.context, self.node.uuid,
                                              purpose=mock.ANY,
-                                             shared=True)
+                                             shared=True,
+                                             filters=self.filters,
+                                             load_ports=False)
         self.assertFalse(sync_mock.called)
 
     def test_single_node(self, get_nodeinfo_mock,
@@ -3980,7 +3986,9 @@ class ManagerSyncPowerStatesTestCase(mgr_utils.CommonMixIn,
                                             self.node.driver)
         acquire_mock.assert_called_once_with(self.context, self.node.uuid,
                                              purpose=mock.ANY,
-                                             shared=True)
+                                             shared=True,
+                                             filters=self.filters,
+                                             load_ports=False)
         sync_mock.assert_called_once_with(task, mock.ANY)
 
     def test__sync_power_state_multiple_nodes(self, get_nodeinfo_mock,
@@ -3989,9 +3997,9 @@ class ManagerSyncPowerStatesTestCase(mgr_utils.CommonMixIn,
         # Create 8 nodes:
         # 1st node: Should acquire and try to sync
         # 2nd node: Not mapped to this conductor
-        # 3rd node: In DEPLOYWAIT provision_state
-        # 4th node: In maintenance mode
-        # 5th node: Is in power transition
+        # 3rd node: In DEPLOYWAIT provision_state (filtered out on acquire)
+        # 4th node: In maintenance mode (filtered out on acquire)
+        # 5th node: Is in power transition (filtered out on acquire)
         # 6th node: Disappears after getting nodeinfo list
         # 7th node: Should acquire and try to sync
         # 8th node: do_sync_power_state raises NodeLocked
@@ -4016,6 +4024,9 @@ class ManagerSyncPowerStatesTestCase(mgr_utils.CommonMixIn,
 
         tasks = [self._create_task(node_attrs=node_attrs[x.uuid])
                  for x in nodes if x.id != 2]
+        # filtered out by the DB during acquire
+        for i in (1, 2, 3):
+            tasks[i] = exception.NodeNotFound(node=i + 2)
         # not found during acquire (4 = index of Node6 after removing Node2)
         tasks[4] = exception.NodeNotFound(node=6)
         sync_results = [0] * 7 + [exception.NodeLocked(node=8, host='')]
@@ -4026,6 +4037,8 @@ class ManagerSyncPowerStatesTestCase(mgr_utils.CommonMixIn,
         acquire_mock.side_effect = self._get_acquire_side_effect(tasks)
         sync_mock.side_effect = sync_results
 
+        # NOTE: use a single worker to get a predictable order of calls
+        self.config(sync_power_state_workers=1, group='conductor')
         with mock.patch.object(eventlet, 'sleep') as sleep_mock:
             self.service._sync_power_states(self.context)
             # Ensure we've yielded on every iteration, except for node
@@ -4038,7 +4051,9 @@ class ManagerSyncPowerStatesTestCase(mgr_utils.CommonMixIn,
         self.assertEqual(mapped_calls, mapped_mock.call_args_list)
         acquire_calls = [mock.call(self.context, x.uuid,
                                    purpose=mock.ANY,
-                                   shared=True)
+                                   shared=True,
+                                   filters=self.filters,
+                                   load_ports=False)
                          for x in nodes if x.id != 2]
         self.assertEqual(acquire_calls, acquire_mock.call_args_list)
         # Nodes 1 and 7 (5 = index of Node7 after removing Node2)
@@ -4047,6 +4062,534 @@ class ManagerSyncPowerStatesTestCase(mgr_utils.CommonMixIn,
         self.assertEqual(sync_calls, sync_mock.call_args_list)
 
 
+@mock.patch.object(manager, 'do_sync_power_state')
+@mock.patch.object(manager.ConductorManager, '_mapped_to_this_conductor',
+                   lambda *args: True)
+class ManagerSyncPowerStatesFiltersTestCase(tests_db_base.DbTestCase):
+    def setUp(self):
+        super(ManagerSyncPowerStatesFiltersTestCase, self).setUp()
+        self.config(sync_power_state_workers=1, group='conductor')
+        self.service = manager.ConductorManager('hostname', 'test-topic')
+        self.service.dbapi = self.dbapi
+        self.service.ring_manager = mock.MagicMock()
+        mgr_utils.mock_the_extension_manager()
+
+    def _create_node(self, **kwargs):
+        kwargs.setdefault('provision_state', states.AVAILABLE)
+        return obj_utils.create_test_node(
+            self.context, uuid=uuidutils.generate_uuid(), **kwargs)
+
+    def test_skipped_nodes_not_acquired(self, sync_mock):
+        node = self._create_node()
+        self._create_node(provision_state=states.DEPLOYWAIT,
+                          target_provision_state=states.ACTIVE)
+        self._create_node(provision_state=states.CLEANWAIT,
+                          target_provision_state=states.AVAILABLE)
+        self._create_node(provision_state=states.ENROLL)
+        self._create_node(maintenance=True)
+        self._create_node(reservation='host1')
+        self._create_node(target_power_state=states.POWER_ON)
+        sync_mock.return_value = 0
+
+        with mock.patch.object(task_manager, 'acquire',
+                               wraps=task_manager.acquire) as acquire_mock:
+            self.service._sync_power_states(self.context)
+
+        acquire_mock.assert_called_once_with(
+            self.context, node.uuid, purpose=mock.ANY, shared=True,
+            filters=manager.SYNC_FILTERS, load_ports=False)
+        sync_mock.assert_called_once_with(mock.ANY, 0)
+        self.assertEqual(node.uuid, sync_mock.call_args[0][0].node.uuid)
+
+    def test_node_changed_after_listing(self, sync_mock):
+        node = self._create_node()
+        node_info = [(node.uuid, node.driver, node.id, node.driver_info)]
+        # The node gets reserved after the list query
+        node.reservation = 'host1'
+        node.save()
+
+        with mock.patch.object(self.service, 'iter_nodes',
+                               return_value=node_info):
+            self.service._sync_power_states(self.context)
+
+        self.assertFalse(sync_mock.called)
+
+
+@mock.patch.object(waiters, 'wait_for_all')
+@mock.patch.object(manager.ConductorManager, '_spawn_worker')
+@mock.patch.object(manager.ConductorManager, '_sync_power_state_nodes_task')
+class ParallelPowerSyncTestCase(mgr_utils.CommonMixIn,
+                                tests_db_base.DbTestCase):
+
+    def setUp(self):
+        super(ParallelPowerSyncTestCase, self).setUp()
+        self.service = manager.ConductorManager('hostname', 'test-topic')
+
+    def _nodes(self, count, driver_info=None):
+        return [(uuidutils.generate_uuid(), 'fake', i, driver_info or {})
+                for i in range(count)]
+
+    def test__sync_power_states_9_nodes_8_workers(self, sync_mock,
+                                                  spawn_mock, wait_mock):
+        self.config(sync_power_state_workers=8, group='conductor')
+        with mock.patch.object(self.service, 'iter_nodes',
+                               return_value=self._nodes(9)):
+            self.service._sync_power_states(self.context)
+
+        self.assertEqual(7, spawn_mock.call_count)
+        spawn_mock.assert_called_with(sync_mock, self.context, mock.ANY)
+        sync_mock.assert_called_once_with(self.context, mock.ANY)
+        wait_mock.assert_called_once_with([spawn_mock.return_value] * 7)
+
+    def test__sync_power_states_3_nodes_8_workers(self, sync_mock,
+                                                  spawn_mock, wait_mock):
+        self.config(sync_power_state_workers=8, group='conductor')
+        with mock.patch.object(self.service, 'iter_nodes',
+                               return_value=self._nodes(3)):
+            self.service._sync_power_states(self.context)
+
+        self.assertEqual(2, spawn_mock.call_count)
+        sync_mock.assert_called_once_with(self.context, mock.ANY)
+
+    def test__sync_power_states_limited_by_periodic_max_workers(
+            self, sync_mock, spawn_mock, wait_mock):
+        self.config(sync_power_state_workers=8, group='conductor')
+        self.config(periodic_max_workers=4, group='conductor')
+        with mock.patch.object(self.service, 'iter_nodes',
+                               return_value=self._nodes(9)):
+            self.service._sync_power_states(self.context)
+
+        self.assertEqual(3, spawn_mock.call_count)
+        sync_mock.assert_called_once_with(self.context, mock.ANY)
+
+    def test__sync_power_states_no_nodes(self, sync_mock, spawn_mock,
+                                         wait_mock):
+        with mock.patch.object(self.service, 'iter_nodes',
+                               return_value=[]):
+            self.service._sync_power_states(self.context)
+
+        self.assertFalse(spawn_mock.called)
+        sync_mock.assert_called_once_with(self.context, mock.ANY)
+        wait_mock.assert_called_once_with([])
+
+    def test__sync_power_states_no_free_workers(self, sync_mock,
+                                                spawn_mock, wait_mock):
+        self.config(sync_power_state_workers=8, group='conductor')
+        spawn_mock.side_effect = [mock.sentinel.future,
+                                  exception.NoFreeConductorWorker()]
+        with mock.patch.object(self.service, 'iter_nodes',
+                               return_value=self._nodes(9)):
+            self.service._sync_power_states(self.context)
+
+        self.assertEqual(2, spawn_mock.call_count)
+        sync_mock.assert_called_once_with(self.context, mock.ANY)
+        wait_mock.assert_called_once_with([mock.sentinel.future])
+
+    def test__sync_power_states_interleaves_by_bmc(self, sync_mock,
+                                                   spawn_mock, wait_mock):
+        self.config(sync_power_state_workers=1, group='conductor')
+        host1 = self._nodes(3, {'ssh_address': 'host1'})
+        host2 = self._nodes(2, {'ssh_address': 'host2'})
+        with mock.patch.object(self.service, 'iter_nodes',
+                               return_value=host1 + host2):
+            self.service._sync_power_states(self.context)
+
+        nodes = sync_mock.call_args[0][1]
+        order = [nodes.get_nowait() for _ in range(nodes.qsize())]
+        self.assertEqual([host1[0], host2[0], host1[1], host2[1], host1[2]],
+                         order)
+
+    @mock.patch.object(manager, '_supports_bulk_power_states', autospec=True)
+    def test__sync_power_states_bulk(self, supports_mock, sync_mock,
+                                     spawn_mock, wait_mock):
+        self.config(sync_power_state_workers=1, group='conductor')
+        self.config(sync_power_state_bulk_size=2, group='conductor')
+        supports_mock.side_effect = lambda driver: driver == 'bulk'
+        bulk = [(uuidutils.generate_uuid(), 'bulk', i, {}) for i in range(3)]
+        single = self._nodes(2)
+        with mock.patch.object(self.service, 'iter_nodes',
+                               return_value=bulk + single):
+            self.service._sync_power_states(self.context)
+
+        nodes = sync_mock.call_args[0][1]
+        order = [nodes.get_nowait() for _ in range(nodes.qsize())]
+        self.assertEqual([bulk[:2], single[0], single[1], bulk[2:]], order)
+        self.assertEqual([mock.call('bulk'), mock.call('fake')],
+                         supports_mock.call_args_list)
+
+    @mock.patch.object(manager, '_supports_bulk_power_states', autospec=True)
+    def test__sync_power_states_bulk_disabled(self, supports_mock, sync_mock,
+                                              spawn_mock, wait_mock):
+        self.config(sync_power_state_workers=1, group='conductor')
+        self.config(sync_power_state_bulk_size=1, group='conductor')
+        node_list = self._nodes(2)
+        with mock.patch.object(self.service, 'iter_nodes',
+                               return_value=node_list):
+            self.service._sync_power_states(self.context)
+
+        nodes = sync_mock.call_args[0][1]
+        self.assertEqual(2, nodes.qsize())
+        self.assertFalse(supports_mock.called)
+
+
+@mock.patch.object(manager, 'do_sync_power_state')
+@mock.patch.object(task_manager, 'acquire')
+class SyncPowerStateNodesTaskTestCase(mgr_utils.CommonMixIn,
+                                      tests_db_base.DbTestCase):
+
+    def setUp(self):
+        super(SyncPowerStateNodesTaskTestCase, self).setUp()
+        self.service = manager.ConductorManager('hostname', 'test-topic')
+        self.node = self._create_node()
+        self.nodes = queue.Queue()
+        self.nodes.put((self.node.uuid, 'fake', self.node.id, {}))
+
+    def test_drains_queue(self, acquire_mock, sync_mock):
+        task = self._create_task(node=self.node)
+        acquire_mock.side_effect = self._get_acquire_side_effect(task)
+        sync_mock.return_value = 0
+
+        self.service._sync_power_state_nodes_task(self.context, self.nodes)
+
+        sync_mock.assert_called_once_with(task, mock.ANY)
+        self.assertTrue(self.nodes.empty())
+
+    def test_stops_on_shutdown(self, acquire_mock, sync_mock):
+        self.service._shutdown = True
+
+        self.service._sync_power_state_nodes_task(self.context, self.nodes)
+
+        self.assertFalse(acquire_mock.called)
+        self.assertFalse(sync_mock.called)
+        self.assertFalse(self.nodes.empty())
+
+    @mock.patch.object(manager.ConductorManager,
+                       '_sync_power_state_nodes_bulk', autospec=True)
+    def test_batch(self, bulk_mock, acquire_mock, sync_mock):
+        batch = [(self.node.uuid, 'fake', self.node.id, {})]
+        self.nodes.put(batch)
+        task = self._create_task(node=self.node)
+        acquire_mock.side_effect = self._get_acquire_side_effect(task)
+        sync_mock.return_value = 0
+
+        self.service._sync_power_state_nodes_task(self.context, self.nodes)
+
+        bulk_mock.assert_called_once_with(self.service, self.context, batch)
+        sync_mock.assert_called_once_with(task, mock.ANY)
+        self.assertTrue(self.nodes.empty())
+
+    @mock.patch.object(manager.ConductorManager,
+                       '_sync_power_state_nodes_bulk', autospec=True)
+    def test_batch_fails(self, bulk_mock, acquire_mock, sync_mock):
+        # The single node queued in setUp is not needed here
+        self.nodes.get_nowait()
+        batches = [[(uuidutils.generate_uuid(), 'fake', i, {})]
+                   for i in range(2)]
+        for batch in batches:
+            self.nodes.put(batch)
+        bulk_mock.side_effect = [RuntimeError(), None]
+
+        self.service._sync_power_state_nodes_task(self.context, self.nodes)
+
+        self.assertEqual([mock.call(self.service, self.context, batch)
+                          for batch in batches],
+                         bulk_mock.call_args_list)
+        self.assertTrue(self.nodes.empty())
+
+
+@mock.patch.object(manager, 'do_sync_power_state', autospec=True)
+@mock.patch.object(task_manager, 'acquire', autospec=True)
+class SyncPowerStateNodesBulkTestCase(mgr_utils.CommonMixIn,
+                                      tests_db_base.DbTestCase):
+
+    def setUp(self):
+        super(SyncPowerStateNodesBulkTestCase, self).setUp()
+        self.service = manager.ConductorManager('hostname', 'test-topic')
+        self.nodes = [self._create_node(id=i,
+                                        uuid=uuidutils.generate_uuid())
+                      for i in range(1, 4)]
+        self.batch = [(n.uuid, 'fake', n.id, {}) for n in self.nodes]
+        self.power = mock.Mock(spec_set=drivers_base.PowerInterface)
+        self.tasks = []
+        for node in self.nodes:
+            task = mock.Mock(spec_set=['node', 'driver',
+                                       'release_resources'])
+            task.node = node
+            # NOTE: a fake driver of its own, not the shared composed one.
+            task.driver = mock.Mock(spec_set=['power'], power=self.power)
+            self.tasks.append(task)
+
+    def test_bulk(self, acquire_mock, sync_mock):
+        acquire_mock.side_effect = self.tasks
+        self.power.get_power_states_bulk.return_value = {
+            self.nodes[0].uuid: states.POWER_ON,
+            self.nodes[1].uuid: states.POWER_OFF}
+        sync_mock.side_effect = [0, 1, 0]
+
+        self.service._sync_power_state_nodes_bulk(self.context, self.batch)
+
+        acquire_mock.assert_has_calls([
+            mock.call(self.context, n.uuid, purpose=mock.ANY, shared=True,
+                      filters=manager.SYNC_FILTERS, load_ports=False)
+            for n in self.nodes])
+        self.power.get_power_states_bulk.assert_called_once_with(self.tasks)
+        self.assertEqual(
+            [mock.call(self.tasks[0], 0, prefetched=states.POWER_ON),
+             mock.call(self.tasks[1], 0, prefetched=states.POWER_OFF),
+             mock.call(self.tasks[2], 0, prefetched=None)],
+            sync_mock.call_args_list)
+        self.assertEqual({self.nodes[1].uuid: 1},
+                         self.service.power_state_sync_count)
+        for task in self.tasks:
+            task.release_resources.assert_called_once_with()
+
+    def test_bulk_node_not_found(self, acquire_mock, sync_mock):
+        acquire_mock.side_effect = [
+            self.tasks[0], exception.NodeNotFound(node=self.nodes[1].uuid),
+            self.tasks[2]]
+        self.power.get_power_states_bulk.return_value = {}
+        sync_mock.return_value = 0
+
+        self.service._sync_power_state_nodes_bulk(self.context, self.batch)
+
+        self.power.get_power_states_bulk.assert_called_once_with(
+            [self.tasks[0], self.tasks[2]])
+        self.assertEqual(2, sync_mock.call_count)
+
+    def test_bulk_node_locked(self, acquire_mock, sync_mock):
+        acquire_mock.side_effect = self.tasks
+        self.power.get_power_states_bulk.return_value = {}
+        sync_mock.side_effect = [
+            exception.NodeLocked(node=self.nodes[0].uuid, host='fake'), 0, 0]
+
+        self.service._sync_power_state_nodes_bulk(self.context, self.batch)
+
+        self.assertEqual(3, sync_mock.call_count)
+        for task in self.tasks:
+            task.release_resources.assert_called_once_with()
+
+    def test_bulk_node_deleted_during_sync(self, acquire_mock, sync_mock):
+        acquire_mock.side_effect = self.tasks
+        self.power.get_power_states_bulk.return_value = {}
+        sync_mock.side_effect = [
+            0, exception.NodeNotFound(node=self.nodes[1].uuid), 0]
+
+        self.service._sync_power_state_nodes_bulk(self.context, self.batch)
+
+        self.assertEqual(3, sync_mock.call_count)
+        for task in self.tasks:
+            task.release_resources.assert_called_once_with()
+
+    def test_bulk_node_sync_fails(self, acquire_mock, sync_mock):
+        acquire_mock.side_effect = self.tasks
+        self.power.get_power_states_bulk.return_value = {}
+        sync_mock.side_effect = [RuntimeError(), 1, 0]
+
+        self.service._sync_power_state_nodes_bulk(self.context, self.batch)
+
+        self.assertEqual(3, sync_mock.call_count)
+        self.assertEqual({self.nodes[1].uuid: 1},
+                         self.service.power_state_sync_count)
+        for task in self.tasks:
+            task.release_resources.assert_called_once_with()
+
+    def test_bulk_all_not_found(self, acquire_mock, sync_mock):
+        acquire_mock.side_effect = exception.NodeNotFound(node='fake')
+
+        self.service._sync_power_state_nodes_bulk(self.context, self.batch)
+
+        self.assertFalse(self.power.get_power_states_bulk.called)
+        self.assertFalse(sync_mock.called)
+
+    def test_bulk_driver_fails(self, acquire_mock, sync_mock):
+        acquire_mock.side_effect = self.tasks
+        self.power.get_power_states_bulk.side_effect = RuntimeError()
+
+        self.assertRaises(RuntimeError,
+                          self.service._sync_power_state_nodes_bulk,
+                          self.context, self.batch)
+
+        self.assertFalse(sync_mock.called)
+        for task in self.tasks:
+            task.release_resources.assert_called_once_with()
+
+
+@mock.patch.object(waiters, 'wait_for_all')
+@mock.patch.object(manager.ConductorManager, '_spawn_worker')
+@mock.patch.object(manager.ConductorManager, '_send_sensor_data_batches')
+@mock.patch.object(manager.ConductorManager, '_sensor_data_nodes_task')
+class ParallelSensorDataTestCase(tests_db_base.DbTestCase):
+
+    def setUp(self):
+        super(ParallelSensorDataTestCase, self).setUp()
+        self.service = manager.ConductorManager('hostname', 'test-topic')
+        self.config(send_sensor_data=True, group='conductor')
+
+    def _nodes(self, count):
+        return [(uuidutils.generate_uuid(), 'fake', uuidutils.generate_uuid())
+                for i in range(count)]
+
+    def test__send_sensor_data_9_nodes_4_workers(self, task_mock,
+                                                 batches_mock, spawn_mock,
+                                                 wait_mock):
+        self.config(send_sensor_data_workers=4, group='conductor')
+        with mock.patch.object(self.service, 'iter_nodes',
+                               return_value=self._nodes(9)):
+            self.service._send_sensor_data(self.context)
+
+        self.assertEqual(3, spawn_mock.call_count)
+        spawn_mock.assert_called_with(task_mock, self.context, mock.ANY,
+                                      mock.ANY)
+        task_mock.assert_called_once_with(self.context, mock.ANY, mock.ANY)
+        wait_mock.assert_called_once_with([spawn_mock.return_value] * 3)
+        batches_mock.assert_called_once_with(self.context, mock.ANY,
+                                             flush=True)
+
+    def test__send_sensor_data_limited_by_periodic_max_workers(
+            self, task_mock, batches_mock, spawn_mock, wait_mock):
+        self.config(send_sensor_data_workers=8, group='conductor')
+        self.config(periodic_max_workers=2, group='conductor')
+        with mock.patch.object(self.service, 'iter_nodes',
+                               return_value=self._nodes(9)):
+            self.service._send_sensor_data(self.context)
+
+        self.assertEqual(1, spawn_mock.call_count)
+        task_mock.assert_called_once_with(self.context, mock.ANY, mock.ANY)
+
+    def test__send_sensor_data_no_free_workers(self, task_mock,
+                                               batches_mock, spawn_mock,
+                                               wait_mock):
+        self.config(send_sensor_data_workers=4, group='conductor')
+        spawn_mock.side_effect = [mock.sentinel.future,
+                                  exception.NoFreeConductorWorker()]
+        with mock.patch.object(self.service, 'iter_nodes',
+                               return_value=self._nodes(9)):
+            self.service._send_sensor_data(self.context)
+
+        self.assertEqual(2, spawn_mock.call_count)
+        task_mock.assert_called_once_with(self.context, mock.ANY, mock.ANY)
+        wait_mock.assert_called_once_with([mock.sentinel.future])
+
+    @mock.patch.object(manager, 'time', autospec=True)
+    @mock.patch.object(manager.METRICS, 'send_gauge', autospec=True)
+    def test__send_sensor_data_metrics(self, gauge_mock, time_mock,
+                                       task_mock, batches_mock, spawn_mock,
+                                       wait_mock):
+        self.config(send_sensor_data_interval=600, group='conductor')
+        time_mock.time.side_effect = [1000, 1700]
+        with mock.patch.object(self.service, 'iter_nodes',
+                               return_value=self._nodes(70)):
+            self.service._send_sensor_data(self.context)
+
+        gauge_mock.assert_has_calls([
+            mock.call('ConductorManager._send_sensor_data.nodes', 70),
+            mock.call('ConductorManager._send_sensor_data.nodes_per_second',
+                      0.1),
+            mock.call('ConductorManager._send_sensor_data.lag', 100)])
+
+
+@mock.patch.object(manager.ConductorManager, '_send_sensor_data_batches',
+                   autospec=True)
+@mock.patch.object(task_manager, 'acquire')
+class SensorDataNodesTaskTestCase(tests_db_base.DbTestCase):
+
+    def setUp(self):
+        super(SensorDataNodesTaskTestCase, self).setUp()
+        self.service = manager.ConductorManager('hostname', 'test-topic')
+        self.nodes = queue.Queue()
+        self.nodes.put(('node-uuid', 'fake', 'instance-uuid'))
+        self.collected = queue.Queue()
+        self.task = mock.Mock(spec_set=['node', 'driver'])
+
+    def test_collects(self, acquire_mock, batches_mock):
+        acquire_mock.return_value.__enter__.return_value = self.task
+        self.task.driver.management.get_sensors_data.return_value = {
+            't1': {'f1': 'v1'}}
+
+        self.service._sensor_data_nodes_task(self.context, self.nodes,
+                                             self.collected)
+
+        self.assertTrue(self.nodes.empty())
+        message = self.collected.get_nowait()
+        self.assertEqual('node-uuid', message['node_uuid'])
+        self.assertEqual('instance-uuid', message['instance_uuid'])
+        self.assertEqual({'t1': {'f1': 'v1'}}, message['payload'])
+        self.task.driver.management.validate.assert_called_once_with(
+            self.task)
+        batches_mock.assert_called_once_with(self.service, self.context,
+                                             self.collected)
+
+    def test_get_sensors_data_fails(self, acquire_mock, batches_mock):
+        acquire_mock.return_value.__enter__.return_value = self.task
+        self.task.driver.management.get_sensors_data.side_effect = (
+            exception.FailedToGetSensorData(node='node-uuid', error='boom'))
+
+        self.service._sensor_data_nodes_task(self.context, self.nodes,
+                                             self.collected)
+
+        self.assertTrue(self.nodes.empty())
+        self.assertTrue(self.collected.empty())
+        self.assertFalse(batches_mock.called)
+
+    def test_stops_on_shutdown(self, acquire_mock, batches_mock):
+        self.service._shutdown = True
+
+        self.service._sensor_data_nodes_task(self.context, self.nodes,
+                                             self.collected)
+
+        self.assertFalse(acquire_mock.called)
+        self.assertFalse(self.nodes.empty())
+
+
+class SendSensorDataBatchesTestCase(tests_db_base.DbTestCase):
+
+    def setUp(self):
+        super(SendSensorDataBatchesTestCase, self).setUp()
+        self.service = manager.ConductorManager('hostname', 'test-topic')
+        self.service.sensors_notifier = mock.Mock(spec_set=['info'])
+        self.collected = queue.Queue()
+        for i in range(3):
+            self.collected.put({'node_uuid': 'node%d' % i,
+                                'payload': {'t1': {'f1': 'v1'}}})
+
+    def test_one_node_per_notification(self):
+        self.service._send_sensor_data_batches(self.context, self.collected)
+
+        self.assertEqual(
+            [mock.call(self.context, 'hardware.ipmi.metrics',
+                       {'node_uuid': 'node%d' % i,
+                        'payload': {'t1': {'f1': 'v1'}}})
+             for i in range(3)],
+            self.service.sensors_notifier.info.call_args_list)
+        self.assertTrue(self.collected.empty())
+
+    def test_batches(self):
+        self.config(send_sensor_data_batch_size=2, group='conductor')
+
+        self.service._send_sensor_data_batches(self.context, self.collected)
+
+        self.service.sensors_notifier.info.assert_called_once_with(
+            self.context, 'hardware.ipmi.metrics.batch', mock.ANY)
+        batch = self.service.sensors_notifier.info.call_args[0][2]
+        self.assertEqual(['node0', 'node1'], [m['node_uuid'] for m in batch])
+        self.assertEqual(1, self.collected.qsize())
+
+        self.service._send_sensor_data_batches(self.context, self.collected,
+                                               flush=True)
+
+        batch = self.service.sensors_notifier.info.call_args[0][2]
+        self.assertEqual(['node2'], [m['node_uuid'] for m in batch])
+        self.assertTrue(self.collected.empty())
+
+    def test_filters_out_unsupported_types(self):
+        self.config(send_sensor_data_types=['t2'], group='conductor')
+
+        self.service._send_sensor_data_batches(self.context, self.collected)
+
+        self.assertFalse(self.service.sensors_notifier.info.called)
+        self.assertTrue(self.collected.empty())
+
+
 @mock.patch.object(task_manager, 'acquire')
 @mock.patch.object(manager.ConductorManager, '_mapped_to_this_conductor')
 @mock.patch.object(dbapi.IMPL, 'get_nodeinfo_list')
@@ -4057,6 +4600,7 @@ class ManagerCheckDeployTimeoutsTestCase(mgr_utils.CommonMixIn,
         self.config(deploy_callback_timeout=300, group='conductor')
         self.service = manager.ConductorManager('hostname', 'test-topic')
         self.service.dbapi = self.dbapi
+        self.service.ring_manager = mock.MagicMock()
 
         self.node = self._create_node(provision_state=states.DEPLOYWAIT,
                                       target_provision_state=states.ACTIVE)
@@ -4429,7 +4973,7 @@ class ManagerTestProperties(tests_db_base.DbTestCase):
         self.assertEqual(exception.DriverNotFound, exc.exc_info[0])
 
 
-@mock.patch.object(task_manager, 'acquire')
+@mock.patch.object(task_manager, 'acquire_many')
 @mock.patch.object(manager.ConductorManager, '_mapped_to_this_conductor')
 @mock.patch.object(dbapi.IMPL, 'get_nodeinfo_list')
 class ManagerSyncLocalStateTestCase(mgr_utils.CommonMixIn,
@@ -4442,7 +4986,7 @@ class ManagerSyncLocalStateTestCase(mgr_utils.CommonMixIn,
 
         self.service.conductor = mock.Mock()
         self.service.dbapi = self.dbapi
-        self.service.ring_manager = mock.Mock()
+        self.service.ring_manager = mock.MagicMock()
 
         self.node = self._create_node(provision_state=states.ACTIVE,
                                       target_provision_state=states.NOSTATE)
@@ -4453,6 +4997,19 @@ class ManagerSyncLocalStateTestCase(mgr_utils.CommonMixIn,
                         'provision_state': states.ACTIVE}
         self.columns = ['uuid', 'driver', 'id', 'conductor_affinity']
 
+    def _get_acquire_many_side_effect(self, tasks, failed=None):
+        @contextlib.contextmanager
+        def _acquire_many(context, node_ids, purpose):
+            yield ({task.node.uuid: task for task in tasks
+                    if task.node.uuid in node_ids}, failed or {})
+        return _acquire_many
+
+    def _create_tasks(self, count):
+        nodes = [self._create_node(id=i, provision_state=states.ACTIVE,
+                                   target_provision_state=states.NOSTATE)
+                 for i in range(1, count + 1)]
+        return nodes, [self._create_task(node=node) for node in nodes]
+
     def _assert_get_nodeinfo_args(self, get_nodeinfo_mock):
         get_nodeinfo_mock.assert_called_once_with(
             columns=self.columns, filters=self.filters)
@@ -4485,13 +5042,14 @@ class ManagerSyncLocalStateTestCase(mgr_utils.CommonMixIn,
     def test_good(self, get_nodeinfo_mock, mapped_mock, acquire_mock):
         get_nodeinfo_mock.return_value = self._get_nodeinfo_list_response()
         mapped_mock.return_value = True
-        acquire_mock.side_effect = self._get_acquire_side_effect(self.task)
+        acquire_mock.side_effect = self._get_acquire_many_side_effect(
+            [self.task])
 
         self.service._sync_local_state(self.context)
 
         self._assert_get_nodeinfo_args(get_nodeinfo_mock)
         mapped_mock.assert_called_once_with(self.node.uuid, self.node.driver)
-        acquire_mock.assert_called_once_with(self.context, self.node.uuid,
+        acquire_mock.assert_called_once_with(self.context, [self.node.uuid],
                                              purpose=mock.ANY)
         # assert spawn_after has been called
         self.task.spawn_after.assert_called_once_with(
@@ -4501,77 +5059,85 @@ class ManagerSyncLocalStateTestCase(mgr_utils.CommonMixIn,
     def test_no_free_worker(self, get_nodeinfo_mock, mapped_mock,
                             acquire_mock):
         mapped_mock.return_value = True
-        acquire_mock.side_effect = (
-            self._get_acquire_side_effect([self.task] * 3))
-        self.task.spawn_after.side_effect = [
-            None,
-            exception.NoFreeConductorWorker('error')
-        ]
+        nodes, tasks = self._create_tasks(3)
+        acquire_mock.side_effect = self._get_acquire_many_side_effect(tasks)
+        tasks[1].spawn_after.side_effect = (
+            exception.NoFreeConductorWorker('error'))
 
         # 3 nodes to be checked
         get_nodeinfo_mock.return_value = (
-            self._get_nodeinfo_list_response([self.node] * 3))
+            self._get_nodeinfo_list_response(nodes))
 
         self.service._sync_local_state(self.context)
 
         self._assert_get_nodeinfo_args(get_nodeinfo_mock)
+        acquire_mock.assert_called_once_with(
+            self.context, [n.uuid for n in nodes], purpose=mock.ANY)
 
-        # assert  _mapped_to_this_conductor() gets called 2 times only
-        # instead of 3. When NoFreeConductorWorker is raised the loop
-        # should be broken
-        expected = [mock.call(self.node.uuid, self.node.driver)] * 2
-        self.assertEqual(expected, mapped_mock.call_args_list)
-
-        # assert  acquire() gets called 2 times only instead of 3. When
-        # NoFreeConductorWorker is raised the loop should be broken
-        expected = [mock.call(self.context, self.node.uuid,
-                              purpose=mock.ANY)] * 2
-        self.assertEqual(expected, acquire_mock.call_args_list)
-
-        # assert spawn_after has been called twice
-        expected = [mock.call(self.service._spawn_worker,
-                    self.service._do_takeover, self.task)] * 2
-        self.assertEqual(expected, self.task.spawn_after.call_args_list)
+        # assert spawn_after is not called once NoFreeConductorWorker
+        # is raised
+        for task in tasks[:2]:
+            task.spawn_after.assert_called_once_with(
+                self.service._spawn_worker,
+                self.service._do_takeover, task)
+        self.assertFalse(tasks[2].spawn_after.called)
 
     def test_node_locked(self, get_nodeinfo_mock, mapped_mock, acquire_mock,):
         mapped_mock.return_value = True
-        acquire_mock.side_effect = self._get_acquire_side_effect(
-            [self.task, exception.NodeLocked('error'), self.task])
-        self.task.spawn_after.side_effect = [None, None]
+        nodes, tasks = self._create_tasks(3)
+        acquire_mock.side_effect = self._get_acquire_many_side_effect(
+            [tasks[0], tasks[2]],
+            {nodes[1].uuid: exception.NodeLocked(node=nodes[1].uuid,
+                                                 host='fake')})
 
         # 3 nodes to be checked
         get_nodeinfo_mock.return_value = (
-            self._get_nodeinfo_list_response([self.node] * 3))
+            self._get_nodeinfo_list_response(nodes))
 
         self.service._sync_local_state(self.context)
 
         self._assert_get_nodeinfo_args(get_nodeinfo_mock)
 
         # assert _mapped_to_this_conductor() gets called 3 times
-        expected = [mock.call(self.node.uuid, self.node.driver)] * 3
+        expected = [mock.call(n.uuid, n.driver) for n in nodes]
         self.assertEqual(expected, mapped_mock.call_args_list)
 
-        # assert acquire() gets called 3 times
-        expected = [mock.call(self.context, self.node.uuid,
-                              purpose=mock.ANY)] * 3
-        self.assertEqual(expected, acquire_mock.call_args_list)
+        # assert all the nodes are locked at once
+        acquire_mock.assert_called_once_with(
+            self.context, [n.uuid for n in nodes], purpose=mock.ANY)
 
-        # assert spawn_after has been called only 2 times
-        expected = [mock.call(self.service._spawn_worker,
-                    self.service._do_takeover, self.task)] * 2
-        self.assertEqual(expected, self.task.spawn_after.call_args_list)
+        # assert spawn_after has been called for the locked nodes only
+        for task in (tasks[0], tasks[2]):
+            task.spawn_after.assert_called_once_with(
+                self.service._spawn_worker,
+                self.service._do_takeover, task)
+        self.assertFalse(tasks[1].spawn_after.called)
+
+    def test_node_changed(self, get_nodeinfo_mock, mapped_mock,
+                          acquire_mock):
+        get_nodeinfo_mock.return_value = self._get_nodeinfo_list_response()
+        mapped_mock.return_value = True
+        acquire_mock.side_effect = self._get_acquire_many_side_effect(
+            [self.task])
+        # Node was put in maintenance after being listed
+        self.node.maintenance = True
+
+        self.service._sync_local_state(self.context)
+
+        acquire_mock.assert_called_once_with(self.context, [self.node.uuid],
+                                             purpose=mock.ANY)
+        self.assertFalse(self.task.spawn_after.called)
 
     def test_worker_limit(self, get_nodeinfo_mock, mapped_mock, acquire_mock):
         # Limit to only 1 worker
         self.config(periodic_max_workers=1, group='conductor')
         mapped_mock.return_value = True
-        acquire_mock.side_effect = (
-            self._get_acquire_side_effect([self.task] * 3))
-        self.task.spawn_after.side_effect = [None] * 3
+        nodes, tasks = self._create_tasks(3)
+        acquire_mock.side_effect = self._get_acquire_many_side_effect(tasks)
 
         # 3 nodes to be checked
         get_nodeinfo_mock.return_value = (
-            self._get_nodeinfo_list_response([self.node] * 3))
+            self._get_nodeinfo_list_response(nodes))
 
         self.service._sync_local_state(self.context)
 
@@ -4579,16 +5145,50 @@ class ManagerSyncLocalStateTestCase(mgr_utils.CommonMixIn,
 
         # assert _mapped_to_this_conductor() gets called only once
         # because of the worker limit
-        mapped_mock.assert_called_once_with(self.node.uuid, self.node.driver)
+        mapped_mock.assert_called_once_with(nodes[0].uuid, nodes[0].driver)
 
-        # assert acquire() gets called only once because of the worker limit
-        acquire_mock.assert_called_once_with(self.context, self.node.uuid,
+        # assert only one node is locked because of the worker limit
+        acquire_mock.assert_called_once_with(self.context, [nodes[0].uuid],
                                              purpose=mock.ANY)
 
         # assert spawn_after has been called
-        self.task.spawn_after.assert_called_once_with(
+        tasks[0].spawn_after.assert_called_once_with(
             self.service._spawn_worker,
-            self.service._do_takeover, self.task)
+            self.service._do_takeover, tasks[0])
+
+    def test_worker_limit_node_locked(self, get_nodeinfo_mock, mapped_mock,
+                                      acquire_mock):
+        # Limit to 2 workers
+        self.config(periodic_max_workers=2, group='conductor')
+        mapped_mock.return_value = True
+        nodes, tasks = self._create_tasks(3)
+        acquire_mock.side_effect = self._get_acquire_many_side_effect(
+            tasks[1:],
+            {nodes[0].uuid: exception.NodeLocked(node=nodes[0].uuid,
+                                                 host='fake')})
+
+        # 3 nodes to be checked
+        get_nodeinfo_mock.return_value = (
+            self._get_nodeinfo_list_response(nodes))
+
+        self.service._sync_local_state(self.context)
+
+        self._assert_get_nodeinfo_args(get_nodeinfo_mock)
+
+        # assert the locked node does not count against the worker limit,
+        # so the next node is locked as well
+        self.assertEqual(
+            [mock.call(self.context, [nodes[0].uuid, nodes[1].uuid],
+                       purpose=mock.ANY),
+             mock.call(self.context, [nodes[2].uuid], purpose=mock.ANY)],
+            acquire_mock.call_args_list)
+
+        # assert spawn_after has been called for the 2 available nodes
+        for task in tasks[1:]:
+            task.spawn_after.assert_called_once_with(
+                self.service._spawn_worker,
+                self.service._do_takeover, task)
+        self.assertFalse(tasks[0].spawn_after.called)
 
 
 @mock.patch.object(swift, 'SwiftAPI')
@@ -4793,6 +5393,7 @@ class ManagerCheckInspectTimeoutsTestCase(mgr_utils.CommonMixIn,
         self.config(inspect_timeout=300, group='conductor')
         self.service = manager.ConductorManager('hostname', 'test-topic')
         self.service.dbapi = self.dbapi
+        self.service.ring_manager = mock.MagicMock()
 
         self.node = self._create_node(provision_state=states.INSPECTING,
                                       target_provision_state=states.MANAGEABLE)
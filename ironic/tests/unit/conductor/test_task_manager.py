@@ -17,6 +17,8 @@
 
 """Tests for :class:`ironic.conductor.task_manager`."""
 
+import threading
+
 import futurist
 import mock
 from oslo_utils import uuidutils
@@ -61,7 +63,8 @@ class TaskManagerTestCase(tests_db_base.DbTestCase):
             self.assertFalse(task.shared)
             build_driver_mock.assert_called_once_with(task, driver_name=None)
 
-        node_get_mock.assert_called_once_with(self.context, 'fake-node-id')
+        node_get_mock.assert_called_once_with(self.context, 'fake-node-id',
+                                              filters=None)
         reserve_mock.assert_called_once_with(self.context, self.host,
                                              'fake-node-id')
         get_ports_mock.assert_called_once_with(self.context, self.node.id)
@@ -69,6 +72,36 @@ class TaskManagerTestCase(tests_db_base.DbTestCase):
         release_mock.assert_called_once_with(self.context, self.host,
                                              self.node.id)
 
+    def test_shared_lock_without_ports(
+            self, get_portgroups_mock, get_ports_mock, build_driver_mock,
+            reserve_mock, release_mock, node_get_mock):
+        node_get_mock.return_value = self.node
+        with task_manager.TaskManager(self.context, 'fake-node-id',
+                                      shared=True, load_ports=False) as task:
+            self.assertFalse(get_ports_mock.called)
+            self.assertFalse(get_portgroups_mock.called)
+            self.assertEqual(get_ports_mock.return_value, task.ports)
+            self.assertEqual(get_portgroups_mock.return_value, task.portgroups)
+            # Ports and portgroups are only loaded once
+            self.assertEqual(get_ports_mock.return_value, task.ports)
+            self.assertEqual(get_portgroups_mock.return_value, task.portgroups)
+
+        get_ports_mock.assert_called_once_with(self.context, self.node.id)
+        get_portgroups_mock.assert_called_once_with(self.context, self.node.id)
+        self.assertIsNone(task.ports)
+        self.assertIsNone(task.portgroups)
+
+    def test_shared_lock_without_ports_not_accessed(
+            self, get_portgroups_mock, get_ports_mock, build_driver_mock,
+            reserve_mock, release_mock, node_get_mock):
+        node_get_mock.return_value = self.node
+        with task_manager.TaskManager(self.context, 'fake-node-id',
+                                      shared=True, load_ports=False) as task:
+            self.assertEqual(build_driver_mock.return_value, task.driver)
+
+        self.assertFalse(get_ports_mock.called)
+        self.assertFalse(get_portgroups_mock.called)
+
     def test_excl_lock_with_driver(
             self, get_portgroups_mock, get_ports_mock, build_driver_mock,
             reserve_mock, release_mock, node_get_mock):
@@ -84,7 +117,8 @@ class TaskManagerTestCase(tests_db_base.DbTestCase):
             build_driver_mock.assert_called_once_with(
                 task, driver_name='fake-driver')
 
-        node_get_mock.assert_called_once_with(self.context, 'fake-node-id')
+        node_get_mock.assert_called_once_with(self.context, 'fake-node-id',
+                                              filters=None)
         reserve_mock.assert_called_once_with(self.context, self.host,
                                              'fake-node-id')
         get_ports_mock.assert_called_once_with(self.context, self.node.id)
@@ -127,8 +161,8 @@ class TaskManagerTestCase(tests_db_base.DbTestCase):
                                   mock.call(task2, driver_name=None)],
                                  build_driver_mock.call_args_list)
 
-        self.assertEqual([mock.call(self.context, 'node-id1'),
-                          mock.call(self.context, 'node-id2')],
+        self.assertEqual([mock.call(self.context, 'node-id1', filters=None),
+                          mock.call(self.context, 'node-id2', filters=None)],
                          node_get_mock.call_args_list)
         self.assertEqual([mock.call(self.context, self.host, 'node-id1'),
                           mock.call(self.context, self.host, 'node-id2')],
@@ -174,7 +208,8 @@ class TaskManagerTestCase(tests_db_base.DbTestCase):
                           task_manager.TaskManager,
                           self.context,
                           'fake-node-id')
-        node_get_mock.assert_called_with(self.context, 'fake-node-id')
+        node_get_mock.assert_called_with(self.context, 'fake-node-id',
+                                         filters=None)
         reserve_mock.assert_called_with(self.context, self.host,
                                         'fake-node-id')
         self.assertEqual(retry_attempts, reserve_mock.call_count)
@@ -183,6 +218,83 @@ class TaskManagerTestCase(tests_db_base.DbTestCase):
         self.assertFalse(build_driver_mock.called)
         self.assertFalse(release_mock.called)
 
+    @mock.patch.object(task_manager.time, 'sleep', autospec=True)
+    @mock.patch.object(task_manager.random, 'uniform', autospec=True)
+    def test_excl_lock_reserve_backoff(
+            self, uniform_mock, sleep_mock, get_portgroups_mock,
+            get_ports_mock, build_driver_mock, reserve_mock, release_mock,
+            node_get_mock):
+        self.config(node_locked_retry_attempts=3, group='conductor')
+        self.config(node_locked_retry_interval=1, group='conductor')
+        uniform_mock.side_effect = lambda a, b: b
+        reserve_mock.side_effect = (
+            [exception.NodeLocked(node='foo', host='another-host')] * 4 +
+            [self.node])
+
+        with task_manager.TaskManager(self.context, 'fake-node-id') as task:
+            self.assertEqual(self.node, task.node)
+
+        self.assertEqual(5, reserve_mock.call_count)
+        self.assertEqual([mock.call(0.05, 0.1), mock.call(0.1, 0.2),
+                          mock.call(0.2, 0.4), mock.call(0.4, 0.8)],
+                         uniform_mock.call_args_list)
+        self.assertEqual(4, sleep_mock.call_count)
+
+    @mock.patch.object(threading.Event, 'wait', autospec=True)
+    def test_excl_lock_reserve_same_host(
+            self, wait_mock, get_portgroups_mock, get_ports_mock,
+            build_driver_mock, reserve_mock, release_mock, node_get_mock):
+        self.config(node_locked_retry_attempts=2, group='conductor')
+        self.config(node_locked_retry_interval=1, group='conductor')
+        reserve_mock.side_effect = [
+            exception.NodeLocked(node=self.node.uuid, host=self.host),
+            self.node]
+
+        with task_manager.TaskManager(self.context, 'fake-node-id') as task:
+            self.assertEqual(self.node, task.node)
+
+        self.assertEqual(2, reserve_mock.call_count)
+        wait_mock.assert_called_once_with(mock.ANY, mock.ANY)
+        self.assertLessEqual(wait_mock.call_args[0][1], 1)
+        self.assertEqual({}, task_manager._lock_release_notifier._waiters)
+
+    @mock.patch.object(threading.Event, 'wait', autospec=True)
+    def test_excl_lock_reserve_released_before_wait(
+            self, wait_mock, get_portgroups_mock, get_ports_mock,
+            build_driver_mock, reserve_mock, release_mock, node_get_mock):
+        self.config(node_locked_retry_attempts=2, group='conductor')
+        self.config(node_locked_retry_interval=1, group='conductor')
+
+        def _reserve(context, tag, node_id):
+            if reserve_mock.call_count == 1:
+                # The lock is released after the reservation failed, but
+                # before waiting for the release
+                task_manager._lock_release_notifier.notify(self.node.uuid,
+                                                           self.node.id)
+                raise exception.NodeLocked(node=self.node.uuid,
+                                           host=self.host)
+            return self.node
+
+        reserve_mock.side_effect = _reserve
+        wait_mock.side_effect = lambda event, timeout: (
+            self.assertTrue(event.is_set()))
+
+        with task_manager.TaskManager(self.context, self.node.uuid) as task:
+            self.assertEqual(self.node, task.node)
+
+        self.assertEqual(2, reserve_mock.call_count)
+        self.assertEqual(1, wait_mock.call_count)
+
+    def test_excl_lock_release_notifies(
+            self, get_portgroups_mock, get_ports_mock, build_driver_mock,
+            reserve_mock, release_mock, node_get_mock):
+        reserve_mock.return_value = self.node
+        with mock.patch.object(task_manager._lock_release_notifier,
+                               'notify', autospec=True) as notify_mock:
+            with task_manager.TaskManager(self.context, 'fake-node-id'):
+                self.assertFalse(notify_mock.called)
+            notify_mock.assert_called_once_with(self.node.uuid, self.node.id)
+
     def test_excl_lock_get_ports_exception(
             self, get_portgroups_mock, get_ports_mock, build_driver_mock,
             reserve_mock, release_mock, node_get_mock):
@@ -194,7 +306,8 @@ class TaskManagerTestCase(tests_db_base.DbTestCase):
                           self.context,
                           'fake-node-id')
 
-        node_get_mock.assert_called_once_with(self.context, 'fake-node-id')
+        node_get_mock.assert_called_once_with(self.context, 'fake-node-id',
+                                              filters=None)
         reserve_mock.assert_called_once_with(self.context, self.host,
                                              'fake-node-id')
         get_ports_mock.assert_called_once_with(self.context, self.node.id)
@@ -213,7 +326,8 @@ class TaskManagerTestCase(tests_db_base.DbTestCase):
                           self.context,
                           'fake-node-id')
 
-        node_get_mock.assert_called_once_with(self.context, 'fake-node-id')
+        node_get_mock.assert_called_once_with(self.context, 'fake-node-id',
+                                              filters=None)
         reserve_mock.assert_called_once_with(self.context, self.host,
                                              'fake-node-id')
         get_portgroups_mock.assert_called_once_with(self.context, self.node.id)
@@ -233,7 +347,8 @@ class TaskManagerTestCase(tests_db_base.DbTestCase):
                           self.context,
                           'fake-node-id')
 
-        node_get_mock.assert_called_once_with(self.context, 'fake-node-id')
+        node_get_mock.assert_called_once_with(self.context, 'fake-node-id',
+                                              filters=None)
         reserve_mock.assert_called_once_with(self.context, self.host,
                                              'fake-node-id')
         get_ports_mock.assert_called_once_with(self.context, self.node.id)
@@ -259,7 +374,8 @@ class TaskManagerTestCase(tests_db_base.DbTestCase):
 
         self.assertFalse(reserve_mock.called)
         self.assertFalse(release_mock.called)
-        node_get_mock.assert_called_once_with(self.context, 'fake-node-id')
+        node_get_mock.assert_called_once_with(self.context, 'fake-node-id',
+                                              filters=None)
         get_ports_mock.assert_called_once_with(self.context, self.node.id)
         get_portgroups_mock.assert_called_once_with(self.context, self.node.id)
 
@@ -283,7 +399,8 @@ class TaskManagerTestCase(tests_db_base.DbTestCase):
 
         self.assertFalse(reserve_mock.called)
         self.assertFalse(release_mock.called)
-        node_get_mock.assert_called_once_with(self.context, 'fake-node-id')
+        node_get_mock.assert_called_once_with(self.context, 'fake-node-id',
+                                              filters=None)
         get_ports_mock.assert_called_once_with(self.context, self.node.id)
         get_portgroups_mock.assert_called_once_with(self.context, self.node.id)
 
@@ -300,7 +417,8 @@ class TaskManagerTestCase(tests_db_base.DbTestCase):
 
         self.assertFalse(reserve_mock.called)
         self.assertFalse(release_mock.called)
-        node_get_mock.assert_called_once_with(self.context, 'fake-node-id')
+        node_get_mock.assert_called_once_with(self.context, 'fake-node-id',
+                                              filters=None)
         self.assertFalse(get_ports_mock.called)
         self.assertFalse(get_portgroups_mock.called)
         self.assertFalse(build_driver_mock.called)
@@ -319,7 +437,8 @@ class TaskManagerTestCase(tests_db_base.DbTestCase):
 
         self.assertFalse(reserve_mock.called)
         self.assertFalse(release_mock.called)
-        node_get_mock.assert_called_once_with(self.context, 'fake-node-id')
+        node_get_mock.assert_called_once_with(self.context, 'fake-node-id',
+                                              filters=None)
         get_ports_mock.assert_called_once_with(self.context, self.node.id)
         self.assertFalse(build_driver_mock.called)
 
@@ -337,7 +456,8 @@ class TaskManagerTestCase(tests_db_base.DbTestCase):
 
         self.assertFalse(reserve_mock.called)
         self.assertFalse(release_mock.called)
-        node_get_mock.assert_called_once_with(self.context, 'fake-node-id')
+        node_get_mock.assert_called_once_with(self.context, 'fake-node-id',
+                                              filters=None)
         get_portgroups_mock.assert_called_once_with(self.context, self.node.id)
         self.assertFalse(build_driver_mock.called)
 
@@ -356,7 +476,8 @@ class TaskManagerTestCase(tests_db_base.DbTestCase):
 
         self.assertFalse(reserve_mock.called)
         self.assertFalse(release_mock.called)
-        node_get_mock.assert_called_once_with(self.context, 'fake-node-id')
+        node_get_mock.assert_called_once_with(self.context, 'fake-node-id',
+                                              filters=None)
         get_ports_mock.assert_called_once_with(self.context, self.node.id)
         get_portgroups_mock.assert_called_once_with(self.context, self.node.id)
         build_driver_mock.assert_called_once_with(mock.ANY, driver_name=None)
@@ -392,7 +513,8 @@ class TaskManagerTestCase(tests_db_base.DbTestCase):
                                              'fake-node-id')
         release_mock.assert_called_once_with(self.context, self.host,
                                              self.node.id)
-        node_get_mock.assert_called_once_with(self.context, 'fake-node-id')
+        node_get_mock.assert_called_once_with(self.context, 'fake-node-id',
+                                              filters=None)
         get_ports_mock.assert_called_once_with(self.context, self.node.id)
         get_portgroups_mock.assert_called_once_with(self.context, self.node.id)
 
@@ -550,13 +672,141 @@ class TaskManagerTestCase(tests_db_base.DbTestCase):
         reserve_mock.return_value = self.node
         copy_mock.return_value = m
         t = task_manager.TaskManager('fake', 'fake')
-        copy_mock.assert_called_once_with()
+        copy_mock.assert_called_once_with(shallow=True)
         self.assertIs(m, t.fsm)
         m.initialize.assert_called_once_with(
             start_state=self.node.provision_state,
             target_state=self.node.target_provision_state)
 
 
+@mock.patch.object(driver_factory, 'build_driver_for_task')
+class AcquireManyTestCase(tests_db_base.DbTestCase):
+    def setUp(self):
+        super(AcquireManyTestCase, self).setUp()
+        self.host = 'test-host'
+        self.config(host=self.host)
+        self.node1 = obj_utils.create_test_node(
+            self.context, uuid=uuidutils.generate_uuid())
+        self.node2 = obj_utils.create_test_node(
+            self.context, uuid=uuidutils.generate_uuid(),
+            reservation='another-host')
+
+    def test_acquire_many(self, build_driver_mock):
+        node_ids = [self.node1.uuid, self.node2.uuid]
+        with mock.patch.object(objects.Node, 'reserve_many',
+                               wraps=objects.Node.reserve_many) as mock_res:
+            with task_manager.acquire_many(self.context, node_ids) as (
+                    tasks, failed):
+                self.assertEqual([self.node1.uuid], list(tasks))
+                task = tasks[self.node1.uuid]
+                self.assertFalse(task.shared)
+                self.assertEqual(self.node1.id, task.node.id)
+                self.assertEqual(self.host, task.node.reservation)
+                self.assertEqual(build_driver_mock.return_value, task.driver)
+                self.assertEqual([self.node2.uuid], list(failed))
+                self.assertIsInstance(failed[self.node2.uuid],
+                                      exception.NodeLocked)
+        mock_res.assert_called_once_with(self.context, self.host, node_ids)
+
+        self.assertIsNone(task.node)
+        self.node1.refresh()
+        self.assertIsNone(self.node1.reservation)
+        self.node2.refresh()
+        self.assertEqual('another-host', self.node2.reservation)
+
+    def test_acquire_many_releases_once(self, build_driver_mock):
+        node3 = obj_utils.create_test_node(self.context,
+                                           uuid=uuidutils.generate_uuid())
+        node_ids = [self.node1.id, node3.id]
+        with mock.patch.object(objects.Node, 'release_many',
+                               wraps=objects.Node.release_many) as mock_rel:
+            with task_manager.acquire_many(self.context, node_ids) as (
+                    tasks, failed):
+                self.assertEqual(set(node_ids), set(tasks))
+                self.assertEqual({}, failed)
+        mock_rel.assert_called_once_with(self.context, self.host, mock.ANY)
+        self.assertEqual(set(node_ids), set(mock_rel.call_args[0][2]))
+
+    def test_acquire_many_exception(self, build_driver_mock):
+        def _run():
+            with task_manager.acquire_many(self.context, [self.node1.id]):
+                raise exception.IronicException('boom')
+
+        self.assertRaises(exception.IronicException, _run)
+        self.node1.refresh()
+        self.assertIsNone(self.node1.reservation)
+
+    def test_acquire_many_task_failure(self, build_driver_mock):
+        build_driver_mock.side_effect = exception.DriverNotFound(
+            driver_name='foo')
+        with task_manager.acquire_many(self.context, [self.node1.id]) as (
+                tasks, failed):
+            self.assertEqual({}, tasks)
+            self.assertIsInstance(failed[self.node1.id],
+                                  exception.DriverNotFound)
+        self.node1.refresh()
+        self.assertIsNone(self.node1.reservation)
+
+    def test_acquire_many_spawn_after(self, build_driver_mock):
+        future_mock = mock.Mock(spec=['cancel', 'add_done_callback'])
+        spawn_mock = mock.Mock(return_value=future_mock)
+        with task_manager.acquire_many(self.context, [self.node1.id]) as (
+                tasks, failed):
+            task = tasks[self.node1.id]
+            task.spawn_after(spawn_mock, 1, 2, foo='bar')
+
+        spawn_mock.assert_called_once_with(1, 2, foo='bar')
+        future_mock.add_done_callback.assert_called_once_with(
+            task._thread_release_resources)
+        # The lock is kept until the spawned thread finishes
+        self.node1.refresh()
+        self.assertEqual(self.host, self.node1.reservation)
+
+
+class LockReleaseNotifierTestCase(tests_base.TestCase):
+    def setUp(self):
+        super(LockReleaseNotifierTestCase, self).setUp()
+        self.notifier = task_manager._LockReleaseNotifier()
+
+    def test_watch_timeout(self):
+        with self.notifier.watch('node') as wait:
+            self.assertEqual(1, len(self.notifier._waiters))
+            self.assertFalse(wait(0))
+        self.assertEqual({}, self.notifier._waiters)
+
+    def test_notify(self):
+        with self.notifier.watch('node') as wait:
+            self.notifier.notify('node', 1)
+            self.assertTrue(wait(10))
+        self.assertEqual({}, self.notifier._waiters)
+
+    def test_notify_by_id(self):
+        with self.notifier.watch('1') as wait:
+            with self.notifier.watch('other') as other_wait:
+                self.notifier.notify('node', 1)
+                self.assertTrue(wait(10))
+                self.assertFalse(other_wait(0))
+        self.assertEqual({}, self.notifier._waiters)
+
+    def test_notify_before_wait(self):
+        waiting = threading.Event()
+        with mock.patch.object(threading.Event, 'wait',
+                               autospec=True) as wait_mock:
+            def _wait(event, timeout):
+                waiting.set()
+                self.assertTrue(event.is_set())
+            wait_mock.side_effect = _wait
+            with self.notifier.watch('node') as wait:
+                self.notifier.notify('node', 1)
+                wait(10)
+        self.assertTrue(waiting.is_set())
+        self.assertEqual({}, self.notifier._waiters)
+
+    def test_notify_without_waiters(self):
+        self.notifier.notify('node', 1)
+        self.assertEqual({}, self.notifier._waiters)
+
+
 class TaskManagerStateModelTestCases(tests_base.TestCase):
     def setUp(self):
         super(TaskManagerStateModelTestCases, self).setUp()
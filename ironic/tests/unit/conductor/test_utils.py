@@ -891,3 +891,36 @@ class ErrorHandlersTestCase(tests_base.TestCase):
         conductor_utils.power_state_error_handler(exc, self.node, 'foo')
         self.assertFalse(self.node.save.called)
         self.assertFalse(log_mock.warning.called)
+
+
+class BMCAddressTestCase(tests_base.TestCase):
+
+    def test_get_bmc_address(self):
+        self.assertEqual('1.2.3.4', conductor_utils.get_bmc_address(
+            {'ipmi_address': '1.2.3.4', 'ipmi_username': 'admin'}))
+        self.assertEqual('drac', conductor_utils.get_bmc_address(
+            {'drac_host': 'drac'}))
+
+    def test_get_bmc_address_prefers_sorted_field(self):
+        self.assertEqual('bmc', conductor_utils.get_bmc_address(
+            {'ipmi_transit_address': 'transit', 'ipmi_address': 'bmc'}))
+
+    def test_get_bmc_address_unknown(self):
+        self.assertIsNone(conductor_utils.get_bmc_address({}))
+        self.assertIsNone(conductor_utils.get_bmc_address(None))
+        self.assertIsNone(conductor_utils.get_bmc_address(
+            {'ssh_address': '', 'deploy_kernel': 'kernel'}))
+
+    def test_interleave_by_bmc_address(self):
+        nodes = [('n1', {'ssh_address': 'h1'}),
+                 ('n2', {'ssh_address': 'h1'}),
+                 ('n3', {'ssh_address': 'h1'}),
+                 ('n4', {'ssh_address': 'h2'}),
+                 ('n5', {}),
+                 ('n6', {})]
+        result = conductor_utils.interleave_by_bmc_address(nodes, 1)
+        self.assertEqual(['n1', 'n4', 'n5', 'n6', 'n2', 'n3'],
+                         [n[0] for n in result])
+
+    def test_interleave_by_bmc_address_empty(self):
+        self.assertEqual([], conductor_utils.interleave_by_bmc_address([], 1))
@@ -0,0 +1,88 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Tests for the SQLAlchemy DB API statements that only some backends support.
+
+Like the migration tests, these are "opportunistic": they run against a
+PostgreSQL database named 'openstack_citest', see test_migrations for how
+to set it up, and are skipped when it is not available.
+"""
+
+from oslo_db.sqlalchemy import test_base
+from oslo_utils import uuidutils
+from sqlalchemy import orm
+
+import ironic.db.sqlalchemy.api as sa_api
+from ironic.db.sqlalchemy import models
+
+
+class ReserveNodePostgreSQL(test_base.PostgreSQLOpportunisticTestCase):
+
+    def setUp(self):
+        super(ReserveNodePostgreSQL, self).setUp()
+        models.Base.metadata.create_all(self.engine)
+        self.session = orm.sessionmaker(bind=self.engine)()
+        self.addCleanup(self.session.close)
+        self.dbapi = sa_api.get_backend()
+
+        self.uuid = uuidutils.generate_uuid()
+        self.properties = {'cpus': 4}
+        result = self.engine.execute(models.Node.__table__.insert().values(
+            uuid=self.uuid, driver='fake', properties=self.properties,
+            extra={}))
+        self.node_id = result.inserted_primary_key[0]
+
+    def _get_reservation(self):
+        nodes = models.Node.__table__
+        return self.engine.execute(
+            nodes.select().where(nodes.c.id == self.node_id)
+        ).first()['reservation']
+
+    def test_update_returning_supported(self):
+        self.assertTrue(sa_api._update_returning_supported(self.session))
+
+    def test_reserve_by_uuid(self):
+        node = self.dbapi._reserve_node_returning(self.session, 'host1',
+                                                  self.uuid)
+        self.session.commit()
+
+        self.assertIsInstance(node, models.Node)
+        self.assertEqual(self.node_id, node.id)
+        self.assertEqual(self.uuid, node.uuid)
+        self.assertEqual('fake', node.driver)
+        self.assertEqual('host1', node.reservation)
+        self.assertEqual(self.properties, node.properties)
+        self.assertEqual({}, node.extra)
+        self.assertEqual('host1', self._get_reservation())
+
+    def test_reserve_by_id(self):
+        node = self.dbapi._reserve_node_returning(self.session, 'host1',
+                                                  self.node_id)
+        self.session.commit()
+
+        self.assertEqual(self.uuid, node.uuid)
+        self.assertEqual('host1', self._get_reservation())
+
+    def test_reserve_locked(self):
+        self.dbapi._reserve_node_returning(self.session, 'host1', self.uuid)
+        self.session.commit()
+
+        self.assertIsNone(self.dbapi._reserve_node_returning(
+            self.session, 'host2', self.uuid))
+        self.session.commit()
+        self.assertEqual('host1', self._get_reservation())
+
+    def test_reserve_not_found(self):
+        self.assertIsNone(self.dbapi._reserve_node_returning(
+            self.session, 'host1', uuidutils.generate_uuid()))
+        self.assertIsNone(self._get_reservation())
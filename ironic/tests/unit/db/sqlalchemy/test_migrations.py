@@ -537,6 +537,32 @@ class MigrationCheckersMixin(object):
                               (sqlalchemy.types.Boolean,
                                sqlalchemy.types.Integer))
 
+    def _check_b4130a7fc904(self, engine, data):
+        indexes = {idx['name']: idx['column_names'] for idx in
+                   sqlalchemy.inspect(engine).get_indexes('nodes')}
+        self.assertEqual(
+            ['provision_state', 'maintenance', 'provision_updated_at'],
+            indexes['provision_maintenance_update_idx'])
+        self.assertEqual(['provision_state', 'inspection_started_at'],
+                         indexes['provision_inspection_started_idx'])
+        self.assertEqual(['reservation'], indexes['reservation_idx'])
+        self.assertEqual(['driver'], indexes['driver_idx'])
+        self.assertEqual(['console_enabled'], indexes['console_enabled_idx'])
+
+    def _check_828a25081473(self, engine, data):
+        inspector = sqlalchemy.inspect(engine)
+        indexes = {idx['name']: idx['column_names'] for idx in
+                   inspector.get_indexes('nodes')}
+        self.assertEqual(['created_at', 'id'],
+                         indexes['nodes_created_at_idx'])
+        self.assertEqual(['provision_state', 'id'],
+                         indexes['nodes_provision_state_idx'])
+        for table in ('ports', 'portgroups'):
+            indexes = {idx['name']: idx['column_names'] for idx in
+                       inspector.get_indexes(table)}
+            self.assertEqual(['created_at', 'id'],
+                             indexes['%s_created_at_idx' % table])
+
     def test_upgrade_and_version(self):
         with patch_with_engine(self.engine):
             self.migration_api.upgrade('head')
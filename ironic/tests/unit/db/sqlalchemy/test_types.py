@@ -41,6 +41,22 @@ class SqlAlchemyCustomTypesTestCase(base.DbTestCase):
         ch2 = sa_api.model_query(models.Chassis).filter_by(uuid=ch2_id).one()
         self.assertEqual(extra, ch2.extra)
 
+    def test_LazyJSONEncodedDict_decoded_on_access(self):
+        ch_id = uuidutils.generate_uuid()
+        extra = {'foo1': 'test'}
+        self.dbapi.create_chassis({'uuid': ch_id, 'extra': extra})
+        ch = sa_api.model_query(models.Chassis).filter_by(uuid=ch_id).one()
+        self.assertFalse(ch.is_json_decoded('extra'))
+        self.assertTrue(ch.is_json_decoded('uuid'))
+
+        self.assertEqual(extra, ch.extra)
+        self.assertTrue(ch.is_json_decoded('extra'))
+        self.assertIs(ch.extra, ch.extra)
+
+        ch.extra = {'foo2': 'other'}
+        self.assertEqual({'foo2': 'other'}, ch.extra)
+        self.assertEqual({'foo2': 'other'}, ch._extra)
+
     def test_JSONEncodedDict_type_check(self):
         self.assertRaises(db_exc.DBError,
                           self.dbapi.create_chassis,
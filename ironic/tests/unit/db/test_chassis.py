@@ -58,6 +58,14 @@ class DbChassisTestCase(base.DbTestCase):
 
         self.assertEqual('hello', res.description)
 
+    def test_update_chassis_extra(self):
+        extra = {'foo': 'bar'}
+        res = self.dbapi.update_chassis(self.chassis.id, {'extra': extra})
+        self.assertEqual(extra, res.extra)
+
+        res = self.dbapi.get_chassis_by_id(self.chassis.id)
+        self.assertEqual(extra, res.extra)
+
     def test_update_chassis_that_does_not_exist(self):
         self.assertRaises(exception.ChassisNotFound,
                           self.dbapi.update_chassis, 666, {'description': ''})
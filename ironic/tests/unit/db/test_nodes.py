@@ -24,6 +24,7 @@ import six
 
 from ironic.common import exception
 from ironic.common import states
+from ironic.db.sqlalchemy import api as sa_api
 from ironic.tests.unit.db import base
 from ironic.tests.unit.db import utils
 
@@ -64,20 +65,45 @@ class DbNodeTestCase(base.DbTestCase):
         res = self.dbapi.get_node_by_id(node.id)
         self.assertEqual(node.id, res.id)
         self.assertEqual(node.uuid, res.uuid)
+        self.assertNotIn('tags', res.__dict__)
+
+    def test_get_node_by_id_with_tags(self):
+        node = utils.create_test_node()
+        self.dbapi.set_node_tags(node.id, ['tag1', 'tag2'])
+        res = self.dbapi.get_node_by_id(node.id, with_tags=True)
+        self.assertEqual(node.id, res.id)
         self.assertItemsEqual(['tag1', 'tag2'], [tag.tag for tag in res.tags])
 
     def test_get_node_by_uuid(self):
         node = utils.create_test_node()
         self.dbapi.set_node_tags(node.id, ['tag1', 'tag2'])
-        res = self.dbapi.get_node_by_uuid(node.uuid)
+        res = self.dbapi.get_node_by_uuid(node.uuid, with_tags=True)
         self.assertEqual(node.id, res.id)
         self.assertEqual(node.uuid, res.uuid)
         self.assertItemsEqual(['tag1', 'tag2'], [tag.tag for tag in res.tags])
 
+    def test_get_node_by_uuid_with_filters(self):
+        node = utils.create_test_node(provision_state=states.DEPLOYWAIT)
+        res = self.dbapi.get_node_by_uuid(
+            node.uuid, filters={'provision_state': states.DEPLOYWAIT})
+        self.assertEqual(node.id, res.id)
+        self.assertRaises(exception.NodeNotFound,
+                          self.dbapi.get_node_by_uuid, node.uuid,
+                          filters={'provision_state_not_in':
+                                   [states.DEPLOYWAIT]})
+
+    def test_get_node_by_id_with_filters(self):
+        node = utils.create_test_node(reservation='fake-host')
+        res = self.dbapi.get_node_by_id(node.id, filters={'reserved': True})
+        self.assertEqual(node.uuid, res.uuid)
+        self.assertRaises(exception.NodeNotFound,
+                          self.dbapi.get_node_by_id, node.id,
+                          filters={'reserved': False})
+
     def test_get_node_by_name(self):
         node = utils.create_test_node()
         self.dbapi.set_node_tags(node.id, ['tag1', 'tag2'])
-        res = self.dbapi.get_node_by_name(node.name)
+        res = self.dbapi.get_node_by_name(node.name, with_tags=True)
         self.assertEqual(node.id, res.id)
         self.assertEqual(node.uuid, res.uuid)
         self.assertEqual(node.name, res.name)
@@ -114,6 +140,19 @@ class DbNodeTestCase(base.DbTestCase):
         self.assertEqual(extras, dict((r[0], r[1]) for r in res))
         self.assertEqual(uuids, dict((r[0], r[2]) for r in res))
 
+    def test_get_nodeinfo_list_with_json_cols(self):
+        driver_info = {'ipmi_address': '1.2.3.4'}
+        driver_internal_info = {'is_whole_disk_image': True}
+        node = utils.create_test_node(
+            driver_info=driver_info,
+            driver_internal_info=driver_internal_info)
+        res = self.dbapi.get_nodeinfo_list(
+            columns=['uuid', 'driver', 'id', 'driver_info',
+                     'driver_internal_info'])
+        self.assertEqual([(node.uuid, node.driver, node.id, driver_info,
+                           driver_internal_info)],
+                         [tuple(r) for r in res])
+
     def test_get_nodeinfo_list_with_filters(self):
         node1 = utils.create_test_node(
             driver='driver-one',
@@ -192,6 +231,43 @@ class DbNodeTestCase(base.DbTestCase):
                                                     states.DEPLOYWAIT})
         self.assertEqual([node2.id], [r[0] for r in res])
 
+        res = self.dbapi.get_nodeinfo_list(
+            filters={'provision_state_in': [states.DEPLOYWAIT,
+                                            states.CLEANWAIT]})
+        self.assertEqual([node2.id], [r[0] for r in res])
+
+        res = self.dbapi.get_nodeinfo_list(
+            filters={'provision_state_not_in': [states.DEPLOYWAIT]})
+        self.assertNotIn(node2.id, [r[0] for r in res])
+        self.assertIn(node1.id, [r[0] for r in res])
+
+    def test_get_nodeinfo_list_provision_state_not_in_nostate(self):
+        node1 = utils.create_test_node(uuid=uuidutils.generate_uuid(),
+                                       provision_state=states.NOSTATE)
+        utils.create_test_node(uuid=uuidutils.generate_uuid(),
+                               provision_state=states.DEPLOYWAIT)
+        node2 = utils.create_test_node(uuid=uuidutils.generate_uuid(),
+                                       provision_state=states.ACTIVE)
+
+        res = self.dbapi.get_nodeinfo_list(
+            filters={'provision_state_not_in': [states.DEPLOYWAIT]})
+        self.assertEqual(sorted([node1.id, node2.id]),
+                         sorted(r[0] for r in res))
+
+    def test_get_nodeinfo_list_target_power_state(self):
+        node1 = utils.create_test_node(uuid=uuidutils.generate_uuid(),
+                                       target_power_state=None)
+        node2 = utils.create_test_node(uuid=uuidutils.generate_uuid(),
+                                       target_power_state=states.POWER_ON)
+
+        res = self.dbapi.get_nodeinfo_list(
+            filters={'target_power_state': None})
+        self.assertEqual([node1.id], [r[0] for r in res])
+
+        res = self.dbapi.get_nodeinfo_list(
+            filters={'target_power_state': states.POWER_ON})
+        self.assertEqual([node2.id], [r[0] for r in res])
+
     @mock.patch.object(timeutils, 'utcnow', autospec=True)
     def test_get_nodeinfo_list_inspection(self, mock_utcnow):
         past = datetime.datetime(2000, 1, 1, 0, 0)
@@ -226,9 +302,28 @@ class DbNodeTestCase(base.DbTestCase):
         res = self.dbapi.get_node_list()
         res_uuids = [r.uuid for r in res]
         six.assertCountEqual(self, uuids, res_uuids)
+        for r in res:
+            self.assertNotIn('tags', r.__dict__)
+
+        res = self.dbapi.get_node_list(with_tags=True)
         for r in res:
             self.assertEqual([], r.tags)
 
+    def test_get_node_list_fields(self):
+        node = utils.create_test_node(uuid=uuidutils.generate_uuid())
+        self.dbapi.set_node_tags(node.id, ['tag1'])
+        res = self.dbapi.get_node_list(fields=['id', 'uuid', 'power_state'])
+        self.assertEqual([node.uuid], [r.uuid for r in res])
+        self.assertEqual([node.power_state], [r.power_state for r in res])
+        for name in ('_properties', '_driver_info', 'tags'):
+            self.assertNotIn(name, res[0].__dict__)
+
+    def test_get_node_list_fields_tags(self):
+        node = utils.create_test_node(uuid=uuidutils.generate_uuid())
+        self.dbapi.set_node_tags(node.id, ['tag1'])
+        res = self.dbapi.get_node_list(fields=['id'], with_tags=True)
+        self.assertEqual(['tag1'], [t.tag for t in res[0].tags])
+
     def test_get_node_list_with_filters(self):
         ch1 = utils.create_test_chassis(uuid=uuidutils.generate_uuid())
         ch2 = utils.create_test_chassis(uuid=uuidutils.generate_uuid())
@@ -285,7 +380,8 @@ class DbNodeTestCase(base.DbTestCase):
             instance_uuid='12345678-9999-0000-aaaa-123456789012')
         self.dbapi.set_node_tags(node.id, ['tag1', 'tag2'])
 
-        res = self.dbapi.get_node_by_instance(node.instance_uuid)
+        res = self.dbapi.get_node_by_instance(node.instance_uuid,
+                                              with_tags=True)
         self.assertEqual(node.uuid, res.uuid)
         self.assertItemsEqual(['tag1', 'tag2'], [tag.tag for tag in res.tags])
 
@@ -466,7 +562,8 @@ class DbNodeTestCase(base.DbTestCase):
 
         # reserve the node
         res = self.dbapi.reserve_node(r1, uuid)
-        self.assertItemsEqual(['tag1', 'tag2'], [tag.tag for tag in res.tags])
+        self.assertEqual(r1, res.reservation)
+        self.assertNotIn('tags', res.__dict__)
 
         # check reservation
         res = self.dbapi.get_node_by_uuid(uuid)
@@ -517,6 +614,32 @@ class DbNodeTestCase(base.DbTestCase):
         res = self.dbapi.get_node_by_uuid(uuid)
         self.assertEqual(r2, res.reservation)
 
+    @mock.patch.object(sa_api.Connection, '_reserve_node_returning',
+                       autospec=True)
+    @mock.patch.object(sa_api, '_update_returning_supported', autospec=True,
+                       return_value=True)
+    def test_reserve_node_update_returning(self, mock_supported,
+                                           mock_reserve):
+        node = utils.create_test_node()
+        mock_reserve.return_value = node
+        res = self.dbapi.reserve_node('fake-reservation', node.uuid)
+        self.assertIs(node, res)
+        mock_reserve.assert_called_once_with(self.dbapi, mock.ANY,
+                                             'fake-reservation', node.uuid)
+
+    @mock.patch.object(sa_api.Connection, '_reserve_node_returning',
+                       autospec=True, return_value=None)
+    @mock.patch.object(sa_api, '_update_returning_supported', autospec=True,
+                       return_value=True)
+    def test_reserve_node_update_returning_locked(self, mock_supported,
+                                                  mock_reserve):
+        node = utils.create_test_node(reservation='another-host')
+        exc = self.assertRaises(exception.NodeLocked, self.dbapi.reserve_node,
+                                'fake-reservation', node.uuid)
+        self.assertIn('another-host', str(exc))
+        self.assertRaises(exception.NodeNotFound, self.dbapi.reserve_node,
+                          'fake-reservation', uuidutils.generate_uuid())
+
     def test_reservation_in_exception_message(self):
         node = utils.create_test_node()
         uuid = node.uuid
@@ -554,6 +677,87 @@ class DbNodeTestCase(base.DbTestCase):
         self.assertRaises(exception.NodeNotLocked,
                           self.dbapi.release_node, 'fake', node.uuid)
 
+    def test_reserve_nodes(self):
+        node1 = utils.create_test_node(uuid=uuidutils.generate_uuid())
+        self.dbapi.set_node_tags(node1.id, ['tag1'])
+        node2 = utils.create_test_node(uuid=uuidutils.generate_uuid())
+        node3 = utils.create_test_node(uuid=uuidutils.generate_uuid(),
+                                       reservation='another-host')
+        missing = uuidutils.generate_uuid()
+
+        reserved, failed = self.dbapi.reserve_nodes(
+            'fake-reservation', [node1.uuid, node2.id, node3.uuid, missing])
+
+        self.assertEqual(set([node1.uuid, node2.id]), set(reserved))
+        self.assertEqual(node1.id, reserved[node1.uuid].id)
+        self.assertEqual(node2.uuid, reserved[node2.id].uuid)
+        self.assertNotIn('tags', reserved[node1.uuid].__dict__)
+        self.assertEqual(set([node3.uuid, missing]), set(failed))
+        self.assertIsInstance(failed[node3.uuid], exception.NodeLocked)
+        self.assertIsInstance(failed[missing], exception.NodeNotFound)
+
+        for node in (node1, node2):
+            res = self.dbapi.get_node_by_id(node.id)
+            self.assertEqual('fake-reservation', res.reservation)
+        res = self.dbapi.get_node_by_id(node3.id)
+        self.assertEqual('another-host', res.reservation)
+
+    def test_reserve_nodes_already_reserved(self):
+        node = utils.create_test_node()
+        self.dbapi.reserve_node('fake-reservation', node.id)
+
+        reserved, failed = self.dbapi.reserve_nodes('fake-reservation',
+                                                    [node.id])
+        self.assertEqual({}, reserved)
+        self.assertIsInstance(failed[node.id], exception.NodeLocked)
+
+    def test_reserve_nodes_duplicate(self):
+        node = utils.create_test_node()
+
+        reserved, failed = self.dbapi.reserve_nodes(
+            'fake-reservation', [node.uuid, node.id])
+
+        self.assertEqual([node.id], list(reserved))
+        self.assertEqual([node.uuid], list(failed))
+        self.assertIsInstance(failed[node.uuid],
+                              exception.InvalidParameterValue)
+        self.assertEqual('fake-reservation',
+                         self.dbapi.get_node_by_id(node.id).reservation)
+
+    def test_release_nodes_duplicate(self):
+        node = utils.create_test_node(reservation='fake-reservation')
+
+        failed = self.dbapi.release_nodes('fake-reservation',
+                                          [node.id, node.uuid])
+
+        self.assertEqual([node.uuid], list(failed))
+        self.assertIsInstance(failed[node.uuid],
+                              exception.InvalidParameterValue)
+        self.assertIsNone(self.dbapi.get_node_by_id(node.id).reservation)
+
+    def test_reserve_nodes_invalid_identity(self):
+        self.assertRaises(exception.InvalidIdentity,
+                          self.dbapi.reserve_nodes, 'fake', ['not-a-uuid'])
+
+    def test_release_nodes(self):
+        node1 = utils.create_test_node(uuid=uuidutils.generate_uuid(),
+                                       reservation='fake-reservation')
+        node2 = utils.create_test_node(uuid=uuidutils.generate_uuid(),
+                                       reservation='another-host')
+        node3 = utils.create_test_node(uuid=uuidutils.generate_uuid())
+        missing = uuidutils.generate_uuid()
+
+        failed = self.dbapi.release_nodes(
+            'fake-reservation', [node1.uuid, node2.id, node3.uuid, missing])
+
+        self.assertEqual(set([node2.id, node3.uuid, missing]), set(failed))
+        self.assertIsInstance(failed[node2.id], exception.NodeLocked)
+        self.assertIsInstance(failed[node3.uuid], exception.NodeNotLocked)
+        self.assertIsInstance(failed[missing], exception.NodeNotFound)
+        self.assertIsNone(self.dbapi.get_node_by_id(node1.id).reservation)
+        self.assertEqual('another-host',
+                         self.dbapi.get_node_by_id(node2.id).reservation)
+
     @mock.patch.object(timeutils, 'utcnow', autospec=True)
     def test_touch_node_provisioning(self, mock_utcnow):
         test_time = datetime.datetime(2000, 1, 1, 0, 0)
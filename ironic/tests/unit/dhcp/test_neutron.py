@@ -234,10 +234,10 @@ class TestNeutron(db_base.DbTestCase):
         self.config(port_setup_delay=30, group='neutron')
         with task_manager.acquire(self.context,
                                   self.node.uuid) as task:
-            task.driver.power = ssh.SSHPower()
-            opts = pxe_utils.dhcp_options_for_instance(task)
-            api = dhcp_factory.DHCPFactory()
-            api.update_dhcp(task, opts)
+            with mock.patch.object(task.driver, 'power', ssh.SSHPower()):
+                opts = pxe_utils.dhcp_options_for_instance(task)
+                api = dhcp_factory.DHCPFactory()
+                api.update_dhcp(task, opts)
             mock_ts.assert_called_with(30)
         mock_updo.assert_called_once_with(mock.ANY, 'vif-uuid', opts,
                                           token=self.context.auth_token)
@@ -254,9 +254,9 @@ class TestNeutron(db_base.DbTestCase):
         with task_manager.acquire(self.context,
                                   self.node.uuid) as task:
             opts = pxe_utils.dhcp_options_for_instance(task)
-            task.driver.power = ssh.SSHPower()
-            api = dhcp_factory.DHCPFactory()
-            api.update_dhcp(task, opts)
+            with mock.patch.object(task.driver, 'power', ssh.SSHPower()):
+                api = dhcp_factory.DHCPFactory()
+                api.update_dhcp(task, opts)
             self.assertTrue(mock_log.warning.called)
             self.assertIn('Setting the port delay to 15 for SSH',
                           mock_log.warning.call_args[0][0])
@@ -716,9 +716,8 @@ class TestAgentVendor(db_base.DbTestCase):
                                   shared=False) as task:
             get_power_state_mock.return_value = states.POWER_OFF
             task.node.driver_internal_info['is_whole_disk_image'] = True
-            task.driver.boot = None
-
-            self.passthru.reboot_to_instance(task)
+            with mock.patch.object(task.driver, 'boot', None):
+                self.passthru.reboot_to_instance(task)
 
             self.assertFalse(clean_pxe_mock.called)
             self.assertFalse(prepare_mock.called)
@@ -760,8 +759,8 @@ class TestAgentVendor(db_base.DbTestCase):
                                   shared=False) as task:
             get_power_state_mock.return_value = states.POWER_OFF
             task.node.driver_internal_info['is_whole_disk_image'] = True
-            task.driver.boot = None
-            self.passthru.reboot_to_instance(task)
+            with mock.patch.object(task.driver, 'boot', None):
+                self.passthru.reboot_to_instance(task)
 
             self.assertFalse(clean_pxe_mock.called)
             self.assertFalse(prepare_mock.called)
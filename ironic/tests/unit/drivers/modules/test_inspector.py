@@ -150,8 +150,8 @@ class CheckStatusTestCase(BaseTestCase):
         self.assertFalse(mock_get.called)
 
     def test_not_inspector(self, mock_init, mock_get):
-        self.task.driver.inspect = object()
-        inspector._check_status(self.task)
+        with mock.patch.object(self.task.driver, 'inspect', object()):
+            inspector._check_status(self.task)
         self.assertFalse(mock_get.called)
 
     def test_not_finished(self, mock_init, mock_get):
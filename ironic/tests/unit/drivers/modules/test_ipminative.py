@@ -264,6 +264,14 @@ class IPMINativeDriverTestCase(db_base.DbTestCase):
         self.assertEqual(sorted(expected),
                          sorted(self.driver.get_properties().keys()))
 
+    @mock.patch('pyghmi.ipmi.command.Command', autospec=True)
+    def test_get_power_states_bulk(self, ipmi_mock):
+        ipmi_mock.return_value.get_power.return_value = {'powerstate': 'on'}
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            self.assertTrue(self.driver.power.supports_bulk_power_states)
+            result = self.driver.power.get_power_states_bulk([task])
+        self.assertEqual({self.node.uuid: states.POWER_ON}, result)
+
     @mock.patch('pyghmi.ipmi.command.Command', autospec=True)
     def test_get_power_state(self, ipmi_mock):
         # Getting the mocked command.
@@ -22,6 +22,7 @@
 
 import contextlib
 import os
+import select
 import stat
 import subprocess
 import tempfile
@@ -328,6 +329,238 @@ class IPMIToolCheckOptionSupportedTestCase(base.TestCase):
         self.assertEqual(expected, mock_support.call_args_list)
 
 
+class IPMIToolSessionPoolTestCase(base.TestCase):
+
+    def setUp(self):
+        super(IPMIToolSessionPoolTestCase, self).setUp()
+        self.pool = ipmi._IPMISessionPool()
+        self.args = ['ipmitool', '-I', 'lanplus', '-H', '1.2.3.4']
+
+    @mock.patch.object(ipmi, '_IPMIShellSession', autospec=True)
+    def test_execute_reuses_session(self, mock_session_cls):
+        session = mock_session_cls.return_value
+        session.lock = mock.MagicMock()
+        session.last_used = time.time()
+        session.execute.return_value = ('Chassis Power is on\n', '')
+
+        for i in range(2):
+            self.assertEqual(('Chassis Power is on\n', ''),
+                             self.pool.execute(self.args, 'pass',
+                                               'power status'))
+
+        mock_session_cls.assert_called_once_with(self.args, 'pass')
+        self.assertEqual([mock.call('power status')] * 2,
+                         session.execute.call_args_list)
+        self.assertFalse(session.close.called)
+
+    @mock.patch.object(ipmi, '_IPMIShellSession', autospec=True)
+    def test_execute_different_credentials(self, mock_session_cls):
+        mock_session_cls.return_value.lock = mock.MagicMock()
+        mock_session_cls.return_value.last_used = time.time()
+        mock_session_cls.return_value.execute.return_value = ('', '')
+
+        self.pool.execute(self.args, 'pass', 'power status')
+        self.pool.execute(self.args, 'other', 'power status')
+
+        self.assertEqual([mock.call(self.args, 'pass'),
+                          mock.call(self.args, 'other')],
+                         mock_session_cls.call_args_list)
+
+    @mock.patch.object(ipmi, '_IPMIShellSession', autospec=True)
+    def test_execute_failure_discards_session(self, mock_session_cls):
+        session = mock_session_cls.return_value
+        session.lock = mock.MagicMock()
+        session.last_used = time.time()
+        session.execute.side_effect = processutils.ProcessExecutionError()
+
+        self.assertRaises(processutils.ProcessExecutionError,
+                          self.pool.execute, self.args, 'pass',
+                          'power status')
+        session.close.assert_called_once_with()
+
+        session.execute.side_effect = None
+        session.execute.return_value = ('', '')
+        self.pool.execute(self.args, 'pass', 'power status')
+        self.assertEqual(2, mock_session_cls.call_count)
+
+    @mock.patch.object(ipmi, '_IPMIShellSession', autospec=True)
+    def test_execute_does_not_evict_idle_sessions(self, mock_session_cls):
+        self.config(session_idle_timeout=60, group='ipmi')
+        idle = mock.Mock(last_used=time.time() - 120, lock=mock.MagicMock())
+        idle.lock.locked.return_value = False
+        self.pool._sessions[('idle',)] = idle
+        mock_session_cls.return_value.lock = mock.MagicMock()
+        mock_session_cls.return_value.last_used = time.time()
+        mock_session_cls.return_value.execute.return_value = ('', '')
+
+        self.pool.execute(self.args, 'pass', 'power status')
+
+        self.assertFalse(idle.close.called)
+        self.assertIn(('idle',), self.pool._sessions)
+
+    def test_evict_idle(self):
+        self.config(session_idle_timeout=60, group='ipmi')
+        idle, busy, recent = [mock.Mock(lock=mock.MagicMock())
+                              for i in range(3)]
+        idle.last_used = busy.last_used = time.time() - 120
+        recent.last_used = time.time()
+        idle.lock.locked.return_value = False
+        busy.lock.locked.return_value = True
+        recent.lock.locked.return_value = False
+        self.pool._sessions = {('idle',): idle, ('busy',): busy,
+                               ('recent',): recent}
+
+        self.pool.evict_idle()
+
+        idle.close.assert_called_once_with()
+        self.assertFalse(busy.close.called)
+        self.assertFalse(recent.close.called)
+        self.assertEqual({('busy',): busy, ('recent',): recent},
+                         self.pool._sessions)
+
+    def test_close_all(self):
+        sessions = [mock.Mock(), mock.Mock()]
+        self.pool._sessions = {('a',): sessions[0], ('b',): sessions[1]}
+
+        self.pool.close_all()
+
+        for session in sessions:
+            session.close.assert_called_once_with()
+        self.assertEqual({}, self.pool._sessions)
+
+
+@mock.patch.object(ipmi, '_make_password_file', autospec=True)
+@mock.patch.object(os, 'read', autospec=True)
+@mock.patch.object(select, 'select', autospec=True)
+@mock.patch.object(subprocess, 'Popen')
+class IPMIToolShellSessionTestCase(base.TestCase):
+
+    def setUp(self):
+        super(IPMIToolShellSessionTestCase, self).setUp()
+        self.args = ['ipmitool', '-I', 'lanplus', '-H', '1.2.3.4']
+
+    def _start(self, mock_popen, mock_select, mock_read, mock_pwfile,
+               output):
+        mock_pwfile.return_value.__enter__.return_value = 'pwfile'
+        mock_select.side_effect = lambda r, w, x, t: (r, w, x)
+        mock_read.side_effect = [b'ipmitool> '] + output
+        return ipmi._IPMIShellSession(self.args, 'pass')
+
+    def test_start(self, mock_popen, mock_select, mock_read, mock_pwfile):
+        self._start(mock_popen, mock_select, mock_read, mock_pwfile, [])
+        mock_pwfile.assert_called_once_with('pass')
+        mock_popen.assert_called_once_with(
+            self.args + ['-f', 'pwfile', 'shell'], stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, close_fds=True)
+
+    def test_start_exited(self, mock_popen, mock_select, mock_read,
+                          mock_pwfile):
+        mock_pwfile.return_value.__enter__.return_value = 'pwfile'
+        mock_select.side_effect = lambda r, w, x, t: (r, w, x)
+        mock_read.return_value = b''
+        mock_popen.return_value.poll.return_value = 1
+
+        self.assertRaises(processutils.ProcessExecutionError,
+                          ipmi._IPMIShellSession, self.args, 'pass')
+        mock_popen.return_value.wait.assert_called_once_with()
+
+    def test_execute(self, mock_popen, mock_select, mock_read, mock_pwfile):
+        session = self._start(
+            mock_popen, mock_select, mock_read, mock_pwfile,
+            [b'power status\nChassis Power ', b'is on\nipmitool> '])
+
+        self.assertEqual(('Chassis Power is on\n', ''),
+                         session.execute('power status'))
+        mock_popen.return_value.stdin.write.assert_called_once_with(
+            b'power status\n')
+
+    def test_execute_error(self, mock_popen, mock_select, mock_read,
+                           mock_pwfile):
+        session = self._start(
+            mock_popen, mock_select, mock_read, mock_pwfile,
+            [b'Error: Unable to establish IPMI v2 / RMCP+ session\n'
+             b'ipmitool> '])
+
+        self.assertRaises(processutils.ProcessExecutionError,
+                          session.execute, 'power status')
+
+    def test_execute_timeout(self, mock_popen, mock_select, mock_read,
+                             mock_pwfile):
+        session = self._start(mock_popen, mock_select, mock_read,
+                              mock_pwfile, [])
+        mock_select.side_effect = None
+        mock_select.return_value = ([], [], [])
+
+        self.assertRaises(processutils.ProcessExecutionError,
+                          session.execute, 'power status')
+
+
+@mock.patch.object(time, 'sleep', autospec=True)
+class IPMIToolBMCCommandSchedulerTestCase(base.TestCase):
+
+    def setUp(self):
+        super(IPMIToolBMCCommandSchedulerTestCase, self).setUp()
+        self.config(min_command_interval=5, group='ipmi')
+        self.scheduler = ipmi._BMCCommandScheduler()
+
+    def test_slot_first_call(self, mock_sleep):
+        with self.scheduler.slot('1.2.3.4'):
+            pass
+        self.assertFalse(mock_sleep.called)
+        self.assertIn('1.2.3.4', self.scheduler._bmcs)
+
+    def test_slot_second_call_same_address(self, mock_sleep):
+        with self.scheduler.slot('1.2.3.4'):
+            pass
+        with self.scheduler.slot('1.2.3.4'):
+            pass
+        self.assertEqual(1, mock_sleep.call_count)
+        delay = mock_sleep.call_args[0][0]
+        self.assertTrue(0 < delay <= 5)
+
+    def test_slot_different_address(self, mock_sleep):
+        with self.scheduler.slot('1.2.3.4'):
+            pass
+        with self.scheduler.slot('5.6.7.8'):
+            pass
+        self.assertFalse(mock_sleep.called)
+
+    def test_slot_interval_passed(self, mock_sleep):
+        with self.scheduler.slot('1.2.3.4'):
+            pass
+        self.scheduler._bmcs['1.2.3.4'].last_done = time.time() - 5
+        with self.scheduler.slot('1.2.3.4'):
+            pass
+        self.assertFalse(mock_sleep.called)
+
+    def test_slot_exception(self, mock_sleep):
+        def _fail():
+            with self.scheduler.slot('1.2.3.4'):
+                raise ValueError()
+
+        self.assertRaises(ValueError, _fail)
+        bmc = self.scheduler._bmcs['1.2.3.4']
+        self.assertNotEqual(0, bmc.last_done)
+        self.assertEqual(0, bmc.users)
+        self.assertFalse(bmc.lock.locked())
+
+    def test_slot_evicts_idle(self, mock_sleep):
+        with self.scheduler.slot('1.2.3.4'):
+            pass
+        self.scheduler._bmcs['1.2.3.4'].last_done = time.time() - 10
+        with self.scheduler.slot('5.6.7.8'):
+            pass
+        self.assertEqual(['5.6.7.8'], list(self.scheduler._bmcs))
+
+    def test_slot_does_not_evict_busy(self, mock_sleep):
+        with self.scheduler.slot('1.2.3.4'):
+            self.scheduler._bmcs['1.2.3.4'].last_done = time.time() - 10
+            with self.scheduler.slot('5.6.7.8'):
+                pass
+            self.assertEqual(['1.2.3.4', '5.6.7.8'],
+                             list(self.scheduler._bmcs))
+
+
 awesome_password_filename = 'awesome_password_filename'
 
 
@@ -341,6 +574,7 @@ class IPMIToolPrivateMethodTestCase(db_base.DbTestCase):
 
     def setUp(self):
         super(IPMIToolPrivateMethodTestCase, self).setUp()
+        ipmi._PARSED_DRIVER_INFO.clear()
         self.node = obj_utils.get_test_node(
             self.context,
             driver='fake_ipmitool',
@@ -614,6 +848,42 @@ class IPMIToolPrivateMethodTestCase(db_base.DbTestCase):
         self.assertEqual(six.u('12345678'), ret['password'])
         self.assertIsInstance(ret['password'], six.text_type)
 
+    @mock.patch.object(ipmi, '_parse_driver_info_uncached', autospec=True)
+    def test__parse_driver_info_cached(self, mock_parse, mock_sleep):
+        info = ipmi._parse_driver_info(self.node)
+        self.assertFalse(mock_parse.called)
+        self.assertEqual(self.info, info)
+        info['address'] = 'changed'
+        self.assertNotEqual(info, ipmi._parse_driver_info(self.node))
+
+    def test__parse_driver_info_cache_invalidated(self, mock_sleep):
+        self.node.driver_info = dict(INFO_DICT, ipmi_address='10.0.0.1')
+        info = ipmi._parse_driver_info(self.node)
+        self.assertEqual('10.0.0.1', info['address'])
+        self.node.properties = {'capabilities': 'hardware_model:gen9'}
+        info = ipmi._parse_driver_info(self.node)
+        self.assertEqual('gen9', info['hardware_model'])
+
+    def test__parse_driver_info_invalid_not_cached(self, mock_sleep):
+        self.node.driver_info = dict(INFO_DICT, ipmi_priv_level='ABCD')
+        self.assertRaises(exception.InvalidParameterValue,
+                          ipmi._parse_driver_info, self.node)
+        self.assertNotIn(self.node.uuid, ipmi._PARSED_DRIVER_INFO)
+
+    @mock.patch.object(ipmi, '_PARSED_DRIVER_INFO_MAX', 1)
+    def test__parse_driver_info_cache_evicts(self, mock_sleep):
+        node = obj_utils.get_test_node(
+            self.context, uuid=uuidutils.generate_uuid(),
+            driver='fake_ipmitool', driver_info=INFO_DICT)
+        ipmi._parse_driver_info(node)
+        self.assertEqual([node.uuid], list(ipmi._PARSED_DRIVER_INFO))
+
+    def test__parse_driver_info_hardware_model(self, mock_sleep):
+        self.assertEqual(self.node.driver, self.info['hardware_model'])
+        self.node.properties = {'capabilities': 'hardware_model:gen9'}
+        info = ipmi._parse_driver_info(self.node)
+        self.assertEqual('gen9', info['hardware_model'])
+
     def test__parse_driver_info_ipmi_prot_version_1_5(self, mock_sleep):
         info = dict(INFO_DICT)
         info['ipmi_protocol_version'] = '1.5'
@@ -672,7 +942,7 @@ class IPMIToolPrivateMethodTestCase(db_base.DbTestCase):
     @mock.patch.object(utils, 'execute', autospec=True)
     def test__exec_ipmitool_first_call_to_address(self, mock_exec,
                                                   mock_support, mock_sleep):
-        ipmi.LAST_CMD_TIME = {}
+        ipmi._BMC_SCHEDULER = ipmi._BMCCommandScheduler()
         args = [
             'ipmitool',
             '-I', 'lanplus',
@@ -697,7 +967,7 @@ class IPMIToolPrivateMethodTestCase(db_base.DbTestCase):
     @mock.patch.object(utils, 'execute', autospec=True)
     def test__exec_ipmitool_second_call_to_address_sleep(
             self, mock_exec, mock_support, mock_sleep):
-        ipmi.LAST_CMD_TIME = {}
+        ipmi._BMC_SCHEDULER = ipmi._BMCCommandScheduler()
         args = [[
             'ipmitool',
             '-I', 'lanplus',
@@ -734,7 +1004,7 @@ class IPMIToolPrivateMethodTestCase(db_base.DbTestCase):
     @mock.patch.object(utils, 'execute', autospec=True)
     def test__exec_ipmitool_second_call_to_address_no_sleep(
             self, mock_exec, mock_support, mock_sleep):
-        ipmi.LAST_CMD_TIME = {}
+        ipmi._BMC_SCHEDULER = ipmi._BMCCommandScheduler()
         args = [[
             'ipmitool',
             '-I', 'lanplus',
@@ -761,7 +1031,7 @@ class IPMIToolPrivateMethodTestCase(db_base.DbTestCase):
         ipmi._exec_ipmitool(self.info, 'A B C')
         mock_exec.assert_called_with(*args[0])
         # act like enough time has passed
-        ipmi.LAST_CMD_TIME[self.info['address']] = (
+        ipmi._BMC_SCHEDULER._bmcs[self.info['address']].last_done = (
             time.time() - CONF.ipmi.min_command_interval)
         ipmi._exec_ipmitool(self.info, 'D E F')
         self.assertFalse(mock_sleep.called)
@@ -773,7 +1043,7 @@ class IPMIToolPrivateMethodTestCase(db_base.DbTestCase):
     @mock.patch.object(utils, 'execute', autospec=True)
     def test__exec_ipmitool_two_calls_to_diff_address(
             self, mock_exec, mock_support, mock_sleep):
-        ipmi.LAST_CMD_TIME = {}
+        ipmi._BMC_SCHEDULER = ipmi._BMCCommandScheduler()
         args = [[
             'ipmitool',
             '-I', 'lanplus',
@@ -953,6 +1223,89 @@ class IPMIToolPrivateMethodTestCase(db_base.DbTestCase):
         mock_exec.assert_called_once_with(*args)
         _make_password_file_mock.assert_called_once_with('\0')
 
+    @mock.patch.object(ipmi._SESSION_POOL, 'execute', autospec=True)
+    @mock.patch.object(ipmi, '_is_option_supported', autospec=True)
+    @mock.patch.object(utils, 'execute', autospec=True)
+    def test__exec_ipmitool_session_pool(self, mock_exec, mock_support,
+                                         mock_pool_exec, mock_sleep):
+        self.config(use_session_pool=True, group='ipmi')
+        ipmi._BMC_SCHEDULER = ipmi._BMCCommandScheduler()
+        args = [
+            'ipmitool',
+            '-I', 'lanplus',
+            '-H', self.info['address'],
+            '-L', self.info['priv_level'],
+            '-U', self.info['username'],
+        ]
+        mock_support.return_value = False
+        mock_pool_exec.return_value = ('Chassis Power is on\n', '')
+
+        self.assertEqual(('Chassis Power is on\n', ''),
+                         ipmi._exec_ipmitool(self.info, 'power status'))
+
+        mock_pool_exec.assert_called_once_with(args, self.info['password'],
+                                               'power status')
+        self.assertFalse(mock_exec.called)
+        self.assertIn(self.info['address'], ipmi._BMC_SCHEDULER._bmcs)
+
+    @mock.patch.object(ipmi._SESSION_POOL, 'execute', autospec=True)
+    @mock.patch.object(ipmi, '_is_option_supported', autospec=True)
+    @mock.patch.object(ipmi, '_make_password_file', _make_password_file_stub)
+    @mock.patch.object(utils, 'execute', autospec=True)
+    def test__exec_ipmitool_session_pool_not_pooled_command(
+            self, mock_exec, mock_support, mock_pool_exec, mock_sleep):
+        self.config(use_session_pool=True, group='ipmi')
+        mock_support.return_value = False
+        mock_exec.return_value = (None, None)
+
+        ipmi._exec_ipmitool(self.info, 'power on')
+
+        self.assertFalse(mock_pool_exec.called)
+        self.assertTrue(mock_exec.called)
+
+    @mock.patch.object(ipmi._SESSION_POOL, 'execute', autospec=True)
+    @mock.patch.object(ipmi, '_is_option_supported', autospec=True)
+    @mock.patch.object(ipmi, '_make_password_file', _make_password_file_stub)
+    @mock.patch.object(utils, 'execute', autospec=True)
+    def test__exec_ipmitool_session_pool_disabled(
+            self, mock_exec, mock_support, mock_pool_exec, mock_sleep):
+        mock_support.return_value = False
+        mock_exec.return_value = (None, None)
+
+        ipmi._exec_ipmitool(self.info, 'power status')
+
+        self.assertFalse(mock_pool_exec.called)
+        self.assertTrue(mock_exec.called)
+
+    @mock.patch.object(ipmi._SESSION_POOL, 'execute', autospec=True)
+    @mock.patch.object(ipmi, '_is_option_supported', autospec=True)
+    @mock.patch.object(ipmi, '_make_password_file', _make_password_file_stub)
+    @mock.patch.object(utils, 'execute', autospec=True)
+    def test__exec_ipmitool_session_pool_fallback(
+            self, mock_exec, mock_support, mock_pool_exec, mock_sleep):
+        self.config(use_session_pool=True, group='ipmi')
+        ipmi._BMC_SCHEDULER = ipmi._BMCCommandScheduler()
+        args = [
+            'ipmitool',
+            '-I', 'lanplus',
+            '-H', self.info['address'],
+            '-L', self.info['priv_level'],
+            '-U', self.info['username'],
+            '-f', awesome_password_filename,
+            'power', 'status',
+        ]
+        mock_support.return_value = False
+        mock_pool_exec.side_effect = processutils.ProcessExecutionError()
+        mock_exec.return_value = ('Chassis Power is on\n', '')
+
+        self.assertEqual(('Chassis Power is on\n', ''),
+                         ipmi._exec_ipmitool(self.info, 'power status'))
+
+        self.assertEqual(1, mock_pool_exec.call_count)
+        mock_exec.assert_called_once_with(*args)
+        # The command interval is also honoured for the fallback
+        self.assertTrue(mock_sleep.called)
+
     @mock.patch.object(ipmi, '_is_option_supported', autospec=True)
     @mock.patch.object(ipmi, '_make_password_file', _make_password_file_stub)
     @mock.patch.object(utils, 'execute', autospec=True)
@@ -1057,7 +1410,7 @@ class IPMIToolPrivateMethodTestCase(db_base.DbTestCase):
     def test__exec_ipmitool_exception_retry(
             self, mock_exec, mock_support, mock_sleep):
 
-        ipmi.LAST_CMD_TIME = {}
+        ipmi._BMC_SCHEDULER = ipmi._BMCCommandScheduler()
         mock_support.return_value = False
         mock_exec.side_effect = [
             processutils.ProcessExecutionError(
@@ -1081,7 +1434,7 @@ class IPMIToolPrivateMethodTestCase(db_base.DbTestCase):
     def test__exec_ipmitool_exception_retries_exceeded(
             self, mock_exec, mock_support, mock_sleep):
 
-        ipmi.LAST_CMD_TIME = {}
+        ipmi._BMC_SCHEDULER = ipmi._BMCCommandScheduler()
         mock_support.return_value = False
 
         mock_exec.side_effect = [processutils.ProcessExecutionError(
@@ -1104,7 +1457,7 @@ class IPMIToolPrivateMethodTestCase(db_base.DbTestCase):
     def test__exec_ipmitool_exception_non_retryable_failure(
             self, mock_exec, mock_support, mock_sleep):
 
-        ipmi.LAST_CMD_TIME = {}
+        ipmi._BMC_SCHEDULER = ipmi._BMCCommandScheduler()
         mock_support.return_value = False
 
         # Return a retryable error, then an error that cannot
@@ -1160,7 +1513,7 @@ class IPMIToolPrivateMethodTestCase(db_base.DbTestCase):
     def test__exec_ipmitool_with_port(self, mock_exec, mock_pass,
                                       mock_support):
         self.info['dest_port'] = '1623'
-        ipmi.LAST_CMD_TIME = {}
+        ipmi._BMC_SCHEDULER = ipmi._BMCCommandScheduler()
         args = [
             'ipmitool',
             '-I', 'lanplus',
@@ -1257,11 +1610,32 @@ class IPMIToolPrivateMethodTestCase(db_base.DbTestCase):
         self.assertEqual(mock_exec.call_args_list, expected)
         self.assertEqual(states.ERROR, state)
 
+    @mock.patch.object(ipmi, '_exec_ipmitool', autospec=True)
+    @mock.patch.object(driver_utils, 'wait_for_power_state', autospec=True)
+    def test__power_off_wait(self, mock_wait, mock_exec, mock_sleep):
+        mock_wait.return_value = states.POWER_OFF
+        mock_exec.return_value = ["Chassis Power is off\n", None]
+
+        state = ipmi._power_off(self.info)
+
+        self.assertEqual(states.POWER_OFF, state)
+        mock_exec.assert_called_once_with(self.info, "power off")
+        mock_wait.assert_called_once_with(
+            mock.ANY, states.POWER_OFF, CONF.ipmi.retry_timeout,
+            model=('ipmitool', self.info['hardware_model']))
+        get_power_state = mock_wait.call_args[0][0]
+        self.assertEqual(states.POWER_OFF, get_power_state())
+        mock_exec.side_effect = processutils.ProcessExecutionError()
+        self.assertIsNone(get_power_state())
+
 
 class IPMIToolDriverTestCase(db_base.DbTestCase):
 
     def setUp(self, terminal=None):
         super(IPMIToolDriverTestCase, self).setUp()
+        ipmi._PARSED_DRIVER_INFO.clear()
+        ipmi._SDR_CACHE_FILES.clear()
+        ipmi._SDR_CACHE_DIR = None
         if terminal is None:
             self.driver_name = "fake_ipmitool"
         else:
@@ -1317,6 +1691,11 @@ class IPMIToolDriverTestCase(db_base.DbTestCase):
 
         self.assertEqual(mock_exec.call_args_list, expected)
 
+    @mock.patch.object(ipmi._SESSION_POOL, 'evict_idle', autospec=True)
+    def test_close_idle_sessions(self, mock_evict):
+        self.driver.power._close_idle_sessions(mock.Mock(), self.context)
+        mock_evict.assert_called_once_with()
+
     @mock.patch.object(ipmi, '_exec_ipmitool', autospec=True)
     def test_get_power_state_exception(self, mock_exec):
         mock_exec.side_effect = processutils.ProcessExecutionError("error")
@@ -1326,6 +1705,22 @@ class IPMIToolDriverTestCase(db_base.DbTestCase):
                               task)
         mock_exec.assert_called_once_with(self.info, "power status")
 
+    @mock.patch.object(ipmi, '_exec_ipmitool', autospec=True)
+    def test_get_power_states_bulk(self, mock_exec):
+        mock_exec.return_value = ["Chassis Power is on\n", None]
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            self.assertTrue(self.driver.power.supports_bulk_power_states)
+            result = self.driver.power.get_power_states_bulk([task])
+        self.assertEqual({self.node.uuid: states.POWER_ON}, result)
+        mock_exec.assert_called_once_with(self.info, "power status")
+
+    @mock.patch.object(ipmi, '_exec_ipmitool', autospec=True)
+    def test_get_power_states_bulk_exception(self, mock_exec):
+        mock_exec.side_effect = processutils.ProcessExecutionError("error")
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            result = self.driver.power.get_power_states_bulk([task])
+        self.assertIsInstance(result[self.node.uuid], exception.IPMIFailure)
+
     @mock.patch.object(ipmi, '_power_on', autospec=True)
     @mock.patch.object(ipmi, '_power_off', autospec=True)
     def test_set_power_on_ok(self, mock_off, mock_on):
@@ -2163,6 +2558,134 @@ class IPMIToolDriverTestCase(db_base.DbTestCase):
                           self.node,
                           fake_sensors_data)
 
+    def test__iter_sensors(self):
+        fake_sensors_data = ("Sensor ID : Temp (0x1)\n"
+                             " Sensor Reading : 50\n"
+                             "   \n"
+                             "\n"
+                             "Sensor ID : Temp (0x2)\n"
+                             " Bad : line : here\n")
+        self.assertEqual([{'Sensor ID': 'Temp (0x1)', 'Sensor Reading': '50'},
+                          {'Sensor ID': 'Temp (0x2)'}],
+                         list(ipmi._iter_sensors(fake_sensors_data)))
+
+    def _exec_ipmitool_sensors(self, driver_info, command,
+                               sdr_cache_file=None):
+        if command == 'mc info':
+            return 'Firmware Revision         : 2.50\n', ''
+        if command.startswith('sdr dump '):
+            with open(command.split(' ', 2)[2], 'w') as f:
+                f.write('sdr')
+            return '', ''
+        return self.fake_sensors_data, ''
+
+    def _setup_sdr_cache(self, mock_exec):
+        self.config(use_sdr_cache=True, group='ipmi')
+        self.config(tempdir=tempfile.mkdtemp())
+        self.fake_sensors_data = ("Sensor ID : Temp (0x1)\n"
+                                  " Sensor Type (Analog) : Temperature\n"
+                                  " Sensor Reading : 50\n")
+        mock_exec.side_effect = self._exec_ipmitool_sensors
+        return os.path.join(ipmi._get_sdr_cache_dir(),
+                            'ipmi-sdr-1.2.3.4-------2.50')
+
+    @mock.patch.object(ipmi, '_exec_ipmitool', autospec=True)
+    def test_get_sensors_data(self, mock_exec):
+        mock_exec.return_value = ("Sensor ID : Temp (0x1)\n"
+                                  " Sensor Type (Analog) : Temperature\n"
+                                  " Sensor Reading : 50\n", '')
+
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            ret = self.driver.management.get_sensors_data(task)
+
+        self.assertEqual(['Temp (0x1)'], list(ret['Temperature']))
+        mock_exec.assert_called_once_with(self.info, 'sdr -v')
+
+    @mock.patch.object(ipmi, '_exec_ipmitool', autospec=True)
+    def test_get_sensors_data_sdr_cache(self, mock_exec):
+        path = self._setup_sdr_cache(mock_exec)
+
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            self.driver.management.get_sensors_data(task)
+            ret = self.driver.management.get_sensors_data(task)
+
+        self.assertEqual(['Temp (0x1)'], list(ret['Temperature']))
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(
+            [mock.call(self.info, 'mc info'),
+             mock.call(self.info, mock.ANY),
+             mock.call(self.info, 'sdr -v', sdr_cache_file=path),
+             mock.call(self.info, 'sdr -v', sdr_cache_file=path)],
+            mock_exec.call_args_list)
+        dump_command = mock_exec.call_args_list[1][0][1]
+        self.assertTrue(dump_command.startswith('sdr dump %s.' % path))
+        self.assertEqual([os.path.basename(path)],
+                         os.listdir(os.path.dirname(path)))
+        self.assertEqual(0o700,
+                         os.stat(os.path.dirname(path)).st_mode & 0o777)
+
+    def test__get_sdr_cache_name_bridging(self):
+        info = dict(self.info, transit_channel='0', transit_address='0x82',
+                    target_channel='7', target_address='0x72',
+                    local_address='0x0', dest_port='623')
+        self.assertEqual('ipmi-sdr-1.2.3.4-623-0x0-0-0x82-7-0x72-2.50',
+                         ipmi._get_sdr_cache_name(info, '2.50'))
+        other = dict(info, target_address='0x74')
+        self.assertNotEqual(ipmi._get_sdr_cache_name(info, '2.50'),
+                            ipmi._get_sdr_cache_name(other, '2.50'))
+
+    @mock.patch.object(ipmi, '_exec_ipmitool', autospec=True)
+    def test_get_sensors_data_sdr_cache_existing(self, mock_exec):
+        path = self._setup_sdr_cache(mock_exec)
+        with open(path, 'w') as f:
+            f.write('sdr')
+
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            self.driver.management.get_sensors_data(task)
+
+        self.assertEqual(
+            [mock.call(self.info, 'mc info'),
+             mock.call(self.info, 'sdr -v', sdr_cache_file=path)],
+            mock_exec.call_args_list)
+
+    @mock.patch.object(ipmi, '_exec_ipmitool', autospec=True)
+    def test_get_sensors_data_sdr_cache_dump_fails(self, mock_exec):
+        path = self._setup_sdr_cache(mock_exec)
+
+        def _exec(driver_info, command, sdr_cache_file=None):
+            if command.startswith('sdr dump '):
+                raise processutils.ProcessExecutionError()
+            return self._exec_ipmitool_sensors(driver_info, command)
+
+        mock_exec.side_effect = _exec
+
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            ret = self.driver.management.get_sensors_data(task)
+
+        self.assertIn('Temperature', ret)
+        self.assertFalse(os.path.exists(path))
+        mock_exec.assert_called_with(self.info, 'sdr -v')
+        self.assertEqual({}, ipmi._SDR_CACHE_FILES)
+
+    @mock.patch.object(ipmi, '_exec_ipmitool', autospec=True)
+    def test_get_sensors_data_sdr_cache_read_fails(self, mock_exec):
+        path = self._setup_sdr_cache(mock_exec)
+
+        def _exec(driver_info, command, sdr_cache_file=None):
+            if sdr_cache_file:
+                raise processutils.ProcessExecutionError()
+            return self._exec_ipmitool_sensors(driver_info, command)
+
+        mock_exec.side_effect = _exec
+
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            ret = self.driver.management.get_sensors_data(task)
+
+        self.assertIn('Temperature', ret)
+        self.assertFalse(os.path.exists(path))
+        mock_exec.assert_called_with(self.info, 'sdr -v')
+        self.assertEqual({}, ipmi._SDR_CACHE_FILES)
+
     @mock.patch.object(ipmi, '_exec_ipmitool', autospec=True)
     def test_dump_sdr_ok(self, mock_exec):
         mock_exec.return_value = (None, None)
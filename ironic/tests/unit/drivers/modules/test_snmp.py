@@ -20,6 +20,7 @@ import time
 
 import mock
 from oslo_config import cfg
+from oslo_utils import uuidutils
 from pysnmp.entity.rfc3413.oneliner import cmdgen
 from pysnmp import error as snmp_error
 
@@ -41,6 +42,7 @@ INFO_DICT = db_utils.get_test_snmp_info()
 class SNMPClientTestCase(base.TestCase):
     def setUp(self):
         super(SNMPClientTestCase, self).setUp()
+        snmp._CLIENTS.clear()
         self.address = '1.2.3.4'
         self.port = '6700'
         self.oid = 'oid'
@@ -97,6 +99,63 @@ class SNMPClientTestCase(base.TestCase):
         mock_cmdgenerator.getCmd.assert_called_once_with(mock.ANY, mock.ANY,
                                                          self.oid)
 
+    @mock.patch.object(cmdgen, 'CommunityData', autospec=True)
+    @mock.patch.object(cmdgen, 'UdpTransportTarget', autospec=True)
+    def test_auth_and_transport_reused(self, mock_transport, mock_community,
+                                       mock_cmdgen):
+        client = snmp.SNMPClient(self.address, self.port, snmp.SNMP_V1)
+        self.assertIs(client._get_auth(), client._get_auth())
+        self.assertIs(client._get_transport(), client._get_transport())
+        mock_community.assert_called_once_with(client.community, mpModel=0)
+        mock_transport.assert_called_once_with((client.address, client.port))
+
+    @mock.patch.object(snmp.SNMPClient, '_get_transport', autospec=True)
+    @mock.patch.object(snmp.SNMPClient, '_get_auth', autospec=True)
+    def test_get_multiple(self, mock_auth, mock_transport, mock_cmdgen):
+        var_binds = [('oid1', 'value1'), ('oid2', 'value2')]
+        mock_cmdgenerator = mock_cmdgen.return_value
+        mock_cmdgenerator.getCmd.return_value = ("", None, 0, var_binds)
+        client = snmp.SNMPClient(self.address, self.port, snmp.SNMP_V3)
+        vals = client.get_multiple(['oid1', 'oid2'])
+        self.assertEqual(['value1', 'value2'], vals)
+        mock_cmdgenerator.getCmd.assert_called_once_with(mock.ANY, mock.ANY,
+                                                         'oid1', 'oid2')
+
+    @mock.patch.object(cmdgen, 'UdpTransportTarget', autospec=True)
+    def test_get_err_engine_resets_transport(self, mock_transport,
+                                             mock_cmdgen):
+        mock_cmdgenerator = mock_cmdgen.return_value
+        mock_cmdgenerator.getCmd.return_value = ("engine error", None, 0, [])
+        client = snmp.SNMPClient(self.address, self.port, snmp.SNMP_V1)
+        self.assertRaises(exception.SNMPFailure, client.get, self.oid)
+        self.assertRaises(exception.SNMPFailure, client.get, self.oid)
+        self.assertEqual(2, mock_transport.call_count)
+
+    def test__get_client_cached(self, mock_cmdgen):
+        snmp_info = {'address': self.address, 'port': 161, 'outlet': '1',
+                     'version': snmp.SNMP_V1, 'community': 'public'}
+        client = snmp._get_client(snmp_info)
+        other_outlet = snmp._get_client(dict(snmp_info, outlet='2'))
+        other_pdu = snmp._get_client(dict(snmp_info, address='5.6.7.8'))
+        self.assertIs(client, other_outlet)
+        self.assertIsNot(client, other_pdu)
+        self.assertEqual(2, mock_cmdgen.call_count)
+
+    @mock.patch.object(snmp, '_CLIENTS_MAX', 2)
+    def test__get_client_lru(self, mock_cmdgen):
+        snmp_info = {'address': self.address, 'port': 161, 'outlet': '1',
+                     'version': snmp.SNMP_V1, 'community': 'public'}
+        client = snmp._get_client(snmp_info)
+        snmp._get_client(dict(snmp_info, address='5.6.7.8'))
+        self.assertIs(client, snmp._get_client(snmp_info))
+        snmp._get_client(dict(snmp_info, address='9.10.11.12'))
+
+        self.assertEqual(
+            [self.address, '9.10.11.12'],
+            [key[0] for key in snmp._CLIENTS])
+        self.assertIs(client, snmp._get_client(snmp_info))
+        self.assertEqual(3, mock_cmdgen.call_count)
+
     @mock.patch.object(snmp.SNMPClient, '_get_transport', autospec=True)
     @mock.patch.object(snmp.SNMPClient, '_get_auth', autospec=True)
     def test_get_next(self, mock_auth, mock_transport, mock_cmdgen):
@@ -1176,6 +1235,87 @@ class SNMPDeviceDriverTestCase(db_base.DbTestCase):
         self.assertEqual(states.POWER_ON, pstate)
 
 
+@mock.patch.object(snmp, '_get_client', autospec=True)
+class SNMPBulkPowerStatesTestCase(db_base.DbTestCase):
+    """Tests for getting the power states of several outlets at once."""
+
+    def setUp(self):
+        super(SNMPBulkPowerStatesTestCase, self).setUp()
+        mgr_utils.mock_the_extension_manager(driver='fake_snmp')
+        self.node = obj_utils.create_test_node(self.context,
+                                               driver='fake_snmp',
+                                               driver_info=INFO_DICT)
+        self.node2 = obj_utils.create_test_node(
+            self.context, uuid=uuidutils.generate_uuid(), driver='fake_snmp',
+            driver_info=dict(INFO_DICT, snmp_outlet='2'))
+
+    def _get_power_states_bulk(self):
+        with task_manager.acquire(self.context, self.node.uuid,
+                                  shared=True) as task1:
+            with task_manager.acquire(self.context, self.node2.uuid,
+                                      shared=True) as task2:
+                self.assertTrue(
+                    task1.driver.power.supports_bulk_power_states)
+                return task1.driver.power.get_power_states_bulk(
+                    [task1, task2])
+
+    def test_get_power_states_bulk(self, mock_get_client):
+        mock_client = mock_get_client.return_value
+        mock_client.get_multiple.return_value = [
+            snmp.SNMPDriverTeltronix.value_power_on,
+            snmp.SNMPDriverTeltronix.value_power_off]
+
+        result = self._get_power_states_bulk()
+
+        self.assertEqual({self.node.uuid: states.POWER_ON,
+                          self.node2.uuid: states.POWER_OFF}, result)
+        oid = (snmp.SNMPDriverBase.oid_enterprise +
+               snmp.SNMPDriverTeltronix.oid_device)
+        mock_client.get_multiple.assert_called_once_with(
+            [oid + (1,), oid + (2,)])
+        self.assertFalse(mock_client.get.called)
+
+    @mock.patch.object(snmp, '_MAX_OIDS_PER_GET', 1)
+    def test_get_power_states_bulk_split(self, mock_get_client):
+        mock_client = mock_get_client.return_value
+        mock_client.get_multiple.side_effect = [
+            [snmp.SNMPDriverTeltronix.value_power_on],
+            [snmp.SNMPDriverTeltronix.value_power_on]]
+
+        result = self._get_power_states_bulk()
+
+        self.assertEqual({self.node.uuid: states.POWER_ON,
+                          self.node2.uuid: states.POWER_ON}, result)
+        self.assertEqual(2, mock_client.get_multiple.call_count)
+
+    def test_get_power_states_bulk_fallback(self, mock_get_client):
+        mock_client = mock_get_client.return_value
+        mock_client.get_multiple.side_effect = exception.SNMPFailure(
+            operation='GET', error='tooBig')
+        mock_client.get.side_effect = [
+            snmp.SNMPDriverTeltronix.value_power_off,
+            exception.SNMPFailure(operation='GET', error='test-error')]
+
+        result = self._get_power_states_bulk()
+
+        self.assertEqual(states.POWER_OFF, result[self.node.uuid])
+        self.assertIsInstance(result[self.node2.uuid], exception.SNMPFailure)
+        self.assertEqual(2, mock_client.get.call_count)
+
+    def test_get_power_states_bulk_invalid_info(self, mock_get_client):
+        self.node2.driver_info = dict(INFO_DICT, snmp_driver='invalid')
+        self.node2.save()
+        mock_client = mock_get_client.return_value
+        mock_client.get_multiple.return_value = [
+            snmp.SNMPDriverTeltronix.value_power_on]
+
+        result = self._get_power_states_bulk()
+
+        self.assertEqual(states.POWER_ON, result[self.node.uuid])
+        self.assertIsInstance(result[self.node2.uuid],
+                              exception.InvalidParameterValue)
+
+
 @mock.patch.object(snmp, '_get_driver', autospec=True)
 class SNMPDriverTestCase(db_base.DbTestCase):
     """SNMP power driver interface tests.
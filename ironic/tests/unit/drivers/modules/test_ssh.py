@@ -16,6 +16,7 @@
 """Test class for Ironic SSH power driver."""
 
 import tempfile
+import time
 
 import mock
 from oslo_concurrency import processutils
@@ -32,6 +33,7 @@ from ironic.conductor import task_manager
 from ironic.drivers.modules import console_utils
 from ironic.drivers.modules import ssh
 from ironic.drivers import utils as driver_utils
+from ironic.tests import base
 from ironic.tests.unit.conductor import mgr_utils
 from ironic.tests.unit.db import base as db_base
 from ironic.tests.unit.db import utils as db_utils
@@ -227,10 +229,111 @@ class SSHValidateParametersTestCase(db_base.DbTestCase):
                           'this_doesn_t_exist')
 
 
+@mock.patch.object(utils, 'ssh_connect', autospec=True)
+class SSHClientPoolTestCase(base.TestCase):
+
+    def setUp(self):
+        super(SSHClientPoolTestCase, self).setUp()
+        self.pool = ssh._SSHClientPool()
+        self.info = {'host': 'host1', 'port': 22, 'username': 'user',
+                     'password': 'pass', 'uuid': 'node1'}
+
+    def _client(self, active=True):
+        client = mock.Mock(spec_set=['get_transport', 'close'])
+        client.get_transport.return_value.is_active.return_value = active
+        return client
+
+    def test_get_reuses_client(self, ssh_connect_mock):
+        ssh_connect_mock.return_value = self._client()
+        client = self.pool.get(self.info)
+        self.assertIs(client, self.pool.get(dict(self.info, uuid='node2')))
+        ssh_connect_mock.assert_called_once_with(self.info)
+
+    def test_get_different_hosts(self, ssh_connect_mock):
+        ssh_connect_mock.side_effect = [self._client(), self._client()]
+        client = self.pool.get(self.info)
+        self.assertIsNot(client,
+                         self.pool.get(dict(self.info, host='host2')))
+        self.assertEqual(2, ssh_connect_mock.call_count)
+
+    def test_get_inactive_client(self, ssh_connect_mock):
+        inactive = self._client(active=False)
+        ssh_connect_mock.side_effect = [inactive, self._client()]
+        self.pool.get(self.info)
+        client = self.pool.get(self.info)
+        self.assertIsNot(inactive, client)
+        inactive.close.assert_called_once_with()
+        self.assertEqual(2, ssh_connect_mock.call_count)
+
+    def test_get_connect_fails(self, ssh_connect_mock):
+        ssh_connect_mock.side_effect = exception.SSHConnectFailed(host='h')
+        self.assertRaises(exception.SSHConnectFailed, self.pool.get,
+                          self.info)
+        self.assertEqual({}, self.pool._clients)
+
+    @mock.patch.object(time, 'time', autospec=True)
+    def test_get_evicts_idle(self, time_mock, ssh_connect_mock):
+        self.config(connection_idle_timeout=60, group='ssh')
+        idle = self._client()
+        ssh_connect_mock.side_effect = [idle, self._client()]
+        time_mock.return_value = 100
+        self.pool.release(self.info, self.pool.get(self.info))
+        time_mock.return_value = 161
+        self.assertIsNot(idle, self.pool.get(self.info))
+        idle.close.assert_called_once_with()
+
+    @mock.patch.object(time, 'time', autospec=True)
+    def test_get_keeps_idle_client_in_use(self, time_mock, ssh_connect_mock):
+        self.config(connection_idle_timeout=60, group='ssh')
+        in_use = self._client()
+        ssh_connect_mock.side_effect = [in_use, self._client()]
+        time_mock.return_value = 100
+        self.pool.get(self.info)
+        time_mock.return_value = 161
+        self.assertIsNot(in_use, self.pool.get(dict(self.info,
+                                                    host='host2')))
+        self.assertFalse(in_use.close.called)
+        self.assertIs(in_use, self.pool.get(self.info))
+
+    def test_release(self, ssh_connect_mock):
+        ssh_connect_mock.return_value = self._client()
+        client = self.pool.get(self.info)
+        self.pool.get(dict(self.info, uuid='node2'))
+        key = self.pool._key(self.info)
+        self.assertEqual(2, self.pool._clients[key][2])
+        self.pool.release(self.info, client)
+        self.pool.release(self.info, client)
+        self.assertEqual(0, self.pool._clients[key][2])
+        # releasing a client which is not pooled does nothing
+        self.pool.release(dict(self.info, host='host2'), client)
+        self.pool.release(self.info, self._client())
+        self.assertEqual(0, self.pool._clients[key][2])
+
+    def test_discard(self, ssh_connect_mock):
+        ssh_connect_mock.return_value = self._client()
+        client = self.pool.get(self.info)
+        self.pool.discard(client)
+        client.close.assert_called_once_with()
+        self.assertEqual({}, self.pool._clients)
+        # discarding a client which is not pooled does nothing
+        other = self._client()
+        self.pool.discard(other)
+        self.assertFalse(other.close.called)
+
+    def test_close_all(self, ssh_connect_mock):
+        ssh_connect_mock.return_value = self._client()
+        client = self.pool.get(self.info)
+        self.pool.close_all()
+        client.close.assert_called_once_with()
+        self.assertEqual({}, self.pool._clients)
+
+
 class SSHPrivateMethodsTestCase(db_base.DbTestCase):
 
     def setUp(self):
         super(SSHPrivateMethodsTestCase, self).setUp()
+        ssh._VM_NAMES.clear()
+        ssh._VM_LISTS.clear()
         self.node = obj_utils.get_test_node(
             self.context,
             driver='fake_ssh',
@@ -240,20 +343,54 @@ class SSHPrivateMethodsTestCase(db_base.DbTestCase):
     @mock.patch.object(utils, 'ssh_connect', autospec=True)
     def test__get_connection_client(self, ssh_connect_mock):
         ssh_connect_mock.return_value = self.sshclient
-        client = ssh._get_connection(self.node)
-        self.assertEqual(self.sshclient, client)
+        with ssh._get_connection(self.node) as client:
+            self.assertEqual(self.sshclient, client)
         driver_info = ssh._parse_driver_info(self.node)
         ssh_connect_mock.assert_called_once_with(driver_info)
 
     @mock.patch.object(utils, 'ssh_connect', autospec=True)
     def test__get_connection_exception(self, ssh_connect_mock):
         ssh_connect_mock.side_effect = exception.SSHConnectFailed(host='fake')
-        self.assertRaises(exception.SSHConnectFailed,
-                          ssh._get_connection,
-                          self.node)
+
+        def _connect():
+            with ssh._get_connection(self.node):
+                pass
+
+        self.assertRaises(exception.SSHConnectFailed, _connect)
         driver_info = ssh._parse_driver_info(self.node)
         ssh_connect_mock.assert_called_once_with(driver_info)
 
+    @mock.patch.object(ssh._CONNECTION_POOL, 'release', autospec=True)
+    @mock.patch.object(ssh._CONNECTION_POOL, 'get', autospec=True)
+    @mock.patch.object(utils, 'ssh_connect', autospec=True)
+    def test__get_connection_pooled(self, ssh_connect_mock, pool_get_mock,
+                                    pool_release_mock):
+        self.config(use_connection_pool=True, group='ssh')
+        pool_get_mock.return_value = self.sshclient
+        driver_info = ssh._parse_driver_info(self.node)
+        with ssh._get_connection(self.node) as client:
+            self.assertEqual(self.sshclient, client)
+            pool_get_mock.assert_called_once_with(driver_info)
+            self.assertFalse(pool_release_mock.called)
+        pool_release_mock.assert_called_once_with(driver_info,
+                                                  self.sshclient)
+        self.assertFalse(ssh_connect_mock.called)
+
+    @mock.patch.object(ssh._CONNECTION_POOL, 'release', autospec=True)
+    @mock.patch.object(ssh._CONNECTION_POOL, 'get', autospec=True)
+    def test__get_connection_pooled_error(self, pool_get_mock,
+                                          pool_release_mock):
+        self.config(use_connection_pool=True, group='ssh')
+        pool_get_mock.return_value = self.sshclient
+
+        def _use():
+            with ssh._get_connection(self.node):
+                raise exception.SSHCommandFailed(cmd='fake')
+
+        self.assertRaises(exception.SSHCommandFailed, _use)
+        pool_release_mock.assert_called_once_with(
+            ssh._parse_driver_info(self.node), self.sshclient)
+
     @mock.patch.object(processutils, 'ssh_execute', autospec=True)
     def test__ssh_execute(self, exec_ssh_mock):
         ssh_cmd = "somecmd"
@@ -267,11 +404,14 @@ class SSHPrivateMethodsTestCase(db_base.DbTestCase):
     def test__ssh_execute_exception(self, exec_ssh_mock):
         ssh_cmd = "somecmd"
         exec_ssh_mock.side_effect = processutils.ProcessExecutionError
-        self.assertRaises(exception.SSHCommandFailed,
-                          ssh._ssh_execute,
-                          self.sshclient,
-                          ssh_cmd)
+        with mock.patch.object(ssh._CONNECTION_POOL, 'discard',
+                               autospec=True) as discard_mock:
+            self.assertRaises(exception.SSHCommandFailed,
+                              ssh._ssh_execute,
+                              self.sshclient,
+                              ssh_cmd)
         exec_ssh_mock.assert_called_once_with(self.sshclient, ssh_cmd)
+        discard_mock.assert_called_once_with(self.sshclient)
 
     @mock.patch.object(processutils, 'ssh_execute', autospec=True)
     @mock.patch.object(ssh, '_get_hosts_name_for_node', autospec=True)
@@ -352,6 +492,65 @@ class SSHPrivateMethodsTestCase(db_base.DbTestCase):
                              info['cmd_set']['list_running'])
         exec_ssh_mock.assert_called_once_with(self.sshclient, ssh_cmd)
 
+    @mock.patch.object(processutils, 'ssh_execute', autospec=True)
+    @mock.patch.object(ssh, '_get_hosts_name_for_node', autospec=True)
+    def test__get_power_status_shared_listing(self, get_hosts_name_mock,
+                                              exec_ssh_mock):
+        self.config(vm_list_cache_ttl=5, group='ssh')
+        info = ssh._parse_driver_info(self.node)
+        other_info = dict(info, uuid=uuidutils.generate_uuid())
+        exec_ssh_mock.return_value = ('"NodeName"\n', '')
+        get_hosts_name_mock.side_effect = ['NodeName', 'OtherName']
+
+        self.assertEqual(states.POWER_ON,
+                         ssh._get_power_status(self.sshclient, info))
+        self.assertEqual(states.POWER_OFF,
+                         ssh._get_power_status(self.sshclient, other_info))
+        ssh_cmd = "%s %s" % (info['cmd_set']['base_cmd'],
+                             info['cmd_set']['list_running'])
+        exec_ssh_mock.assert_called_once_with(self.sshclient, ssh_cmd)
+
+    @mock.patch.object(ssh, '_ssh_execute', autospec=True)
+    def test__list_vms_cache_expired(self, exec_ssh_mock):
+        self.config(vm_list_cache_ttl=5, group='ssh')
+        info = ssh._parse_driver_info(self.node)
+        exec_ssh_mock.side_effect = [['vm1'], ['vm2']]
+
+        self.assertEqual(['vm1'],
+                         ssh._list_vms(self.sshclient, info, 'list'))
+        for key, (lines, run_at) in list(ssh._VM_LISTS.items()):
+            ssh._VM_LISTS[key] = (lines, run_at - 6)
+        self.assertEqual(['vm2'],
+                         ssh._list_vms(self.sshclient, info, 'list'))
+        self.assertEqual(2, exec_ssh_mock.call_count)
+
+    @mock.patch.object(ssh, '_ssh_execute', autospec=True)
+    def test__list_vms_cache_disabled(self, exec_ssh_mock):
+        self.config(vm_list_cache_ttl=0, group='ssh')
+        info = ssh._parse_driver_info(self.node)
+        exec_ssh_mock.side_effect = [['vm1'], ['vm2']]
+
+        self.assertEqual(['vm1'],
+                         ssh._list_vms(self.sshclient, info, 'list'))
+        self.assertEqual(['vm2'],
+                         ssh._list_vms(self.sshclient, info, 'list'))
+        self.assertEqual({}, ssh._VM_LISTS)
+
+    @mock.patch.object(ssh, '_ssh_execute', autospec=True)
+    def test__invalidate_vm_lists(self, exec_ssh_mock):
+        self.config(vm_list_cache_ttl=5, group='ssh')
+        info = ssh._parse_driver_info(self.node)
+        other_info = dict(info, host='5.6.7.8')
+        exec_ssh_mock.return_value = ['vm1']
+        ssh._list_vms(self.sshclient, info, 'list')
+        ssh._list_vms(self.sshclient, info, 'list all')
+        ssh._list_vms(self.sshclient, other_info, 'list')
+
+        ssh._invalidate_vm_lists(info)
+
+        self.assertEqual([('5.6.7.8', info['port'], info['username'],
+                           'list')], list(ssh._VM_LISTS))
+
     @mock.patch.object(processutils, 'ssh_execute', autospec=True)
     def test__get_hosts_name_for_node_match(self, exec_ssh_mock):
         info = ssh._parse_driver_info(self.node)
@@ -372,6 +571,67 @@ class SSHPrivateMethodsTestCase(db_base.DbTestCase):
         self.assertEqual('NodeName', found_name)
         self.assertEqual(expected, exec_ssh_mock.call_args_list)
 
+    @mock.patch.object(processutils, 'ssh_execute', autospec=True)
+    def test__get_hosts_name_for_node_cached(self, exec_ssh_mock):
+        info = ssh._parse_driver_info(self.node)
+        info['macs'] = ["52:54:00:cf:2d:31"]
+        exec_ssh_mock.side_effect = [('NodeName', ''),
+                                     ('52:54:00:cf:2d:31', '')]
+
+        self.assertEqual('NodeName',
+                         ssh._get_hosts_name_for_node(self.sshclient, info))
+        self.assertEqual('NodeName',
+                         ssh._get_hosts_name_for_node(self.sshclient, info))
+        self.assertEqual(2, exec_ssh_mock.call_count)
+
+    @mock.patch.object(ssh, '_VM_NAMES_MAX', 1)
+    @mock.patch.object(processutils, 'ssh_execute', autospec=True)
+    def test__get_hosts_name_for_node_cache_bounded(self, exec_ssh_mock):
+        info = ssh._parse_driver_info(self.node)
+        info['macs'] = ["52:54:00:cf:2d:31"]
+        other_info = dict(info, uuid=uuidutils.generate_uuid())
+        exec_ssh_mock.side_effect = [('NodeName', ''),
+                                     ('52:54:00:cf:2d:31', '')] * 2
+
+        ssh._get_hosts_name_for_node(self.sshclient, info)
+        ssh._get_hosts_name_for_node(self.sshclient, other_info)
+
+        self.assertEqual([other_info['uuid']],
+                         [key[0] for key in ssh._VM_NAMES])
+
+    @mock.patch.object(processutils, 'ssh_execute', autospec=True)
+    def test__get_hosts_name_for_node_cache_expired(self, exec_ssh_mock):
+        self.config(vm_name_cache_ttl=60, group='ssh')
+        self.config(vm_list_cache_ttl=0, group='ssh')
+        info = ssh._parse_driver_info(self.node)
+        info['macs'] = ["52:54:00:cf:2d:31"]
+        exec_ssh_mock.side_effect = [('NodeName', ''),
+                                     ('52:54:00:cf:2d:31', ''),
+                                     ('OtherName', ''),
+                                     ('52:54:00:cf:2d:31', '')]
+
+        self.assertEqual('NodeName',
+                         ssh._get_hosts_name_for_node(self.sshclient, info))
+        for key, (name, found) in list(ssh._VM_NAMES.items()):
+            ssh._VM_NAMES[key] = (name, found - 61)
+        self.assertEqual('OtherName',
+                         ssh._get_hosts_name_for_node(self.sshclient, info))
+        self.assertEqual(4, exec_ssh_mock.call_count)
+
+    @mock.patch.object(processutils, 'ssh_execute', autospec=True)
+    def test__get_hosts_name_for_node_cache_disabled(self, exec_ssh_mock):
+        self.config(vm_name_cache_ttl=0, group='ssh')
+        self.config(vm_list_cache_ttl=0, group='ssh')
+        info = ssh._parse_driver_info(self.node)
+        info['macs'] = ["52:54:00:cf:2d:31"]
+        exec_ssh_mock.side_effect = [('NodeName', ''),
+                                     ('52:54:00:cf:2d:31', '')] * 2
+
+        ssh._get_hosts_name_for_node(self.sshclient, info)
+        ssh._get_hosts_name_for_node(self.sshclient, info)
+        self.assertEqual(4, exec_ssh_mock.call_count)
+        self.assertEqual({}, ssh._VM_NAMES)
+
     @mock.patch.object(processutils, 'ssh_execute', autospec=True)
     def test__get_hosts_name_for_node_no_match(self, exec_ssh_mock):
         self.config(group='ssh', get_vm_name_attempts=2)
@@ -531,9 +791,12 @@ class SSHPrivateMethodsTestCase(db_base.DbTestCase):
         cmd_to_exec = "%s %s" % (info['cmd_set']['base_cmd'],
                                  info['cmd_set']['stop_cmd'])
         cmd_to_exec = cmd_to_exec.replace('{_NodeName_}', 'NodeName')
+        ssh._VM_LISTS[(info['host'], info['port'], info['username'],
+                       'list')] = (['NodeName'], time.time())
         current_state = ssh._power_off(self.sshclient, info)
 
         self.assertEqual(states.POWER_OFF, current_state)
+        self.assertEqual({}, ssh._VM_LISTS)
         self.assertEqual(expected, get_power_status_mock.call_args_list)
         get_hosts_name_mock.assert_called_once_with(self.sshclient, info)
         exec_ssh_mock.assert_called_once_with(self.sshclient, cmd_to_exec)
@@ -588,6 +851,8 @@ class SSHDriverTestCase(db_base.DbTestCase):
 
     def setUp(self):
         super(SSHDriverTestCase, self).setUp()
+        ssh._VM_NAMES.clear()
+        ssh._VM_LISTS.clear()
         mgr_utils.mock_the_extension_manager(driver="fake_ssh")
         self.driver = driver_factory.get_driver("fake_ssh")
         self.node = obj_utils.create_test_node(
@@ -1040,6 +1305,111 @@ class SSHDriverTestCase(db_base.DbTestCase):
                         "vm-list power-state=running --minimal | tr ',' '\n'")
         mock_exc.assert_called_once_with(mock.ANY, expected_cmd)
 
+    def _create_second_node(self, **driver_info):
+        info = db_utils.get_test_ssh_info()
+        info.update(driver_info)
+        node = obj_utils.create_test_node(
+            self.context, uuid=uuidutils.generate_uuid(), driver='fake_ssh',
+            driver_info=info)
+        obj_utils.create_test_port(self.context, node_id=node.id,
+                                   uuid=uuidutils.generate_uuid(),
+                                   address='52:54:00:cf:2d:32')
+        return node
+
+    @mock.patch.object(utils, 'ssh_connect', autospec=True)
+    @mock.patch.object(ssh, '_get_hosts_name_for_node', autospec=True)
+    @mock.patch.object(ssh, '_ssh_execute', autospec=True)
+    def test_get_power_states_bulk(self, mock_exc, mock_h, mock_connect):
+        node2 = self._create_second_node()
+        mock_connect.return_value = self.sshclient
+        mock_h.side_effect = ['NodeName', 'OtherName']
+        mock_exc.return_value = ['NodeName', '']
+
+        with task_manager.acquire(self.context, self.node.uuid,
+                                  shared=True) as task1:
+            with task_manager.acquire(self.context, node2.uuid,
+                                      shared=True) as task2:
+                self.assertTrue(
+                    task1.driver.power.supports_bulk_power_states)
+                result = task1.driver.power.get_power_states_bulk(
+                    [task1, task2])
+
+        self.assertEqual({self.node.uuid: states.POWER_ON,
+                          node2.uuid: states.POWER_OFF}, result)
+        mock_connect.assert_called_once_with(mock.ANY)
+        mock_exc.assert_called_once_with(self.sshclient,
+                                         'LC_ALL=C /usr/bin/virsh '
+                                         '--connect qemu:///system '
+                                         'list --name')
+
+    @mock.patch.object(utils, 'ssh_connect', autospec=True)
+    @mock.patch.object(ssh, '_get_hosts_name_for_node', autospec=True)
+    @mock.patch.object(ssh, '_ssh_execute', autospec=True)
+    def test_get_power_states_bulk_different_hosts(self, mock_exc, mock_h,
+                                                   mock_connect):
+        node2 = self._create_second_node(ssh_address='5.6.7.8')
+        mock_connect.side_effect = [
+            self.sshclient, exception.SSHConnectFailed(host='5.6.7.8')]
+        mock_h.return_value = 'NodeName'
+        mock_exc.return_value = ['NodeName', '']
+
+        with task_manager.acquire(self.context, self.node.uuid,
+                                  shared=True) as task1:
+            with task_manager.acquire(self.context, node2.uuid,
+                                      shared=True) as task2:
+                result = task1.driver.power.get_power_states_bulk(
+                    [task1, task2])
+
+        self.assertEqual(states.POWER_ON, result[self.node.uuid])
+        self.assertIsInstance(result[node2.uuid], exception.SSHConnectFailed)
+        self.assertEqual(2, mock_connect.call_count)
+        self.assertEqual(1, mock_exc.call_count)
+
+    @mock.patch.object(utils, 'ssh_connect', autospec=True)
+    @mock.patch.object(ssh, '_get_hosts_name_for_node', autospec=True)
+    @mock.patch.object(ssh, '_ssh_execute', autospec=True)
+    def test_get_power_states_bulk_per_node_listing(self, mock_exc, mock_h,
+                                                    mock_connect):
+        node2 = self._create_second_node(ssh_virt_type='vmware')
+        self.node.driver_info = node2.driver_info
+        self.node.save()
+        mock_connect.return_value = self.sshclient
+        mock_h.side_effect = ['vm1', 'vm2']
+        mock_exc.side_effect = [['"vm1"', ''], ['', '']]
+
+        with task_manager.acquire(self.context, self.node.uuid,
+                                  shared=True) as task1:
+            with task_manager.acquire(self.context, node2.uuid,
+                                      shared=True) as task2:
+                result = task1.driver.power.get_power_states_bulk(
+                    [task1, task2])
+
+        self.assertEqual({self.node.uuid: states.POWER_ON,
+                          node2.uuid: states.POWER_OFF}, result)
+        mock_connect.assert_called_once_with(mock.ANY)
+        self.assertEqual(2, mock_exc.call_count)
+
+    @mock.patch.object(utils, 'ssh_connect', autospec=True)
+    @mock.patch.object(ssh, '_get_hosts_name_for_node', autospec=True)
+    @mock.patch.object(ssh, '_ssh_execute', autospec=True)
+    def test_get_power_states_bulk_cached(self, mock_exc, mock_h,
+                                          mock_connect):
+        self.config(vm_list_cache_ttl=5, group='ssh')
+        node2 = self._create_second_node()
+        mock_connect.return_value = self.sshclient
+        mock_h.side_effect = ['NodeName', 'OtherName']
+        mock_exc.return_value = ['NodeName', '']
+
+        with task_manager.acquire(self.context, self.node.uuid,
+                                  shared=True) as task1:
+            with task_manager.acquire(self.context, node2.uuid,
+                                      shared=True) as task2:
+                task1.driver.power.get_power_states_bulk([task1])
+                result = task1.driver.power.get_power_states_bulk([task2])
+
+        self.assertEqual({node2.uuid: states.POWER_OFF}, result)
+        self.assertEqual(1, mock_exc.call_count)
+
     @mock.patch.object(ssh, '_get_connection', autospec=True)
     @mock.patch.object(ssh, '_get_hosts_name_for_node', autospec=True)
     @mock.patch.object(ssh, '_ssh_execute', autospec=True)
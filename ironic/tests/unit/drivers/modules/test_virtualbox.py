@@ -12,7 +12,10 @@
 
 """Test class for VirtualBox Driver Modules."""
 
+import time
+
 import mock
+from oslo_utils import uuidutils
 from pyremotevbox import exception as pyremotevbox_exc
 from pyremotevbox import vbox as pyremotevbox_vbox
 
@@ -38,6 +41,7 @@ class VirtualBoxMethodsTestCase(db_base.DbTestCase):
 
     def setUp(self):
         super(VirtualBoxMethodsTestCase, self).setUp()
+        virtualbox._POWER_STATUSES.clear()
         driver_info = INFO_DICT.copy()
         mgr_utils.mock_the_extension_manager(driver="fake_vbox")
         self.node = obj_utils.create_test_node(self.context,
@@ -93,6 +97,72 @@ class VirtualBoxMethodsTestCase(db_base.DbTestCase):
         func_mock.assert_called_once_with('args', kwarg='kwarg')
         self.assertEqual('return-value', return_value)
 
+    @mock.patch.object(pyremotevbox_vbox, 'VirtualBoxHost', autospec=True)
+    def test__run_vm_method_existing_host(self, host_mock):
+        host_object_mock = mock.MagicMock(spec_set=['find_vm'])
+        func_mock = mock.MagicMock(spec_set=[], return_value='return-value')
+        vm_object_mock = mock.MagicMock(spec_set=['foo'], foo=func_mock)
+        host_object_mock.find_vm.return_value = vm_object_mock
+
+        return_value = virtualbox._run_vm_method(
+            self.node, host_object_mock, 'some-ironic-method', 'foo')
+
+        self.assertFalse(host_mock.called)
+        host_object_mock.find_vm.assert_called_once_with('baremetal1')
+        self.assertEqual('return-value', return_value)
+
+    @mock.patch.object(virtualbox, '_run_virtualbox_method', autospec=True)
+    def test__get_power_status_cached(self, run_method_mock):
+        self.config(power_state_cache_ttl=5, group='virtualbox')
+        run_method_mock.return_value = 'Running'
+
+        self.assertEqual('Running',
+                         virtualbox._get_power_status(self.node))
+        self.assertEqual('Running',
+                         virtualbox._get_power_status(self.node))
+        run_method_mock.assert_called_once_with(self.node,
+                                                'get_power_state',
+                                                'get_power_status')
+
+    @mock.patch.object(virtualbox, '_run_virtualbox_method', autospec=True)
+    def test__get_power_status_cache_expired(self, run_method_mock):
+        self.config(power_state_cache_ttl=5, group='virtualbox')
+        run_method_mock.side_effect = ['Running', 'PoweredOff']
+
+        virtualbox._get_power_status(self.node)
+        for key, (status, read_at) in list(
+                virtualbox._POWER_STATUSES.items()):
+            virtualbox._POWER_STATUSES[key] = (status, read_at - 6)
+
+        self.assertEqual('PoweredOff',
+                         virtualbox._get_power_status(self.node))
+        self.assertEqual(2, run_method_mock.call_count)
+
+    @mock.patch.object(virtualbox, '_run_virtualbox_method', autospec=True)
+    def test__get_power_status_cache_per_user(self, run_method_mock):
+        self.config(power_state_cache_ttl=5, group='virtualbox')
+        run_method_mock.side_effect = ['Running', 'PoweredOff']
+        node2 = obj_utils.create_test_node(
+            self.context, uuid=uuidutils.generate_uuid(), driver='fake_vbox',
+            driver_info=dict(INFO_DICT, virtualbox_username='other'))
+
+        self.assertEqual('Running',
+                         virtualbox._get_power_status(self.node))
+        self.assertEqual('PoweredOff',
+                         virtualbox._get_power_status(node2))
+        self.assertEqual(2, run_method_mock.call_count)
+
+    @mock.patch.object(virtualbox, '_run_virtualbox_method', autospec=True)
+    def test__get_power_status_cache_disabled(self, run_method_mock):
+        self.config(power_state_cache_ttl=0, group='virtualbox')
+        run_method_mock.side_effect = ['Running', 'PoweredOff']
+
+        virtualbox._get_power_status(self.node)
+
+        self.assertEqual('PoweredOff',
+                         virtualbox._get_power_status(self.node))
+        self.assertEqual({}, virtualbox._POWER_STATUSES)
+
     @mock.patch.object(pyremotevbox_vbox, 'VirtualBoxHost', autospec=True)
     def test__run_virtualbox_method_get_host_fails(self, host_mock):
         host_mock.side_effect = pyremotevbox_exc.PyRemoteVBoxException
@@ -188,6 +258,7 @@ class VirtualBoxPowerTestCase(db_base.DbTestCase):
 
     def setUp(self):
         super(VirtualBoxPowerTestCase, self).setUp()
+        virtualbox._POWER_STATUSES.clear()
         driver_info = INFO_DICT.copy()
         mgr_utils.mock_the_extension_manager(driver="fake_vbox")
         self.node = obj_utils.create_test_node(self.context,
@@ -231,14 +302,68 @@ class VirtualBoxPowerTestCase(db_base.DbTestCase):
                                                     'get_power_status')
             self.assertEqual(states.ERROR, power_state)
 
+    @mock.patch.object(pyremotevbox_vbox, 'VirtualBoxHost', autospec=True)
+    def test_get_power_states_bulk(self, host_mock):
+        node2 = obj_utils.create_test_node(
+            self.context, uuid=uuidutils.generate_uuid(), driver='fake_vbox',
+            driver_info=dict(INFO_DICT, virtualbox_vmname='baremetal2'))
+        host_object_mock = mock.MagicMock(spec_set=['find_vm'])
+        host_mock.return_value = host_object_mock
+        host_object_mock.find_vm.side_effect = [
+            mock.MagicMock(spec_set=['get_power_status'],
+                           get_power_status=mock.Mock(return_value=status))
+            for status in ('Running', 'PoweredOff')]
+
+        with task_manager.acquire(self.context, self.node.uuid,
+                                  shared=True) as task1:
+            with task_manager.acquire(self.context, node2.uuid,
+                                      shared=True) as task2:
+                self.assertTrue(
+                    task1.driver.power.supports_bulk_power_states)
+                result = task1.driver.power.get_power_states_bulk(
+                    [task1, task2])
+
+        self.assertEqual({self.node.uuid: states.POWER_ON,
+                          node2.uuid: states.POWER_OFF}, result)
+        self.assertEqual(1, host_mock.call_count)
+        self.assertEqual([mock.call('baremetal1'), mock.call('baremetal2')],
+                         host_object_mock.find_vm.call_args_list)
+
+    @mock.patch.object(pyremotevbox_vbox, 'VirtualBoxHost', autospec=True)
+    def test_get_power_states_bulk_cached(self, host_mock):
+        self.config(power_state_cache_ttl=5, group='virtualbox')
+        key = ('10.0.2.2', 12345, 'username', 'baremetal1')
+        virtualbox._POWER_STATUSES[key] = ('Running', time.time())
+
+        with task_manager.acquire(self.context, self.node.uuid,
+                                  shared=True) as task:
+            result = task.driver.power.get_power_states_bulk([task])
+
+        self.assertEqual({self.node.uuid: states.POWER_ON}, result)
+        self.assertFalse(host_mock.called)
+
+    @mock.patch.object(pyremotevbox_vbox, 'VirtualBoxHost', autospec=True)
+    def test_get_power_states_bulk_host_fails(self, host_mock):
+        host_mock.side_effect = pyremotevbox_exc.PyRemoteVBoxException
+
+        with task_manager.acquire(self.context, self.node.uuid,
+                                  shared=True) as task:
+            result = task.driver.power.get_power_states_bulk([task])
+
+        self.assertIsInstance(result[self.node.uuid],
+                              exception.VirtualBoxOperationFailed)
+
     @mock.patch.object(virtualbox, '_run_virtualbox_method', autospec=True)
     def test_set_power_state_off(self, run_method_mock):
         with task_manager.acquire(self.context, self.node.uuid,
                                   shared=False) as task:
+            key = ('10.0.2.2', 12345, 'username', 'baremetal1')
+            virtualbox._POWER_STATUSES[key] = ('Running', time.time())
             task.driver.power.set_power_state(task, states.POWER_OFF)
             run_method_mock.assert_called_once_with(task.node,
                                                     'set_power_state',
                                                     'stop')
+            self.assertEqual({}, virtualbox._POWER_STATUSES)
 
     @mock.patch.object(virtualbox.VirtualBoxManagement, 'set_boot_device')
     @mock.patch.object(virtualbox, '_run_virtualbox_method', autospec=True)
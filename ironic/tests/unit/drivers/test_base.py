@@ -408,3 +408,18 @@ class TestDeployInterface(base.TestCase):
                                                   driver='driver')),
                          'url')
         self.assertTrue(mock_log.called)
+
+
+class TestPowerInterface(base.TestCase):
+    def test_get_power_states_bulk(self):
+        power = fake.FakePower()
+        tasks = [mock.Mock(node=mock.Mock(uuid='uuid1')),
+                 mock.Mock(node=mock.Mock(uuid='uuid2'))]
+        error = exception.IPMIFailure(cmd='power status')
+
+        with mock.patch.object(power, 'get_power_state', autospec=True,
+                               side_effect=['power on', error]):
+            result = power.get_power_states_bulk(tasks)
+
+        self.assertEqual({'uuid1': 'power on', 'uuid2': error}, result)
+        self.assertFalse(power.supports_bulk_power_states)
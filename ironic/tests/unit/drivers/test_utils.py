@@ -16,12 +16,14 @@
 import datetime
 import os
 
+import eventlet
 import mock
 from oslo_config import cfg
 from oslo_utils import timeutils
 
 from ironic.common import driver_factory
 from ironic.common import exception
+from ironic.common import states
 from ironic.common import swift
 from ironic.conductor import task_manager
 from ironic.conductor import utils as manager_utils
@@ -96,6 +98,15 @@ class UtilsTestCase(db_base.DbTestCase):
         self.assertEqual(expected, result)
         self.assertEqual(expected2, result2)
 
+    def test_get_hardware_model(self):
+        self.node.properties = {'capabilities': 'hardware_model:gen9'}
+        self.assertEqual('gen9', driver_utils.get_hardware_model(self.node))
+
+    def test_get_hardware_model_default(self):
+        self.node.properties = {}
+        self.assertEqual(self.node.driver,
+                         driver_utils.get_hardware_model(self.node))
+
     def test_get_node_capability_returns_none(self):
         properties = {'capabilities': 'cap1:value1,cap2:value2'}
         self.node.properties = properties
@@ -247,6 +258,144 @@ class UtilsTestCase(db_base.DbTestCase):
         self.assertEqual("0a1b2c3d4f", mac_clean)
 
 
+class GetPowerStatesConcurrentlyTestCase(tests_base.TestCase):
+
+    def test_get_power_states_concurrently(self):
+        power = mock.Mock(spec_set=['get_power_state'])
+        tasks = [mock.Mock(node=mock.Mock(uuid='uuid%d' % i))
+                 for i in range(3)]
+        error = exception.IPMIFailure(cmd='power status')
+
+        def _get_power_state(task):
+            if task.node.uuid == 'uuid2':
+                raise error
+            return 'power on'
+
+        power.get_power_state.side_effect = _get_power_state
+
+        result = driver_utils.get_power_states_concurrently(power, tasks)
+
+        self.assertEqual({'uuid0': 'power on', 'uuid1': 'power on',
+                          'uuid2': error}, result)
+        self.assertEqual(3, power.get_power_state.call_count)
+
+    @mock.patch.object(eventlet, 'GreenPool', autospec=True)
+    def test_get_power_states_concurrently_bounded(self, pool_mock):
+        self.config(sync_power_state_bulk_concurrency=2, group='conductor')
+        power = mock.Mock(spec_set=['get_power_state'])
+        tasks = [mock.Mock(node=mock.Mock(uuid='uuid%d' % i))
+                 for i in range(3)]
+        pool_mock.return_value.imap.return_value = []
+
+        driver_utils.get_power_states_concurrently(power, tasks)
+
+        pool_mock.assert_called_once_with(2)
+
+    def test_get_power_states_concurrently_no_tasks(self):
+        power = mock.Mock(spec_set=['get_power_state'])
+        self.assertEqual(
+            {}, driver_utils.get_power_states_concurrently(power, []))
+        self.assertFalse(power.get_power_state.called)
+
+
+@mock.patch.object(driver_utils.METRICS, 'send_timer', autospec=True)
+@mock.patch('eventlet.greenthread.sleep', autospec=True)
+class WaitForPowerStateTestCase(tests_base.TestCase):
+
+    def setUp(self):
+        super(WaitForPowerStateTestCase, self).setUp()
+        driver_utils._POWER_TRANSITION_TIMES.clear()
+        self.addCleanup(driver_utils._POWER_TRANSITION_TIMES.clear)
+        self.get_power_state = mock.Mock()
+
+    def _sleeps(self, sleep_mock):
+        return [c[0][0] for c in sleep_mock.call_args_list]
+
+    def test_wait_for_power_state(self, sleep_mock, timer_mock):
+        self.get_power_state.side_effect = [states.POWER_OFF,
+                                            states.POWER_OFF,
+                                            states.POWER_ON]
+
+        state = driver_utils.wait_for_power_state(
+            self.get_power_state, states.POWER_ON, 30, model='gen9')
+
+        self.assertEqual(states.POWER_ON, state)
+        self.assertEqual(3, self.get_power_state.call_count)
+        self.assertEqual([1, 1, 2], self._sleeps(sleep_mock))
+        self.assertIn(('gen9', states.POWER_ON),
+                      driver_utils._POWER_TRANSITION_TIMES)
+        timer_mock.assert_called_once_with(
+            'wait_for_power_state.power_on', mock.ANY)
+
+    def test_wait_for_power_state_learned(self, sleep_mock, timer_mock):
+        driver_utils._POWER_TRANSITION_TIMES[('gen9', states.POWER_ON)] = 10
+        self.get_power_state.side_effect = [states.POWER_OFF,
+                                            states.POWER_OFF,
+                                            states.POWER_ON]
+
+        state = driver_utils.wait_for_power_state(
+            self.get_power_state, states.POWER_ON, 30, model='gen9')
+
+        self.assertEqual(states.POWER_ON, state)
+        self.assertEqual([8, 1, 1], self._sleeps(sleep_mock))
+
+    def test_wait_for_power_state_other_model(self, sleep_mock, timer_mock):
+        driver_utils._POWER_TRANSITION_TIMES[('gen9', states.POWER_ON)] = 10
+        self.get_power_state.return_value = states.POWER_ON
+
+        driver_utils.wait_for_power_state(
+            self.get_power_state, states.POWER_ON, 30, model='gen8')
+
+        self.assertEqual([1], self._sleeps(sleep_mock))
+
+    def test_wait_for_power_state_timeout(self, sleep_mock, timer_mock):
+        self.get_power_state.return_value = states.POWER_OFF
+
+        state = driver_utils.wait_for_power_state(
+            self.get_power_state, states.POWER_ON, 5)
+
+        self.assertEqual(states.ERROR, state)
+        self.assertEqual(4, self.get_power_state.call_count)
+        self.assertEqual([1, 1, 2, 1], self._sleeps(sleep_mock))
+        self.assertEqual({}, driver_utils._POWER_TRANSITION_TIMES)
+        self.assertFalse(timer_mock.called)
+
+    def test_wait_for_power_state_max_interval(self, sleep_mock, timer_mock):
+        self.get_power_state.return_value = states.POWER_OFF
+
+        state = driver_utils.wait_for_power_state(
+            self.get_power_state, states.POWER_ON, 5, max_interval=1)
+
+        self.assertEqual(states.ERROR, state)
+        self.assertEqual(5, self.get_power_state.call_count)
+        self.assertEqual([1] * 5, self._sleeps(sleep_mock))
+
+    def test_wait_for_power_state_exception(self, sleep_mock, timer_mock):
+        self.get_power_state.side_effect = exception.IPMIFailure(
+            cmd='power status')
+
+        self.assertRaises(exception.IPMIFailure,
+                          driver_utils.wait_for_power_state,
+                          self.get_power_state, states.POWER_ON, 5)
+        self.assertEqual(1, self.get_power_state.call_count)
+
+    def test__record_power_transition(self, sleep_mock, timer_mock):
+        key = ('gen9', states.POWER_ON)
+        driver_utils._record_power_transition(key, 10)
+        self.assertEqual(10, driver_utils._POWER_TRANSITION_TIMES[key])
+        driver_utils._record_power_transition(key, 20)
+        self.assertEqual(13, driver_utils._POWER_TRANSITION_TIMES[key])
+
+    @mock.patch.object(driver_utils, '_POWER_TRANSITION_TIMES_MAX', 2)
+    def test__record_power_transition_evicts(self, sleep_mock, timer_mock):
+        driver_utils._record_power_transition('a', 1)
+        driver_utils._record_power_transition('b', 1)
+        driver_utils._record_power_transition('a', 1)
+        driver_utils._record_power_transition('c', 1)
+        self.assertEqual(['a', 'c'],
+                         list(driver_utils._POWER_TRANSITION_TIMES))
+
+
 class UtilsRamdiskLogsTestCase(tests_base.TestCase):
 
     def setUp(self):
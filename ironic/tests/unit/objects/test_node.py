@@ -41,7 +41,7 @@ class TestNodeObject(base.DbTestCase):
 
             node = objects.Node.get(self.context, node_id)
 
-            mock_get_node.assert_called_once_with(node_id)
+            mock_get_node.assert_called_once_with(node_id, filters=None)
             self.assertEqual(self.context, node._context)
 
     def test_get_by_uuid(self):
@@ -52,7 +52,7 @@ class TestNodeObject(base.DbTestCase):
 
             node = objects.Node.get(self.context, uuid)
 
-            mock_get_node.assert_called_once_with(uuid)
+            mock_get_node.assert_called_once_with(uuid, filters=None)
             self.assertEqual(self.context, node._context)
 
     def test_get_bad_id_and_uuid(self):
@@ -85,7 +85,7 @@ class TestNodeObject(base.DbTestCase):
                 n.driver = "fake-driver"
                 n.save()
 
-                mock_get_node.assert_called_once_with(uuid)
+                mock_get_node.assert_called_once_with(uuid, filters=None)
                 mock_update_node.assert_called_once_with(
                     uuid, {'properties': {"fake": "property"},
                            'driver': 'fake-driver',
@@ -97,7 +97,8 @@ class TestNodeObject(base.DbTestCase):
         uuid = self.fake_node['uuid']
         returns = [dict(self.fake_node, properties={"fake": "first"}),
                    dict(self.fake_node, properties={"fake": "second"})]
-        expected = [mock.call(uuid), mock.call(uuid)]
+        expected = [mock.call(uuid, filters=None),
+                    mock.call(uuid, filters=None)]
         with mock.patch.object(self.dbapi, 'get_node_by_uuid',
                                side_effect=returns,
                                autospec=True) as mock_get_node:
@@ -117,6 +118,21 @@ class TestNodeObject(base.DbTestCase):
             self.assertIsInstance(nodes[0], objects.Node)
             self.assertEqual(self.context, nodes[0]._context)
 
+    def test_list_fields(self):
+        with mock.patch.object(self.dbapi, 'get_node_list',
+                               autospec=True) as mock_get_list:
+            mock_get_list.return_value = [self.fake_node]
+            nodes = objects.Node.list(self.context,
+                                      fields=['id', 'uuid', 'power_state'])
+            self.assertThat(nodes, matchers.HasLength(1))
+            self.assertEqual(self.fake_node['uuid'], nodes[0].uuid)
+            self.assertFalse(nodes[0].obj_attr_is_set('properties'))
+            self.assertEqual({'id', 'uuid', 'power_state'},
+                             set(nodes[0].as_dict()))
+            mock_get_list.assert_called_once_with(
+                filters=None, limit=None, marker=None, sort_key=None,
+                sort_dir=None, fields=['id', 'uuid', 'power_state'])
+
     def test_reserve(self):
         with mock.patch.object(self.dbapi, 'reserve_node',
                                autospec=True) as mock_reserve:
@@ -154,6 +170,32 @@ class TestNodeObject(base.DbTestCase):
                               objects.Node.release, self.context,
                               'fake-tag', node_id)
 
+    def test_reserve_many(self):
+        with mock.patch.object(self.dbapi, 'reserve_nodes',
+                               autospec=True) as mock_reserve:
+            node_id = self.fake_node['id']
+            error = exception.NodeNotFound(node='non-existent')
+            mock_reserve.return_value = ({node_id: self.fake_node},
+                                         {'non-existent': error})
+            fake_tag = 'fake-tag'
+            reserved, failed = objects.Node.reserve_many(
+                self.context, fake_tag, [node_id, 'non-existent'])
+            self.assertIsInstance(reserved[node_id], objects.Node)
+            self.assertEqual(self.context, reserved[node_id]._context)
+            self.assertEqual({'non-existent': error}, failed)
+            mock_reserve.assert_called_once_with(fake_tag,
+                                                 [node_id, 'non-existent'])
+
+    def test_release_many(self):
+        with mock.patch.object(self.dbapi, 'release_nodes',
+                               autospec=True) as mock_release:
+            node_id = self.fake_node['id']
+            mock_release.return_value = {}
+            fake_tag = 'fake-tag'
+            self.assertEqual({}, objects.Node.release_many(
+                self.context, fake_tag, [node_id]))
+            mock_release.assert_called_once_with(fake_tag, [node_id])
+
     def test_touch_provisioning(self):
         with mock.patch.object(self.dbapi, 'get_node_by_uuid',
                                autospec=True) as mock_get_node:
@@ -179,7 +221,7 @@ class TestNodeObject(base.DbTestCase):
                                'cpus': '-1', 'cpu_arch': 'x86_64'}
             self.assertRaisesRegex(exception.InvalidParameterValue,
                                    ".*local_gb=5G, cpus=-1$", node.save)
-            mock_get_node.assert_called_once_with(uuid)
+            mock_get_node.assert_called_once_with(uuid, filters=None)
 
     def test__validate_property_values_success(self):
         uuid = self.fake_node['uuid']
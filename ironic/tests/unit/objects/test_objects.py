@@ -79,6 +79,22 @@ class MyObj(base.IronicObject, object_base.VersionedObjectDictCompat):
         self.foo = 42
 
 
+class _FakeLazyDbObject(dict):
+    """DB entity whose 'bar' field is decoded on first access."""
+
+    def __init__(self, **kwargs):
+        super(_FakeLazyDbObject, self).__init__(
+            created_at=None, updated_at=None, **kwargs)
+        self.read = []
+
+    def __getitem__(self, key):
+        self.read.append(key)
+        return super(_FakeLazyDbObject, self).__getitem__(key)
+
+    def is_json_decoded(self, name):
+        return name != 'bar'
+
+
 class MyObj2(object):
     @classmethod
     def obj_name(cls):
@@ -374,6 +390,44 @@ class _TestObject(object):
         self.assertEqual(2, obj.foo)
         self.assertEqual('current.bar', obj.bar)
 
+    def _get_lazy_test_obj(self, db_object):
+        @base.IronicObjectRegistry.register_if(False)
+        class TestObj(base.IronicObject,
+                      object_base.VersionedObjectDictCompat):
+            fields = {'foo': fields.IntegerField(),
+                      'bar': fields.FlexibleDictField()}
+
+        return TestObj._from_db_object(TestObj(self.context), db_object)
+
+    def test_lazy_field(self):
+        db_object = _FakeLazyDbObject(foo=1, bar={'a': 'b'})
+        obj = self._get_lazy_test_obj(db_object)
+        self.assertIn('foo', db_object.read)
+        self.assertTrue(obj.obj_attr_is_set('bar'))
+        self.assertEqual(set(), obj.obj_what_changed())
+        self.assertNotIn('bar', db_object.read)
+
+        self.assertEqual({'a': 'b'}, obj.bar)
+        self.assertIn('bar', db_object.read)
+        self.assertEqual(set(), obj.obj_what_changed())
+        self.assertEqual({'foo': 1, 'bar': {'a': 'b'}, 'created_at': None,
+                          'updated_at': None}, obj.as_dict())
+
+    def test_lazy_field_set(self):
+        obj = self._get_lazy_test_obj(_FakeLazyDbObject(foo=1, bar={}))
+        obj.bar = {'c': 'd'}
+        self.assertEqual({'c': 'd'}, obj.bar)
+        self.assertEqual(set(['bar']), obj.obj_what_changed())
+
+    def test_refresh_object_lazy_field(self):
+        obj = self._get_lazy_test_obj(_FakeLazyDbObject(foo=1, bar={}))
+        db_object = _FakeLazyDbObject(foo=2, bar={'a': 'b'})
+        current_obj = self._get_lazy_test_obj(db_object)
+        obj.obj_refresh(current_obj)
+        self.assertEqual(2, obj.foo)
+        self.assertNotIn('bar', db_object.read)
+        self.assertEqual({'a': 'b'}, obj.bar)
+
     def test_obj_constructor(self):
         obj = MyObj(self.context, foo=123, bar='abc')
         self.assertEqual(123, obj.foo)